@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Condition Evaluation Benchmark
+Measures single-core condition throughput for program flow logic, comparing
+compiling every expression per evaluation (the old parse-per-call path)
+with the evaluator's cached compiled conditions, and a trigger sweep over
+many enrolled users evaluated per user versus as one columnar batch
+
+Examples:
+    python scripts/benchmark-condition-evaluation.py
+    python scripts/benchmark-condition-evaluation.py --evaluations 50000 --users 500
+    python scripts/benchmark-condition-evaluation.py --sweep-users 100000
+"""
+
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add project root and the creator hub service to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "services" / "creator-hub-service"))
+
+from app.condition_evaluator import ConditionContext, ConditionEvaluator
+from app.program_engine import ExecutionContext
+from app.step_models import ConditionalConfig
+
+SWEEP_EXPRESSIONS = [
+    "engagement_score < 0.5 AND days_enrolled > 7",
+    "(plan == 'pro' OR plan == 'enterprise') AND streak_days IN [7, 14, 30]",
+    "engagement_score < 0.3 AND COUNT(completed_lessons) < 2",
+]
+
+EXPRESSIONS = [
+    "engagement_score >= 0.5",
+    "engagement_score < 0.5 AND days_enrolled > 7",
+    "(plan == 'pro' OR plan == 'enterprise') AND COUNT(completed_lessons) >= 3",
+    "AVG(quiz_scores) > 70 AND user_traits CONTAINS 'visual'",
+    "GET_STEP_RESULT('intro', 'completed') == true OR streak_days IN [7, 14, 30]",
+]
+
+
+def make_contexts(count: int, seed: int = 0):
+    rng = random.Random(seed)
+    contexts = []
+    for i in range(count):
+        execution_context = ExecutionContext(
+            program_id="program-1",
+            user_id=f"user-{i}",
+            creator_id="creator-1",
+            execution_id=f"execution-{i}",
+            variables={
+                "engagement_score": rng.random(),
+                "days_enrolled": rng.randint(0, 60),
+                "completed_lessons": list(range(rng.randint(0, 8))),
+                "quiz_scores": [rng.randint(40, 100) for _ in range(5)],
+                "streak_days": rng.choice([1, 7, 14, 30]),
+            }
+        )
+        contexts.append(ConditionContext(
+            execution_context=execution_context,
+            program=None,
+            step_results={"intro": {"completed": rng.random() > 0.3}},
+            user_variables={
+                "plan": rng.choice(["free", "pro", "enterprise"]),
+                "user_traits": rng.choice(["visual", "auditory", "visual kinesthetic"]),
+            },
+            system_variables={},
+            time_context={}
+        ))
+    return contexts
+
+
+async def run(name: str, evaluate, contexts, evaluations: int) -> dict:
+    started = time.perf_counter()
+    matched = 0
+    for i in range(evaluations):
+        expression = EXPRESSIONS[i % len(EXPRESSIONS)]
+        matched += bool(await evaluate(expression, contexts[i % len(contexts)]))
+    elapsed = time.perf_counter() - started
+    return {
+        "mode": name,
+        "evaluations_per_second": round(evaluations / elapsed),
+        "mean_us": round(elapsed / evaluations * 1e6, 2),
+        "matched": matched
+    }
+
+
+def make_table(count: int, seed: int = 0) -> dict:
+    rng = np.random.default_rng(seed)
+    lesson_counts = rng.integers(0, 8, count)
+    return {
+        "engagement_score": rng.random(count),
+        "days_enrolled": rng.integers(0, 60, count),
+        "plan": rng.choice(["free", "pro", "enterprise"], count).tolist(),
+        "streak_days": rng.choice([1, 7, 14, 30], count),
+        "completed_lessons": [list(range(n)) for n in lesson_counts],
+    }
+
+
+async def run_sweep(evaluator: ConditionEvaluator, users: int) -> list:
+    table = make_table(users)
+    base_context = make_contexts(1)[0]
+    results = []
+    for expression in SWEEP_EXPRESSIONS:
+        compiled = evaluator.compile(expression)
+        started = time.perf_counter()
+        per_user = []
+        for row in range(users):
+            context = ConditionContext(
+                execution_context=base_context.execution_context,
+                program=None,
+                step_results={},
+                user_variables={name: column[row] for name, column in table.items()},
+                system_variables={},
+                time_context={}
+            )
+            per_user.append(bool(await compiled.evaluate(context)))
+        per_user_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        batch = await evaluator.evaluate_batch(expression, table, base_context)
+        batch_seconds = time.perf_counter() - started
+        assert batch.tolist() == per_user, f"batch result differs: {expression}"
+
+        results.append({
+            "expression": expression,
+            "vectorized": evaluator.compile_batch(expression).fully_vectorized,
+            "matched": int(batch.sum()),
+            "per_user_seconds": round(per_user_seconds, 3),
+            "batch_seconds": round(batch_seconds, 3),
+        })
+    return results
+
+
+async def main(args):
+    contexts = make_contexts(args.users)
+    evaluator = ConditionEvaluator()
+    configs = {
+        expression: ConditionalConfig(condition_expression=expression, cache_evaluation_result=False)
+        for expression in EXPRESSIONS
+    }
+
+    async def compile_every_time(expression, context):
+        return await evaluator.compiler.compile(expression).evaluate(context)
+
+    async def compiled(expression, context):
+        return await evaluator.compile(expression).evaluate(context)
+
+    async def evaluate_condition(expression, context):
+        return (await evaluator.evaluate_condition(configs[expression], context)).result
+
+    results = [
+        await run("parse_per_evaluation", compile_every_time, contexts, args.evaluations),
+        await run("compiled", compiled, contexts, args.evaluations),
+        await run("evaluate_condition", evaluate_condition, contexts, args.evaluations),
+    ]
+    assert len({r["matched"] for r in results}) == 1, "modes disagree"
+
+    print(json.dumps({
+        "expressions": len(EXPRESSIONS),
+        "users": args.users,
+        "evaluations": args.evaluations,
+        "results": results,
+        "sweep_users": args.sweep_users,
+        "sweep": await run_sweep(evaluator, args.sweep_users) if args.sweep_users else []
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark condition evaluation throughput")
+    parser.add_argument("--evaluations", type=int, default=20000, help="Evaluations per mode")
+    parser.add_argument("--users", type=int, default=200, help="Distinct user contexts")
+    parser.add_argument("--sweep-users", type=int, default=100000, help="Users in the trigger sweep (0 to skip)")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Execution Checkpoint Benchmark
+Measures the per-step cost of checkpointing program executions and the
+time to recover an execution interrupted part-way through, compared with
+restarting it from the first step
+
+Each step sleeps for --step-ms (standing in for an AI-enhanced step) and
+returns --payload-bytes of generated content. Without --redis-url the store
+runs against in-process fakeredis, which measures serialization and
+command overhead but not network round trips.
+
+Examples:
+    python scripts/benchmark-execution-checkpoints.py
+    python scripts/benchmark-execution-checkpoints.py --steps 50 --crash-after 40 --step-ms 200
+    python scripts/benchmark-execution-checkpoints.py --redis-url redis://localhost:6379/0
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add project root and the creator hub service to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+sys.path.insert(0, str(project_root / "services" / "creator-hub-service"))
+
+from shared.cache.execution_checkpoints import ExecutionCheckpointStore
+from shared.cache.redis_client import RedisClient
+from app.program_engine import ExecutionContext, ProgramEngine, StepExecutionResult, StepHandler
+from app.program_models import ExecutionConfig, ExecutionStrategy, ProgramDefinition, StepType
+from app.step_models import ActionConfig, ActionType, ProgramStep, TriggerConfig, TriggerType
+
+
+class SimulatedStepHandler(StepHandler):
+    """Sleeps like a model call and returns generated content"""
+
+    def __init__(self, step_seconds: float, payload_bytes: int):
+        self.step_seconds = step_seconds
+        sentence = "Great progress today! Here is your next exercise. "
+        self.payload = (sentence * (payload_bytes // len(sentence) + 1))[:payload_bytes]
+        self.calls = 0
+        self.started = asyncio.Event()
+
+    async def can_handle(self, step):
+        return True
+
+    async def validate(self, step):
+        return []
+
+    async def execute(self, step, context, step_debug):
+        self.calls += 1
+        self.started.set()
+        await asyncio.sleep(self.step_seconds)
+        context.variables[f"{step.step_id}_done"] = True
+        return StepExecutionResult(
+            step_id=step.step_id,
+            execution_id=context.execution_id,
+            status="completed",
+            started_at=context.started_at,
+            success=True,
+            result_data={"message": self.payload},
+            engagement_score=0.8,
+            next_step_recommendations=step.next_steps
+        )
+
+
+def make_program(step_count: int):
+    program = ProgramDefinition(
+        title="Checkpoint benchmark",
+        description="Linear program",
+        creator_id="creator-1",
+        entry_step_ids=["step-0"],
+        execution_config=ExecutionConfig(execution_strategy=ExecutionStrategy.SEQUENTIAL)
+    )
+    steps = [
+        ProgramStep(
+            step_id=f"step-{i}",
+            program_id=program.id,
+            creator_id="creator-1",
+            step_type=StepType.CUSTOM,
+            title=f"Step {i}",
+            step_order=i,
+            trigger_config=TriggerConfig(trigger_type=TriggerType.IMMEDIATE),
+            action_config=ActionConfig(action_type=ActionType.SEND_MESSAGE),
+            next_steps=[f"step-{i + 1}"] if i + 1 < step_count else []
+        )
+        for i in range(step_count)
+    ]
+    return program, steps
+
+
+def make_engine(program, steps, handler, store=None) -> ProgramEngine:
+    engine = ProgramEngine(checkpoint_store=store)
+    engine.register_step_handler(StepType.CUSTOM, handler)
+    engine.register_program_steps(program, steps)
+    return engine
+
+
+def make_context(program, execution_id: str) -> ExecutionContext:
+    return ExecutionContext(
+        program_id=program.id, user_id="user-1", creator_id="creator-1", execution_id=execution_id
+    )
+
+
+async def timed_run(engine, program, context):
+    started = time.perf_counter()
+    result = await engine.run_program(program, context)
+    return result, time.perf_counter() - started
+
+
+async def main(args):
+    redis_client = RedisClient(redis_url=args.redis_url or "redis://localhost:6379/0")
+    if not args.redis_url:
+        import fakeredis.aioredis
+        redis_client._client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+    step_seconds = args.step_ms / 1000
+    program, steps = make_program(args.steps)
+
+    try:
+        # Full run without checkpoints
+        handler = SimulatedStepHandler(step_seconds, args.payload_bytes)
+        engine = make_engine(program, steps, handler)
+        _, plain_seconds = await timed_run(engine, program, make_context(program, "plain"))
+
+        # Full run with checkpoints
+        store = ExecutionCheckpointStore(redis_client)
+        handler = SimulatedStepHandler(step_seconds, args.payload_bytes)
+        engine = make_engine(program, steps, handler, store)
+        context = make_context(program, "checkpointed")
+        _, checkpointed_seconds = await timed_run(engine, program, context)
+        step_writes = engine.execution_metrics["checkpoint_writes"]
+        write_seconds = engine.execution_metrics["checkpoint_write_seconds"]
+        bytes_per_step = store.stats["bytes_written"] / max(store.stats["writes"], 1)
+
+        # Interrupt an execution once --crash-after steps have completed
+        handler = SimulatedStepHandler(step_seconds, args.payload_bytes)
+        engine = make_engine(program, steps, handler, store)
+        run = asyncio.create_task(engine.run_program(program, make_context(program, "crashed")))
+        while handler.calls <= args.crash_after:
+            handler.started.clear()
+            await handler.started.wait()
+        run.cancel()
+        try:
+            await run
+        except asyncio.CancelledError:
+            pass
+
+        # Resume it on a fresh engine (as a new worker would) and time how
+        # long it takes to reach the first step that still has to run
+        handler = SimulatedStepHandler(step_seconds, args.payload_bytes)
+        engine = make_engine(program, steps, handler, store)
+        started = time.perf_counter()
+        resume = asyncio.create_task(engine.resume_program(program, "creator-1", "crashed"))
+        await handler.started.wait()
+        recovery_seconds = time.perf_counter() - started
+        result = await resume
+        resume_seconds = time.perf_counter() - started
+        assert result.status == "completed" and result.successful_steps == args.steps
+        assert handler.calls == args.steps - args.crash_after, "completed steps were re-run"
+
+        print(json.dumps({
+            "backend": "redis" if args.redis_url else "fakeredis",
+            "steps": args.steps,
+            "step_ms": args.step_ms,
+            "payload_bytes": args.payload_bytes,
+            "run_seconds": round(plain_seconds, 3),
+            "checkpointed_run_seconds": round(checkpointed_seconds, 3),
+            "checkpoint_write_ms_per_step": round(write_seconds / step_writes * 1000, 3),
+            "checkpoint_bytes_per_step": round(bytes_per_step),
+            "crash_after_steps": args.crash_after,
+            "recovery_ms": round(recovery_seconds * 1000, 3),
+            "resumed_run_seconds": round(resume_seconds, 3),
+            "restart_from_scratch_seconds": round(plain_seconds, 3),
+            "steps_rerun_on_resume": handler.calls
+        }, indent=2))
+    finally:
+        if args.redis_url:
+            await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark execution checkpoint overhead and recovery")
+    parser.add_argument("--steps", type=int, default=20, help="Steps in the program")
+    parser.add_argument("--crash-after", type=int, default=15, help="Steps completed before the interruption")
+    parser.add_argument("--step-ms", type=float, default=50, help="Simulated duration of each step")
+    parser.add_argument("--payload-bytes", type=int, default=2000, help="Generated content per step")
+    parser.add_argument("--redis-url", default=None, help="Benchmark against a real Redis (default: fakeredis)")
+    args = parser.parse_args()
+    if not 0 <= args.crash_after < args.steps:
+        parser.error("--crash-after must be less than --steps")
+    asyncio.run(main(args))
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Password Hashing Benchmark
+Compares login throughput, latency and event-loop stalls with hashing run
+inline on the loop versus on bounded thread / process pools
+
+Examples:
+    python scripts/benchmark-password-hashing.py
+    python scripts/benchmark-password-hashing.py --logins 400 --concurrency 100 --workers 2 4 8 --max-queue 16
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+import statistics
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.security.hashing_pool import HashingPoolBusy, PasswordHashingPool
+from shared.security.password_security import PasswordHasher
+
+PASSWORD = "Correct-Horse-Battery-Staple-42"
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.005) -> float:
+    """Worst delay of a periodic tick, i.e. how long other requests would stall"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run(config: str, hasher: PasswordHasher, hashed: str, args, workers: int = 0) -> dict:
+    pool = None
+    if config != "inline":
+        pool = PasswordHashingPool(hasher, max_workers=workers, max_queue=args.max_queue, executor=config)
+        await pool.verify_password(PASSWORD, hashed)  # Warm up workers
+
+    latencies, rejected = [], 0
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def login():
+        nonlocal rejected
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                if pool is None:
+                    assert hasher.verify_password(PASSWORD, hashed)
+                else:
+                    assert await pool.verify_password(PASSWORD, hashed)
+            except HashingPoolBusy:
+                rejected += 1
+                return
+            latencies.append(time.perf_counter() - started)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    started = time.perf_counter()
+    await asyncio.gather(*(login() for _ in range(args.logins)))
+    elapsed = time.perf_counter() - started
+    stop.set()
+    loop_lag = await lag_task
+    if pool is not None:
+        pool.shutdown()
+
+    latencies.sort()
+    return {
+        "config": config if config == "inline" else f"{config}x{workers}",
+        "logins_per_second": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies) * 1000, 1) if latencies else None,
+        "p99_ms": round(latencies[int(len(latencies) * 0.99) - 1] * 1000, 1) if latencies else None,
+        "rejected_503": rejected,
+        "max_loop_stall_ms": round(loop_lag * 1000, 1)
+    }
+
+
+async def main(args):
+    hasher = PasswordHasher()
+    hashed = hasher.hash_password(PASSWORD, use_argon2=not args.bcrypt)
+
+    results = [await run("inline", hasher, hashed, args)]
+    for executor in args.executors:
+        for workers in args.workers:
+            results.append(await run(executor, hasher, hashed, args, workers))
+
+    print(json.dumps({
+        "algorithm": "bcrypt" if args.bcrypt else "argon2id",
+        "logins": args.logins,
+        "concurrency": args.concurrency,
+        "max_queue": args.max_queue,
+        "results": results
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark password hashing configurations")
+    parser.add_argument("--logins", type=int, default=200, help="Total login attempts")
+    parser.add_argument("--concurrency", type=int, default=50, help="Logins in flight at once")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4], help="Pool sizes to compare")
+    parser.add_argument("--executors", nargs="+", default=["thread", "process"], choices=["thread", "process"])
+    parser.add_argument("--max-queue", type=int, default=1000, help="Pool backlog before shedding with 503")
+    parser.add_argument("--bcrypt", action="store_true", help="Benchmark bcrypt hashes instead of Argon2id")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Vector Compression Benchmark
+Measures memory reduction and recall@k of float16 / int8 / PQ against exact float32 search
+"""
+
+import sys
+import json
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.ai.quantization import COMPRESSION_TYPES, benchmark_compression
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark embedding compression codecs")
+    parser.add_argument("--vectors", type=int, default=20000, help="Corpus size")
+    parser.add_argument("--queries", type=int, default=200, help="Number of queries")
+    parser.add_argument("--dim", type=int, default=768, help="Embedding dimension")
+    parser.add_argument("--k", type=int, default=10, help="Neighbours compared for recall")
+    parser.add_argument("--space", default="cosine", choices=["l2", "ip", "cosine"])
+    parser.add_argument("--rerank-factor", type=int, default=4)
+    parser.add_argument("--subspaces", type=int, default=None, help="PQ subspaces")
+    parser.add_argument("--codecs", nargs="+", default=list(COMPRESSION_TYPES), choices=list(COMPRESSION_TYPES))
+    parser.add_argument("--input", help="Optional .npy file with real embeddings (overrides --vectors/--dim)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    if args.input:
+        vectors = np.load(args.input).astype(np.float32)
+    else:
+        # Clustered data is closer to real embeddings than isotropic noise
+        centers = rng.standard_normal((64, args.dim)).astype(np.float32)
+        labels = rng.integers(0, len(centers), args.vectors)
+        vectors = centers[labels] + 0.3 * rng.standard_normal((args.vectors, args.dim)).astype(np.float32)
+    picks = rng.choice(len(vectors), size=min(args.queries, len(vectors)), replace=False)
+    queries = vectors[picks] + 0.05 * rng.standard_normal((len(picks), vectors.shape[1])).astype(np.float32)
+
+    reports = benchmark_compression(
+        vectors,
+        queries,
+        k=args.k,
+        compression_types=args.codecs,
+        space=args.space,
+        rerank_factor=args.rerank_factor,
+        pq_options={"subspaces": args.subspaces} if args.subspaces else None
+    )
+    print(json.dumps({"vectors": len(vectors), "dim": int(vectors.shape[1]), "results": reports}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Breached-Password Index Builder
+Converts a downloaded Pwned Passwords SHA-1 list ("HASH:COUNT" lines, any
+order) into the sorted binary index used for offline breach checks. Point
+BREACHED_PASSWORDS_INDEX_PATH at the output to enable offline mode.
+
+Examples:
+    python scripts/build-breached-password-index.py pwned-passwords-sha1.txt -o /data/pwned.idx
+    python scripts/build-breached-password-index.py ranges/*.txt -o /data/pwned.idx --min-count 3 --bloom 0.001
+    python scripts/build-breached-password-index.py --check /data/pwned.idx "P@ssw0rd"
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.security.breached_passwords import BreachedPasswordIndex, build_breached_password_index
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Build or query an offline breached-password index")
+    parser.add_argument("sources", nargs="*", help="SHA-1 hash list files (HASH:COUNT per line)")
+    parser.add_argument("-o", "--output", help="Index file to write")
+    parser.add_argument("--min-count", type=int, default=1, help="Skip hashes seen in fewer breaches")
+    parser.add_argument("--bloom", type=float, default=None, metavar="ERROR_RATE",
+                        help="Also write a Bloom filter sidecar with this false-positive rate")
+    parser.add_argument("--chunk-size", type=int, default=2_000_000, help="Hashes sorted in memory at a time")
+    parser.add_argument("--check", nargs=2, metavar=("INDEX", "PASSWORD"), help="Look a password up in an index")
+    args = parser.parse_args()
+
+    if args.check:
+        index = BreachedPasswordIndex(args.check[0])
+        started = time.perf_counter()
+        found = index.contains_password(args.check[1])
+        elapsed_us = (time.perf_counter() - started) * 1e6
+        print(f"{'BREACHED' if found else 'not found'} ({len(index)} hashes, {elapsed_us:.0f} µs)")
+        index.close()
+        return 1 if found else 0
+
+    if not args.sources or not args.output:
+        parser.error("sources and --output are required to build an index")
+
+    started = time.perf_counter()
+    count = build_breached_password_index(
+        args.sources,
+        args.output,
+        min_count=args.min_count,
+        bloom_error_rate=args.bloom,
+        chunk_size=args.chunk_size
+    )
+    print(f"Indexed {count} hashes into {args.output} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -83,7 +83,7 @@ def main():
             "extra_deps": {"alembic", "psycopg2-binary"}
         },
         "creator-hub-service": {
-            "extra_deps": {"aiofiles", "python-magic", "PyPDF2", "python-docx", "python-dotenv"}
+            "extra_deps": {"aiofiles", "python-magic", "PyPDF2", "python-docx", "python-dotenv", "numpy"}
         },
         "ai-engine-service": {
             "extra_deps": {
@@ -95,7 +95,13 @@ def main():
             }
         },
         "channel-service": {
-            "extra_deps": {"websockets", "aiofiles"}
+            "extra_deps": {
+                "websockets", "aiofiles",
+                # shared.monitoring (circuit breaker and hedging metrics)
+                "opentelemetry-api", "opentelemetry-sdk", "opentelemetry-exporter-jaeger",
+                "opentelemetry-exporter-jaeger-thrift", "opentelemetry-instrumentation-httpx",
+                "opentelemetry-instrumentation-redis", "prometheus-client", "cryptography"
+            }
         }
     }
     
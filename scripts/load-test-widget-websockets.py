@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Web Widget WebSocket Load Test
+Holds many concurrent widget connections (spread over one or more channel-service
+workers) and measures connect success, message round trips and slow-consumer evictions
+
+Example (10k connections over two workers; raise the open-file limit first):
+    ulimit -n 65536
+    python scripts/load-test-widget-websockets.py --url ws://localhost:8004 --url ws://localhost:8014 \
+        --connections 10000 --messages 2
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+from pathlib import Path
+
+try:
+    import websockets
+except ImportError:
+    print("The 'websockets' package is required: pip install websockets")
+    sys.exit(1)
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.cache.websocket_fanout import SLOW_CONSUMER_CLOSE_CODE
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_client(index, args, started, stats):
+    base_url = args.url[index % len(args.url)].rstrip("/")
+    session_id = f"load-{uuid.uuid4()}"
+    uri = f"{base_url}/ws/widget/{args.channel_id}?creator_id={args.creator_id}&session_id={session_id}"
+
+    try:
+        async with started:
+            connect_start = time.perf_counter()
+            websocket = await asyncio.wait_for(websockets.connect(uri, max_queue=args.client_queue), args.timeout)
+            stats["connect_ms"].append((time.perf_counter() - connect_start) * 1000)
+    except Exception:
+        stats["connect_failures"] += 1
+        return
+
+    try:
+        stats["connected"] += 1
+        # Connection confirmation frame
+        await asyncio.wait_for(websocket.recv(), args.timeout)
+        await asyncio.sleep(args.ramp_hold)
+
+        for n in range(args.messages):
+            sent_at = time.perf_counter()
+            await websocket.send(json.dumps({"type": "user_message", "content": f"load test {n}"}))
+            while True:
+                frame = json.loads(await asyncio.wait_for(websocket.recv(), args.timeout))
+                if frame.get("type") in ("ai_response", "error"):
+                    break
+            stats["round_trip_ms"].append((time.perf_counter() - sent_at) * 1000)
+            if args.slow_reader and index % args.slow_reader == 0:
+                # Stop reading to exercise server-side backpressure
+                await asyncio.sleep(args.hold)
+        await asyncio.sleep(args.hold)
+    except websockets.ConnectionClosed as closed:
+        code = closed.rcvd.code if closed.rcvd else None
+        stats["evicted" if code == SLOW_CONSUMER_CLOSE_CODE else "dropped"] += 1
+    except Exception:
+        stats["message_failures"] += 1
+    finally:
+        await websocket.close()
+
+
+async def run(args) -> dict:
+    stats = {
+        "connected": 0, "connect_failures": 0, "message_failures": 0, "evicted": 0, "dropped": 0,
+        "connect_ms": [], "round_trip_ms": []
+    }
+    started = asyncio.Semaphore(args.connect_concurrency)
+    wall_start = time.perf_counter()
+    await asyncio.gather(*(run_client(i, args, started, stats) for i in range(args.connections)))
+    elapsed = time.perf_counter() - wall_start
+
+    return {
+        "connections": args.connections,
+        "workers": len(args.url),
+        "connected": stats["connected"],
+        "connect_failures": stats["connect_failures"],
+        "message_failures": stats["message_failures"],
+        "evicted_slow_consumers": stats["evicted"],
+        "dropped": stats["dropped"],
+        "connect_ms_p50": round(percentile(stats["connect_ms"], 50), 1),
+        "connect_ms_p99": round(percentile(stats["connect_ms"], 99), 1),
+        "round_trips": len(stats["round_trip_ms"]),
+        "round_trip_ms_p50": round(percentile(stats["round_trip_ms"], 50), 1),
+        "round_trip_ms_p99": round(percentile(stats["round_trip_ms"], 99), 1),
+        "elapsed_seconds": round(elapsed, 1)
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Load test Web Widget WebSocket connections")
+    parser.add_argument("--url", action="append", help="Channel service base URL (repeat for several workers)")
+    parser.add_argument("--connections", type=int, default=10000, help="Concurrent connections to hold")
+    parser.add_argument("--connect-concurrency", type=int, default=500, help="Handshakes in flight at once")
+    parser.add_argument("--messages", type=int, default=1, help="Messages sent per connection")
+    parser.add_argument("--channel-id", default="load-test")
+    parser.add_argument("--creator-id", default="demo-creator")
+    parser.add_argument("--ramp-hold", type=float, default=5.0, help="Seconds to idle after connecting")
+    parser.add_argument("--hold", type=float, default=10.0, help="Seconds to hold the connection at the end")
+    parser.add_argument("--slow-reader", type=int, default=0, help="Every Nth client stops reading (0 disables)")
+    parser.add_argument("--client-queue", type=int, default=16, help="Client-side receive buffer in frames")
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--max-failure-rate", type=float, default=0.01, help="Exit non-zero above this rate")
+    args = parser.parse_args()
+    args.url = args.url or ["ws://localhost:8004"]
+
+    report = asyncio.run(run(args))
+    print(json.dumps(report, indent=2))
+
+    failures = report["connect_failures"] + report["message_failures"] + report["dropped"]
+    return 1 if failures > args.max_failure_rate * args.connections else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
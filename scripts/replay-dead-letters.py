@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Dead-Letter Replay
+Lists or replays messages a MessageQueue consumer gave up on. Replayed messages
+go back onto their priority lane with a fresh retry budget.
+
+Examples:
+    python scripts/replay-dead-letters.py --creator-id system --queue webhooks --list
+    python scripts/replay-dead-letters.py --creator-id system --queue webhooks --count 50
+    python scripts/replay-dead-letters.py --creator-id system --queue webhooks --id 1718000000000-0 --priority low
+"""
+
+import sys
+import json
+import asyncio
+import argparse
+from pathlib import Path
+
+# Add project root to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from shared.cache.message_queue import PRIORITIES, MessageQueue
+from shared.cache.redis_client import RedisClient
+
+
+async def main(args):
+    redis_client = RedisClient(redis_url=args.redis_url)
+    queue = MessageQueue(redis_client)
+    try:
+        if args.list:
+            for message in await queue.get_dead_letters(args.creator_id, args.queue, count=args.count):
+                print(json.dumps(message, default=str))
+            return
+
+        replayed = await queue.replay_dead_letters(
+            args.creator_id,
+            args.queue,
+            count=args.count,
+            message_ids=args.id or None,
+            priority=args.priority
+        )
+        print(f"Replayed {replayed} dead-lettered messages from {args.queue} ({args.creator_id})")
+    finally:
+        await redis_client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="List or replay dead-lettered queue messages")
+    parser.add_argument("--creator-id", required=True, help="Tenant the queue belongs to ('system' for shared queues)")
+    parser.add_argument("--queue", required=True, help="Queue name, e.g. webhooks")
+    parser.add_argument("--count", type=int, default=100, help="Maximum messages to list or replay, oldest first")
+    parser.add_argument("--id", action="append", help="Replay only this dead-letter entry (repeatable)")
+    parser.add_argument("--priority", choices=PRIORITIES, help="Lane to replay into (default: original priority)")
+    parser.add_argument("--list", action="store_true", help="Only print the dead-lettered messages")
+    parser.add_argument("--redis-url", default=None, help="Redis URL (default: REDIS_URL)")
+    asyncio.run(main(parser.parse_args()))
@@ -5,11 +5,11 @@ Implements JWT validation, tenant isolation, and user context management
 
 import logging
 from typing import Dict, Any, Optional
-from functools import lru_cache
 from contextvars import ContextVar
 from dataclasses import dataclass
 
-import httpx
+from shared.config.env_constants import AUTH_SERVICE_URL, get_env_value
+from shared.security.jwks import JWKS_PATH, get_jwks_verifier, http_jwks_loader
 from fastapi import HTTPException, Depends, Request, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import jwt, JWTError
@@ -49,42 +49,17 @@ class UserContext:
 
 
 class JWTManager:
-    """Manages JWT validation and JWKS key retrieval"""
+    """Manages JWT validation against the auth service's cached JWKS"""
     
     def __init__(self):
-        self.auth_service_url = "http://auth-service:8001"
-        self.jwks_url = f"{self.auth_service_url}/.well-known/jwks.json"
-        self.issuer = "auth-service"
-        self.audience = "coaching-platform"
+        self.auth_service_url = get_env_value(AUTH_SERVICE_URL, default="http://auth-service:8001").rstrip("/")
+        self.jwks_url = f"{self.auth_service_url}{JWKS_PATH}"
         self.algorithm = "RS256"
-    
-    @lru_cache(maxsize=10)
-    async def get_jwks(self) -> Dict[str, Any]:
-        """Get JWKS with caching and retry logic"""
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.get(self.jwks_url, timeout=5.0)
-                response.raise_for_status()
-                return response.json()
-        except Exception as e:
-            logger.error(f"Failed to fetch JWKS: {e}")
-            raise HTTPException(
-                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-                detail="Authentication service unavailable"
-            )
-    
-    def get_signing_key(self, jwks: Dict[str, Any], kid: str) -> str:
-        """Get signing key by key ID"""
-        for key in jwks.get("keys", []):
-            if key.get("kid") == kid:
-                return key
-        
-        # Retry with fresh JWKS on cache miss
-        self.get_jwks.cache_clear()
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Invalid token: key not found"
-        )
+        # Keys are fetched once and refreshed in the background, not per request
+        self.verifier = get_jwks_verifier(load_jwks=http_jwks_loader(self.jwks_url))
+        # Same issuer and audience the auth service issues tokens with
+        self.issuer = self.verifier.issuer
+        self.audience = self.verifier.audience
     
     async def verify_token(self, token: str) -> Dict[str, Any]:
         """Verify JWT token and return claims"""
@@ -99,15 +74,9 @@ class JWTManager:
                     detail="Invalid token: missing key ID"
                 )
             
-            # Get JWKS and signing key
-            jwks = await self.get_jwks()
-            signing_key = self.get_signing_key(jwks, kid)
-            
-            # Verify token
-            claims = jwt.decode(
+            # Verify token with the cached signing key
+            claims = await self.verifier.verify(
                 token,
-                signing_key,
-                algorithms=[self.algorithm],
                 audience=self.audience,
                 issuer=self.issuer
             )
@@ -9,11 +9,13 @@ import hashlib
 import json
 import time
 import unicodedata
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timezone
 from dataclasses import dataclass
 
 from shared.ai.chromadb_manager import get_chromadb_manager, ChromaDBError
+from shared.ai.quantization import COMPRESSION_TYPES, pack_embedding, unpack_embedding
+from shared.ai.hnsw_tuning import select_hnsw_tier
 from shared.ai.ollama_manager import get_ollama_manager, OllamaError
 from shared.cache import get_cache_manager
 from shared.exceptions.base import BaseServiceException
@@ -450,6 +452,12 @@ class EmbeddingManager:
         self.embedding_batch_size = 10
         self.max_concurrent_embeddings = 5
         self.embedding_timeout = 60  # seconds - increased for debugging
+        
+        # Per-creator embedding cache compression (None = plain float lists), with
+        # the monotonic time it was loaded; reloaded after compression_type_ttl seconds
+        # so changes made through another worker (or the config expiring) are seen
+        self._compression_types: Dict[str, Tuple[float, Optional[str]]] = {}
+        self.compression_type_ttl = 60.0
     
     async def generate_embeddings_batch(
         self,
@@ -731,7 +739,7 @@ class EmbeddingManager:
             cache_key = f"embedding:{text_hash}"
             
             cached_embedding = await self.cache_manager.redis.get(creator_id, cache_key)
-            return cached_embedding
+            return unpack_embedding(cached_embedding)
             
         except Exception as e:
             logger.debug(f"Failed to get cached embedding: {e}")
@@ -749,10 +757,12 @@ class EmbeddingManager:
             text_hash = hashlib.sha256(text.encode('utf-8')).hexdigest()[:32]
             cache_key = f"embedding:{text_hash}"
             
+            compression_type = await self._get_compression_type(creator_id)
+            
             return await self.cache_manager.redis.set(
                 creator_id,
                 cache_key,
-                embedding,
+                pack_embedding(embedding, compression_type),
                 self.search_cache.embedding_cache_ttl
             )
             
@@ -810,36 +820,85 @@ class EmbeddingManager:
         """
         return await self.search_cache.warm_popular_queries(creator_id)
     
-    async def enable_embedding_compression(self, creator_id: str, compression_type: str = "float16") -> bool:
+    async def _get_compression_type(self, creator_id: str) -> Optional[str]:
+        """Get the creator's embedding cache compression type (memoized for ``compression_type_ttl``)"""
+        cached = self._compression_types.get(creator_id)
+        if cached is not None and time.monotonic() - cached[0] < self.compression_type_ttl:
+            return cached[1]
+        
+        compression_type = None
+        try:
+            config = await self.cache_manager.redis.get(creator_id, "embedding_compression")
+            if isinstance(config, dict) and config.get("enabled"):
+                compression_type = config.get("type")
+        except Exception as e:
+            logger.debug(f"Failed to load compression config: {e}")
+        self._compression_types[creator_id] = (time.monotonic(), compression_type)
+        return compression_type
+    
+    def invalidate_compression_type(self, creator_id: Optional[str] = None):
+        """Drop the memoized compression type of a creator (or of every creator)"""
+        if creator_id is None:
+            self._compression_types.clear()
+        else:
+            self._compression_types.pop(creator_id, None)
+    
+    async def enable_embedding_compression(
+        self,
+        creator_id: str,
+        compression_type: str = "float16",
+        rerank_factor: int = 4,
+        shard_wide: bool = False
+    ) -> bool:
         """
         Enable embedding compression for storage efficiency
         
+        New entries in the Redis embedding cache are stored quantized (PQ falls
+        back to int8 there), and the creator's vector store shard is quantized
+        when the backend supports it. Shard quantization affects every creator
+        in the shard, so a shared shard is only quantized with ``shard_wide``.
+        
         Args:
             creator_id: Creator identifier
             compression_type: Type of compression (float16, int8, pq)
+            rerank_factor: Candidates per result re-ranked at full precision (1 = off)
+            shard_wide: Quantize the vector store shard even when other creators share it
             
         Returns:
             Success status
         """
         try:
-            if compression_type not in ["float16", "int8", "pq"]:
+            if compression_type not in COMPRESSION_TYPES:
                 raise EmbeddingError(f"Unsupported compression type: {compression_type}")
             
-            # Store compression preference
-            compression_key = f"embedding_compression:{creator_id}"
+            try:
+                vector_store = await self.chromadb_manager.enable_compression(
+                    creator_id, compression_type, rerank_factor=rerank_factor, shard_wide=shard_wide
+                )
+                vector_store["applied"] = True
+            except ChromaDBError as e:
+                logger.warning(f"Vector store compression not applied for creator {creator_id}: {e}")
+                vector_store = {"applied": False, "reason": str(e)}
+            
             compression_config = {
                 "type": compression_type,
                 "enabled": True,
                 "enabled_at": datetime.now(timezone.utc).isoformat(),
-                "expected_reduction": 0.5 if compression_type == "float16" else 0.75
+                "cache_codec": "int8" if compression_type == "pq" else compression_type,
+                "rerank_factor": rerank_factor,
+                "vector_store": vector_store
             }
             
-            await self.cache_manager.set(
-                compression_key, 
-                json.dumps(compression_config), 
-                ttl=86400 * 30  # 30 days
+            stored = await self.cache_manager.redis.set(
+                creator_id,
+                "embedding_compression",
+                compression_config,
+                86400 * 30  # 30 days
             )
+            if not stored:
+                raise EmbeddingError("Failed to store compression config")
             
+            self.invalidate_compression_type(creator_id)
             logger.info(f"Enabled {compression_type} compression for creator {creator_id}")
             return True
             
@@ -847,6 +906,23 @@ class EmbeddingManager:
             logger.exception(f"Failed to enable compression: {e}")
             return False
     
+    async def get_compression_config(self, creator_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Get the creator's compression config, including the vector store memory stats
+        
+        Args:
+            creator_id: Creator identifier
+            
+        Returns:
+            Compression config or None if compression is not enabled
+        """
+        try:
+            config = await self.cache_manager.redis.get(creator_id, "embedding_compression")
+            return config if isinstance(config, dict) else None
+        except Exception as e:
+            logger.error(f"Failed to get compression config: {e}")
+            return None
+    
     async def optimize_connection_pool(self) -> Dict[str, Any]:
         """
         Optimize ChromaDB connection pool settings
@@ -887,6 +963,10 @@ class EmbeddingManager:
         """
         Auto-tune HNSW parameters based on dataset size
         
+        Parameters come from the size tier used for shard collections
+        (shared.ai.hnsw_tuning); shards are rebuilt into the new tier by
+        ChromaDBManager.maintain_hnsw_tiers.
+        
         Args:
             dataset_size: Number of vectors in dataset
             
@@ -894,41 +974,27 @@ class EmbeddingManager:
             Optimized HNSW parameters
         """
         try:
-            # Auto-tune parameters based on dataset size
-            if dataset_size < 1000:
-                # Small dataset - prioritize accuracy
-                hnsw_params = {
-                    "M": 16,
-                    "ef_construction": 200,
-                    "ef": 100
-                }
-            elif dataset_size < 10000:
-                # Medium dataset - balance accuracy and speed
-                hnsw_params = {
-                    "M": 16,
-                    "ef_construction": 200,
-                    "ef": min(400, max(50, dataset_size // 25))
-                }
-            else:
-                # Large dataset - prioritize speed
-                hnsw_params = {
-                    "M": 12,  # Reduce connections for speed
-                    "ef_construction": 150,
-                    "ef": min(200, max(50, dataset_size // 50))
-                }
+            tier = select_hnsw_tier(dataset_size)
+            hnsw_params = {
+                "M": tier.params.M,
+                "ef_construction": tier.params.construction_ef,
+                "ef": tier.params.search_ef
+            }
             
             # Store tuned parameters
             tuning_config = {
                 "dataset_size": dataset_size,
+                "tier": tier.name,
                 "hnsw_params": hnsw_params,
                 "tuned_at": datetime.utcnow().isoformat(),
-                "rationale": f"Optimized for dataset size {dataset_size}"
+                "rationale": f"Optimized for dataset size {dataset_size} ({tier.name} tier)"
             }
             
-            await self.cache_manager.set(
+            await self.cache_manager.redis.set(
+                "system",
                 "hnsw_tuning_config",
-                json.dumps(tuning_config),
-                ttl=86400 * 7  # 7 days
+                tuning_config,
+                86400 * 7  # 7 days
             )
             
             logger.info(f"HNSW parameters tuned for dataset size {dataset_size}: {hnsw_params}")
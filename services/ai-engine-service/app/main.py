@@ -31,7 +31,7 @@ from shared.ai.chromadb_manager import close_chromadb_manager, get_chromadb_mana
 from shared.ai.ollama_manager import close_ollama_manager, get_ollama_manager
 
 # Local imports
-from .auth import get_current_user, UserContext
+from .auth import get_current_user, UserContext, jwt_manager
 from shared.config.env_constants import (
     CORS_ORIGINS,
     REQUIRED_VARS_BY_SERVICE,
@@ -40,8 +40,10 @@ from shared.config.env_constants import (
     MONITORING_RETENTION_DAYS,
     ENABLE_PII_DETECTION,
     HEALTH_CHECK_INTERVAL_MINUTES,
+    HNSW_MAINTENANCE_INTERVAL_SECONDS,
 )
 from shared.config.settings import validate_service_environment
+from shared.utils.http_client import init_http_client, close_http_client
 from shared.monitoring import (
     OperationType,
     PrivacyConfig,
@@ -76,6 +78,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan events"""
     logger.info("🚀 AI Engine Service starting up...")
 
+    # Pooled keep-alive HTTP client for calls to other services
+    await init_http_client(upstreams=[jwt_manager.auth_service_url])
+
+    # Token signing keys, refreshed in the background for local verification
+    await jwt_manager.verifier.start()
+
     # Initialize monitoring systems
     logger.info("Initializing monitoring systems...")
 
@@ -163,6 +171,25 @@ async def lifespan(app: FastAPI):
     app.state.privacy_task = privacy_task
     logger.info("Started automated privacy compliance monitoring")
 
+    # Start HNSW tier maintenance (shard rebuilds) in background
+    hnsw_interval = int(get_env_value(HNSW_MAINTENANCE_INTERVAL_SECONDS, default="3600") or 0)
+
+    async def hnsw_maintenance_task():
+        """Background task rebuilding shards that crossed an HNSW tier"""
+        while True:
+            await asyncio.sleep(hnsw_interval)
+            try:
+                results = await get_chromadb_manager().maintain_hnsw_tiers()
+                rebuilt = [entry["shard"] for entry in results if "rebuild" in entry]
+                if rebuilt:
+                    logger.info(f"Rebuilt HNSW shards: {rebuilt}")
+            except Exception as e:
+                logger.error(f"HNSW maintenance failed: {e}")
+
+    if hnsw_interval > 0:
+        app.state.hnsw_task = asyncio.create_task(hnsw_maintenance_task())
+        logger.info(f"Started HNSW tier maintenance with {hnsw_interval}s interval")
+
     # Startup logic
     startup_tasks = []
 
@@ -221,6 +248,15 @@ async def lifespan(app: FastAPI):
                 pass
             logger.info("Stopped alert evaluation")
 
+        # Stop HNSW maintenance task
+        if hasattr(app.state, "hnsw_task"):
+            app.state.hnsw_task.cancel()
+            try:
+                await app.state.hnsw_task
+            except asyncio.CancelledError:
+                pass
+            logger.info("Stopped HNSW tier maintenance")
+
         # Stop privacy compliance task
         if hasattr(app.state, "privacy_task"):
             app.state.privacy_task.cancel()
@@ -232,6 +268,8 @@ async def lifespan(app: FastAPI):
 
         await close_chromadb_manager()
         await close_ollama_manager()
+        await jwt_manager.verifier.stop()
+        await close_http_client()
         logger.info("✅ AI Engine Service cleanup completed")
     except Exception as e:
         logger.error(f"❌ AI Engine Service cleanup failed: {str(e)}")
@@ -1268,22 +1306,24 @@ async def get_active_model_version(model_name: str):
 
 @app.post("/api/v1/ai/embeddings/{creator_id}/compression", tags=["models"])
 async def enable_embedding_compression(
-    creator_id: str, compression_type: str = "float16"
+    creator_id: str, compression_type: str = "float16", shard_wide: bool = False
 ):
     """Enable embedding compression for storage efficiency"""
     try:
         embedding_manager = get_embedding_manager()
         success = await embedding_manager.enable_embedding_compression(
-            creator_id, compression_type
+            creator_id, compression_type, shard_wide=shard_wide
         )
 
         if success:
+            config = await embedding_manager.get_compression_config(creator_id) or {}
             return {
                 "status": "success",
                 "message": f"Enabled {compression_type} compression for creator {creator_id}",
                 "creator_id": creator_id,
                 "compression_type": compression_type,
-                "expected_reduction": "50%" if compression_type == "float16" else "75%",
+                "cache_codec": config.get("cache_codec"),
+                "vector_store": config.get("vector_store"),
                 "timestamp": datetime.utcnow().isoformat(),
             }
         else:
@@ -1351,6 +1391,28 @@ async def tune_hnsw_parameters(dataset_size: int):
         )
 
 
+@app.post("/api/v1/ai/hnsw/maintenance", tags=["models"])
+async def run_hnsw_maintenance():
+    """Rebuild shards whose size has moved into a different HNSW tier"""
+    try:
+        chromadb_manager = get_chromadb_manager()
+        results = await chromadb_manager.maintain_hnsw_tiers()
+
+        return {
+            "status": "success",
+            "shards": results,
+            "rebuilt": sum(1 for entry in results if "rebuild" in entry),
+            "timestamp": datetime.utcnow().isoformat(),
+        }
+
+    except Exception as e:
+        logger.error(f"HNSW maintenance failed: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"HNSW maintenance failed: {str(e)}",
+        )
+
+
 @app.get("/api/v1/ai/performance/{creator_id}", tags=["models"])
 async def get_performance_metrics(creator_id: str):
     """Get comprehensive performance metrics for creator"""
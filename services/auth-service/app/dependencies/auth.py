@@ -3,7 +3,6 @@ Authentication dependencies for FastAPI
 Provides JWT validation, user context, and security middleware
 """
 
-import os
 import uuid
 import time
 import redis.asyncio as redis
@@ -14,11 +13,13 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
-from jose import JWTError, jwt
+from jose import JWTError
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 
 from shared.models.database import Creator, JWTBlacklist
 from shared.models.auth import CreatorResponse
+from shared.security.jwks import get_jwks_verifier
+from shared.security.token_cache import get_auth_state_cache
 from ..database import get_db
 
 logger = logging.getLogger(__name__)
@@ -64,6 +65,52 @@ class AuthorizationError(HTTPException):
         )
 
 
+async def _decode_access_token(request: Request, token: str) -> Dict[str, Any]:
+    """
+    Verify an access token's signature and required claims
+    
+    Args:
+        request: FastAPI request object
+        token: Encoded JWT
+        
+    Returns:
+        Validated token payload
+        
+    Raises:
+        AuthenticationError: If token is invalid or expired
+    """
+    # Verify against the published signing keys (no network call per request)
+    try:
+        payload = await get_jwks_verifier().verify(token)
+    except ExpiredSignatureError:
+        logger.warning(f"Expired JWT token from {request.client.host}")
+        raise AuthenticationError("Token has expired")
+    except JWTClaimsError as e:
+        logger.warning(f"Invalid JWT claims from {request.client.host}: {e}")
+        raise AuthenticationError("Invalid token claims")
+    except JWTError as e:
+        logger.warning(f"Invalid JWT token from {request.client.host}: {e}")
+        raise AuthenticationError("Invalid token")
+    
+    # Extract claims
+    creator_id = payload.get("sub")
+    jti = payload.get("jti")
+    token_type = payload.get("type")
+    
+    if not creator_id or not jti or token_type != "access":
+        logger.warning(f"Missing or invalid JWT claims from {request.client.host}")
+        raise AuthenticationError("Invalid token format")
+    
+    # Validate creator ID format
+    try:
+        uuid.UUID(creator_id)
+    except ValueError:
+        logger.warning(f"Invalid creator ID format in JWT: {creator_id}")
+        raise AuthenticationError("Invalid token format")
+    
+    return payload
+
+
 async def get_current_creator_id(
     request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
@@ -84,75 +131,47 @@ async def get_current_creator_id(
         AuthenticationError: If token is invalid or expired
     """
     try:
-        # Get JWT configuration
-        jwt_secret_key = os.getenv("JWT_SECRET_KEY")
-        jwt_algorithm = os.getenv("JWT_ALGORITHM", "RS256")
-        jwt_audience = os.getenv("JWT_AUDIENCE", "api")
-        jwt_issuer = os.getenv("JWT_ISSUER", "mvp-coaching-ai-platform")
+        auth_cache = get_auth_state_cache()
         
-        if not jwt_secret_key:
-            logger.error("JWT_SECRET_KEY not configured")
-            raise AuthenticationError("Authentication service misconfigured")
-        
-        # Decode JWT token
-        try:
-            payload = jwt.decode(
-                credentials.credentials,
-                jwt_secret_key,
-                algorithms=[jwt_algorithm],
-                audience=jwt_audience,
-                issuer=jwt_issuer
-            )
-        except ExpiredSignatureError:
-            logger.warning(f"Expired JWT token from {request.client.host}")
-            raise AuthenticationError("Token has expired")
-        except JWTClaimsError as e:
-            logger.warning(f"Invalid JWT claims from {request.client.host}: {e}")
-            raise AuthenticationError("Invalid token claims")
-        except JWTError as e:
-            logger.warning(f"Invalid JWT token from {request.client.host}: {e}")
-            raise AuthenticationError("Invalid token")
+        # Tokens verified before skip decoding and claim validation until they expire
+        payload = auth_cache.tokens.get(credentials.credentials)
+        if payload is None:
+            payload = await _decode_access_token(request, credentials.credentials)
+            auth_cache.tokens.put(credentials.credentials, payload)
         
-        # Extract claims
-        creator_id = payload.get("sub")
-        jti = payload.get("jti")
-        token_type = payload.get("type")
+        creator_id = payload["sub"]
+        jti = payload["jti"]
         
-        if not creator_id or not jti or token_type != "access":
-            logger.warning(f"Missing or invalid JWT claims from {request.client.host}")
-            raise AuthenticationError("Invalid token format")
-        
-        # Validate creator ID format
-        try:
-            creator_uuid = uuid.UUID(creator_id)
-        except ValueError:
-            logger.warning(f"Invalid creator ID format in JWT: {creator_id}")
-            raise AuthenticationError("Invalid token format")
-        
-        # Check if token is blacklisted
-        blacklist_result = await db.execute(
-            select(JWTBlacklist).where(JWTBlacklist.jti == jti)
-        )
-        if blacklist_result.scalar_one_or_none():
-            logger.warning(f"Blacklisted JWT token used: {jti[:16]}...")
-            raise AuthenticationError("Token has been revoked")
+        # Check if token is blacklisted (only JTIs the revocation filter flags)
+        if auth_cache.might_be_revoked(jti):
+            blacklist_result = await db.execute(
+                select(JWTBlacklist).where(JWTBlacklist.jti == jti)
+            )
+            if blacklist_result.scalar_one_or_none():
+                logger.warning(f"Blacklisted JWT token used: {jti[:16]}...")
+                raise AuthenticationError("Token has been revoked")
         
         # Verify creator exists and is active
-        creator_result = await db.execute(
-            select(Creator).where(
-                Creator.id == creator_uuid,
-                Creator.is_active == True
+        is_active = auth_cache.get_creator_active(creator_id)
+        if is_active is None:
+            creator_result = await db.execute(
+                select(Creator.id).where(
+                    Creator.id == uuid.UUID(creator_id),
+                    Creator.is_active == True
+                )
             )
-        )
-        creator = creator_result.scalar_one_or_none()
+            is_active = creator_result.scalar_one_or_none() is not None
+            auth_cache.set_creator_active(creator_id, is_active)
         
-        if not creator:
+        if not is_active:
             logger.warning(f"JWT token for non-existent or inactive creator: {creator_id}")
             raise AuthenticationError("Invalid token")
         
         # Store request context for audit logging
         request.state.creator_id = creator_id
         request.state.jti = jti
+        # Lets permission checks use the token's compiled perm_mask claim
+        request.state.token_claims = payload
         request.state.client_ip = request.client.host
         request.state.user_agent = request.headers.get("User-Agent")
         
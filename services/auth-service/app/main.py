@@ -10,8 +10,17 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
+from sqlalchemy import select
 
+from shared.cache.session_store import get_session_store
 from shared.config.settings import validate_service_environment
+from shared.models.database import JWTBlacklist
+from shared.security.hashing_pool import close_password_hashing_pool
+from shared.security.jwks import JWKS_PATH, get_jwks_verifier
+from shared.security.jwt_manager import get_jwt_manager
+from shared.security.password_security import PWNED_PASSWORDS_API_URL
+from shared.security.token_cache import get_auth_state_cache
+from shared.utils.http_client import init_http_client, close_http_client
 # Import centralized environment constants and helpers
 from shared.config.env_constants import CORS_ORIGINS, JWT_SECRET_KEY, REQUIRED_VARS_BY_SERVICE, get_env_value
 
@@ -31,6 +40,22 @@ required_env_vars = REQUIRED_VARS_BY_SERVICE["auth_service"]
 validate_service_environment(required_env_vars, logger)
 
 
+async def load_revoked_jtis():
+    """JTIs of revoked tokens that have not expired yet"""
+    async with get_db_manager().get_session() as session:
+        result = await session.execute(
+            select(JWTBlacklist.jti).where(JWTBlacklist.expires_at > datetime.utcnow())
+        )
+        return result.scalars().all()
+
+
+async def load_local_jwks():
+    """Published key set, read straight from the key manager"""
+    key_manager = (await get_jwt_manager()).key_manager
+    await key_manager.reload()
+    return await key_manager.get_jwks()
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan events"""
@@ -49,8 +74,19 @@ async def lifespan(app: FastAPI):
             logger.error("❌ Database health check failed")
             raise RuntimeError("Database connectivity check failed")
         
+        # Pooled keep-alive HTTP client (breached-password lookups)
+        await init_http_client(upstreams=[PWNED_PASSWORDS_API_URL])
+        
+        # Verified-token cache and revocation filter shared with the other workers
+        await get_auth_state_cache().start(load_revoked=load_revoked_jtis)
+        
+        # Signing keys; requests are verified against the same key set other services fetch
+        await get_jwks_verifier(load_jwks=load_local_jwks).start()
+        
+        # Writes buffered session activity even when no further reads trigger it
+        await get_session_store().start()
+        
         # TODO: Initialize Redis connection
-        # TODO: Validate JWT keys
         
         logger.info("🎉 Auth Service startup completed successfully")
         
@@ -67,6 +103,13 @@ async def lifespan(app: FastAPI):
         await close_db()
         logger.info("✅ Database connections closed")
         
+        await close_http_client()
+        
+        await get_auth_state_cache().stop()
+        await get_jwks_verifier().stop()
+        await get_session_store().stop()
+        close_password_hashing_pool()
+        
     except Exception as e:
         logger.error(f"❌ Error during shutdown: {e}")
 
@@ -179,6 +222,21 @@ async def readiness_check():
         )
 
 
+@app.get(JWKS_PATH, tags=["authentication"])
+async def jwks():
+    """
+    Public signing keys (JWK Set) for local token verification
+    
+    Lists the current key and keys still in their rotation grace period
+    """
+    key_manager = (await get_jwt_manager()).key_manager
+    await key_manager.reload()
+    return JSONResponse(
+        content=await key_manager.get_jwks(),
+        headers={"Cache-Control": "public, max-age=60"}
+    )
+
+
 @app.get("/", tags=["health"])
 async def root():
     """Root endpoint with service information"""
@@ -188,6 +246,7 @@ async def root():
         "docs": "/docs",
         "health": "/health",
         "ready": "/ready",
+        "jwks": JWKS_PATH,
         "description": "Authentication and authorization service for MVP Coaching AI Platform"
     }
 
@@ -35,6 +35,10 @@ from shared.models.auth import (
 from shared.security.password_security import (
     PasswordHasher, PasswordValidator, validate_password_strength
 )
+from shared.security.hashing_pool import HashingPoolBusy, get_password_hashing_pool
+from shared.security.jwt_manager import get_jwt_manager
+from shared.security.rbac import get_roles_from_subscription, permission_claims
+from shared.security.token_cache import get_auth_state_cache
 
 logger = logging.getLogger(__name__)
 
@@ -64,6 +68,9 @@ class AuthService:
         self.password_hasher = PasswordHasher()
         self.password_validator = PasswordValidator()
         
+        # Hashing runs on a bounded worker pool, never on the event loop
+        self.hashing_pool = get_password_hashing_pool()
+        
         # Validate required configuration
         if not self.jwt_secret_key:
             raise ValueError(f"{JWT_SECRET_KEY} environment variable is required")
@@ -135,7 +142,10 @@ class AuthService:
                 )
             
             # 3. Hash password using Argon2id
-            password_hash = self.password_hasher.hash_password(creator_data.password, use_argon2=True)
+            try:
+                password_hash = await self.hashing_pool.hash_password(creator_data.password, use_argon2=True)
+            except HashingPoolBusy as e:
+                raise self._hashing_overloaded(e)
             
             # 4. Create creator record
             creator = Creator(
@@ -155,7 +165,8 @@ class AuthService:
                 
                 # 5. Generate JWT tokens
                 tokens = await self._generate_token_pair(
-                    creator.id, db, client_ip, user_agent
+                    creator.id, db, client_ip, user_agent,
+                    subscription_tier=creator.subscription_tier
                 )
                 
                 # 6. Log successful registration
@@ -276,9 +287,12 @@ class AuthService:
                 )
             
             # 4. Verify password
-            password_valid = self.password_hasher.verify_password(
-                login_data.password, creator.password_hash
-            )
+            try:
+                password_valid = await self.hashing_pool.verify_password(
+                    login_data.password, creator.password_hash
+                )
+            except HashingPoolBusy as e:
+                raise self._hashing_overloaded(e)
             
             if not password_valid:
                 # Increment failed login attempts
@@ -323,23 +337,29 @@ class AuthService:
             creator.locked_until = None
             creator.last_login_at = datetime.utcnow()
             
-            # 6. Check if password needs rehashing
-            if self.password_hasher.needs_rehash(creator.password_hash):
-                new_hash = self.password_hasher.hash_password(login_data.password, use_argon2=True)
-                creator.password_hash = new_hash
-                creator.password_changed_at = datetime.utcnow()
+            # 6. Check if password needs rehashing (skipped under load, retried next login)
+            if self.hashing_pool.needs_rehash(creator.password_hash):
+                try:
+                    new_hash = await self.hashing_pool.hash_password(login_data.password, use_argon2=True)
+                except HashingPoolBusy:
+                    new_hash = None
                 
-                await self._log_audit_event(
-                    db, creator.id, "password_rehashed", "security",
-                    f"Password rehashed to stronger algorithm: {creator.email}",
-                    {"email": creator.email},
-                    client_ip, user_agent, "info"
-                )
+                if new_hash:
+                    creator.password_hash = new_hash
+                    creator.password_changed_at = datetime.utcnow()
+                    
+                    await self._log_audit_event(
+                        db, creator.id, "password_rehashed", "security",
+                        f"Password rehashed to stronger algorithm: {creator.email}",
+                        {"email": creator.email},
+                        client_ip, user_agent, "info"
+                    )
             
             # 7. Generate JWT tokens
             token_expire_hours = 24 * 7 if login_data.remember_me else 24  # 7 days vs 1 day
             tokens = await self._generate_token_pair(
-                creator.id, db, client_ip, user_agent, token_expire_hours
+                creator.id, db, client_ip, user_agent, token_expire_hours,
+                subscription_tier=creator.subscription_tier
             )
             
             # 8. Log successful login
@@ -464,7 +484,8 @@ class AuthService:
             # 5. Generate new token pair with same family
             tokens = await self._generate_token_pair(
                 creator.id, db, client_ip, user_agent,
-                family_id=refresh_token.family_id
+                family_id=refresh_token.family_id,
+                subscription_tier=creator.subscription_tier
             )
             
             # 6. Log successful refresh
@@ -580,7 +601,8 @@ class AuthService:
         client_ip: Optional[str] = None,
         user_agent: Optional[str] = None,
         token_expire_hours: int = 24,
-        family_id: Optional[uuid.UUID] = None
+        family_id: Optional[uuid.UUID] = None,
+        subscription_tier: Optional[str] = None
     ) -> TokenResponse:
         """Generate JWT access token and refresh token pair"""
         
@@ -595,17 +617,23 @@ class AuthService:
             "iat": datetime.utcnow(),
             "exp": datetime.utcnow() + timedelta(hours=token_expire_hours),
             "iss": "mvp-coaching-ai-platform",
-            "aud": "api"
+            "aud": "api",
+            # Compiled permissions let services authorize without resolving roles
+            **permission_claims(get_roles_from_subscription(subscription_tier or "free"))
         }
         
-        # Generate access token
+        # Generate access token, signed with the current rotating key so every
+        # service can verify it against the published JWKS
         try:
+            jwt_manager = await get_jwt_manager()
+            key_id, private_key = await jwt_manager.key_manager.get_current_key()
             access_token = jwt.encode(
                 access_token_payload,
-                self.jwt_secret_key,
-                algorithm=self.jwt_algorithm
+                private_key,
+                algorithm="RS256",
+                headers={"kid": key_id}
             )
-        except JWTError as e:
+        except (JWTError, ValueError) as e:
             logger.error(f"JWT encoding failed for creator {creator_id}: {str(e)}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -886,10 +914,13 @@ class AuthService:
                     }
                 )
             
-            # 4. Update creator's password using self.password_hasher.hash_password
-            new_password_hash = self.password_hasher.hash_password(
-                reset_confirm.new_password, use_argon2=True
-            )
+            # 4. Update creator's password using the hashing pool
+            try:
+                new_password_hash = await self.hashing_pool.hash_password(
+                    reset_confirm.new_password, use_argon2=True
+                )
+            except HashingPoolBusy as e:
+                raise self._hashing_overloaded(e)
             creator.password_hash = new_password_hash
             
             # 5. Mark reset token as used (used_at = datetime.utcnow(), is_active = False)
@@ -915,6 +946,9 @@ class AuthService:
             creator.password_changed_at = datetime.utcnow()
             
             await db.commit()
+            
+            # 9. Drop cached tokens and status for the creator on every worker
+            await get_auth_state_cache().invalidate_creator(str(creator.id))
             return True
             
         except HTTPException:
@@ -928,6 +962,15 @@ class AuthService:
                 detail="Password reset failed due to internal error"
             )
 
+    def _hashing_overloaded(self, error: HashingPoolBusy) -> HTTPException:
+        """503 telling the client to retry once the hashing backlog drains"""
+        logger.warning(f"Password hashing pool saturated: {self.hashing_pool.get_stats()}")
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Authentication is temporarily overloaded, please retry shortly",
+            headers={"Retry-After": str(error.retry_after)}
+        )
+
     async def _revoke_all_refresh_tokens(self, creator_id: uuid.UUID, db: AsyncSession):
         """
         Revoke all refresh tokens for a creator
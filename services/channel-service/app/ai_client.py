@@ -4,12 +4,30 @@ Handles communication with AI Engine Service for message processing
 """
 
 import asyncio
+import functools
 import logging
-from typing import Dict, Any, Optional
+import time
+from typing import Dict, Any, List, Optional
+from urllib.parse import urlsplit
 import httpx
+from shared.utils.http_client import get_http_client
+from shared.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    LatencyTracker,
+    get_optional_metrics_collector,
+    hedged_call,
+)
 from pydantic import BaseModel, Field
 
-from shared.config.env_constants import get_env_value
+from shared.config.env_constants import (
+    AI_ENGINE_BREAKER_FAILURE_THRESHOLD,
+    AI_ENGINE_BREAKER_RECOVERY_SECONDS,
+    AI_ENGINE_HEDGE_URL,
+    AI_ENGINE_HEDGE_MIN_DELAY_MS,
+    get_env_value,
+)
 # Use the correct environment variable name
 AI_ENGINE_URL = "AI_ENGINE_SERVICE_URL"
 
@@ -36,23 +54,100 @@ class ConversationResponse(BaseModel):
     sources: list = Field(default_factory=list, description="Knowledge sources used")
 
 
+# Hedge delay until enough latency samples have been collected
+HEDGE_COLD_START_DELAY_SECONDS = 1.0
+HEDGE_MIN_SAMPLES = 20
+
+
+def _normalize_base_url(url: str) -> str:
+    # Convert localhost to service name for Docker networking
+    if "localhost" in url:
+        url = url.replace("localhost", "ai-engine-service")
+    
+    # Ensure protocol is included
+    if not url.startswith(('http://', 'https://')):
+        url = f"http://{url}"
+    return url.rstrip("/")
+
+
+def _is_upstream_failure(error: BaseException) -> bool:
+    """Errors that count against the breaker (overload/outage, not bad requests)"""
+    if isinstance(error, httpx.HTTPStatusError):
+        return error.response.status_code >= 500 or error.response.status_code == 429
+    return isinstance(error, httpx.TransportError)
+
+
 class AIEngineClient:
-    """Client for communicating with AI Engine Service"""
+    """
+    Client for communicating with AI Engine Service
+    
+    Each AI Engine replica sits behind a circuit breaker so an overloaded
+    engine fails calls immediately instead of holding them for the full
+    timeout. When AI_ENGINE_HEDGE_URL names a second replica, a conversation
+    request still unanswered after the recent p95 latency is also sent there
+    and the first answer wins (the slower replica may still process it).
+    """
     
     def __init__(self):
         # Use the same pattern as database.py
-        self.base_url = get_env_value(AI_ENGINE_URL, fallback=True) or "http://ai-engine-service:8003"
-        
-        # Convert localhost to service name for Docker networking
-        if "localhost" in self.base_url:
-            self.base_url = self.base_url.replace("localhost", "ai-engine-service")
-        
-        # Ensure protocol is included
-        if not self.base_url.startswith(('http://', 'https://')):
-            self.base_url = f"http://{self.base_url}"
+        self.base_url = _normalize_base_url(
+            get_env_value(AI_ENGINE_URL, fallback=True) or "http://ai-engine-service:8003"
+        )
+        hedge_url = get_env_value(AI_ENGINE_HEDGE_URL, fallback=True)
+        self.hedge_url = _normalize_base_url(hedge_url) if hedge_url else None
             
         self.timeout = 30.0  # 30 seconds timeout for AI responses
-        logger.info(f"AI Engine Client initialized with URL: {self.base_url}")
+        self.hedge_min_delay = int(get_env_value(AI_ENGINE_HEDGE_MIN_DELAY_MS, default="250")) / 1000.0
+        
+        failure_threshold = int(get_env_value(AI_ENGINE_BREAKER_FAILURE_THRESHOLD, default="5"))
+        recovery_timeout = float(get_env_value(AI_ENGINE_BREAKER_RECOVERY_SECONDS, default="30"))
+        self.breakers: Dict[str, CircuitBreaker] = {
+            url: CircuitBreaker(
+                f"ai_engine:{urlsplit(url).netloc}",
+                failure_threshold=failure_threshold,
+                recovery_timeout=recovery_timeout,
+                service="channel-service"
+            )
+            for url in self.replica_urls
+        }
+        self.latency = LatencyTracker()
+        logger.info(f"AI Engine Client initialized with URL: {self.base_url} (hedge: {self.hedge_url or 'disabled'})")
+    
+    @property
+    def replica_urls(self) -> List[str]:
+        return [self.base_url] + ([self.hedge_url] if self.hedge_url and self.hedge_url != self.base_url else [])
+    
+    @property
+    def is_available(self) -> bool:
+        """False while every replica's circuit is open"""
+        return any(breaker.state != CircuitState.OPEN for breaker in self.breakers.values())
+    
+    def hedge_delay(self) -> float:
+        """Seconds to wait on the primary before hedging (recent p95, floored)"""
+        p95 = self.latency.percentile(95)
+        if p95 is None or len(self.latency) < HEDGE_MIN_SAMPLES:
+            p95 = HEDGE_COLD_START_DELAY_SECONDS
+        return max(self.hedge_min_delay, p95)
+    
+    def get_circuit_status(self) -> List[Dict[str, Any]]:
+        return [breaker.get_status() for breaker in self.breakers.values()]
+    
+    async def _post_conversation(self, url: str, payload: Dict[str, Any], headers: Dict[str, str]) -> Dict[str, Any]:
+        async def send() -> Dict[str, Any]:
+            client = get_http_client()
+            response = await client.post(
+                f"{url}/api/v1/ai/conversations",
+                json=payload,
+                headers=headers,
+                timeout=self.timeout
+            )
+            response.raise_for_status()
+            return response.json()
+        
+        start = time.perf_counter()
+        data = await self.breakers[url].call(send, is_failure=_is_upstream_failure)
+        self.latency.record(time.perf_counter() - start)
+        return data
         
     async def process_message(
         self,
@@ -76,6 +171,7 @@ class AIEngineClient:
             ConversationResponse with AI-generated response
             
         Raises:
+            CircuitOpenError: If every AI Engine replica's circuit is open
             Exception: If AI Engine request fails
         """
         try:
@@ -93,17 +189,34 @@ class AIEngineClient:
             if auth_token:
                 headers["Authorization"] = f"Bearer {auth_token}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/ai/conversations",
-                    json=request_data.dict(),
-                    headers=headers
+            # Fail fast while every replica's circuit is open
+            urls = [url for url in self.replica_urls if self.breakers[url].state != CircuitState.OPEN]
+            if not urls:
+                raise CircuitOpenError(
+                    "ai_engine",
+                    min(breaker.retry_after for breaker in self.breakers.values())
                 )
-                
-                response.raise_for_status()
-                response_data = response.json()
-                
-                return ConversationResponse(**response_data)
+            
+            attempts = [
+                functools.partial(self._post_conversation, url, request_data.dict(), headers)
+                for url in urls
+            ]
+            if len(attempts) == 1:
+                response_data = await attempts[0]()
+            else:
+                response_data, winner, started = await hedged_call(attempts, self.hedge_delay())
+                if started > 1:
+                    metrics = get_optional_metrics_collector()
+                    if metrics is not None:
+                        metrics.record_hedged_request(
+                            "ai_engine", "channel-service", "primary" if winner == 0 else "hedge"
+                        )
+            
+            return ConversationResponse(**response_data)
+        
+        except CircuitOpenError:
+            logger.warning(f"AI Engine circuit open, failing fast for conversation {conversation_id}")
+            raise
                 
         except httpx.TimeoutException:
             logger.error(f"AI Engine request timeout for conversation {conversation_id}")
@@ -142,16 +255,20 @@ class AIEngineClient:
             if auth_token:
                 headers["Authorization"] = f"Bearer {auth_token}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
+            async def fetch() -> Dict[str, Any]:
+                client = get_http_client()
                 response = await client.get(
                     f"{self.base_url}/api/v1/ai/conversations/{conversation_id}/context",
                     params={"creator_id": creator_id},
-                    headers=headers
+                    headers=headers,
+                    timeout=self.timeout
                 )
                 
                 response.raise_for_status()
                 return response.json()
-                
+            
+            return await self.breakers[self.base_url].call(fetch, is_failure=_is_upstream_failure)
+            
         except Exception as e:
             logger.error(f"Failed to get conversation context: {str(e)}")
             return {}
@@ -164,9 +281,9 @@ class AIEngineClient:
             True if healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            client = get_http_client()
+            response = await client.get(f"{self.base_url}/health", timeout=5.0)
+            return response.status_code == 200
         except Exception:
             return False
 
@@ -9,6 +9,7 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from .models import ChannelConfiguration, ChannelType
 from .channels import BaseChannelService, WhatsAppService, TelegramService, WebWidgetService
+from .message_counters import get_message_counters
 
 logger = logging.getLogger(__name__)
 
@@ -225,14 +226,21 @@ class ChannelManager:
             
             channel_list = []
             for channel in channels:
+                # Live counts are in Redis; the columns lag by one flush interval
+                try:
+                    counts = await get_message_counters().get_counts(str(channel.creator_id), str(channel.id))
+                except Exception as e:
+                    self.logger.warning(f"Message counter unavailable, using stored counts: {e}")
+                    counts = {"daily": channel.current_daily_count, "monthly": channel.current_monthly_count}
+
                 channel_info = {
                     "id": str(channel.id),
                     "channel_type": channel.channel_type,
                     "channel_name": channel.channel_name,
                     "health_status": channel.health_status,
                     "last_health_check": channel.last_health_check.isoformat() if channel.last_health_check else None,
-                    "daily_count": channel.current_daily_count,
-                    "monthly_count": channel.current_monthly_count,
+                    "daily_count": counts["daily"],
+                    "monthly_count": counts["monthly"],
                     "daily_limit": channel.daily_message_limit,
                     "monthly_limit": channel.monthly_message_limit,
                     "created_at": channel.created_at.isoformat()
@@ -320,6 +328,26 @@ class ChannelManager:
         """Get list of supported channel types"""
         return [channel_type.value for channel_type in self.service_registry.keys()]
     
+    async def verify_webhook(self, channel_id: str, creator_id: str, payload: str, signature: Optional[str]) -> bool:
+        """
+        Check a webhook request before it is accepted
+        Channels with a webhook secret require a valid signature; channels without one accept unsigned events
+        """
+        channel_config = await self._get_channel_config(channel_id, creator_id)
+        if not channel_config:
+            self.logger.warning(f"Webhook received for unknown channel: {channel_id}")
+            return False
+        
+        if not channel_config.webhook_secret:
+            return True
+        if not signature:
+            return False
+        
+        service = await self.get_channel_service(channel_config)
+        if not service:
+            return False
+        return service.validate_webhook_signature(payload, signature, channel_config.webhook_secret)
+    
     async def validate_webhook_signature(self, channel_id: str, creator_id: str, payload: str, signature: str) -> bool:
         """Validate webhook signature for specified channel"""
         try:
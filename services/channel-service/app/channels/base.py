@@ -6,22 +6,27 @@ Abstract base class for all channel integrations
 import logging
 import uuid
 from abc import ABC, abstractmethod
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from datetime import datetime
 
+import httpx
 from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.utils.delivery_scheduler import RetryLater, STATUS_RETRYING
 from ..models import (
     ChannelConfiguration, 
+    ChannelType,
     Message, 
     InboundMessage, 
     OutboundMessage,
-    WebhookEvent,
     HealthStatus,
     MessageDirection,
     ProcessingStatus,
     DeliveryStatus
 )
 from ..ai_client import get_ai_client, ConversationResponse
+from ..delivery import get_delivery_scheduler
+from ..message_counters import get_message_counters
 
 logger = logging.getLogger(__name__)
 
@@ -35,6 +40,7 @@ class BaseChannelService(ABC):
     def __init__(self, channel_config: ChannelConfiguration, db_session: AsyncSession):
         self.channel_config = channel_config
         self.db_session = db_session
+        self._reserved_slots = 0
         self.logger = logging.getLogger(f"{__name__}.{self.__class__.__name__}")
     
     @property
@@ -241,8 +247,88 @@ class BaseChannelService(ABC):
             
             return fallback_message
     
+    def get_retry_after(self, response: httpx.Response, response_data: Dict[str, Any]) -> Optional[float]:
+        """
+        Decide whether a provider response is worth retrying
+        Returns the wait the provider asked for (0 if none) for throttling and
+        server errors, None when the response is final
+        """
+        if response.status_code == 429 or response.status_code >= 500:
+            try:
+                return float(response.headers.get("Retry-After", 0))
+            except ValueError:
+                return 0.0
+        return None
+    
+    async def deliver(
+        self,
+        message_id: Optional[str],
+        recipient: str,
+        request: Callable[[], Awaitable[httpx.Response]]
+    ) -> Tuple[httpx.Response, Dict[str, Any]]:
+        """
+        Send a provider API request through the channel's delivery scheduler
+        
+        The request is paced to the provider's send quota, ordered per
+        recipient, and retried with backoff on throttling, server errors and
+        connection errors. Retries are recorded on the outbound message row.
+        
+        Returns:
+            Response and parsed body of the final attempt
+        
+        Raises:
+            httpx.TransportError: If no attempt reached the provider
+        """
+        channel = ChannelType(self.channel_type).value
+        scheduler = get_delivery_scheduler(channel, str(self.channel_config.id))
+        
+        async def attempt() -> Tuple[httpx.Response, Dict[str, Any]]:
+            try:
+                response = await request()
+            except httpx.TransportError as e:
+                raise RetryLater(f"{type(e).__name__}: {e}") from e
+            try:
+                response_data = response.json()
+            except ValueError:
+                response_data = {}
+            
+            retry_after = self.get_retry_after(response, response_data)
+            if retry_after is not None:
+                raise RetryLater(
+                    f"HTTP {response.status_code}", retry_after=retry_after, result=(response, response_data)
+                )
+            return response, response_data
+        
+        async def on_status(status: str, attempt_number: int, error: Optional[str]) -> None:
+            if status == STATUS_RETRYING and message_id:
+                await self.update_message_status(message_id, {"error_count": attempt_number, "last_error": error})
+        
+        try:
+            return await scheduler.submit(recipient, attempt, on_status=on_status)
+        except RetryLater as e:
+            if e.result is not None:
+                return e.result
+            raise e.__cause__ or e
+    
     async def increment_message_count(self) -> bool:
-        """Increment daily and monthly message counts"""
+        """
+        Count a sent message
+
+        Consumes the slot reserved by ``check_rate_limits`` when there is one;
+        the counters live in Redis and reach the database on the next flush.
+        """
+        if self._reserved_slots > 0:
+            self._reserved_slots -= 1
+            return True
+
+        try:
+            await get_message_counters().increment(
+                str(self.channel_config.creator_id), str(self.channel_config.id)
+            )
+            return True
+        except Exception as e:
+            self.logger.warning(f"Message counter unavailable, updating database directly: {e}")
+
         try:
             from shared.models.database import ChannelConfiguration as DBChannelConfig
             from sqlalchemy import update
@@ -268,10 +354,39 @@ class BaseChannelService(ABC):
             return False
     
     async def check_rate_limits(self) -> bool:
-        """Check if channel has exceeded rate limits"""
+        """
+        Check rate limits and reserve a slot for one outgoing message
+
+        The check and the reservation are one atomic Redis call, so concurrent
+        senders cannot overshoot the limits. A reserved slot must be either
+        consumed by ``increment_message_count`` or handed back with
+        ``release_message_slot`` if the message is not sent.
+        """
+        daily_limit = self.channel_config.daily_message_limit
+        monthly_limit = self.channel_config.monthly_message_limit
+
+        try:
+            allowed, counts = await get_message_counters().reserve(
+                str(self.channel_config.creator_id),
+                str(self.channel_config.id),
+                daily_limit=daily_limit,
+                monthly_limit=monthly_limit
+            )
+        except Exception as e:
+            self.logger.warning(f"Message counter unavailable, using stored counts: {e}")
+            counts = None
+
+        if counts is not None:
+            if allowed:
+                self._reserved_slots += 1
+                return True
+            if counts["daily"] >= daily_limit:
+                self.logger.warning(f"Daily rate limit exceeded: {counts['daily']}/{daily_limit}")
+            else:
+                self.logger.warning(f"Monthly rate limit exceeded: {counts['monthly']}/{monthly_limit}")
+            return False
+
         try:
-            daily_limit = self.channel_config.daily_message_limit
-            monthly_limit = self.channel_config.monthly_message_limit
             daily_count = self.channel_config.current_daily_count
             monthly_count = self.channel_config.current_monthly_count
             
@@ -288,6 +403,18 @@ class BaseChannelService(ABC):
         except Exception as e:
             self.logger.error(f"Failed to check rate limits: {e}")
             return False
+
+    async def release_message_slot(self) -> None:
+        """Hand back a slot reserved by ``check_rate_limits`` for a message that was not sent"""
+        if self._reserved_slots <= 0:
+            return
+        self._reserved_slots -= 1
+        try:
+            await get_message_counters().release(
+                str(self.channel_config.creator_id), str(self.channel_config.id)
+            )
+        except Exception as e:
+            self.logger.error(f"Failed to release message slot: {e}")
     
     async def update_health_status(self, status: HealthStatus, error_message: Optional[str] = None) -> bool:
         """Update channel health status"""
@@ -328,6 +455,14 @@ class BaseChannelService(ABC):
         self.logger.warning("Webhook signature validation not implemented for this channel")
         return True
     
+    @staticmethod
+    def webhook_event_keys(webhook_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """
+        Identify a raw webhook event before it is processed
+        Returns (dedup ID, user identifier); default implementation knows neither
+        """
+        return None, None
+    
     def extract_user_info(self, webhook_data: Dict[str, Any]) -> Dict[str, Any]:
         """
         Extract user information from webhook data
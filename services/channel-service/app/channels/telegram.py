@@ -4,11 +4,10 @@ Handles Telegram messaging through Bot API
 """
 
 import hmac
-import hashlib
 import json
 import logging
-from typing import Dict, List, Optional, Any
-import httpx
+from typing import Dict, List, Optional, Any, Tuple
+from shared.utils.http_client import get_http_client
 from datetime import datetime
 
 from .base import BaseChannelService
@@ -18,12 +17,15 @@ from ..models import (
     ChannelType,
     MessageType,
     MessageDirection,
+    DeliveryStatus,
     HealthStatus,
     TelegramConfiguration
 )
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_API_BASE_URL = "https://api.telegram.org"
+
 
 class TelegramService(BaseChannelService):
     """
@@ -33,7 +35,7 @@ class TelegramService(BaseChannelService):
     
     def __init__(self, channel_config, db_session):
         super().__init__(channel_config, db_session)
-        self.api_base_url = f"https://api.telegram.org/bot{channel_config.api_token}"
+        self.api_base_url = f"{TELEGRAM_API_BASE_URL}/bot{channel_config.api_token}"
         self.config = TelegramConfiguration(**channel_config.configuration)
     
     @property
@@ -64,6 +66,7 @@ class TelegramService(BaseChannelService):
     
     async def send_message(self, message: OutboundMessage) -> Dict[str, Any]:
         """Send message through Telegram Bot API"""
+        message_id = None
         try:
             # Check rate limits
             if not await self.check_rate_limits():
@@ -135,32 +138,37 @@ class TelegramService(BaseChannelService):
             if "reply_markup" in message.channel_metadata:
                 payload["reply_markup"] = message.channel_metadata["reply_markup"]
             
-            # Send message
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload)
-                response_data = response.json()
+            # Record the message before delivery so retries and failures are tracked on it
+            message_id = await self.save_message({
+                "conversation_id": message.conversation_id,
+                "content": message.content,
+                "message_type": message.message_type,
+                "channel_metadata": message.channel_metadata,
+                "user_identifier": message.user_identifier,
+                "user_name": message.user_name,
+                "user_metadata": message.user_metadata
+            }, MessageDirection.OUTBOUND)
+            
+            # Send message (paced to the bot's quota, in order per chat)
+            client = get_http_client()
+            response, response_data = await self.deliver(
+                message_id, str(message.user_identifier), lambda: client.post(url, json=payload)
+            )
             
             if response.status_code == 200 and response_data.get("ok"):
                 # Message sent successfully
                 telegram_message = response_data["result"]
                 telegram_message_id = telegram_message["message_id"]
                 
-                # Save message to database
-                message_data = {
-                    "conversation_id": message.conversation_id,
-                    "content": message.content,
-                    "message_type": message.message_type,
+                await self.update_message_status(message_id, {
                     "external_message_id": str(telegram_message_id),
                     "channel_metadata": {
                         **message.channel_metadata,
                         "telegram_response": response_data
                     },
-                    "user_identifier": message.user_identifier,
-                    "user_name": message.user_name,
-                    "user_metadata": message.user_metadata
-                }
-                
-                message_id = await self.save_message(message_data, MessageDirection.OUTBOUND)
+                    "delivery_status": DeliveryStatus.SENT.value,
+                    "sent_at": datetime.utcnow()
+                })
                 await self.increment_message_count()
                 
                 return {
@@ -173,9 +181,15 @@ class TelegramService(BaseChannelService):
                 # Message failed
                 error_message = response_data.get("description", "Unknown error")
                 self.logger.error(f"Telegram message failed: {error_message}")
+                await self.update_message_status(message_id, {
+                    "delivery_status": DeliveryStatus.FAILED.value,
+                    "last_error": error_message
+                })
+                await self.release_message_slot()
                 
                 return {
                     "success": False,
+                    "message_id": message_id,
                     "error": error_message,
                     "status": "failed",
                     "error_code": response_data.get("error_code")
@@ -183,12 +197,25 @@ class TelegramService(BaseChannelService):
                 
         except Exception as e:
             self.logger.error(f"Failed to send Telegram message: {e}")
+            if message_id:
+                await self.update_message_status(message_id, {
+                    "delivery_status": DeliveryStatus.FAILED.value,
+                    "last_error": str(e)
+                })
+            await self.release_message_slot()
             return {
                 "success": False,
                 "error": str(e),
                 "status": "error"
             }
     
+    def get_retry_after(self, response, response_data: Dict[str, Any]) -> Optional[float]:
+        """Telegram reports flood-control waits in parameters.retry_after"""
+        retry_after = (response_data.get("parameters") or {}).get("retry_after")
+        if retry_after is not None:
+            return float(retry_after)
+        return super().get_retry_after(response, response_data)
+    
     async def process_webhook(self, webhook_data: Dict[str, Any]) -> Optional[InboundMessage]:
         """Process Telegram webhook update"""
         try:
@@ -283,9 +310,9 @@ class TelegramService(BaseChannelService):
         try:
             url = f"{self.api_base_url}/getMe"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                response_data = response.json()
+            client = get_http_client()
+            response = await client.get(url)
+            response_data = response.json()
             
             if response.status_code == 200 and response_data.get("ok"):
                 bot_info = response_data["result"]
@@ -331,13 +358,13 @@ class TelegramService(BaseChannelService):
                 "max_connections": self.config.max_connections
             }
             
-            # Add secret token if configured
-            if self.config.webhook_secret_token:
-                payload["secret_token"] = self.config.webhook_secret_token
+            # Telegram echoes the secret token back on every update
+            if self.webhook_secret_token:
+                payload["secret_token"] = self.webhook_secret_token
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload)
-                response_data = response.json()
+            client = get_http_client()
+            response = await client.post(url, json=payload)
+            response_data = response.json()
             
             if response.status_code == 200 and response_data.get("ok"):
                 self.logger.info(f"Telegram webhook set successfully: {webhook_url}")
@@ -351,21 +378,36 @@ class TelegramService(BaseChannelService):
             self.logger.error(f"Failed to setup Telegram webhook: {e}")
             return False
     
+    @staticmethod
+    def webhook_event_keys(webhook_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Update ID and sender of a Telegram update (redeliveries reuse the update_id)"""
+        update_id = webhook_data.get("update_id")
+        message_data = webhook_data.get("message") or webhook_data.get("edited_message") or {}
+        user_id = (message_data.get("from") or {}).get("id") or (message_data.get("chat") or {}).get("id")
+        return (
+            str(update_id) if update_id is not None else None,
+            str(user_id) if user_id is not None else None
+        )
+    
+    @property
+    def webhook_secret_token(self) -> Optional[str]:
+        """Token registered with setWebhook (the channel's webhook secret unless overridden)"""
+        return self.config.webhook_secret_token or self.channel_config.webhook_secret
+    
     def validate_webhook_signature(self, payload: str, signature: str, secret: str) -> bool:
-        """Validate Telegram webhook signature"""
+        """
+        Validate a Telegram webhook request
+        Telegram does not sign the body: it echoes the ``secret_token`` given to
+        setWebhook in the X-Telegram-Bot-Api-Secret-Token header, so the header
+        is compared with that token
+        """
         try:
-            if not self.config.webhook_secret_token:
+            expected_token = self.webhook_secret_token or secret
+            if not expected_token:
                 self.logger.warning("No webhook secret token configured for Telegram")
                 return True
             
-            # Telegram uses HMAC-SHA256
-            expected_signature = hmac.new(
-                secret.encode(),
-                payload.encode(),
-                hashlib.sha256
-            ).hexdigest()
-            
-            return hmac.compare_digest(expected_signature, signature)
+            return hmac.compare_digest(expected_token.encode(), (signature or "").encode())
             
         except Exception as e:
             self.logger.error(f"Failed to validate Telegram webhook signature: {e}")
@@ -423,26 +465,26 @@ class TelegramService(BaseChannelService):
             url = f"{self.api_base_url}/getFile"
             payload = {"file_id": file_id}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, json=payload)
-                response_data = response.json()
+            client = get_http_client()
+            response = await client.post(url, json=payload)
+            response_data = response.json()
+            
+            if response.status_code == 200 and response_data.get("ok"):
+                file_info = response_data["result"]
+                file_path = file_info.get("file_path")
                 
-                if response.status_code == 200 and response_data.get("ok"):
-                    file_info = response_data["result"]
-                    file_path = file_info.get("file_path")
+                if file_path:
+                    # Download actual file
+                    file_url = f"https://api.telegram.org/file/bot{self.channel_config.api_token}/{file_path}"
+                    file_response = await client.get(file_url)
                     
-                    if file_path:
-                        # Download actual file
-                        file_url = f"https://api.telegram.org/file/bot{self.channel_config.api_token}/{file_path}"
-                        file_response = await client.get(file_url)
-                        
-                        if file_response.status_code == 200:
-                            return {
-                                "content": file_response.content,
-                                "content_type": file_response.headers.get("content-type"),
-                                "file_path": file_path,
-                                "size": file_info.get("file_size", len(file_response.content))
-                            }
+                    if file_response.status_code == 200:
+                        return {
+                            "content": file_response.content,
+                            "content_type": file_response.headers.get("content-type"),
+                            "file_path": file_path,
+                            "size": file_info.get("file_size", len(file_response.content))
+                        }
             
             return None
             
@@ -455,9 +497,9 @@ class TelegramService(BaseChannelService):
         try:
             url = f"{self.api_base_url}/getWebhookInfo"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url)
-                response_data = response.json()
+            client = get_http_client()
+            response = await client.get(url)
+            response_data = response.json()
             
             if response.status_code == 200 and response_data.get("ok"):
                 return response_data["result"]
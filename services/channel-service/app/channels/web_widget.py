@@ -9,6 +9,8 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import secrets
 
+from shared.cache.websocket_fanout import get_websocket_fanout
+
 from .base import BaseChannelService
 from ..models import (
     InboundMessage, 
@@ -33,6 +35,7 @@ class WebWidgetService(BaseChannelService):
         super().__init__(channel_config, db_session)
         self.config = WebWidgetConfiguration(**channel_config.configuration)
         self.active_sessions: Dict[str, Dict[str, Any]] = {}
+        self.fanout = get_websocket_fanout()
     
     @property
     def channel_type(self) -> str:
@@ -100,22 +103,17 @@ class WebWidgetService(BaseChannelService):
             message_id = await self.save_message(message_data, MessageDirection.OUTBOUND)
             await self.increment_message_count()
             
-            # Try to send via WebSocket if session is active
-            session_info = self.active_sessions.get(message.user_identifier)
-            if session_info and session_info.get("websocket"):
-                try:
-                    websocket = session_info["websocket"]
-                    websocket_message = {
-                        "type": "message",
-                        "id": message_id,
-                        "content": message.content,
-                        "message_type": message.message_type.value,
-                        "timestamp": datetime.utcnow().isoformat(),
-                        "from": "assistant"
-                    }
-                    
-                    await websocket.send_json(websocket_message)
-                    
+            # Deliver via WebSocket on whichever worker holds the session
+            websocket_message = {
+                "type": "message",
+                "id": message_id,
+                "content": message.content,
+                "message_type": message.message_type.value,
+                "timestamp": datetime.utcnow().isoformat(),
+                "from": "assistant"
+            }
+            try:
+                if await self.fanout.send(message.user_identifier, websocket_message):
                     # Update message status
                     await self.update_message_status(message_id, {
                         "delivery_status": "delivered",
@@ -129,9 +127,9 @@ class WebWidgetService(BaseChannelService):
                         "delivery_method": "websocket"
                     }
                     
-                except Exception as ws_error:
-                    self.logger.warning(f"WebSocket delivery failed, message queued: {ws_error}")
-                    # Message is saved, client will get it via polling
+            except Exception as ws_error:
+                self.logger.warning(f"WebSocket delivery failed, message queued: {ws_error}")
+                # Message is saved, client will get it via polling
             
             # Message queued for polling retrieval
             return {
@@ -143,6 +141,7 @@ class WebWidgetService(BaseChannelService):
                 
         except Exception as e:
             self.logger.error(f"Failed to send Web Widget message: {e}")
+            await self.release_message_slot()
             return {
                 "success": False,
                 "error": str(e),
@@ -308,8 +307,9 @@ class WebWidgetService(BaseChannelService):
     async def register_websocket_session(self, session_id: str, websocket, user_info: Dict[str, Any]):
         """Register WebSocket session for real-time messaging"""
         try:
+            connection = await self.fanout.connect(session_id, websocket, user_info)
             self.active_sessions[session_id] = {
-                "websocket": websocket,
+                "connection": connection,
                 "user_info": user_info,
                 "connected_at": datetime.utcnow(),
                 "last_activity": datetime.utcnow()
@@ -329,14 +329,18 @@ class WebWidgetService(BaseChannelService):
                 "timestamp": datetime.utcnow().isoformat()
             }
             
-            await websocket.send_json(welcome_message)
+            await self.fanout.send(session_id, welcome_message)
             
         except Exception as e:
             self.logger.error(f"Failed to register WebSocket session: {e}")
     
-    async def unregister_websocket_session(self, session_id: str):
-        """Unregister WebSocket session"""
+    async def unregister_websocket_session(self, session_id: str, websocket=None):
+        """Unregister WebSocket session (ignored if ``websocket`` has since been replaced)"""
         try:
+            connection = self.active_sessions.get(session_id, {}).get("connection")
+            if websocket is not None and connection is not None and connection.websocket is not websocket:
+                return
+            await self.fanout.disconnect(session_id, connection=connection)
             if session_id in self.active_sessions:
                 session_info = self.active_sessions.pop(session_id)
                 duration = datetime.utcnow() - session_info["connected_at"]
@@ -7,8 +7,8 @@ import hmac
 import hashlib
 import json
 import logging
-from typing import Dict, List, Optional, Any
-import httpx
+from typing import Dict, List, Optional, Any, Tuple
+from shared.utils.http_client import get_http_client
 from datetime import datetime
 
 from .base import BaseChannelService
@@ -18,12 +18,18 @@ from ..models import (
     ChannelType,
     MessageType,
     MessageDirection,
+    DeliveryStatus,
     HealthStatus,
     WhatsAppConfiguration
 )
 
 logger = logging.getLogger(__name__)
 
+WHATSAPP_API_BASE_URL = "https://graph.facebook.com"
+
+# Graph API throttling errors: app, account, business-account and pair rate limits
+WHATSAPP_THROTTLING_ERROR_CODES = {4, 80007, 130429, 131056}
+
 
 class WhatsAppService(BaseChannelService):
     """
@@ -33,7 +39,7 @@ class WhatsAppService(BaseChannelService):
     
     def __init__(self, channel_config, db_session):
         super().__init__(channel_config, db_session)
-        self.api_base_url = "https://graph.facebook.com"
+        self.api_base_url = WHATSAPP_API_BASE_URL
         self.config = WhatsAppConfiguration(**channel_config.configuration)
         self.headers = {
             "Authorization": f"Bearer {channel_config.api_token}",
@@ -68,6 +74,7 @@ class WhatsAppService(BaseChannelService):
     
     async def send_message(self, message: OutboundMessage) -> Dict[str, Any]:
         """Send message through WhatsApp Business API"""
+        message_id = None
         try:
             # Check rate limits
             if not await self.check_rate_limits():
@@ -100,31 +107,36 @@ class WhatsAppService(BaseChannelService):
                     "filename": message.channel_metadata.get("filename", "document")
                 }
             
-            # Send message
-            async with httpx.AsyncClient() as client:
-                response = await client.post(url, headers=self.headers, json=payload)
-                response_data = response.json()
+            # Record the message before delivery so retries and failures are tracked on it
+            message_id = await self.save_message({
+                "conversation_id": message.conversation_id,
+                "content": message.content,
+                "message_type": message.message_type,
+                "channel_metadata": message.channel_metadata,
+                "user_identifier": message.user_identifier,
+                "user_name": message.user_name,
+                "user_metadata": message.user_metadata
+            }, MessageDirection.OUTBOUND)
+            
+            # Send message (paced to the phone number's quota, in order per recipient)
+            client = get_http_client()
+            response, response_data = await self.deliver(
+                message_id, message.user_identifier, lambda: client.post(url, headers=self.headers, json=payload)
+            )
             
             if response.status_code == 200 and response_data.get("messages"):
                 # Message sent successfully
                 whatsapp_message_id = response_data["messages"][0]["id"]
                 
-                # Save message to database
-                message_data = {
-                    "conversation_id": message.conversation_id,
-                    "content": message.content,
-                    "message_type": message.message_type,
+                await self.update_message_status(message_id, {
                     "external_message_id": whatsapp_message_id,
                     "channel_metadata": {
                         **message.channel_metadata,
                         "whatsapp_response": response_data
                     },
-                    "user_identifier": message.user_identifier,
-                    "user_name": message.user_name,
-                    "user_metadata": message.user_metadata
-                }
-                
-                message_id = await self.save_message(message_data, MessageDirection.OUTBOUND)
+                    "delivery_status": DeliveryStatus.SENT.value,
+                    "sent_at": datetime.utcnow()
+                })
                 await self.increment_message_count()
                 
                 return {
@@ -137,9 +149,15 @@ class WhatsAppService(BaseChannelService):
                 # Message failed
                 error_message = response_data.get("error", {}).get("message", "Unknown error")
                 self.logger.error(f"WhatsApp message failed: {error_message}")
+                await self.update_message_status(message_id, {
+                    "delivery_status": DeliveryStatus.FAILED.value,
+                    "last_error": error_message
+                })
+                await self.release_message_slot()
                 
                 return {
                     "success": False,
+                    "message_id": message_id,
                     "error": error_message,
                     "status": "failed",
                     "error_code": response_data.get("error", {}).get("code")
@@ -147,12 +165,25 @@ class WhatsAppService(BaseChannelService):
                 
         except Exception as e:
             self.logger.error(f"Failed to send WhatsApp message: {e}")
+            if message_id:
+                await self.update_message_status(message_id, {
+                    "delivery_status": DeliveryStatus.FAILED.value,
+                    "last_error": str(e)
+                })
+            await self.release_message_slot()
             return {
                 "success": False,
                 "error": str(e),
                 "status": "error"
             }
     
+    def get_retry_after(self, response, response_data: Dict[str, Any]) -> Optional[float]:
+        """WhatsApp signals throttling with error codes rather than a Retry-After"""
+        error_code = (response_data.get("error") or {}).get("code")
+        if error_code in WHATSAPP_THROTTLING_ERROR_CODES:
+            return 0.0
+        return super().get_retry_after(response, response_data)
+    
     async def process_webhook(self, webhook_data: Dict[str, Any]) -> Optional[InboundMessage]:
         """Process WhatsApp webhook event"""
         try:
@@ -245,8 +276,8 @@ class WhatsAppService(BaseChannelService):
         try:
             url = f"{self.api_base_url}/{self.config.api_version}/{self.config.phone_number_id}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers)
+            client = get_http_client()
+            response = await client.get(url, headers=self.headers)
             
             if response.status_code == 200:
                 data = response.json()
@@ -295,6 +326,24 @@ class WhatsAppService(BaseChannelService):
             self.logger.error(f"Failed to setup WhatsApp webhook: {e}")
             return False
     
+    @staticmethod
+    def webhook_event_keys(webhook_data: Dict[str, Any]) -> Tuple[Optional[str], Optional[str]]:
+        """Message ID (wamid) and sender of a WhatsApp webhook event"""
+        try:
+            value = webhook_data["entry"][0]["changes"][0]["value"]
+        except (KeyError, IndexError, TypeError):
+            return None, None
+        
+        if value.get("messages"):
+            message_data = value["messages"][0]
+            return message_data.get("id"), message_data.get("from")
+        if value.get("statuses"):
+            status_data = value["statuses"][0]
+            # Each status transition of a message is delivered separately
+            status_id = f"{status_data.get('id')}:{status_data.get('status')}" if status_data.get("id") else None
+            return status_id, status_data.get("recipient_id")
+        return None, None
+    
     def validate_webhook_signature(self, payload: str, signature: str, secret: str) -> bool:
         """Validate WhatsApp webhook signature"""
         try:
@@ -379,24 +428,24 @@ class WhatsAppService(BaseChannelService):
             # Get media URL
             url = f"{self.api_base_url}/{self.config.api_version}/{media_id}"
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(url, headers=self.headers)
+            client = get_http_client()
+            response = await client.get(url, headers=self.headers)
+            
+            if response.status_code == 200:
+                media_info = response.json()
+                media_url = media_info.get("url")
                 
-                if response.status_code == 200:
-                    media_info = response.json()
-                    media_url = media_info.get("url")
+                if media_url:
+                    # Download actual media file
+                    media_response = await client.get(media_url, headers=self.headers)
                     
-                    if media_url:
-                        # Download actual media file
-                        media_response = await client.get(media_url, headers=self.headers)
-                        
-                        if media_response.status_code == 200:
-                            return {
-                                "content": media_response.content,
-                                "content_type": media_response.headers.get("content-type"),
-                                "filename": media_info.get("filename"),
-                                "size": len(media_response.content)
-                            }
+                    if media_response.status_code == 200:
+                        return {
+                            "content": media_response.content,
+                            "content_type": media_response.headers.get("content-type"),
+                            "filename": media_info.get("filename"),
+                            "size": len(media_response.content)
+                        }
             
             return None
             
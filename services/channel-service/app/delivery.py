@@ -0,0 +1,52 @@
+"""
+Outbound delivery schedulers for Channel Service
+One scheduler per provider channel, paced to that provider's send quota.
+"""
+
+import logging
+from typing import Dict, List, Any
+
+from shared.config.env_constants import (
+    WHATSAPP_SEND_RATE_PER_SECOND, TELEGRAM_SEND_RATE_PER_SECOND, OUTBOUND_DELIVERY_MAX_ATTEMPTS,
+    RATE_LIMIT_EXPECTED_WORKERS, get_env_value
+)
+from shared.utils.delivery_scheduler import DeliveryScheduler
+
+logger = logging.getLogger(__name__)
+
+# Provider send quotas (messages per second per sender) and their defaults
+PROVIDER_RATE_SETTINGS = {
+    "whatsapp": (WHATSAPP_SEND_RATE_PER_SECOND, "80"),
+    "telegram": (TELEGRAM_SEND_RATE_PER_SECOND, "30"),
+}
+
+_schedulers: Dict[str, DeliveryScheduler] = {}
+
+
+def provider_rate_per_worker(channel_type: str) -> float:
+    """Provider quota divided across the workers sending for the same channel"""
+    setting, default = PROVIDER_RATE_SETTINGS[channel_type]
+    quota = float(get_env_value(setting, default=default))
+    workers = max(1, int(get_env_value(RATE_LIMIT_EXPECTED_WORKERS, default="4")))
+    return quota / workers
+
+
+def get_delivery_scheduler(channel_type: str, channel_id: str) -> DeliveryScheduler:
+    """Get the scheduler for one provider channel (bot / phone number)"""
+    key = f"{channel_type}:{channel_id}"
+    scheduler = _schedulers.get(key)
+    if scheduler is None:
+        scheduler = DeliveryScheduler(
+            key,
+            rate=provider_rate_per_worker(channel_type),
+            max_attempts=int(get_env_value(OUTBOUND_DELIVERY_MAX_ATTEMPTS, default="5")),
+            metrics_label=channel_type
+        )
+        _schedulers[key] = scheduler
+        logger.info(f"Created delivery scheduler {key} at {scheduler.rate:g} msg/s")
+    return scheduler
+
+
+def get_delivery_stats() -> List[Dict[str, Any]]:
+    """Throughput and backlog of every channel scheduler in this worker"""
+    return [scheduler.get_stats() for scheduler in _schedulers.values()]
@@ -10,10 +10,10 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
-from jose import JWTError, jwt
+from jose import JWTError
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 
-from shared.config.env_constants import get_env_value, JWT_SECRET_KEY, JWT_ALGORITHM
+from shared.security.jwks import get_jwks_verifier
 from shared.models.database import Creator
 from ..database import get_db, set_tenant_context
 
@@ -46,13 +46,9 @@ async def get_current_creator_id(
         HTTPException: If token is invalid or creator not found
     """
     try:
-        # Get JWT configuration
-        secret_key = get_env_value(JWT_SECRET_KEY, fallback=True)
-        algorithm = get_env_value(JWT_ALGORITHM, "HS256")
-        
-        # Decode and validate token
+        # Verify against the auth service's cached signing keys (no network call)
         token = credentials.credentials
-        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        payload = await get_jwks_verifier().verify(token)
         
         # Extract creator ID from token
         creator_id: str = payload.get("sub")
@@ -3,34 +3,48 @@ Channel Service - MVP Coaching AI Platform
 Multi-channel messaging service with WhatsApp, Telegram, and Web Widget support
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
-from typing import Dict, List, Optional, Any
-from datetime import datetime
+from typing import Optional
 
-from fastapi import FastAPI, HTTPException, status, WebSocket, WebSocketDisconnect, Depends, Query, Body
+from fastapi import FastAPI, HTTPException, status, WebSocket, WebSocketDisconnect, Depends, Query, Request, Header
 from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, PlainTextResponse
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 
 from shared.config.settings import validate_service_environment
+from shared.cache.websocket_fanout import get_websocket_fanout
+from shared.security.jwks import get_jwks_verifier
+from shared.utils.http_client import init_http_client, close_http_client
+from shared.utils.circuit_breaker import CircuitOpenError, get_optional_metrics_collector
 # Centralized environment constants and configuration management
-from shared.config.env_constants import CORS_ORIGINS, REQUIRED_VARS_BY_SERVICE, get_env_value
+from shared.config.env_constants import (
+    AUTH_SERVICE_URL, CORS_ORIGINS, REQUIRED_VARS_BY_SERVICE, CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS,
+    WEBHOOK_WORKER_CONCURRENCY, WEBHOOK_WORKER_BATCH_SIZE, get_env_value
+)
 # Import local authentication dependencies
 from .database import get_db, get_tenant_session, init_database, close_database, async_session
 
 # Import AI client at module level  
 try:
-    from .ai_client import AIEngineClient
+    from .ai_client import AIEngineClient, get_ai_client
     AI_CLIENT_AVAILABLE = True
 except Exception as ai_import_error:
     print(f"Failed to import AI Engine client: {ai_import_error}")
     AI_CLIENT_AVAILABLE = False
     AIEngineClient = None
+    get_ai_client = None
 
 from .channel_manager import ChannelManager
+from .channels.telegram import TELEGRAM_API_BASE_URL
+from .channels.whatsapp import WHATSAPP_API_BASE_URL
+from .channels import TelegramService, WhatsAppService
+from .delivery import get_delivery_stats
+from .message_counters import flush_message_counters, run_counter_flush_loop
+from .webhook_processor import enqueue_webhook, run_webhook_workers, stop_webhook_workers
 from .models import (
     ChannelConfiguration, 
     ChannelConfigurationCreate,
@@ -50,35 +64,8 @@ required_env_vars = REQUIRED_VARS_BY_SERVICE["channel_service"]
 validate_service_environment(required_env_vars, logger)
 
 
-# WebSocket connection manager for Web Widget
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: Dict[str, Dict[str, Any]] = {}
-    
-    async def connect(self, websocket: WebSocket, session_id: str, user_info: Dict[str, Any]):
-        await websocket.accept()
-        self.active_connections[session_id] = {
-            "websocket": websocket,
-            "user_info": user_info,
-            "connected_at": datetime.utcnow()
-        }
-        logger.info(f"WebSocket connected: {session_id}")
-    
-    def disconnect(self, session_id: str):
-        if session_id in self.active_connections:
-            del self.active_connections[session_id]
-            logger.info(f"WebSocket disconnected: {session_id}")
-    
-    async def send_message(self, session_id: str, message: dict):
-        if session_id in self.active_connections:
-            websocket = self.active_connections[session_id]["websocket"]
-            await websocket.send_json(message)
-    
-    def get_active_sessions(self) -> List[str]:
-        return list(self.active_connections.keys())
-
-
-manager = ConnectionManager()
+# Web Widget sockets: local bounded send queues plus Redis pub/sub routing across workers
+websocket_fanout = get_websocket_fanout()
 channel_manager: Optional[ChannelManager] = None
 
 
@@ -91,11 +78,60 @@ async def lifespan(app: FastAPI):
     # - Database connection testing
     # - Channel service initialization
     # - Health checks setup
-    
+
+    # Pooled keep-alive HTTP client shared by the AI client and channel providers
+    upstreams = [WHATSAPP_API_BASE_URL, TELEGRAM_API_BASE_URL, get_env_value(AUTH_SERVICE_URL, default="")]
+    if AI_CLIENT_AVAILABLE:
+        upstreams.extend(get_ai_client().replica_urls)
+    await init_http_client(upstreams=upstreams)
+
+    # Token signing keys, refreshed in the background for local verification
+    await get_jwks_verifier().start()
+
+    # Write-behind flush of Redis message counters to the database
+    flush_interval = int(get_env_value(CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS, default="30") or 0)
+    if flush_interval > 0:
+        app.state.counter_flush_task = asyncio.create_task(run_counter_flush_loop(flush_interval))
+        logger.info(f"Started message counter flush with {flush_interval}s interval")
+
+    # Webhook events are acknowledged on receipt and processed from the queue
+    webhook_concurrency = int(get_env_value(WEBHOOK_WORKER_CONCURRENCY, default="10") or 0)
+    if webhook_concurrency > 0:
+        webhook_batch_size = int(get_env_value(WEBHOOK_WORKER_BATCH_SIZE, default="50"))
+        app.state.webhook_worker_task = asyncio.create_task(
+            run_webhook_workers(webhook_concurrency, webhook_batch_size)
+        )
+        logger.info(f"Started webhook workers with concurrency {webhook_concurrency}")
+
+    try:
+        await websocket_fanout.start()
+    except Exception as e:
+        logger.error(f"WebSocket fan-out unavailable, widget delivery limited to this worker: {e}")
+
     yield
-    
+
     logger.info("🛑 Channel Service shutting down...")
     # Cleanup logic here
+    webhook_worker_task = getattr(app.state, "webhook_worker_task", None)
+    if webhook_worker_task:
+        await stop_webhook_workers(webhook_worker_task)
+
+    counter_flush_task = getattr(app.state, "counter_flush_task", None)
+    if counter_flush_task:
+        counter_flush_task.cancel()
+        try:
+            await counter_flush_task
+        except asyncio.CancelledError:
+            pass
+        # Persist whatever was counted since the last run
+        try:
+            await flush_message_counters()
+        except Exception as e:
+            logger.error(f"Final message counter flush failed: {e}")
+
+    await websocket_fanout.stop()
+    await get_jwks_verifier().stop()
+    await close_http_client()
 
 
 # Create FastAPI application
@@ -160,11 +196,25 @@ async def health_check():
         "status": "healthy",
         "service": "channel-service",
         "version": "2.0.0",
-        "active_websocket_connections": len(manager.active_connections),
-        "channel_manager_initialized": channel_manager is not None
+        "active_websocket_connections": len(websocket_fanout.connections),
+        "channel_manager_initialized": channel_manager is not None,
+        "ai_engine_circuits": get_ai_client().get_circuit_status() if AI_CLIENT_AVAILABLE else [],
+        "outbound_delivery": get_delivery_stats()
     }
 
 
+@app.get("/metrics", tags=["health"], response_class=PlainTextResponse)
+async def prometheus_metrics():
+    """Prometheus metrics (circuit breakers, hedged requests, outbound delivery throughput)"""
+    metrics = get_optional_metrics_collector()
+    if metrics is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Monitoring is not installed"
+        )
+    return metrics.get_metrics()
+
+
 @app.get("/ready", tags=["health"])
 async def readiness_check(cm: ChannelManager = Depends(get_channel_manager)):
     """Readiness check endpoint"""
@@ -900,54 +950,67 @@ async def send_channel_message(
 # Webhook Endpoints
 # =====================================================
 
+async def _accept_webhook(
+    request: Request,
+    service_class: type,
+    channel_type: str,
+    channel_id: str,
+    creator_id: str,
+    signature: Optional[str],
+    cm: ChannelManager
+) -> None:
+    """Verify a provider webhook and queue it; processing happens in the webhook workers"""
+    payload = await request.body()
+    if not await cm.verify_webhook(channel_id, creator_id, payload.decode("utf-8", errors="replace"), signature):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Webhook rejected"
+        )
+    
+    try:
+        webhook_data = await request.json()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid webhook payload"
+        )
+    
+    if not await enqueue_webhook(channel_type, service_class, channel_id, creator_id, webhook_data):
+        # Not acknowledged, so the provider redelivers it later
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Webhook could not be queued"
+        )
+
+
 @app.post("/api/v1/webhooks/whatsapp/{channel_id}", tags=["webhooks"])
 async def whatsapp_webhook(
+    request: Request,
     channel_id: str,
-    webhook_data: Dict[str, Any] = Body(...),
     creator_id: str = Query(..., description="Creator ID for the channel"),
+    x_hub_signature_256: Optional[str] = Header(None),
     cm: ChannelManager = Depends(get_channel_manager)
 ):
     """WhatsApp Business API webhook endpoint"""
-    try:
-        result = await cm.process_webhook(channel_id, creator_id, webhook_data)
-        
-        if result and result.get("requires_ai_processing"):
-            # TODO: Forward to AI Engine Service for processing
-            logger.info(f"Message requires AI processing: {result['message']['id']}")
-        
-        return {"status": "ok"}
-        
-    except Exception as e:
-        logger.error(f"WhatsApp webhook failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Webhook processing failed"
-        )
+    await _accept_webhook(
+        request, WhatsAppService, "whatsapp", channel_id, creator_id, x_hub_signature_256, cm
+    )
+    return {"status": "ok"}
 
 
 @app.post("/api/v1/webhooks/telegram/{channel_id}", tags=["webhooks"])
 async def telegram_webhook(
+    request: Request,
     channel_id: str,
-    webhook_data: Dict[str, Any] = Body(...),
     creator_id: str = Query(..., description="Creator ID for the channel"),
+    x_telegram_bot_api_secret_token: Optional[str] = Header(None),
     cm: ChannelManager = Depends(get_channel_manager)
 ):
     """Telegram Bot API webhook endpoint"""
-    try:
-        result = await cm.process_webhook(channel_id, creator_id, webhook_data)
-        
-        if result and result.get("requires_ai_processing"):
-            # TODO: Forward to AI Engine Service for processing
-            logger.info(f"Message requires AI processing: {result['message']['id']}")
-        
-        return {"ok": True}
-        
-    except Exception as e:
-        logger.error(f"Telegram webhook failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Webhook processing failed"
-        )
+    await _accept_webhook(
+        request, TelegramService, "telegram", channel_id, creator_id, x_telegram_bot_api_secret_token, cm
+    )
+    return {"ok": True}
 
 
 # =====================================================
@@ -963,6 +1026,7 @@ async def widget_websocket(
     user_name: str = Query("Demo User", description="User name")
 ):
     """WebSocket endpoint for Web Widget real-time communication"""
+    connection = None
     try:
         # Accept WebSocket connection
         await websocket.accept()
@@ -972,10 +1036,14 @@ async def widget_websocket(
             import uuid
             session_id = str(uuid.uuid4())
         
+        # Every outbound frame goes through the session's bounded send queue
+        connection = await websocket_fanout.connect(
+            session_id, websocket, {"channel_id": channel_id, "creator_id": creator_id}
+        )
         logger.info(f"Widget WebSocket connected: {session_id} for channel {channel_id}")
         
         # Send connection confirmation
-        await websocket.send_json({
+        await websocket_fanout.send(session_id, {
             "type": "status",
             "message": "Connected to AI Coaching Assistant",
             "session_id": session_id
@@ -985,19 +1053,19 @@ async def widget_websocket(
         ai_client = None
         if AI_CLIENT_AVAILABLE:
             try:
-                ai_client = AIEngineClient()
+                ai_client = get_ai_client()
                 logger.info("AI Engine client initialized successfully")
             except Exception as ai_init_error:
                 logger.error(f"Failed to initialize AI Engine client: {ai_init_error}")
                 logger.error(f"Error type: {type(ai_init_error)}")
                 logger.error(f"Error details: {str(ai_init_error)}")
-                await websocket.send_json({
+                await websocket_fanout.send(session_id, {
                     "type": "status",
                     "message": "AI service initialization failed - using demo mode"
                 })
         else:
             logger.warning("AI Engine client not available - using demo mode")
-            await websocket.send_json({
+            await websocket_fanout.send(session_id, {
                 "type": "status",
                 "message": "AI service not available - using demo mode"
             })
@@ -1037,7 +1105,7 @@ async def widget_websocket(
                             })()
                         
                         # Send AI response back to widget
-                        await websocket.send_json({
+                        await websocket_fanout.send(session_id, {
                             "type": "ai_response",
                             "content": ai_response.response,
                             "conversation_id": conversation_id,
@@ -1047,17 +1115,29 @@ async def widget_websocket(
                             "sources_count": ai_response.sources_count
                         })
                         
+                    except CircuitOpenError as circuit_error:
+                        # AI Engine is shedding load: answer now instead of queueing behind it
+                        await websocket_fanout.send(session_id, {
+                            "type": "ai_response",
+                            "content": "I'm getting a lot of questions right now. Please try again in a moment.",
+                            "conversation_id": conversation_id,
+                            "degraded": True,
+                            "retry_after": max(1, round(circuit_error.retry_after))
+                        })
+                        
                     except Exception as ai_error:
                         logger.error(f"AI processing error: {ai_error}")
-                        await websocket.send_json({
+                        await websocket_fanout.send(session_id, {
                             "type": "ai_response",
                             "content": "I'm sorry, I'm having trouble processing your request right now. This is a demo showcasing our AI coaching platform capabilities.",
                             "conversation_id": conversation_id
                         })
                 
+            except WebSocketDisconnect:
+                break
             except Exception as msg_error:
                 logger.error(f"Message processing error: {msg_error}")
-                await websocket.send_json({
+                await websocket_fanout.send(session_id, {
                     "type": "error",
                     "message": "Error processing message"
                 })
@@ -1065,7 +1145,7 @@ async def widget_websocket(
     except Exception as e:
         logger.error(f"WebSocket error for {session_id}: {e}")
         try:
-            await websocket.send_json({
+            await websocket_fanout.send(session_id, {
                 "type": "error", 
                 "message": "Connection error occurred"
             })
@@ -1080,6 +1160,9 @@ async def widget_websocket(
             await websocket.close(code=4000, reason="Internal server error")
         except:
             pass
+    finally:
+        if connection is not None:
+            await websocket_fanout.disconnect(session_id, connection=connection)
 
 
 @app.get("/api/v1/widget/{channel_id}/embed", tags=["web_widget"], response_class=HTMLResponse)
@@ -1144,10 +1227,11 @@ async def get_widget_embed_code(
 
 @app.get("/api/v1/connections", tags=["websocket"])
 async def get_active_connections():
-    """Get active WebSocket connections"""
+    """Get active WebSocket connections on this worker"""
     return {
-        "active_websocket_connections": len(manager.active_connections),
-        "sessions": manager.get_active_sessions()
+        "active_websocket_connections": len(websocket_fanout.connections),
+        "sessions": list(websocket_fanout.connections),
+        "fanout": websocket_fanout.get_stats()
     }
 
 
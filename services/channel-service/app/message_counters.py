@@ -0,0 +1,96 @@
+"""
+Channel message counters for Channel Service
+Redis holds the live daily/monthly counts; this module writes them back to
+Postgres in batches so sending a message never waits on an UPDATE+COMMIT.
+"""
+
+import asyncio
+import logging
+from collections import defaultdict
+from typing import Dict, List, Any
+
+from sqlalchemy import update, bindparam
+
+from shared.cache.usage_counters import UsageCounters, get_usage_counters
+from .database import async_session, set_tenant_context
+
+logger = logging.getLogger(__name__)
+
+CHANNEL_MESSAGE_COUNTERS = "channel_messages"
+
+
+def get_message_counters() -> UsageCounters:
+    """Get the usage counters for channel messages"""
+    return get_usage_counters(CHANNEL_MESSAGE_COUNTERS)
+
+
+async def flush_message_counters(batch_size: int = 500) -> int:
+    """
+    Write changed channel counts to channel_configurations
+
+    Counts are written as absolute values, so a flush that is retried or
+    overlaps another replica's flush converges on the same row state.
+
+    Args:
+        batch_size: Channels written per transaction
+
+    Returns:
+        Number of channel rows flushed
+    """
+    from shared.models.database import ChannelConfiguration as DBChannelConfig
+
+    counters = get_message_counters()
+    table = DBChannelConfig.__table__
+    stmt = (
+        update(table)
+        .where(table.c.id == bindparam("b_id"))
+        .where(table.c.creator_id == bindparam("b_creator_id"))
+        .values(
+            current_daily_count=bindparam("b_daily"),
+            current_monthly_count=bindparam("b_monthly")
+        )
+    )
+
+    flushed = 0
+    while True:
+        entries = await counters.drain_dirty(batch_size)
+        if not entries:
+            return flushed
+
+        by_creator: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for entry in entries:
+            by_creator[entry["creator_id"]].append(entry)
+
+        try:
+            async with async_session() as session:
+                for creator_id, rows in by_creator.items():
+                    await set_tenant_context(session, creator_id)
+                    await session.execute(stmt, [
+                        {
+                            "b_id": row["entity_id"],
+                            "b_creator_id": creator_id,
+                            "b_daily": row["daily"],
+                            "b_monthly": row["monthly"]
+                        }
+                        for row in rows
+                    ])
+                await session.commit()
+        except Exception:
+            await counters.mark_dirty(entries)
+            raise
+
+        flushed += len(entries)
+        if len(entries) < batch_size:
+            return flushed
+
+
+async def run_counter_flush_loop(interval_seconds: int) -> None:
+    """Background task flushing message counters every ``interval_seconds``"""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        try:
+            flushed = await flush_message_counters()
+            if flushed:
+                logger.debug(f"Flushed message counters for {flushed} channels")
+        except Exception as e:
+            logger.error(f"Message counter flush failed: {e}")
@@ -0,0 +1,144 @@
+"""
+Webhook ingestion for Channel Service
+Webhook endpoints only verify and enqueue provider events; workers process
+them from the queue, once per external message ID and in order per user.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+
+from shared.cache.deduplication import MessageDeduplicator
+from shared.cache.message_queue import get_message_queue
+from shared.cache.redis_client import get_redis_client
+from shared.config.env_constants import WEBHOOK_DEDUP_TTL_SECONDS, get_env_value
+
+from .channel_manager import ChannelManager
+from .database import async_session, set_tenant_context
+
+logger = logging.getLogger(__name__)
+
+# Webhooks for every tenant share one stream in the system namespace
+WEBHOOK_QUEUE_TENANT = "system"
+WEBHOOK_QUEUE_NAME = "webhooks"
+
+_deduplicator: Optional[MessageDeduplicator] = None
+
+
+def get_webhook_deduplicator() -> MessageDeduplicator:
+    """Get the deduplicator for provider webhook events"""
+    global _deduplicator
+    if _deduplicator is None:
+        _deduplicator = MessageDeduplicator(
+            get_redis_client(),
+            namespace="webhook",
+            done_ttl=int(get_env_value(WEBHOOK_DEDUP_TTL_SECONDS, default="86400"))
+        )
+    return _deduplicator
+
+
+async def enqueue_webhook(
+    channel_type: str,
+    service_class: type,
+    channel_id: str,
+    creator_id: str,
+    webhook_data: Dict[str, Any]
+) -> Optional[str]:
+    """
+    Queue a verified webhook event for background processing
+
+    Args:
+        channel_type: Channel type value (e.g. "whatsapp")
+        service_class: Channel service class used to identify the event
+        channel_id: Channel configuration ID
+        creator_id: Creator ID owning the channel
+        webhook_data: Raw webhook payload
+
+    Returns:
+        Stream entry ID, or None if the event could not be queued
+    """
+    external_message_id, user_identifier = service_class.webhook_event_keys(webhook_data)
+    return await get_message_queue().send_message(
+        WEBHOOK_QUEUE_TENANT,
+        WEBHOOK_QUEUE_NAME,
+        f"{channel_type}_webhook",
+        {
+            "channel_type": channel_type,
+            "channel_id": channel_id,
+            "creator_id": creator_id,
+            "external_message_id": external_message_id,
+            "user_identifier": user_identifier,
+            "payload": webhook_data
+        },
+        priority="high"
+    )
+
+
+def webhook_ordering_key(message: Dict[str, Any]) -> str:
+    """Events from the same user on the same channel are handled in arrival order"""
+    data = message["data"]
+    return f"{data['channel_id']}:{data.get('user_identifier') or ''}"
+
+
+async def process_webhook_event(message: Dict[str, Any]) -> bool:
+    """
+    Process one queued webhook event (MessageQueue handler)
+
+    Returns:
+        True when the event is done (processed or a duplicate); exceptions
+        release the dedup lease and leave the retry to the queue
+    """
+    data = message["data"]
+    creator_id = data["creator_id"]
+    dedup_key = None
+    if data.get("external_message_id"):
+        dedup_key = f"{data['channel_type']}:{data['channel_id']}:{data['external_message_id']}"
+
+    deduplicator = get_webhook_deduplicator()
+    if dedup_key and not await deduplicator.claim(creator_id, dedup_key):
+        logger.info(f"Skipping duplicate {data['channel_type']} webhook {data['external_message_id']}")
+        return True
+
+    try:
+        async with async_session() as session:
+            await set_tenant_context(session, creator_id)
+            cm = ChannelManager(session)
+            result = await cm.process_webhook(data["channel_id"], creator_id, data["payload"])
+            await session.commit()
+    except Exception:
+        if dedup_key:
+            await deduplicator.release(creator_id, dedup_key)
+        raise
+
+    if dedup_key:
+        await deduplicator.complete(creator_id, dedup_key)
+
+    if result and result.get("requires_ai_processing"):
+        logger.info(f"Processed inbound message {result['message'].get('external_message_id')}")
+    return True
+
+
+async def run_webhook_workers(concurrency: int, batch_size: int) -> None:
+    """Consume queued webhook events until the queue's consumers are stopped"""
+    await get_message_queue().consume_ordered(
+        WEBHOOK_QUEUE_TENANT,
+        WEBHOOK_QUEUE_NAME,
+        process_webhook_event,
+        key_func=webhook_ordering_key,
+        batch_size=batch_size,
+        concurrency=concurrency,
+        # Reclaim only after a crashed worker's dedup lease expired, otherwise
+        # the reclaimed event would be skipped as a duplicate
+        claim_idle_ms=(get_webhook_deduplicator().processing_ttl + 60) * 1000
+    )
+
+
+async def stop_webhook_workers(task: asyncio.Task, timeout: float = 10.0) -> None:
+    """Let the current batch finish, then stop the webhook consumer"""
+    await get_message_queue().stop_all_consumers()
+    try:
+        await asyncio.wait_for(task, timeout=timeout)
+    except asyncio.TimeoutError:
+        logger.warning("Webhook workers did not drain in time, cancelling")
+    except asyncio.CancelledError:
+        pass
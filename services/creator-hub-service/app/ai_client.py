@@ -7,6 +7,7 @@ import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 import httpx
+from shared.utils.http_client import get_http_client
 from pydantic import BaseModel, Field
 
 from shared.config.env_constants import get_env_value
@@ -146,19 +147,20 @@ class AIEngineClient:
             if document_id:
                 data["document_id"] = document_id
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/ai/documents/process",
-                    files=files,
-                    data=data,
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                response_data = response.json()
-                
-                return DocumentProcessResponse(**response_data)
-                
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/v1/ai/documents/process",
+                files=files,
+                data=data,
+                headers=headers,
+                timeout=self.timeout
+            )
+            
+            response.raise_for_status()
+            response_data = response.json()
+            
+            return DocumentProcessResponse(**response_data)
+            
         except httpx.TimeoutException:
             logger.error(f"AI Engine document processing timeout for creator {creator_id}, file {filename}")
             raise Exception("AI service is currently unavailable (timeout)")
@@ -208,18 +210,19 @@ class AIEngineClient:
             if auth_token:
                 headers["Authorization"] = f"Bearer {auth_token}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/ai/documents/search",
-                    json=request_data.dict(),
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                response_data = response.json()
-                
-                return DocumentSearchResponse(**response_data)
-                
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/v1/ai/documents/search",
+                json=request_data.dict(),
+                headers=headers,
+                timeout=self.timeout
+            )
+            
+            response.raise_for_status()
+            response_data = response.json()
+            
+            return DocumentSearchResponse(**response_data)
+            
         except Exception as e:
             logger.error(f"Failed to search documents: {str(e)}")
             raise Exception("Failed to search documents with AI service")
@@ -317,18 +320,19 @@ class AIEngineClient:
             if auth_token:
                 headers["Authorization"] = f"Bearer {auth_token}"
             
-            async with httpx.AsyncClient(timeout=self.timeout) as client:
-                response = await client.post(
-                    f"{self.base_url}/api/v1/ai/conversations",
-                    json=request_data.dict(),
-                    headers=headers
-                )
-                
-                response.raise_for_status()
-                response_data = response.json()
-                
-                return ConversationResponse(**response_data)
-                
+            client = get_http_client()
+            response = await client.post(
+                f"{self.base_url}/api/v1/ai/conversations",
+                json=request_data.dict(),
+                headers=headers,
+                timeout=self.timeout
+            )
+            
+            response.raise_for_status()
+            response_data = response.json()
+            
+            return ConversationResponse(**response_data)
+            
         except Exception as e:
             logger.error(f"Failed to process conversation with knowledge: {str(e)}")
             raise Exception("Failed to process conversation with AI service")
@@ -341,9 +345,9 @@ class AIEngineClient:
             True if healthy, False otherwise
         """
         try:
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(f"{self.base_url}/health")
-                return response.status_code == 200
+            client = get_http_client()
+            response = await client.get(f"{self.base_url}/health", timeout=5.0)
+            return response.status_code == 200
         except Exception:
             return False
 
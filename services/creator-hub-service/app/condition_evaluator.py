@@ -4,12 +4,22 @@ Advanced condition evaluation engine for complex program flow logic
 """
 
 import re
+import copy
+import json
+import time
 import asyncio
+import hashlib
 import logging
+import operator
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Union, Callable
+from collections import OrderedDict
+from typing import (
+    Dict, List, Iterable, Iterator, Mapping, Optional, Any, Sequence, Tuple, Union, Callable
+)
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
+
+import numpy as np
 
 from .program_engine import ExecutionContext
 from .step_models import ConditionalConfig, StepCondition
@@ -57,12 +67,14 @@ class ConditionEvaluationResult:
         explanation: str = "",
         variables_used: List[str] = None,
         execution_time_ms: float = 0.0,
-        cached: bool = False
+        cached: bool = False,
+        functions_used: List[str] = None
     ):
         self.result = result
         self.confidence = confidence
         self.explanation = explanation
         self.variables_used = variables_used or []
+        self.functions_used = functions_used or []
         self.execution_time_ms = execution_time_ms
         self.cached = cached
         self.evaluated_at = datetime.utcnow()
@@ -201,10 +213,31 @@ class BuiltinFunction(ABC):
     def get_arg_count(self) -> int:
         """Get expected argument count"""
         pass
+    
+    @property
+    def is_async(self) -> bool:
+        """Whether compiled conditions must await this function"""
+        return True
 
 
-class CountFunction(BuiltinFunction):
+class SyncBuiltinFunction(BuiltinFunction):
+    """Built-in function that never awaits; compiled conditions call it inline"""
+    
+    @abstractmethod
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
+        """Execute the function without awaiting"""
+        pass
+    
     async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+        return self.execute_sync(args, context)
+    
+    @property
+    def is_async(self) -> bool:
+        return False
+
+
+class CountFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 1:
             raise ValueError("COUNT function requires exactly 1 argument")
         
@@ -223,8 +256,8 @@ class CountFunction(BuiltinFunction):
         return 1
 
 
-class SumFunction(BuiltinFunction):
-    async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+class SumFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 1:
             raise ValueError("SUM function requires exactly 1 argument")
         
@@ -244,8 +277,8 @@ class SumFunction(BuiltinFunction):
         return 1
 
 
-class AvgFunction(BuiltinFunction):
-    async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+class AvgFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 1:
             raise ValueError("AVG function requires exactly 1 argument")
         
@@ -265,8 +298,8 @@ class AvgFunction(BuiltinFunction):
         return 1
 
 
-class NowFunction(BuiltinFunction):
-    async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+class NowFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 0:
             raise ValueError("NOW function requires no arguments")
         return datetime.utcnow()
@@ -278,8 +311,8 @@ class NowFunction(BuiltinFunction):
         return 0
 
 
-class DaysAgoFunction(BuiltinFunction):
-    async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+class DaysAgoFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 1:
             raise ValueError("DAYS_AGO function requires exactly 1 argument")
         
@@ -296,8 +329,8 @@ class DaysAgoFunction(BuiltinFunction):
         return 1
 
 
-class GetStepResultFunction(BuiltinFunction):
-    async def execute(self, args: List[Any], context: ConditionContext) -> Any:
+class GetStepResultFunction(SyncBuiltinFunction):
+    def execute_sync(self, args: List[Any], context: ConditionContext) -> Any:
         if len(args) != 2:
             raise ValueError("GET_STEP_RESULT function requires exactly 2 arguments: step_id, field")
         
@@ -409,7 +442,9 @@ class ConditionParser:
                 paren_level += 1
             elif char == ')':
                 paren_level -= 1
-                if paren_level == 0:
+                # Parentheses right after a name are a function call, not a group
+                preceding = expression[paren_start - 1] if paren_start > 0 else ' '
+                if paren_level == 0 and not (preceding.isalnum() or preceding == '_'):
                     # Extract content within parentheses
                     inner_expr = expression[paren_start + 1:i]
                     # Replace parentheses group with placeholder
@@ -558,24 +593,542 @@ class ConditionParser:
                             self._replace_placeholder(item, placeholder, replacement)
 
 
+# ==================== CONDITION COMPILER ====================
+
+# A compiled node: evaluation closure plus whether it returns an awaitable
+CompiledNode = Tuple[Callable[[ConditionContext], Any], bool]
+
+
+class CompiledCondition:
+    """
+    Condition expression compiled into a tree of closures
+    
+    Parsing, operator lookup and function resolution happen once at compile
+    time. Expressions built only from variables, literals, operators and
+    synchronous functions evaluate without a single await; subtrees that call
+    async functions await only those calls.
+    """
+    
+    def __init__(
+        self,
+        expression: str,
+        parsed: Dict[str, Any],
+        root: CompiledNode,
+        variables_used: List[str],
+        functions_used: List[str]
+    ):
+        self.expression = expression
+        self.parsed = parsed
+        self._evaluate, self.is_async = root
+        self.variables_used = variables_used
+        self.functions_used = functions_used
+        # Columnar form, built on first batch evaluation
+        self.batch: Optional["BatchCondition"] = None
+    
+    async def evaluate(self, context: ConditionContext) -> Any:
+        """Evaluate the condition against a context"""
+        if self.is_async:
+            return await self._evaluate(context)
+        return self._evaluate(context)
+    
+    def evaluate_sync(self, context: ConditionContext) -> Any:
+        """
+        Evaluate without an event loop
+        
+        Raises:
+            RuntimeError: If the expression calls an async function
+        """
+        if self.is_async:
+            raise RuntimeError(f"Condition calls async functions: {self.expression}")
+        return self._evaluate(context)
+
+
+class ConditionCompiler:
+    """Compiles parsed condition expressions into closure trees"""
+    
+    def __init__(self, parser: ConditionParser, custom_functions: Dict[str, BuiltinFunction]):
+        self.parser = parser
+        self.custom_functions = custom_functions
+    
+    def compile(self, expression: str) -> CompiledCondition:
+        """Parse and compile a condition expression"""
+        parsed = self.parser.parse_expression(expression)
+        variables, functions = set(), set()
+        root = self._compile_node(parsed, variables, functions)
+        return CompiledCondition(expression, parsed, root, list(variables), list(functions))
+    
+    def _compile_node(self, node: Dict[str, Any], variables: set, functions: set) -> CompiledNode:
+        expr_type = node.get("type")
+        
+        if expr_type == "literal":
+            value = node["value"]
+            return (lambda context: value), False
+        
+        if expr_type == "variable":
+            name = node["name"]
+            variables.add(name)
+            return (lambda context: context.get_variable(name)), False
+        
+        if expr_type == "function":
+            return self._compile_function(node, variables, functions)
+        
+        if expr_type == "comparison":
+            return self._compile_comparison(node, variables, functions)
+        
+        if expr_type == "logical":
+            return self._compile_logical(node, variables, functions)
+        
+        raise ValueError(f"Unknown expression type: {expr_type}")
+    
+    def _compile_function(self, node: Dict[str, Any], variables: set, functions: set) -> CompiledNode:
+        func_name = node["function"]
+        functions.add(func_name)
+        args = [self._compile_node(arg, variables, functions) for arg in node["args"]]
+        
+        func_impl = self.parser.functions.get(func_name) or self.custom_functions.get(func_name)
+        if func_impl is None:
+            # Reported when evaluated, like any other evaluation failure
+            def unknown_function(context):
+                raise ValueError(f"Unknown function: {func_name}")
+            return unknown_function, False
+        
+        if not func_impl.is_async and not any(is_async for _, is_async in args):
+            execute_sync = func_impl.execute_sync
+            arg_fns = [fn for fn, _ in args]
+            return (lambda context: execute_sync([fn(context) for fn in arg_fns], context)), False
+        
+        async def call(context):
+            values = []
+            for fn, is_async in args:
+                values.append(await fn(context) if is_async else fn(context))
+            return await func_impl.execute(values, context)
+        
+        return call, True
+    
+    def _compile_comparison(self, node: Dict[str, Any], variables: set, functions: set) -> CompiledNode:
+        operator = self.parser.operators.get(node["operator"])
+        if not operator:
+            raise ValueError(f"Unknown operator: {node['operator']}")
+        op = operator.evaluate
+        left, left_async = self._compile_node(node["left"], variables, functions)
+        right, right_async = self._compile_node(node["right"], variables, functions)
+        
+        if not (left_async or right_async):
+            return (lambda context: op(left(context), right(context), context)), False
+        
+        async def compare(context):
+            left_value = await left(context) if left_async else left(context)
+            right_value = await right(context) if right_async else right(context)
+            return op(left_value, right_value, context)
+        
+        return compare, True
+    
+    def _compile_logical(self, node: Dict[str, Any], variables: set, functions: set) -> CompiledNode:
+        operator = node["operator"]
+        if operator not in ("AND", "OR"):
+            raise ValueError(f"Unknown logical operator: {operator}")
+        is_and = operator == "AND"
+        left, left_async = self._compile_node(node["left"], variables, functions)
+        right, right_async = self._compile_node(node["right"], variables, functions)
+        
+        # Short-circuit: AND stops on a falsy left operand, OR on a truthy one
+        if not (left_async or right_async):
+            if is_and:
+                return (lambda context: bool(left(context)) and bool(right(context))), False
+            return (lambda context: bool(left(context)) or bool(right(context))), False
+        
+        async def combine(context):
+            left_value = await left(context) if left_async else left(context)
+            if bool(left_value) != is_and:
+                return not is_and
+            return bool(await right(context) if right_async else right(context))
+        
+        return combine, True
+
+
+# ==================== BATCH EVALUATION ====================
+
+# Comparison operators with a NumPy equivalent (equality keeps Python semantics
+# through the array operators, which compare object arrays element by element)
+_VECTOR_COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    ">": np.greater,
+    ">=": np.greater_equal,
+    "<": np.less,
+    "<=": np.less_equal,
+}
+
+
+class BatchEnvironment:
+    """Columns and per-row fallback results for one batch evaluation"""
+    
+    def __init__(self, table: Mapping[str, Sequence[Any]], base_context: ConditionContext):
+        lengths = {len(column) for column in table.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Batch columns have different lengths: {sorted(lengths)}")
+        self.size = lengths.pop() if lengths else 0
+        self.table = table
+        self.base_context = base_context
+        self.fallback_values: Dict[int, np.ndarray] = {}
+        self.errors = np.zeros(self.size, dtype=bool)
+        self._columns: Dict[str, np.ndarray] = {}
+    
+    def column(self, name: str) -> Any:
+        """Column as an array (numeric dtypes kept, anything else as Python objects)"""
+        if name not in self.table:
+            # Same value for every row
+            return self.base_context.get_variable(name)
+        column = self._columns.get(name)
+        if column is None:
+            try:
+                column = np.asarray(self.table[name])
+            except ValueError:
+                column = None
+            if column is None or column.dtype.kind not in "biuf" or column.ndim != 1:
+                column = _object_array(self.table[name])
+            self._columns[name] = column
+        return column
+    
+    def row_contexts(self, names: Iterable[str]) -> Iterator[ConditionContext]:
+        """
+        One context per row carrying only the named columns
+        
+        The same context object is updated in place for each row, so it must
+        not be kept beyond the row it was yielded for.
+        """
+        user_variables = dict(self.base_context.user_variables)
+        context = replace(self.base_context, user_variables=user_variables)
+        columns = [(name, self.table[name]) for name in names if name in self.table]
+        for row in range(self.size):
+            for name, column in columns:
+                user_variables[name] = column[row]
+            yield context
+    
+    def row_context(self, row: int) -> ConditionContext:
+        """Condition context of a single row, for per-row evaluation"""
+        values = {name: column[row] for name, column in self.table.items()}
+        return replace(
+            self.base_context,
+            user_variables={**self.base_context.user_variables, **values}
+        )
+
+
+def _object_array(values: Sequence[Any]) -> np.ndarray:
+    array = np.empty(len(values), dtype=object)
+    array[:] = list(values)
+    return array
+
+
+def _is_list_literal(node: Dict[str, Any]) -> bool:
+    return node.get("type") == "literal" and node.get("data_type") == "list"
+
+
+def _is_array(value: Any) -> bool:
+    return isinstance(value, np.ndarray)
+
+
+def _broadcast(value: Any, size: int) -> np.ndarray:
+    """Boolean result of a vector operation as one value per row"""
+    if _is_array(value) and value.shape == (size,):
+        return value.astype(bool, copy=False)
+    return np.full(size, bool(value))
+
+
+def _truthiness(value: Any, size: int) -> np.ndarray:
+    if not _is_array(value):
+        return np.full(size, bool(value))
+    if value.dtype.kind in "biuf":
+        return value != 0
+    return np.fromiter((bool(item) for item in value), dtype=bool, count=size)
+
+
+def _equality(compare: Callable[[Any, Any], Any], left: Any, right: Any, size: int) -> np.ndarray:
+    """
+    ``==`` / ``!=`` per row with Python semantics
+    
+    Object arrays compare element by element, except against a list or tuple
+    value: NumPy would broadcast it over the rows as a sequence of operands,
+    so rows are compared one by one against the whole value instead.
+    """
+    if isinstance(left, (list, tuple)) or isinstance(right, (list, tuple)):
+        # tolist() yields Python values, so NumPy scalars do not broadcast either
+        lefts = left.tolist() if _is_array(left) else [left] * size
+        rights = right.tolist() if _is_array(right) else [right] * size
+        return np.fromiter(
+            (bool(compare(a, b)) for a, b in zip(lefts, rights)), dtype=bool, count=size
+        )
+    return _broadcast(compare(left, right), size)
+
+
+def _as_float(value: Any, size: int) -> np.ndarray:
+    """Numeric view matching ``float()`` conversions; unconvertible values become NaN"""
+    if not _is_array(value):
+        try:
+            return np.full(size, float(value))
+        except (ValueError, TypeError):
+            return np.full(size, np.nan)
+    if value.dtype.kind in "biuf":
+        return value.astype(float, copy=False)
+    try:
+        return value.astype(float)
+    except (ValueError, TypeError):
+        converted = np.empty(size)
+        for i, item in enumerate(value):
+            try:
+                converted[i] = float(item)
+            except (ValueError, TypeError):
+                converted[i] = np.nan
+        return converted
+
+
+class BatchCondition:
+    """
+    Condition compiled for evaluation over a columnar table of users
+    
+    Variables, literals, the comparison operators, ``IN`` with a literal list
+    and AND/OR run as NumPy operations over whole columns. Any other subtree
+    (functions, CONTAINS, MATCHES) is evaluated row by row with the scalar
+    compiled closure and fed back in as a column. Rows whose fallback raised
+    are re-evaluated individually, so short-circuiting and error handling
+    match ``ConditionEvaluator.evaluate_condition`` row for row.
+    """
+    
+    def __init__(self, compiled: CompiledCondition, compiler: ConditionCompiler):
+        self.compiled = compiled
+        self._compiler = compiler
+        # Per-row subtrees: (closure, is_async, variables read)
+        self.fallbacks: List[Tuple[Callable[[ConditionContext], Any], bool, set]] = []
+        self._evaluate = self._compile_node(compiled.parsed)
+    
+    @property
+    def fully_vectorized(self) -> bool:
+        return not self.fallbacks
+    
+    async def evaluate(
+        self, 
+        table: Mapping[str, Sequence[Any]], 
+        base_context: ConditionContext
+    ) -> np.ndarray:
+        """
+        Evaluate the condition for every row of a table
+        
+        Args:
+            table: Column name -> one value per user; columns override
+                ``base_context`` variables of the same name
+            base_context: Context supplying everything not in the table
+            
+        Returns:
+            Boolean array with one result per row
+        """
+        env = BatchEnvironment(table, base_context)
+        for index, (fn, is_async, variables) in enumerate(self.fallbacks):
+            values = np.empty(env.size, dtype=object)
+            for row, context in enumerate(env.row_contexts(variables)):
+                try:
+                    value = fn(context)
+                    values[row] = await value if is_async else value
+                except Exception:
+                    env.errors[row] = True
+            env.fallback_values[index] = values
+        
+        with np.errstate(invalid="ignore"):
+            results = _broadcast(self._evaluate(env), env.size).copy()
+        
+        for row in np.flatnonzero(env.errors):
+            try:
+                results[row] = bool(await self.compiled.evaluate(env.row_context(row)))
+            except Exception:
+                results[row] = False
+        return results
+    
+    def _compile_node(self, node: Dict[str, Any]) -> Callable[[BatchEnvironment], Any]:
+        expr_type = node.get("type")
+        
+        if expr_type == "literal":
+            value = node["value"]
+            return lambda env: value
+        
+        if expr_type == "variable":
+            name = node["name"]
+            return lambda env: env.column(name)
+        
+        if (expr_type == "comparison" and node["operator"] in _VECTOR_COMPARISONS
+                and not (_is_list_literal(node["left"]) or _is_list_literal(node["right"]))):
+            return self._compile_comparison(node)
+        
+        if expr_type == "comparison" and node["operator"] == "IN" and _is_list_literal(node["right"]):
+            return self._compile_membership(node)
+        
+        if expr_type == "logical" and node["operator"] in ("AND", "OR"):
+            left = self._compile_node(node["left"])
+            right = self._compile_node(node["right"])
+            combine = np.logical_and if node["operator"] == "AND" else np.logical_or
+            return lambda env: combine(
+                _truthiness(left(env), env.size), _truthiness(right(env), env.size)
+            )
+        
+        # No vector form: evaluate this subtree per row
+        variables = set()
+        fn, is_async = self._compiler._compile_node(node, variables, set())
+        self.fallbacks.append((fn, is_async, variables))
+        index = len(self.fallbacks) - 1
+        return lambda env: env.fallback_values[index]
+    
+    def _compile_comparison(self, node: Dict[str, Any]) -> Callable[[BatchEnvironment], Any]:
+        symbol = node["operator"]
+        compare = _VECTOR_COMPARISONS[symbol]
+        left = self._compile_node(node["left"])
+        right = self._compile_node(node["right"])
+        
+        if symbol in ("==", "!="):
+            return lambda env: _equality(compare, left(env), right(env), env.size)
+        
+        # Ordered comparisons convert with float(), failing conversions compare False
+        return lambda env: compare(_as_float(left(env), env.size), _as_float(right(env), env.size))
+    
+    def _compile_membership(self, node: Dict[str, Any]) -> Callable[[BatchEnvironment], Any]:
+        left = self._compile_node(node["left"])
+        options = node["right"]["value"]
+        numeric = all(isinstance(option, (int, float)) for option in options)
+        
+        def membership(env):
+            values = left(env)
+            if not _is_array(values):
+                return values in options
+            if numeric and values.dtype.kind in "biuf":
+                return np.isin(values, options)
+            return np.fromiter((value in options for value in values), dtype=bool, count=env.size)
+        
+        return membership
+
+
+# ==================== RESULT CACHE ====================
+
+class ConditionResultCache:
+    """
+    LRU cache of condition evaluation results with per-entry expiry
+    
+    Lookups and inserts are O(1): entries live in an OrderedDict in recency
+    order, so eviction pops the least recently used entry instead of
+    scanning for the oldest.
+    
+    Args:
+        max_size: Maximum number of cached results
+        clock: Monotonic clock (injectable for tests)
+    """
+    
+    def __init__(self, max_size: int = 1000, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max(1, max_size)
+        self._clock = clock
+        self._entries: "OrderedDict[str, Tuple[float, ConditionEvaluationResult]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "expired": 0, "evictions": 0}
+    
+    def get(self, key: str) -> Optional[ConditionEvaluationResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        expires_at, result = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.stats["expired"] += 1
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return result
+    
+    def put(self, key: str, result: ConditionEvaluationResult, ttl_seconds: float):
+        if ttl_seconds <= 0:
+            return
+        self._entries[key] = (self._clock() + ttl_seconds, result)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+    
+    def clear(self):
+        self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 # ==================== CORE CONDITION EVALUATOR ====================
 
 class ConditionEvaluator:
     """Core condition evaluation engine"""
     
-    def __init__(self):
+    def __init__(self, cache_max_size: int = 1000, redis_client=None):
         self.parser = ConditionParser()
-        self.cache: Dict[str, ConditionEvaluationResult] = {}
-        self.cache_max_size = 1000
+        self.cache = ConditionResultCache(cache_max_size)
+        # Optional shared tier so workers reuse results of expensive (async) conditions
+        self.redis_client = redis_client
         self.custom_functions: Dict[str, BuiltinFunction] = {}
+        self.compiler = ConditionCompiler(self.parser, self.custom_functions)
+        self.compiled: "OrderedDict[str, CompiledCondition]" = OrderedDict()
+        self.compiled_max_size = 1000
         
         logger.info("Condition Evaluator initialized")
     
     def register_custom_function(self, function: BuiltinFunction):
         """Register custom function for condition evaluation"""
         self.custom_functions[function.get_function_name()] = function
+        # Compiled conditions bind functions at compile time
+        self.compiled.clear()
         logger.info(f"Registered custom function: {function.get_function_name()}")
     
+    def compile(self, expression: str) -> CompiledCondition:
+        """
+        Get the compiled form of a condition expression
+        
+        Compiled conditions are cached by expression text (least recently
+        used first out), so each distinct expression is parsed once.
+        
+        Raises:
+            ValueError: If the expression uses an unknown operator
+        """
+        compiled = self.compiled.get(expression)
+        if compiled is not None:
+            self.compiled.move_to_end(expression)
+            return compiled
+        
+        compiled = self.compiler.compile(expression)
+        self.compiled[expression] = compiled
+        if len(self.compiled) > self.compiled_max_size:
+            self.compiled.popitem(last=False)
+        return compiled
+    
+    def compile_batch(self, expression: str) -> BatchCondition:
+        """Get the batch (columnar) form of a condition expression"""
+        compiled = self.compile(expression)
+        if compiled.batch is None:
+            compiled.batch = BatchCondition(compiled, self.compiler)
+        return compiled.batch
+    
+    async def evaluate_batch(
+        self, 
+        expression: str, 
+        table: Mapping[str, Sequence[Any]], 
+        base_context: ConditionContext
+    ) -> np.ndarray:
+        """
+        Evaluate one condition for many users at once (e.g. trigger sweeps)
+        
+        Args:
+            expression: Condition expression
+            table: Column name -> one value per user for the per-user variables
+            base_context: Context for everything shared by all users
+            
+        Returns:
+            Boolean array, True where the condition holds for that row
+            
+        Raises:
+            ValueError: If the expression cannot be compiled or columns differ in length
+        """
+        return await self.compile_batch(expression).evaluate(table, base_context)
+    
     async def evaluate_condition(
         self, 
         condition_config: ConditionalConfig, 
@@ -586,19 +1139,24 @@ class ConditionEvaluator:
         start_time = datetime.utcnow()
         
         try:
+            # Compile the condition expression (cached by expression text)
+            compiled = self.compile(condition_config.condition_expression)
+            
             # Check cache if enabled
-            cache_key = self._get_cache_key(condition_config, context)
-            if condition_config.cache_evaluation_result and cache_key in self.cache:
-                cached_result = self.cache[cache_key]
-                if self._is_cache_valid(cached_result, condition_config):
+            cache_key = None
+            if condition_config.cache_evaluation_result:
+                cache_key = self._get_cache_key(compiled, context)
+                cached_result = self.cache.get(cache_key)
+                if cached_result is None and self._uses_shared_cache(compiled):
+                    cached_result = await self._get_shared_result(cache_key, context)
+                if cached_result is not None:
+                    # A copy, so callers never mutate the cached entry
+                    cached_result = copy.copy(cached_result)
                     cached_result.cached = True
                     return cached_result
             
-            # Parse the condition expression
-            parsed_expression = self.parser.parse_expression(condition_config.condition_expression)
-            
-            # Evaluate the parsed expression
-            result = await self._evaluate_parsed_expression(parsed_expression, context)
+            # Evaluate the compiled expression
+            result = await compiled.evaluate(context)
             
             # Calculate execution time
             execution_time = (datetime.utcnow() - start_time).total_seconds() * 1000
@@ -608,14 +1166,18 @@ class ConditionEvaluator:
                 result=bool(result),
                 confidence=1.0,  # Simple conditions have full confidence
                 explanation=f"Evaluated: {condition_config.condition_expression} = {result}",
-                variables_used=self._extract_variables_used(parsed_expression),
+                variables_used=compiled.variables_used,
+                functions_used=compiled.functions_used,
                 execution_time_ms=execution_time,
                 cached=False
             )
             
             # Cache result if enabled
-            if condition_config.cache_evaluation_result:
-                self._cache_result(cache_key, evaluation_result)
+            if cache_key is not None:
+                ttl = condition_config.cache_duration_seconds
+                self.cache.put(cache_key, evaluation_result, ttl)
+                if self._uses_shared_cache(compiled):
+                    await self._put_shared_result(cache_key, context, evaluation_result, ttl)
             
             logger.debug(f"Condition evaluated: {condition_config.condition_expression} = {result}")
             return evaluation_result
@@ -631,151 +1193,78 @@ class ConditionEvaluator:
                 execution_time_ms=execution_time
             )
     
-    async def _evaluate_parsed_expression(self, parsed: Dict[str, Any], context: ConditionContext) -> Any:
-        """Evaluate parsed expression recursively"""
-        
-        expr_type = parsed.get("type")
-        
-        if expr_type == "literal":
-            return parsed["value"]
+    def _get_cache_key(self, compiled: CompiledCondition, context: ConditionContext) -> str:
+        """
+        Generate cache key for condition evaluation
         
-        elif expr_type == "variable":
-            variable_name = parsed["name"]
-            return context.get_variable(variable_name)
+        Only the variables the expression reads are part of the key, and the
+        key is a content hash (stable across processes, unlike ``hash()``),
+        so workers sharing a Redis tier agree on it.
+        """
         
-        elif expr_type == "function":
-            return await self._evaluate_function(parsed, context)
-        
-        elif expr_type == "comparison":
-            return await self._evaluate_comparison(parsed, context)
-        
-        elif expr_type == "logical":
-            return await self._evaluate_logical(parsed, context)
-        
-        else:
-            raise ValueError(f"Unknown expression type: {expr_type}")
-    
-    async def _evaluate_function(self, func_expr: Dict[str, Any], context: ConditionContext) -> Any:
-        """Evaluate function call"""
-        
-        func_name = func_expr["function"]
-        args_exprs = func_expr["args"]
-        
-        # Find function implementation
-        func_impl = None
-        if func_name in self.parser.functions:
-            func_impl = self.parser.functions[func_name]
-        elif func_name in self.custom_functions:
-            func_impl = self.custom_functions[func_name]
-        
-        if not func_impl:
-            raise ValueError(f"Unknown function: {func_name}")
-        
-        # Evaluate arguments
-        evaluated_args = []
-        for arg_expr in args_exprs:
-            arg_value = await self._evaluate_parsed_expression(arg_expr, context)
-            evaluated_args.append(arg_value)
-        
-        # Execute function
-        return await func_impl.execute(evaluated_args, context)
-    
-    async def _evaluate_comparison(self, comp_expr: Dict[str, Any], context: ConditionContext) -> bool:
-        """Evaluate comparison expression"""
-        
-        operator_symbol = comp_expr["operator"]
-        left_expr = comp_expr["left"]
-        right_expr = comp_expr["right"]
-        
-        # Get operator implementation
-        operator = self.parser.operators.get(operator_symbol)
-        if not operator:
-            raise ValueError(f"Unknown operator: {operator_symbol}")
-        
-        # Evaluate operands
-        left_value = await self._evaluate_parsed_expression(left_expr, context)
-        right_value = await self._evaluate_parsed_expression(right_expr, context)
-        
-        # Perform comparison
-        return operator.evaluate(left_value, right_value, context)
-    
-    async def _evaluate_logical(self, logical_expr: Dict[str, Any], context: ConditionContext) -> bool:
-        """Evaluate logical expression"""
-        
-        operator = logical_expr["operator"]
-        left_expr = logical_expr["left"]
-        right_expr = logical_expr["right"]
-        
-        # Evaluate left operand
-        left_value = await self._evaluate_parsed_expression(left_expr, context)
-        
-        if operator == "AND":
-            # Short-circuit evaluation for AND
-            if not left_value:
-                return False
-            right_value = await self._evaluate_parsed_expression(right_expr, context)
-            return bool(left_value) and bool(right_value)
-        
-        elif operator == "OR":
-            # Short-circuit evaluation for OR
-            if left_value:
-                return True
-            right_value = await self._evaluate_parsed_expression(right_expr, context)
-            return bool(left_value) or bool(right_value)
-        
-        else:
-            raise ValueError(f"Unknown logical operator: {operator}")
-    
-    def _extract_variables_used(self, parsed: Dict[str, Any]) -> List[str]:
-        """Extract list of variables used in expression"""
-        
-        variables = set()
-        
-        def extract_recursive(expr):
-            if isinstance(expr, dict):
-                if expr.get("type") == "variable":
-                    variables.add(expr["name"])
-                else:
-                    for value in expr.values():
-                        if isinstance(value, (dict, list)):
-                            extract_recursive(value)
-            elif isinstance(expr, list):
-                for item in expr:
-                    extract_recursive(item)
-        
-        extract_recursive(parsed)
-        return list(variables)
-    
-    def _get_cache_key(self, condition_config: ConditionalConfig, context: ConditionContext) -> str:
-        """Generate cache key for condition evaluation"""
-        
-        # Include relevant context in cache key
+        execution_context = context.execution_context
         context_data = {
-            "expression": condition_config.condition_expression,
-            "user_id": context.execution_context.user_id,
-            "program_id": context.execution_context.program_id,
-            "completed_steps": len(context.execution_context.completed_steps),
-            "variables_hash": hash(str(sorted(context.execution_context.variables.items())))
+            "expression": compiled.expression,
+            "user_id": execution_context.user_id,
+            "program_id": execution_context.program_id,
+            "completed_steps": len(execution_context.completed_steps),
+            "variables": {name: context.get_variable(name) for name in compiled.variables_used}
         }
+        if "GET_STEP_RESULT" in compiled.functions_used:
+            context_data["step_results"] = context.step_results
         
-        return f"condition_{hash(str(context_data))}"
+        encoded = json.dumps(context_data, sort_keys=True, default=str).encode()
+        return f"condition:{hashlib.blake2b(encoded, digest_size=16).hexdigest()}"
     
-    def _is_cache_valid(self, cached_result: ConditionEvaluationResult, condition_config: ConditionalConfig) -> bool:
-        """Check if cached result is still valid"""
-        
-        cache_age = (datetime.utcnow() - cached_result.evaluated_at).total_seconds()
-        return cache_age < condition_config.cache_duration_seconds
+    def _uses_shared_cache(self, compiled: CompiledCondition) -> bool:
+        # Pure conditions evaluate in microseconds, faster than a Redis round trip
+        return self.redis_client is not None and compiled.is_async
     
-    def _cache_result(self, cache_key: str, result: ConditionEvaluationResult):
-        """Cache evaluation result"""
+    async def _get_shared_result(
+        self, 
+        cache_key: str, 
+        context: ConditionContext
+    ) -> Optional[ConditionEvaluationResult]:
+        """Look up a result another worker cached, promoting it to the local tier"""
         
-        # Implement LRU cache with size limit
-        if len(self.cache) >= self.cache_max_size:
-            # Remove oldest entry
-            oldest_key = min(self.cache.keys(), key=lambda k: self.cache[k].evaluated_at)
-            del self.cache[oldest_key]
+        data = await self.redis_client.get(context.execution_context.creator_id, cache_key)
+        if not isinstance(data, dict):
+            return None
+        ttl = data.get("expires_at", 0) - time.time()
+        if ttl <= 0:
+            return None
         
-        self.cache[cache_key] = result
+        result = ConditionEvaluationResult(
+            result=bool(data.get("result")),
+            explanation=data.get("explanation", ""),
+            variables_used=data.get("variables_used"),
+            functions_used=data.get("functions_used"),
+            cached=True
+        )
+        self.cache.put(cache_key, result, ttl)
+        return result
+    
+    async def _put_shared_result(
+        self, 
+        cache_key: str, 
+        context: ConditionContext, 
+        result: ConditionEvaluationResult, 
+        ttl: int
+    ):
+        """Publish a result to the shared tier (best effort)"""
+        
+        await self.redis_client.set(
+            context.execution_context.creator_id,
+            cache_key,
+            {
+                "result": result.result,
+                "explanation": result.explanation,
+                "variables_used": result.variables_used,
+                "functions_used": result.functions_used,
+                "expires_at": time.time() + ttl
+            },
+            ttl=ttl
+        )
     
     async def validate_condition_expression(self, expression: str) -> Dict[str, Any]:
         """Validate condition expression syntax"""
@@ -789,12 +1278,12 @@ class ConditionEvaluator:
         }
         
         try:
-            # Parse expression
-            parsed = self.parser.parse_expression(expression)
+            # Compile expression
+            compiled = self.compile(expression)
             
             # Extract variables and functions
-            validation_result["variables_used"] = self._extract_variables_used(parsed)
-            validation_result["functions_used"] = self._extract_functions_used(parsed)
+            validation_result["variables_used"] = compiled.variables_used
+            validation_result["functions_used"] = compiled.functions_used
             
             # Check for unknown functions
             for func_name in validation_result["functions_used"]:
@@ -811,26 +1300,6 @@ class ConditionEvaluator:
         
         return validation_result
     
-    def _extract_functions_used(self, parsed: Dict[str, Any]) -> List[str]:
-        """Extract list of functions used in expression"""
-        
-        functions = set()
-        
-        def extract_recursive(expr):
-            if isinstance(expr, dict):
-                if expr.get("type") == "function":
-                    functions.add(expr["function"])
-                else:
-                    for value in expr.values():
-                        if isinstance(value, (dict, list)):
-                            extract_recursive(value)
-            elif isinstance(expr, list):
-                for item in expr:
-                    extract_recursive(item)
-        
-        extract_recursive(parsed)
-        return list(functions)
-    
     async def test_program_conditions(
         self, 
         creator_id: str, 
@@ -873,8 +1342,8 @@ class ConditionEvaluator:
                 description = expr_data.get("description", "Test condition")
                 
                 try:
-                    # Parse and validate expression
-                    parsed = self.parser.parse_expression(expression)
+                    # Compile and validate expression
+                    self.compile(expression)
                     
                     # Create condition config
                     from .step_models import ConditionalConfig
@@ -988,7 +1457,17 @@ def get_condition_evaluator() -> ConditionEvaluator:
     """Get global condition evaluator instance"""
     global _condition_evaluator
     if _condition_evaluator is None:
-        _condition_evaluator = ConditionEvaluator()
+        from shared.config.env_constants import (
+            CONDITION_RESULT_CACHE_SIZE, CONDITION_RESULT_CACHE_SHARED, get_env_value
+        )
+        redis_client = None
+        if (get_env_value(CONDITION_RESULT_CACHE_SHARED) or "false").lower() == "true":
+            from shared.cache.redis_client import get_redis_client
+            redis_client = get_redis_client()
+        _condition_evaluator = ConditionEvaluator(
+            cache_max_size=int(get_env_value(CONDITION_RESULT_CACHE_SIZE, default="1000")),
+            redis_client=redis_client
+        )
     return _condition_evaluator
 
 
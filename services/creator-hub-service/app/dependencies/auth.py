@@ -10,10 +10,10 @@ from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, text
-from jose import JWTError, jwt
+from jose import JWTError
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 
-from shared.config.env_constants import get_env_value, JWT_SECRET_KEY, JWT_ALGORITHM
+from shared.security.jwks import get_jwks_verifier
 from shared.models.database import Creator
 from ..database import get_db, set_tenant_context
 
@@ -38,20 +38,9 @@ async def get_current_creator_id(
     try:
         token = credentials.credentials
         
-        # Get JWT configuration
-        secret_key = get_env_value(JWT_SECRET_KEY, fallback=True)
-        algorithm = get_env_value(JWT_ALGORITHM, fallback=True)
-        
-        if not secret_key:
-            logger.error("JWT_SECRET_KEY not configured")
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Authentication configuration error"
-            )
-        
-        # Decode JWT token
+        # Verify against the auth service's cached signing keys (no network call)
         try:
-            payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+            payload = await get_jwks_verifier().verify(token)
         except ExpiredSignatureError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -10,8 +10,12 @@ from fastapi import FastAPI, HTTPException, status
 from fastapi.middleware.cors import CORSMiddleware
 
 from shared.config.settings import validate_service_environment
+from shared.security.jwks import get_jwks_verifier
+from shared.utils.http_client import init_http_client, close_http_client
 # Import centralized environment constants and helpers
-from shared.config.env_constants import CORS_ORIGINS, REQUIRED_VARS_BY_SERVICE, get_env_value
+from shared.config.env_constants import AUTH_SERVICE_URL, CORS_ORIGINS, REQUIRED_VARS_BY_SERVICE, get_env_value
+
+from .ai_client import get_ai_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,11 +37,19 @@ async def lifespan(app: FastAPI):
     # - Redis connection
     # - File storage setup
     # - Service connectivity checks
-    
+
+    # Pooled keep-alive HTTP client for calls to the AI Engine and auth service
+    await init_http_client(upstreams=[get_ai_client().base_url, get_env_value(AUTH_SERVICE_URL, default="")])
+
+    # Token signing keys, refreshed in the background for local verification
+    await get_jwks_verifier().start()
+
     yield
     
     logger.info("🛑 Creator Hub Service shutting down...")
     # Cleanup logic here
+    await get_jwks_verifier().stop()
+    await close_http_client()
 
 
 # Create FastAPI application
@@ -4,12 +4,19 @@ Core modular engine with extensible handler registration system
 """
 
 import asyncio
+import json
 import logging
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Type, Callable, Union
+from typing import Dict, FrozenSet, List, Optional, Any, Set, Tuple, Type, Callable, Union
 from uuid import uuid4
 from abc import ABC, abstractmethod
 
+from pydantic import BaseModel, Field
+
+from shared.cache.leases import LeaseUnavailableError, RedisLease
+
 from .program_models import (
     ProgramDefinition, ExecutionStrategy, ProgramStatus, DebugLevel
 )
@@ -118,6 +125,10 @@ class StepExecutionResult(BaseModel):
     started_at: datetime = Field(..., description="Execution start time")
     completed_at: Optional[datetime] = Field(None, description="Execution completion time")
     execution_time_seconds: float = Field(default=0.0, description="Execution time")
+    queue_wait_seconds: float = Field(
+        default=0.0,
+        description="Time the step was ready but waiting for a parallel execution slot"
+    )
     
     # Results
     success: bool = Field(..., description="Whether execution was successful")
@@ -196,6 +207,20 @@ class TriggerHandler(ABC):
         """Check if trigger conditions are met"""
         pass
     
+    async def should_trigger_batch(
+        self, 
+        trigger_config: TriggerConfig, 
+        contexts: List[ExecutionContext]
+    ) -> List[bool]:
+        """
+        Check trigger conditions for many executions at once (scheduled sweeps)
+        
+        The default checks one context at a time; condition-based handlers
+        should override it with ``ConditionEvaluator.evaluate_batch`` so a
+        sweep evaluates each condition once over a column per variable.
+        """
+        return [await self.should_trigger(trigger_config, context) for context in contexts]
+    
     @abstractmethod
     async def setup_trigger(
         self, 
@@ -347,12 +372,84 @@ class StepDebugSession:
         }
 
 
+# ==================== PROGRAM GRAPH ====================
+
+class ProgramGraph:
+    """
+    Step index and dependency graph for one program version
+    
+    Built once per (program id, version) so schedulers look steps up by ID
+    and find what a step unlocks without scanning the program. Two kinds of
+    edges are kept: ``prerequisites`` are hard dependencies (a step only
+    runs once all of them completed successfully) and ``next_steps`` are
+    activation edges (completing a step makes its next steps eligible).
+    """
+    
+    def __init__(self, program_id: str, version: str, steps: List[ProgramStep]):
+        self.program_id = program_id
+        self.version = version
+        self.steps: Dict[str, ProgramStep] = {
+            step.step_id: step for step in sorted(steps, key=lambda s: s.step_order)
+        }
+        self.prerequisites: Dict[str, FrozenSet[str]] = {
+            step_id: frozenset(step.prerequisites) for step_id, step in self.steps.items()
+        }
+        
+        dependents: Dict[str, List[str]] = {step_id: [] for step_id in self.steps}
+        for step_id, prerequisites in self.prerequisites.items():
+            for prerequisite in prerequisites:
+                if prerequisite in dependents:
+                    dependents[prerequisite].append(step_id)
+        self.dependents = dependents
+        self.successors: Dict[str, List[str]] = {
+            step_id: list(dict.fromkeys(step.next_steps + dependents[step_id]))
+            for step_id, step in self.steps.items()
+        }
+        
+        self.blocked_steps = self._find_blocked_steps()
+        if self.blocked_steps:
+            logger.warning(
+                f"Program {program_id} v{version} has steps that can never run "
+                f"(missing or cyclic prerequisites): {sorted(self.blocked_steps)}"
+            )
+    
+    def _find_blocked_steps(self) -> Set[str]:
+        """Steps whose prerequisites are missing or form a cycle (Kahn's algorithm)"""
+        remaining = {
+            step_id: len(prerequisites) for step_id, prerequisites in self.prerequisites.items()
+        }
+        ready = [
+            step_id for step_id, prerequisites in self.prerequisites.items() if not prerequisites
+        ]
+        while ready:
+            step_id = ready.pop()
+            for dependent in self.dependents[step_id]:
+                remaining[dependent] -= 1
+                if remaining[dependent] == 0:
+                    ready.append(dependent)
+        return {step_id for step_id, count in remaining.items() if count > 0}
+    
+    def next_step_ids(self, step_id: str, result: StepExecutionResult) -> List[str]:
+        """
+        Steps unlocked by a successful step
+        
+        A handler's ``next_step_recommendations`` replace the static
+        ``next_steps`` (so conditional branches are honoured); steps that
+        list the finished step as a prerequisite are always included.
+        """
+        if result.next_step_recommendations:
+            return list(dict.fromkeys(
+                result.next_step_recommendations + self.dependents.get(step_id, [])
+            ))
+        return self.successors.get(step_id, [])
+
+
 # ==================== CORE PROGRAM ENGINE ====================
 
 class ProgramEngine:
     """Core modular program execution engine"""
     
-    def __init__(self):
+    def __init__(self, checkpoint_store=None):
         # Handler registries - Modular and extensible
         self.step_handlers: Dict[StepType, StepHandler] = {}
         self.trigger_handlers: Dict[TriggerType, TriggerHandler] = {}
@@ -367,6 +464,16 @@ class ProgramEngine:
             'error_handler': []
         }
         
+        # Step index and dependency graph per (program id, version)
+        self.program_graphs: "OrderedDict[Tuple[str, str], ProgramGraph]" = OrderedDict()
+        self.program_graphs_max_size = 256
+        self.program_graph_loaded_at: Dict[Tuple[str, str], float] = {}
+        self.program_graph_ttl = 300.0
+        
+        # Per-step checkpoints for resumable executions (None disables them)
+        self.checkpoint_store = checkpoint_store
+        self.resume_lease_ttl_ms = 60000
+        
         # Performance monitoring
         self.execution_metrics: Dict[str, float] = {}
         
@@ -396,14 +503,147 @@ class ProgramEngine:
         self.execution_hooks[hook_name].append(callback)
         logger.info(f"Registered execution hook: {hook_name}")
     
+    # ==================== PROGRAM GRAPHS ====================
+    
+    def register_program_steps(
+        self, 
+        program: ProgramDefinition, 
+        steps: List[ProgramStep]
+    ) -> ProgramGraph:
+        """Build and cache the step graph for a program version"""
+        graph = ProgramGraph(program.id, program.version, steps)
+        key = (program.id, program.version)
+        self.program_graphs[key] = graph
+        self.program_graph_loaded_at[key] = time.monotonic()
+        self.program_graphs.move_to_end(key)
+        if len(self.program_graphs) > self.program_graphs_max_size:
+            evicted, _ = self.program_graphs.popitem(last=False)
+            self.program_graph_loaded_at.pop(evicted, None)
+        return graph
+    
+    def invalidate_program_graph(self, program_id: str):
+        """Drop cached graphs of every version of a program after its steps changed"""
+        for key in [key for key in self.program_graphs if key[0] == program_id]:
+            del self.program_graphs[key]
+            self.program_graph_loaded_at.pop(key, None)
+    
+    async def _get_program_graph(self, program: ProgramDefinition) -> ProgramGraph:
+        """
+        Get the step graph for a program version, loading its steps when not cached
+        
+        Cached graphs are dropped when this engine saves a step and expire
+        after ``program_graph_ttl`` seconds, which bounds how long a graph
+        can lag behind edits saved by another worker. A program without
+        steps is not cached, so its steps are picked up once they are added.
+        """
+        key = (program.id, program.version)
+        graph = self.program_graphs.get(key)
+        if graph is not None:
+            if time.monotonic() - self.program_graph_loaded_at[key] < self.program_graph_ttl:
+                self.program_graphs.move_to_end(key)
+                return graph
+            self.invalidate_program_graph(program.id)
+        
+        steps = await self.get_program_steps(program.creator_id, program.id)
+        if not steps:
+            logger.warning(f"Program {program.id} v{program.version} has no steps")
+            return ProgramGraph(program.id, program.version, [])
+        return self.register_program_steps(program, steps)
+    
     # ==================== CORE EXECUTION ====================
     
-    async def execute_program(
+    async def run_program(
         self, 
         program: ProgramDefinition, 
         context: ExecutionContext
     ) -> ProgramExecutionResult:
         """Main program execution with comprehensive debugging"""
+        return await self._run_program(program, context)
+    
+    async def resume_program(
+        self, 
+        program: ProgramDefinition, 
+        creator_id: str, 
+        execution_id: str
+    ) -> Optional[ProgramExecutionResult]:
+        """
+        Resume an interrupted execution from its last checkpoint
+        
+        Steps that completed before the interruption are not run again:
+        their checkpointed results (including AI-enhanced output) are
+        replayed, so the flow reaches the point of interruption without
+        calling any handler. Failed and unstarted steps run normally.
+        
+        Args:
+            program: Program being executed
+            creator_id: Creator who owns the program
+            execution_id: Execution to resume
+            
+        Returns:
+            Execution result, or None when there is no checkpoint to resume
+            (checkpoints disabled, execution finished or checkpoint expired)
+            
+        Raises:
+            ValueError: If the checkpoint belongs to another program or program version
+            LeaseUnavailableError: If another worker is already resuming the execution
+        """
+        if self.checkpoint_store is None:
+            return None
+        
+        # One resume per execution at a time, so no step runs twice concurrently
+        lease = RedisLease(
+            self.checkpoint_store.redis,
+            creator_id,
+            f"execution:resume:{execution_id}",
+            ttl_ms=self.resume_lease_ttl_ms
+        )
+        if not await lease.acquire():
+            raise LeaseUnavailableError(f"Execution {execution_id} is already being resumed")
+        renewal = asyncio.create_task(self._renew_lease(lease))
+        
+        try:
+            checkpoint = await self.checkpoint_store.load(creator_id, execution_id)
+            if checkpoint is None:
+                return None
+            
+            meta = checkpoint.meta
+            if meta.get("program_id") != program.id or meta.get("program_version") != program.version:
+                raise ValueError(
+                    f"Checkpoint {execution_id} was written for program {meta.get('program_id')} "
+                    f"v{meta.get('program_version')}, not {program.id} v{program.version}"
+                )
+            
+            context = ExecutionContext(**meta["context"], **checkpoint.state)
+            logger.info(
+                f"Resuming execution {execution_id} of program {program.id} "
+                f"with {len(checkpoint.steps)} checkpointed steps"
+            )
+            return await self._run_program(program, context, checkpoint)
+        finally:
+            renewal.cancel()
+            await lease.release()
+    
+    async def _renew_lease(self, lease: RedisLease):
+        """Keep a lease alive while its holder runs, stopping once it is lost"""
+        while True:
+            await asyncio.sleep(lease.ttl_ms / 3000)
+            try:
+                renewed = await lease.renew()
+            except Exception as e:
+                # Retried on the next tick, well before the lease expires
+                logger.warning(f"Failed to renew lease {lease.name}: {e}")
+                continue
+            if not renewed:
+                logger.warning(f"Lost lease {lease.name} while it was in use")
+                return
+    
+    async def _run_program(
+        self, 
+        program: ProgramDefinition, 
+        context: ExecutionContext,
+        checkpoint=None
+    ) -> ProgramExecutionResult:
+        """Run a program, replaying steps from ``checkpoint`` when resuming"""
         
         debug_session = DebugSession(
             program.id, 
@@ -426,6 +666,7 @@ class ProgramEngine:
             
             # Initialize execution state
             execution_state = await self._initialize_execution_state(program, context)
+            await self._start_checkpoint(program, context, execution_state, checkpoint)
             debug_session.log_milestone("execution_state_initialized", execution_state)
             
             # Execute program steps based on strategy
@@ -446,6 +687,10 @@ class ProgramEngine:
             # Execute post-execution hooks
             await self._execute_hooks('post_execution', program, context, debug_session)
             
+            # Nothing left to resume (failed steps can still be retried via resume_program)
+            if self.checkpoint_store is not None and not context.failed_steps:
+                await self.checkpoint_store.delete(context.creator_id, context.execution_id)
+            
             # Create final result
             execution_time = (datetime.utcnow() - start_time).total_seconds()
             
@@ -542,8 +787,8 @@ class ProgramEngine:
             for step_id in current_steps:
                 step = await self._get_step_by_id(step_id, program)
                 if step:
-                    step_result = await self._execute_single_step(
-                        step, context, debug_session
+                    step_result = await self._run_step(
+                        step, context, execution_state, debug_session
                     )
                     batch_results.append(step_result)
                     
@@ -574,65 +819,119 @@ class ProgramEngine:
         execution_state: Dict[str, Any],
         debug_session: DebugSession
     ) -> List[StepExecutionResult]:
-        """Execute steps with limited parallelism"""
+        """
+        Execute the program's step graph with limited parallelism
+        
+        Scheduling is work-conserving: a step starts as soon as it has been
+        unlocked and all of its prerequisites completed, rather than waiting
+        for the slowest step of a fixed batch. At most
+        ``parallel_execution_limit`` steps run at once; ready steps queue on
+        a semaphore in the order they became ready. Steps whose
+        prerequisites failed are skipped.
+        """
+        
+        graph = await self._get_program_graph(program)
+        semaphore = asyncio.Semaphore(program.execution_config.parallel_execution_limit)
         
         results = []
-        current_steps = program.entry_step_ids.copy()
-        parallel_limit = program.execution_config.parallel_execution_limit
+        completed = set(context.completed_steps)
+        failed = set(context.failed_steps)
+        started: Set[str] = set(completed | failed)
+        # Unlocked steps not yet started, in the order they were unlocked
+        waiting: Dict[str, None] = dict.fromkeys(
+            step_id for step_id in program.entry_step_ids if step_id not in started
+        )
+        running: Dict[asyncio.Task, str] = {}
         
-        while current_steps:
-            # Process steps in parallel batches
-            batch_size = min(len(current_steps), parallel_limit)
-            step_batch = current_steps[:batch_size]
-            current_steps = current_steps[batch_size:]
-            
-            # Execute batch in parallel
-            batch_tasks = []
-            for step_id in step_batch:
-                step = await self._get_step_by_id(step_id, program)
-                if step:
-                    task = asyncio.create_task(
-                        self._execute_single_step(step, context, debug_session)
-                    )
-                    batch_tasks.append(task)
-            
-            # Wait for batch completion
-            batch_results = await asyncio.gather(*batch_tasks, return_exceptions=True)
-            
-            # Process results and handle exceptions
-            processed_results = []
-            for i, result in enumerate(batch_results):
-                if isinstance(result, Exception):
-                    # Create error result
-                    step_id = step_batch[i]
-                    error_result = StepExecutionResult(
-                        step_id=step_id,
-                        execution_id=context.execution_id,
-                        status="failed",
-                        started_at=datetime.utcnow(),
-                        success=False,
-                        error_message=str(result)
-                    )
-                    processed_results.append(error_result)
-                else:
-                    processed_results.append(result)
-            
-            results.extend(processed_results)
-            
-            # Update context
-            for result in processed_results:
-                if result.success:
-                    context.completed_steps.append(result.step_id)
-                else:
-                    context.failed_steps.append(result.step_id)
-            
-            debug_session.log_milestone("parallel_batch_completed", {
-                "batch_size": len(processed_results),
-                "successful": sum(1 for r in processed_results if r.success)
-            })
+        try:
+            while True:
+                for step_id in list(waiting):
+                    prerequisites = graph.prerequisites.get(step_id, frozenset())
+                    if prerequisites & failed:
+                        del waiting[step_id]
+                        started.add(step_id)
+                        debug_session.log_milestone("step_skipped", {
+                            "step_id": step_id,
+                            "failed_prerequisites": sorted(prerequisites & failed)
+                        })
+                    elif prerequisites <= completed:
+                        del waiting[step_id]
+                        started.add(step_id)
+                        step = graph.steps.get(step_id)
+                        if step is None:
+                            logger.warning(f"Step {step_id} not found in program {program.id}")
+                            continue
+                        task = asyncio.create_task(self._execute_scheduled_step(
+                            step, context, execution_state, debug_session, semaphore
+                        ))
+                        running[task] = step_id
+                
+                if not running:
+                    break
+                
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    step_id = running.pop(task)
+                    result = task.result()
+                    results.append(result)
+                    
+                    if result.success:
+                        completed.add(step_id)
+                        context.completed_steps.append(step_id)
+                        for next_step_id in graph.next_step_ids(step_id, result):
+                            if next_step_id not in started:
+                                waiting.setdefault(next_step_id)
+                    else:
+                        failed.add(step_id)
+                        context.failed_steps.append(step_id)
+        finally:
+            for task in running:
+                task.cancel()
+        
+        debug_session.log_milestone("parallel_graph_completed", {
+            "steps_executed": len(results),
+            "successful": sum(1 for r in results if r.success),
+            "blocked_steps": list(waiting),
+            "total_queue_wait_seconds": sum(r.queue_wait_seconds for r in results)
+        })
         
         return results
     
+    async def _execute_scheduled_step(
+        self, 
+        step: ProgramStep, 
+        context: ExecutionContext,
+        execution_state: Dict[str, Any],
+        debug_session: DebugSession,
+        semaphore: asyncio.Semaphore
+    ) -> StepExecutionResult:
+        """Run a ready step once a parallel slot is free, recording queue wait and run time"""
+        
+        ready_at = time.perf_counter()
+        async with semaphore:
+            queue_wait = time.perf_counter() - ready_at
+            context.active_steps.append(step.step_id)
+            try:
+                result = await self._run_step(step, context, execution_state, debug_session)
+            except Exception as e:
+                result = StepExecutionResult(
+                    step_id=step.step_id,
+                    execution_id=context.execution_id,
+                    status="failed",
+                    started_at=datetime.utcnow(),
+                    success=False,
+                    error_message=str(e)
+                )
+            finally:
+                context.active_steps.remove(step.step_id)
+        
+        result.queue_wait_seconds = queue_wait
+        debug_session.record_metric(f"step_queue_wait_seconds:{step.step_id}", queue_wait)
+        debug_session.record_metric(
+            f"step_run_time_seconds:{step.step_id}", result.execution_time_seconds
+        )
+        return result
+    
     async def _execute_conditional_flow(
         self, 
         program: ProgramDefinition, 
@@ -683,10 +982,113 @@ class ProgramEngine:
             "conditional_results": {}
         }
     
+    # ==================== CHECKPOINTS ====================
+    
+    @staticmethod
+    def _checkpoint_state(context: ExecutionContext) -> Dict[str, Any]:
+        """Context fields that steps may change while the program runs"""
+        return {"variables": context.variables, "metrics": context.metrics}
+    
+    @staticmethod
+    def _state_digest(state: Dict[str, Any]) -> int:
+        return hash(json.dumps(state, sort_keys=True, default=str))
+    
+    async def _start_checkpoint(
+        self, 
+        program: ProgramDefinition, 
+        context: ExecutionContext,
+        execution_state: Dict[str, Any],
+        checkpoint=None
+    ):
+        """Load checkpointed step results when resuming, otherwise write the execution header"""
+        
+        execution_state["checkpointed_results"] = {}
+        execution_state["checkpoint_lock"] = asyncio.Lock()
+        execution_state["checkpoint_state_digest"] = None
+        
+        if checkpoint is not None:
+            execution_state["checkpointed_results"] = {
+                step_id: StepExecutionResult(**record)
+                for step_id, record in checkpoint.steps.items()
+            }
+            execution_state["checkpoint_state_digest"] = self._state_digest(checkpoint.state)
+            return
+        
+        if self.checkpoint_store is None:
+            return
+        
+        state = self._checkpoint_state(context)
+        execution_state["checkpoint_state_digest"] = self._state_digest(state)
+        await self.checkpoint_store.begin(
+            context.creator_id,
+            context.execution_id,
+            meta={
+                "program_id": program.id,
+                "program_version": program.version,
+                "context": context.model_dump(mode="json", exclude={
+                    "variables", "metrics", "completed_steps", "active_steps", "failed_steps"
+                })
+            },
+            state=state
+        )
+    
+    async def _run_step(
+        self, 
+        step: ProgramStep, 
+        context: ExecutionContext,
+        execution_state: Dict[str, Any],
+        debug_session: DebugSession
+    ) -> StepExecutionResult:
+        """Execute a step, or replay its result when it completed before a resume"""
+        
+        checkpointed = execution_state.get("checkpointed_results", {}).pop(step.step_id, None)
+        if checkpointed is not None:
+            debug_session.log_milestone("step_restored_from_checkpoint", step.step_id)
+            return checkpointed
+        
+        result = await self._execute_single_step(step, context, debug_session)
+        if result.success and self.checkpoint_store is not None:
+            await self._checkpoint_step(context, execution_state, result, debug_session)
+        return result
+    
+    async def _checkpoint_step(
+        self, 
+        context: ExecutionContext,
+        execution_state: Dict[str, Any],
+        result: StepExecutionResult,
+        debug_session: DebugSession
+    ):
+        """Persist a completed step, plus the context state if a step changed it"""
+        
+        # Serialized per execution so a slower write never overwrites newer state
+        async with execution_state["checkpoint_lock"]:
+            started = time.perf_counter()
+            state = self._checkpoint_state(context)
+            digest = self._state_digest(state)
+            if digest == execution_state["checkpoint_state_digest"]:
+                state = None
+            else:
+                execution_state["checkpoint_state_digest"] = digest
+            
+            written = await self.checkpoint_store.save_step(
+                context.creator_id,
+                context.execution_id,
+                result.step_id,
+                result.model_dump(mode="json", exclude_defaults=True),
+                state=state
+            )
+            elapsed = time.perf_counter() - started
+        
+        metrics = self.execution_metrics
+        metrics["checkpoint_writes"] = metrics.get("checkpoint_writes", 0) + 1
+        metrics["checkpoint_write_seconds"] = metrics.get("checkpoint_write_seconds", 0.0) + elapsed
+        debug_session.record_metric(f"step_checkpoint_seconds:{result.step_id}", elapsed)
+        debug_session.record_metric(f"step_checkpoint_bytes:{result.step_id}", written)
+    
     async def _get_step_by_id(self, step_id: str, program: ProgramDefinition) -> Optional[ProgramStep]:
-        """Get step by ID - This would typically query the database"""
-        # This is a placeholder - in real implementation would query database
-        return None
+        """Get step by ID from the program's step index"""
+        graph = await self._get_program_graph(program)
+        return graph.steps.get(step_id)
     
     async def _execute_single_step(
         self, 
@@ -747,10 +1149,9 @@ class ProgramEngine:
             if result.success and result.next_step_recommendations:
                 next_steps.extend(result.next_step_recommendations)
         
-        # Remove duplicates and already completed steps
-        next_steps = list(set(next_steps) - set(context.completed_steps))
-        
-        return next_steps
+        # Remove duplicates and steps that already ran; a failed step is not retried
+        finished = set(context.completed_steps) | set(context.failed_steps)
+        return [step_id for step_id in dict.fromkeys(next_steps) if step_id not in finished]
     
     async def _calculate_execution_metrics(
         self, 
@@ -846,6 +1247,7 @@ class ProgramEngine:
         """Update a program"""
         # This would normally update database
         # For now, return None
+        self.invalidate_program_graph(program_id)
         logger.info(f"Updated program {program_id} for creator {creator_id}")
         return None
     
@@ -858,6 +1260,7 @@ class ProgramEngine:
         """Delete a program"""
         # This would normally delete from database
         # For now, return True
+        self.invalidate_program_graph(program_id)
         logger.info(f"Deleted program {program_id} for creator {creator_id}")
         return True
     
@@ -871,6 +1274,7 @@ class ProgramEngine:
         """Add a step to a program"""
         # This would normally add to database
         # For now, return the step as-is
+        self.invalidate_program_graph(program_id)
         logger.info(f"Added step {step.step_id} to program {program_id}")
         return step
     
@@ -910,6 +1314,7 @@ class ProgramEngine:
         """Update a step"""
         # This would normally update database
         # For now, return None
+        self.invalidate_program_graph(program_id)
         logger.info(f"Updated step {step_id} in program {program_id}")
         return None
     
@@ -923,6 +1328,7 @@ class ProgramEngine:
         """Delete a step"""
         # This would normally delete from database
         # For now, return True
+        self.invalidate_program_graph(program_id)
         logger.info(f"Deleted step {step_id} from program {program_id}")
         return True
     
@@ -933,34 +1339,43 @@ class ProgramEngine:
         user_context: str,
         simulation_mode: bool = False,
         debug_session = None,
-        session = None
-    ) -> "ProgramExecutionResult":
-        """Execute a program for a user"""
-        # This would normally execute the full program
-        # For now, return a mock result
-        from .program_models import ProgramExecutionResult, ExecutionStatus
+        session = None,
+        program: Optional[ProgramDefinition] = None
+    ) -> ProgramExecutionResult:
+        """
+        Execute a program for a user
+        
+        Runs through run_program, so each completed step is checkpointed and
+        an interrupted execution can be picked up with resume_program.
         
-        execution_id = str(uuid4())
+        Args:
+            creator_id: Creator who owns the program
+            program_id: Program to execute
+            user_context: User the program is executed for
+            simulation_mode: Marks the run as a simulation in its variables
+            debug_session: Unused; run_program keeps its own debug session
+            session: Database session
+            program: The program, when the caller already loaded it
+            
+        Returns:
+            Execution result
+            
+        Raises:
+            ValueError: If the program does not exist
+        """
+        if program is None:
+            program = await self.get_program(creator_id, program_id, session=session)
+        if program is None:
+            raise ValueError(f"Program {program_id} not found")
         
-        result = ProgramExecutionResult(
-            execution_id=execution_id,
+        context = ExecutionContext(
             program_id=program_id,
+            user_id=user_context,
             creator_id=creator_id,
-            user_context=user_context,
-            execution_status=ExecutionStatus.COMPLETED,
-            total_steps=1,
-            steps_completed=1,
-            steps_failed=0,
-            execution_time_seconds=1.0,
-            started_at=datetime.utcnow(),
-            completed_at=datetime.utcnow(),
-            success_rate=1.0,
-            average_step_time=1.0,
-            user_engagement_score=0.8,
-            personality_consistency_score=0.9,
-            content_effectiveness_score=0.85
+            execution_id=str(uuid4()),
+            variables={"simulation_mode": simulation_mode}
         )
-        
+        result = await self.run_program(program, context)
         logger.info(f"Executed program {program_id} for creator {creator_id}")
         return result
     
@@ -1011,11 +1426,15 @@ def get_program_engine() -> ProgramEngine:
     """Get global program engine instance"""
     global _program_engine
     if _program_engine is None:
-        _program_engine = ProgramEngine()
+        from shared.config.env_constants import EXECUTION_CHECKPOINTS_ENABLED, get_env_value
+        checkpoint_store = None
+        if (get_env_value(EXECUTION_CHECKPOINTS_ENABLED) or "false").lower() == "true":
+            from shared.cache.execution_checkpoints import get_execution_checkpoint_store
+            checkpoint_store = get_execution_checkpoint_store()
+        _program_engine = ProgramEngine(checkpoint_store=checkpoint_store)
     return _program_engine
 
 
 # Fix forward references
-from pydantic import BaseModel, Field
 StepExecutionResult.__annotations__['next_step_recommendations'] = List[str]
 ProgramExecutionResult.model_rebuild()
\ No newline at end of file
@@ -13,6 +13,7 @@ from fastapi import APIRouter, Depends, HTTPException, status, Form, Query, Body
 from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from shared.cache.leases import LeaseUnavailableError
 from shared.exceptions.base import NotFoundError, DatabaseError
 
 # Import dependencies from our app layer
@@ -21,8 +22,7 @@ from ..dependencies.auth import get_current_creator_id
 
 # Import Visual Program Builder models
 from ..program_models import (
-    ProgramDefinition, ProgramStatus, ProgramStep, StepType,
-    ProgramExecutionResult, ExecutionStatus, ExecutionStrategy,
+    ProgramDefinition, ProgramStatus, ProgramStep, StepType, ExecutionStrategy,
     PersonalityConfig, ExecutionConfig, AnalyticsConfig, NotificationConfig
 )
 from ..step_models import (
@@ -31,7 +31,7 @@ from ..step_models import (
 )
 
 # Import engine components
-from ..program_engine import get_program_engine
+from ..program_engine import ProgramExecutionResult, get_program_engine
 from ..step_processor import get_step_processor
 from ..condition_evaluator import get_condition_evaluator
 from ..debug_analytics import get_analytics_system, get_debug_manager
@@ -598,7 +598,8 @@ async def execute_program(
             user_context=user_context,
             simulation_mode=simulation_mode,
             debug_session=debug_session,
-            session=session
+            session=session,
+            program=program
         )
         
         # Collect analytics if enabled
@@ -608,8 +609,8 @@ async def execute_program(
         
         logger.info(
             f"Program execution completed: {program_id}, "
-            f"status={execution_result.execution_status}, "
-            f"steps_completed={execution_result.steps_completed}/{execution_result.total_steps}"
+            f"status={execution_result.status}, "
+            f"steps_completed={execution_result.successful_steps}/{execution_result.total_steps_executed}"
         )
         
         return execution_result
@@ -624,6 +625,65 @@ async def execute_program(
         )
 
 
+@router.post("/{program_id}/executions/{execution_id}/resume")
+async def resume_program_execution(
+    program_id: str,
+    execution_id: str,
+    creator_id: str = Depends(get_current_creator_id),
+    session: AsyncSession = Depends(get_db)
+):
+    """Resume an interrupted execution, skipping steps completed before it stopped"""
+    try:
+        program_engine = get_program_engine()
+        program = await program_engine.get_program(
+            creator_id=creator_id,
+            program_id=program_id,
+            session=session
+        )
+        
+        if not program:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Program not found"
+            )
+        
+        execution_result = await program_engine.resume_program(
+            program=program,
+            creator_id=creator_id,
+            execution_id=execution_id
+        )
+        
+        if execution_result is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No resumable checkpoint for this execution"
+            )
+        
+        logger.info(f"Program execution resumed: {program_id}, execution={execution_id}")
+        
+        return JSONResponse(
+            status_code=status.HTTP_200_OK,
+            content={
+                "message": "Program execution resumed successfully",
+                "execution": execution_result.model_dump(mode="json")
+            }
+        )
+        
+    except HTTPException:
+        raise
+    except (ValueError, LeaseUnavailableError) as e:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=str(e)
+        )
+    except Exception as e:
+        logger.error(f"Failed to resume program execution: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to resume program execution"
+        )
+
+
 @router.get("/{program_id}/executions")
 async def get_execution_history(
     program_id: str,
@@ -4,8 +4,13 @@ Implements scalable metadata filtering strategy for 100,000+ creators
 
 This module uses centralized environment configuration from shared.config.env_constants
 for all ChromaDB-related settings, with fallback to environment-specific defaults.
+
+The storage backend is pluggable (see shared.ai.vector_store): "chromadb" talks to
+the remote ChromaDB server, "local" uses the embedded NumPy store.
 """
 
+import re
+import uuid
 import hashlib
 import logging
 import asyncio
@@ -38,12 +43,40 @@ from shared.config.env_constants import (
     CHROMADB_URL,
     CHROMA_SHARD_COUNT,
     CHROMA_MAX_CONNECTIONS_PER_INSTANCE,
+    VECTOR_STORE_BACKEND,
+    VECTOR_STORE_PATH,
+    HNSW_TARGET_RECALL,
     get_env_value
 )
 from shared.exceptions.base import BaseServiceException
+from shared.cache.leases import RedisLease
+from shared.ai.vector_store import LocalVectorStoreClient
+from shared.ai.hnsw_tuning import (
+    HNSWParams,
+    HNSW_TUNING_KEYS,
+    TIER_METADATA_KEY,
+    select_hnsw_tier,
+    tier_by_name,
+    tune_for_sample,
+)
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_BACKENDS = ("chromadb", "local")
+
+# Base shard collections double as an alias: once rebuilt, their metadata points
+# at the generation collection ("knowledge_shard_3__g2_<suffix>") that holds the
+# data, and at the shadow being built while a rebuild runs
+ACTIVE_COLLECTION_KEY = "active_collection"
+RETIRED_COLLECTION_KEY = "retired_collection"
+SHADOW_COLLECTION_KEY = "shadow_collection"
+_BASE_SHARD_PATTERN = re.compile(r"^knowledge_shard_\d+$")
+_REBUILD_BATCH_SIZE = 1000
+_TUNING_SAMPLE_SIZE = 5000
+# Rebuilds and retirements of a shard are serialized across workers by a Redis lease
+_REBUILD_LEASE_TENANT = "system"
+_REBUILD_LEASE_TTL_MS = 120000
+
 # Log ChromaDB availability after logger is initialized
 if not CHROMADB_AVAILABLE:
     logger.warning("ChromaDB not available - using mock implementation for development")
@@ -122,25 +155,40 @@ class MockCollection:
         
         return result
     
-    def get(self, where=None, include=None):
-        include = include or ["documents", "metadatas", "ids"]
+    def get(self, ids=None, where=None, limit=None, offset=None, include=None):
+        include = include or ["documents", "metadatas"]
         
-        # Filter by where clause if provided
+        # Filter by ids and where clause if provided
         filtered_indices = []
         for i, metadata in enumerate(self._data["metadatas"]):
+            if ids is not None and self._data["ids"][i] not in ids:
+                continue
             if self._matches_where_clause(metadata, where):
                 filtered_indices.append(i)
         
-        result = {}
+        start = offset or 0
+        filtered_indices = filtered_indices[start:start + limit] if limit is not None else filtered_indices[start:]
+        
+        # ChromaDB always returns ids
+        result = {"ids": [self._data["ids"][i] for i in filtered_indices]}
         if "documents" in include:
             result["documents"] = [self._data["documents"][i] for i in filtered_indices]
         if "metadatas" in include:
             result["metadatas"] = [self._data["metadatas"][i] for i in filtered_indices]
-        if "ids" in include:
-            result["ids"] = [self._data["ids"][i] for i in filtered_indices]
+        if "embeddings" in include:
+            result["embeddings"] = [self._data["embeddings"][i] for i in filtered_indices]
         
         return result
     
+    def count(self):
+        return len(self._data["ids"])
+    
+    def modify(self, name=None, metadata=None):
+        if name is not None:
+            self.name = name
+        if metadata is not None:
+            self.metadata = metadata
+    
     def delete(self, ids):
         # Remove items with matching IDs
         indices_to_remove = []
@@ -253,7 +301,10 @@ class ChromaDBManager:
         chromadb_url: Optional[str] = None,
         shard_count: Optional[int] = None,
         max_connections: Optional[int] = None,
-        health_check_timeout: int = 5
+        health_check_timeout: int = 5,
+        backend: Optional[str] = None,
+        vector_store_path: Optional[str] = None,
+        redis_client=None
     ):
         """
         Initialize ChromaDB manager using centralized configuration
@@ -268,6 +319,9 @@ class ChromaDBManager:
             shard_count: Number of shards for collections (5-50, defaults to centralized config)
             max_connections: Max connections per instance (defaults to centralized config)
             health_check_timeout: Health check timeout in seconds
+            backend: Vector store backend, "chromadb" or "local" (defaults to centralized config)
+            vector_store_path: Storage directory for the local backend (empty = in-memory)
+            redis_client: Redis client holding shard rebuild leases (defaults to the shared client)
         """
         # Try to load AI engine config
         try:
@@ -302,8 +356,24 @@ class ChromaDBManager:
         
         self.health_check_timeout = health_check_timeout or 5
         
-        # Validate required configuration
-        if not self.chromadb_url:
+        self.backend = (
+            backend or
+            (getattr(self.config, "vector_store_backend", None) if self.config else None) or
+            get_env_value(VECTOR_STORE_BACKEND, fallback=True) or
+            "chromadb"
+        )
+        if self.backend not in SUPPORTED_BACKENDS:
+            raise ValueError(f"backend must be one of {SUPPORTED_BACKENDS}, got {self.backend}")
+        
+        self.vector_store_path = (
+            vector_store_path if vector_store_path is not None else
+            (getattr(self.config, "vector_store_path", None) if self.config else None) or
+            get_env_value(VECTOR_STORE_PATH, fallback=True) or
+            None
+        )
+        
+        # Validate required configuration (the local backend needs no server)
+        if not self.chromadb_url and self.backend == "chromadb":
             logger.error(
                 f"ChromaDB URL not configured. "
                 f"Attempted sources: param={chromadb_url}, "
@@ -327,8 +397,13 @@ class ChromaDBManager:
         self._cache_ttl = timedelta(minutes=5)
         self._last_cache_update: Dict[str, datetime] = {}
         
+        # Shard rebuilds are coordinated across workers through Redis leases
+        self._redis_client = redis_client
+        self.hnsw_target_recall = float(get_env_value(HNSW_TARGET_RECALL, fallback=True) or 0.95)
+        
         logger.info(
             f"ChromaDB Manager initialized - "
+            f"backend: {self.backend}, "
             f"url: {self.chromadb_url}, "
             f"shard_count: {self.shard_count}, "
             f"max_connections: {self.max_connections}"
@@ -389,6 +464,13 @@ class ChromaDBManager:
     
     def _get_client(self):
         """Get or create ChromaDB client"""
+        if self._client is None and self.backend == "local":
+            try:
+                self._client = LocalVectorStoreClient(path=self.vector_store_path or None)
+            except Exception as e:
+                logger.error(f"Failed to open local vector store: {str(e)}")
+                raise ChromaDBConnectionError(f"Failed to open local vector store: {str(e)}") from e
+        
         if self._client is None:
             try:
                 # Parse URL more safely
@@ -438,6 +520,17 @@ class ChromaDBManager:
         Raises:
             ChromaDBConnectionError: If health check fails
         """
+        if self.backend == "local":
+            client = self._get_client()
+            return {
+                "status": "healthy",
+                "backend": "local",
+                "path": self.vector_store_path or "in-memory",
+                "collections_count": len(client.list_collections()),
+                "shard_count": self.shard_count,
+                "timestamp": datetime.utcnow().isoformat()
+            }
+        
         try:
             # Test direct HTTP connection to ChromaDB instead of using client
             import aiohttp
@@ -495,18 +588,18 @@ class ChromaDBManager:
                     collection = client.get_collection(name=shard_name)
                     logger.debug(f"Retrieved existing collection: {shard_name}")
                 except Exception:
-                    # Collection doesn't exist, create it
+                    # Collection doesn't exist, create it with the smallest tier's HNSW parameters
                     collection = client.create_collection(
                         name=shard_name,
-                        metadata={
-                            "description": f"Knowledge base shard {shard_name.split('_')[-1]}",
-                            "created_at": datetime.utcnow().isoformat(),
-                            "shard_strategy": "metadata_filtering",
-                            "max_creators_per_shard": self.shard_count * 1000  # Estimated capacity
-                        }
+                        metadata=self._shard_metadata(shard_name, select_hnsw_tier(0).name, select_hnsw_tier(0).params)
                     )
                     logger.info(f"Created new collection: {shard_name}")
                 
+                # Follow the alias to the rebuilt generation, if any
+                active_name = (collection.metadata or {}).get(ACTIVE_COLLECTION_KEY)
+                if active_name and active_name != shard_name:
+                    collection = client.get_collection(name=active_name)
+                
                 # Update cache
                 self._collections_cache[shard_name] = collection
                 self._last_cache_update[shard_name] = datetime.utcnow()
@@ -551,8 +644,6 @@ class ChromaDBManager:
             raise ValueError("embeddings, documents, and metadatas must have same length")
         
         try:
-            collection = await self.get_or_create_collection(creator_id)
-            
             # Generate IDs if not provided
             if ids is None:
                 timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -573,8 +664,10 @@ class ChromaDBManager:
                 }
                 enhanced_metadatas.append(enhanced_metadata)
             
-            # Add to collection
-            collection.add(
+            # Add to the active generation (and a shadow being rebuilt)
+            collection = await self._apply_write(
+                creator_id,
+                "add",
                 embeddings=embeddings,
                 documents=documents,
                 metadatas=enhanced_metadatas,
@@ -675,7 +768,8 @@ class ChromaDBManager:
             ChromaDBCollectionError: If deletion fails
         """
         try:
-            collection = await self.get_or_create_collection(creator_id)
+            targets = await self._write_targets(creator_id)
+            collection = targets[0]
             
             # Query to find all embeddings for this document
             results = collection.get(
@@ -693,7 +787,7 @@ class ChromaDBManager:
                 return 0
             
             # Delete embeddings
-            collection.delete(ids=results["ids"])
+            await self._apply_write(creator_id, "delete", targets=targets, ids=results["ids"])
             
             deleted_count = len(results["ids"])
             logger.info(
@@ -712,6 +806,435 @@ class ChromaDBManager:
             logger.error(error_msg)
             raise ChromaDBCollectionError(error_msg) from e
     
+    async def enable_compression(
+        self,
+        creator_id: str,
+        compression_type: str,
+        rerank_factor: int = 4,
+        shard_wide: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Quantize the creator's shard collection (local backend only)
+        
+        Quantization is a shard-level setting: the codec is trained on, and
+        applied to, every creator stored in the shard. Unless ``shard_wide`` is
+        set, a shard that already holds other creators' records is refused so
+        one creator cannot change search precision for its neighbours.
+        
+        Args:
+            creator_id: Creator identifier (selects the shard)
+            compression_type: "float16", "int8" or "pq" (PQ is trained on the shard)
+            rerank_factor: Candidates per result re-ranked at full precision (1 = off)
+            shard_wide: Quantize the shard even when other creators share it
+            
+        Returns:
+            Memory statistics (resident bytes and index reduction)
+            
+        Raises:
+            ChromaDBCollectionError: If the backend has no quantized storage, the shard
+                is shared and ``shard_wide`` is not set, or quantization fails
+        """
+        collection = await self.get_or_create_collection(creator_id)
+        if not hasattr(collection, "enable_quantization"):
+            raise ChromaDBCollectionError(
+                f"Vector store backend '{self.backend}' does not support quantized storage"
+            )
+        
+        other_creators = [partition for partition in collection.partitions() if partition != str(creator_id)]
+        if other_creators and not shard_wide:
+            raise ChromaDBCollectionError(
+                f"Shard {collection.name} is shared with {len(other_creators)} other creator(s); "
+                f"quantization applies to the whole shard and needs shard_wide=True"
+            )
+        
+        try:
+            stats = collection.enable_quantization(compression_type, rerank_factor=rerank_factor)
+            logger.info(
+                f"Enabled {compression_type} quantization on {collection.name}: "
+                f"{stats['index_reduction']:.1%} smaller index, "
+                f"{stats['resident_bytes']} bytes resident"
+            )
+            return stats
+        except Exception as e:
+            error_msg = f"Failed to enable {compression_type} compression for creator {creator_id}: {str(e)}"
+            logger.error(error_msg)
+            raise ChromaDBCollectionError(error_msg) from e
+    
+    def _shard_metadata(self, shard_name: str, tier: str, params: HNSWParams) -> Dict[str, Any]:
+        """Collection metadata for a shard generation with tuned HNSW parameters"""
+        return {
+            "description": f"Knowledge base shard {shard_name.split('_')[-1]}",
+            "created_at": datetime.utcnow().isoformat(),
+            "shard_strategy": "metadata_filtering",
+            "max_creators_per_shard": self.shard_count * 1000,  # Estimated capacity
+            TIER_METADATA_KEY: tier,
+            **params.to_metadata()
+        }
+    
+    def _resolve_shard(self, client, shard_name: str):
+        """Return (base collection, active collection) for a base shard name"""
+        base = client.get_collection(name=shard_name)
+        active_name = (base.metadata or {}).get(ACTIVE_COLLECTION_KEY)
+        if active_name and active_name != shard_name:
+            return base, client.get_collection(name=active_name)
+        return base, base
+    
+    def _get_redis(self):
+        if self._redis_client is None:
+            from shared.cache.redis_client import get_redis_client
+            self._redis_client = get_redis_client()
+        return self._redis_client
+    
+    def _rebuild_lease(self, shard_name: str) -> RedisLease:
+        return RedisLease(
+            self._get_redis(), _REBUILD_LEASE_TENANT, f"hnsw:rebuild:{shard_name}", ttl_ms=_REBUILD_LEASE_TTL_MS
+        )
+    
+    @staticmethod
+    def _update_alias(base, **changes: Any) -> None:
+        """Rewrite the base collection's alias metadata (None removes a key)"""
+        # Tuning keys belong to the generation that was built with them; the distance metric stays
+        metadata = {key: value for key, value in (base.metadata or {}).items() if key not in HNSW_TUNING_KEYS}
+        for key, value in changes.items():
+            if value is None:
+                metadata.pop(key, None)
+            else:
+                metadata[key] = value
+        base.modify(metadata=metadata)
+    
+    async def _write_targets(self, creator_id: str) -> List[Collection]:
+        """
+        Collections a write has to reach: the active generation, then the shadow of a running rebuild
+        
+        Resolved from the alias on every write rather than from the collection cache, so a
+        rebuild in another worker never misses a write and a swap takes effect at once.
+        """
+        await self.get_or_create_collection(creator_id)  # creates the base shard on first use
+        async with self._connection_pool_semaphore:
+            client = self._get_client()
+            shard_name = self._get_shard_name(creator_id)
+            base, active = self._resolve_shard(client, shard_name)
+            targets = [active]
+            shadow_name = (base.metadata or {}).get(SHADOW_COLLECTION_KEY)
+            if shadow_name and shadow_name != active.name:
+                try:
+                    targets.append(client.get_collection(name=shadow_name))
+                except Exception:
+                    pass  # The rebuild finished or was abandoned in between
+        
+        cached = self._collections_cache.get(shard_name)
+        if cached is not None and cached.name != active.name:
+            self._collections_cache[shard_name] = active
+            self._last_cache_update[shard_name] = datetime.utcnow()
+        return targets
+    
+    async def _apply_write(
+        self,
+        creator_id: str,
+        operation: str,
+        targets: Optional[List[Collection]] = None,
+        **kwargs
+    ) -> Collection:
+        """
+        Apply an add/delete to the shard's active generation and any shadow being rebuilt
+        
+        The alias is checked again afterwards: if a rebuild started or swapped while the
+        write was in flight, the write is repeated on the collections it missed (adds of
+        existing ids and deletes of missing ones are no-ops).
+        
+        Returns:
+            The active collection the write went to
+        """
+        targets = targets or await self._write_targets(creator_id)
+        getattr(targets[0], operation)(**kwargs)
+        written = {targets[0].name}
+        for shadow in targets[1:]:
+            self._write_to_shadow(shadow, operation, **kwargs)
+            written.add(shadow.name)
+        
+        for collection in await self._write_targets(creator_id):
+            if collection.name not in written:
+                self._write_to_shadow(collection, operation, **kwargs)
+        return targets[0]
+    
+    @staticmethod
+    def _write_to_shadow(collection, operation: str, **kwargs) -> None:
+        try:
+            getattr(collection, operation)(**kwargs)
+        except Exception as e:
+            # The pre-swap reconciliation pass catches anything missed here
+            logger.warning(f"Failed to apply {operation} to {collection.name}: {str(e)}")
+    
+    async def rebuild_shard(
+        self,
+        shard_name: str,
+        tier: Optional[str] = None,
+        params: Optional[HNSWParams] = None,
+        tune: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Rebuild a shard into a shadow collection with new HNSW parameters and swap it in
+        
+        Only the worker holding the shard's rebuild lease (Redis) rebuilds it. The shadow
+        ("<shard>__g<n>_<suffix>") is published in the base collection's metadata and filled
+        in batches; every worker's writes resolve that alias, so they reach both the active
+        collection and the shadow. A reconciliation pass then fixes anything that changed
+        mid-copy, and a single metadata write on the base collection switches readers over.
+        The previous generation is kept until other instances' collection caches have
+        expired, then retired by the next maintenance run; a shard is not rebuilt again
+        before that.
+        
+        Args:
+            shard_name: Base shard name (e.g. "knowledge_shard_3")
+            tier: Target tier name (defaults to the tier of the current size)
+            params: Explicit HNSW parameters (skips tuning)
+            tune: Benchmark a sample of the shard to pick parameters (needs hnswlib)
+            
+        Returns:
+            Rebuild report (tier, parameters, copied vector count, new collection name)
+            
+        Raises:
+            ChromaDBCollectionError: If the rebuild fails or another worker is rebuilding the
+                shard (the active collection is left untouched)
+        """
+        if not _BASE_SHARD_PATTERN.match(shard_name):
+            raise ValueError(f"Not a base shard collection: {shard_name}")
+        
+        lease = self._rebuild_lease(shard_name)
+        if not await lease.acquire():
+            raise ChromaDBCollectionError(f"Rebuild of {shard_name} already in progress")
+        try:
+            client = self._get_client()
+            base, _ = self._resolve_shard(client, shard_name)
+            self._retire_previous_generation(client, base)
+            return await self._rebuild_leased(client, shard_name, lease, tier, params, tune)
+        finally:
+            await lease.release()
+    
+    async def _rebuild_leased(
+        self,
+        client,
+        shard_name: str,
+        lease: RedisLease,
+        tier: Optional[str],
+        params: Optional[HNSWParams],
+        tune: bool
+    ) -> Dict[str, Any]:
+        """Body of rebuild_shard; the caller holds the shard's rebuild lease"""
+        shadow_name = None
+        base = None
+        try:
+            base, active = self._resolve_shard(client, shard_name)
+            if (base.metadata or {}).get(RETIRED_COLLECTION_KEY):
+                raise ValueError("the previous generation is still in use by cached readers")
+            
+            # A shadow recorded here belongs to a rebuild whose worker died (we hold the lease)
+            abandoned = (base.metadata or {}).get(SHADOW_COLLECTION_KEY)
+            if abandoned:
+                try:
+                    client.delete_collection(abandoned)
+                except Exception:
+                    pass
+                self._update_alias(base, **{SHADOW_COLLECTION_KEY: None})
+            
+            size = active.count()
+            target_tier = tier_by_name(tier) if tier else select_hnsw_tier(size)
+            if target_tier is None:
+                raise ValueError(f"Unknown HNSW tier: {tier}")
+            
+            benchmark = []
+            if params is None:
+                params = target_tier.params
+                if tune and size:
+                    sample = active.get(limit=_TUNING_SAMPLE_SIZE, include=["embeddings"])
+                    params, benchmark = await asyncio.to_thread(
+                        tune_for_sample,
+                        sample.get("embeddings") or [],
+                        target_tier,
+                        space=(active.metadata or {}).get("hnsw:space", "l2"),
+                        target_recall=self.hnsw_target_recall
+                    )
+            
+            generation = int((active.metadata or {}).get("generation", 0)) + 1
+            # Unique per attempt, so no two rebuilds ever share (and delete) a shadow
+            shadow_name = f"{shard_name}__g{generation}_{uuid.uuid4().hex[:8]}"
+            metadata = self._shard_metadata(shard_name, target_tier.name, params)
+            metadata["generation"] = generation
+            space = (active.metadata or {}).get("hnsw:space")
+            if space:
+                metadata["hnsw:space"] = space
+            shadow = client.create_collection(name=shadow_name, metadata=metadata)
+            
+            # From here on every worker's writes also go to the shadow
+            self._update_alias(base, **{SHADOW_COLLECTION_KEY: shadow_name})
+            
+            copied = await self._copy_collection(active, shadow, lease)
+            copied += await self._reconcile_collections(active, shadow)
+            
+            compression_type = (active.metadata or {}).get("quantization")
+            if compression_type and hasattr(shadow, "enable_quantization"):
+                shadow.enable_quantization(
+                    compression_type,
+                    rerank_factor=int((active.metadata or {}).get("quantization:rerank_factor", 4))
+                )
+            
+            if not await lease.renew():
+                raise RuntimeError("rebuild lease lost before the swap")
+            
+            # Atomic swap: one metadata write on the base collection
+            self._update_alias(base, **{
+                ACTIVE_COLLECTION_KEY: shadow_name,
+                RETIRED_COLLECTION_KEY: active.name,
+                SHADOW_COLLECTION_KEY: None,
+                "swapped_at": datetime.utcnow().isoformat()
+            })
+            self._collections_cache.pop(shard_name, None)
+            self._stats_cache.pop(shard_name, None)
+            
+            logger.info(
+                f"Rebuilt {shard_name} as {shadow_name} ({copied} vectors, tier {target_tier.name}, "
+                f"M={params.M}, construction_ef={params.construction_ef}, search_ef={params.search_ef})"
+            )
+            return {
+                "shard": shard_name,
+                "collection": shadow_name,
+                "tier": target_tier.name,
+                "hnsw_params": params.to_metadata(),
+                "vectors": copied,
+                "benchmark": benchmark
+            }
+            
+        except Exception as e:
+            if shadow_name:
+                try:
+                    if base is not None and (base.metadata or {}).get(SHADOW_COLLECTION_KEY) == shadow_name:
+                        self._update_alias(base, **{SHADOW_COLLECTION_KEY: None})
+                    client.delete_collection(shadow_name)
+                except Exception:
+                    pass
+            error_msg = f"Failed to rebuild shard {shard_name}: {str(e)}"
+            logger.error(error_msg)
+            raise ChromaDBCollectionError(error_msg) from e
+    
+    def _retire_previous_generation(self, client, base) -> Optional[str]:
+        """
+        Drop the generation replaced by the last swap once no cache can still use it
+        
+        Callers hold the shard's rebuild lease. Writes never use cached collections, so
+        once the collection cache TTL has passed since the swap nothing reads or writes
+        the previous generation. A retired base collection only loses its records (it
+        keeps the alias).
+        """
+        metadata = dict(base.metadata or {})
+        retired_name = metadata.get(RETIRED_COLLECTION_KEY)
+        if not retired_name:
+            return None
+        swapped_at = metadata.get("swapped_at")
+        if swapped_at and datetime.utcnow() - datetime.fromisoformat(swapped_at) < self._cache_ttl:
+            return None
+        
+        if retired_name == base.name:
+            retired_ids = base.get(include=[])["ids"]
+            for start in range(0, len(retired_ids), _REBUILD_BATCH_SIZE):
+                base.delete(ids=retired_ids[start:start + _REBUILD_BATCH_SIZE])
+        else:
+            try:
+                client.delete_collection(retired_name)
+            except Exception as e:
+                logger.warning(f"Failed to delete retired collection {retired_name}: {str(e)}")
+        
+        self._update_alias(base, **{RETIRED_COLLECTION_KEY: None})
+        logger.info(f"Retired collection {retired_name}")
+        return retired_name
+    
+    async def _copy_collection(self, source, target, lease: Optional[RedisLease] = None) -> int:
+        """Copy every record in batches, yielding to the event loop (and renewing the lease) between batches"""
+        copied, offset = 0, 0
+        while True:
+            batch = source.get(
+                limit=_REBUILD_BATCH_SIZE,
+                offset=offset,
+                include=["embeddings", "documents", "metadatas"]
+            )
+            if not batch["ids"]:
+                return copied
+            target.add(
+                embeddings=batch["embeddings"],
+                documents=batch["documents"],
+                metadatas=batch["metadatas"],
+                ids=batch["ids"]
+            )
+            copied += len(batch["ids"])
+            offset += _REBUILD_BATCH_SIZE
+            if lease is not None and not await lease.renew():
+                raise RuntimeError("rebuild lease lost during the copy")
+            await asyncio.sleep(0)
+    
+    async def _reconcile_collections(self, source, target) -> int:
+        """Make target's id set equal source's (writes that raced the batch copy)"""
+        source_ids = set(source.get(include=[])["ids"])
+        target_ids = set(target.get(include=[])["ids"])
+        
+        stale = list(target_ids - source_ids)
+        if stale:
+            target.delete(ids=stale)
+        
+        missing = list(source_ids - target_ids)
+        for start in range(0, len(missing), _REBUILD_BATCH_SIZE):
+            batch = source.get(
+                ids=missing[start:start + _REBUILD_BATCH_SIZE],
+                include=["embeddings", "documents", "metadatas"]
+            )
+            target.add(
+                embeddings=batch["embeddings"],
+                documents=batch["documents"],
+                metadatas=batch["metadatas"],
+                ids=batch["ids"]
+            )
+        return len(missing) - len(stale)
+    
+    async def maintain_hnsw_tiers(self) -> List[Dict[str, Any]]:
+        """
+        Rebuild every shard whose size has moved into a different HNSW tier
+        
+        Meant to run periodically in the background, in every worker; shards are
+        rebuilt one at a time so only one shadow copy exists at once, and a shard whose
+        rebuild lease another worker holds is skipped.
+        
+        Returns:
+            One entry per shard checked, with the rebuild report when it was rebuilt
+        """
+        client = self._get_client()
+        results = []
+        for info in client.list_collections():
+            if not _BASE_SHARD_PATTERN.match(info.name):
+                continue
+            lease = self._rebuild_lease(info.name)
+            try:
+                if not await lease.acquire():
+                    results.append({"shard": info.name, "skipped": "rebuild in progress elsewhere"})
+                    continue
+                base, active = self._resolve_shard(client, info.name)
+                self._retire_previous_generation(client, base)
+                size = active.count()
+                current = (active.metadata or {}).get(TIER_METADATA_KEY)
+                target = select_hnsw_tier(size).name
+                entry = {"shard": info.name, "size": size, "tier": current, "target_tier": target}
+                if current != target:
+                    if (base.metadata or {}).get(RETIRED_COLLECTION_KEY):
+                        entry["skipped"] = "previous generation not retired yet"
+                    else:
+                        entry["rebuild"] = await self._rebuild_leased(
+                            client, info.name, lease, target, None, True
+                        )
+                results.append(entry)
+            except Exception as e:
+                logger.error(f"HNSW maintenance failed for {info.name}: {str(e)}")
+                results.append({"shard": info.name, "error": str(e)})
+            finally:
+                await lease.release()
+        return results
+    
     async def get_collection_stats(self, creator_id: str) -> CollectionStats:
         """
         Get statistics for creator's collection shard
@@ -797,9 +1320,9 @@ class ChromaDBManager:
             collections = client.list_collections()
             
             for collection_info in collections:
-                if collection_info.name.startswith("knowledge_shard_"):
+                if _BASE_SHARD_PATTERN.match(collection_info.name):
                     try:
-                        collection = client.get_collection(collection_info.name)
+                        _, collection = self._resolve_shard(client, collection_info.name)
                         results = collection.get(include=["metadatas"])
                         
                         if not results["metadatas"]:
@@ -851,8 +1374,10 @@ class ChromaDBManager:
         """Close ChromaDB client and cleanup resources"""
         if self._client:
             try:
-                # ChromaDB client doesn't have explicit close method
-                # Just clear references
+                # ChromaDB client doesn't have explicit close method; the local
+                # backend flushes its memory-mapped segments
+                if isinstance(self._client, LocalVectorStoreClient):
+                    self._client.close()
                 self._client = None
                 self._collections_cache.clear()
                 self._stats_cache.clear()
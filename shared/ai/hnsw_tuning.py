@@ -0,0 +1,228 @@
+"""
+HNSW parameter tuning for vector store shards
+
+Shard collections are created with ``hnsw:*`` index settings picked from a
+size tier, recorded under ``hnsw_tier``.
+When a shard grows into the next tier, ChromaDBManager rebuilds it into a
+shadow collection with the new parameters and swaps it in. A recall/latency
+benchmark (requires ``hnswlib``, the index library behind ChromaDB) can pick
+the parameters for a tier from a sample of the shard's own vectors.
+"""
+
+import logging
+import time
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from shared.ai.quantization import distances_from_dots, top_k
+
+# hnswlib is only needed for benchmarking
+try:
+    import hnswlib
+    HNSWLIB_AVAILABLE = True
+except ImportError:
+    hnswlib = None
+    HNSWLIB_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# ChromaDB reserves the "hnsw:" prefix for index settings and rejects unknown keys
+TIER_METADATA_KEY = "hnsw_tier"
+# Index settings this module picks per tier ("hnsw:space" is left as created)
+HNSW_TUNING_KEYS = ("hnsw:M", "hnsw:construction_ef", "hnsw:search_ef")
+
+
+@dataclass(frozen=True)
+class HNSWParams:
+    """HNSW index parameters as understood by ChromaDB collection metadata"""
+    M: int
+    construction_ef: int
+    search_ef: int
+
+    def to_metadata(self) -> Dict[str, int]:
+        return {
+            "hnsw:M": self.M,
+            "hnsw:construction_ef": self.construction_ef,
+            "hnsw:search_ef": self.search_ef
+        }
+
+    @classmethod
+    def from_metadata(cls, metadata: Optional[Dict[str, Any]]) -> Optional["HNSWParams"]:
+        metadata = metadata or {}
+        try:
+            return cls(
+                M=int(metadata["hnsw:M"]),
+                construction_ef=int(metadata["hnsw:construction_ef"]),
+                search_ef=int(metadata["hnsw:search_ef"])
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+
+@dataclass(frozen=True)
+class HNSWTier:
+    """Shard size range (upper bound exclusive, None = unbounded) with its parameters"""
+    name: str
+    max_size: Optional[int]
+    params: HNSWParams
+
+
+# Larger graphs need more links and a wider search beam to hold recall
+DEFAULT_HNSW_TIERS: Tuple[HNSWTier, ...] = (
+    HNSWTier("small", 1_000, HNSWParams(M=16, construction_ef=200, search_ef=100)),
+    HNSWTier("medium", 10_000, HNSWParams(M=16, construction_ef=200, search_ef=200)),
+    HNSWTier("large", 100_000, HNSWParams(M=24, construction_ef=300, search_ef=256)),
+    HNSWTier("xlarge", None, HNSWParams(M=32, construction_ef=400, search_ef=384)),
+)
+
+
+def select_hnsw_tier(size: int, tiers: Sequence[HNSWTier] = DEFAULT_HNSW_TIERS) -> HNSWTier:
+    """Return the tier a shard of ``size`` vectors belongs to"""
+    for tier in tiers:
+        if tier.max_size is None or size < tier.max_size:
+            return tier
+    return tiers[-1]
+
+
+def tier_by_name(name: Optional[str], tiers: Sequence[HNSWTier] = DEFAULT_HNSW_TIERS) -> Optional[HNSWTier]:
+    return next((tier for tier in tiers if tier.name == name), None)
+
+
+# ----------------------------------------------------------------------------
+# Recall / latency benchmark
+# ----------------------------------------------------------------------------
+
+def candidate_grid(
+    tier: HNSWTier,
+    m_values: Optional[Iterable[int]] = None,
+    search_ef_values: Optional[Iterable[int]] = None
+) -> List[HNSWParams]:
+    """Parameter grid around a tier's defaults (construction_ef is kept fixed)"""
+    base = tier.params
+    m_values = sorted(set(m_values or (max(8, base.M // 2), base.M, base.M * 2)))
+    search_ef_values = sorted(set(search_ef_values or (
+        max(16, base.search_ef // 4), max(32, base.search_ef // 2), base.search_ef, base.search_ef * 2
+    )))
+    return [HNSWParams(M=m, construction_ef=base.construction_ef, search_ef=ef) for m in m_values for ef in search_ef_values]
+
+
+def benchmark_hnsw_params(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    candidates: Sequence[HNSWParams],
+    k: int = 10,
+    space: str = "l2",
+    num_threads: int = 1
+) -> List[Dict[str, Any]]:
+    """
+    Measure recall@k and query latency of each parameter set against exact search
+
+    One index is built per distinct (M, construction_ef); search_ef is swept on it.
+
+    Args:
+        vectors: Indexed vectors (n, dim)
+        queries: Query vectors (q, dim)
+        candidates: Parameter sets to evaluate
+        k: Neighbours compared for recall
+        space: "l2", "ip" or "cosine"
+        num_threads: Threads used for index construction
+
+    Returns:
+        One report per candidate with recall_at_k, latency_ms_p50/p95 and build_seconds
+
+    Raises:
+        RuntimeError: If hnswlib is not installed
+    """
+    if not HNSWLIB_AVAILABLE:
+        raise RuntimeError("hnswlib is required for HNSW benchmarking")
+
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    k = min(k, len(vectors))
+    truth = _exact_top_k(vectors, queries, k, space)
+
+    reports = []
+    builds: Dict[Tuple[int, int], Tuple[Any, float]] = {}
+    for params in candidates:
+        build_key = (params.M, params.construction_ef)
+        if build_key not in builds:
+            start = time.perf_counter()
+            index = hnswlib.Index(space=space, dim=vectors.shape[1])
+            index.init_index(max_elements=len(vectors), ef_construction=params.construction_ef, M=params.M)
+            index.set_num_threads(num_threads)
+            index.add_items(vectors, np.arange(len(vectors)))
+            builds[build_key] = (index, time.perf_counter() - start)
+        index, build_seconds = builds[build_key]
+        index.set_ef(max(params.search_ef, k))
+        index.set_num_threads(1)
+
+        latencies = []
+        found = np.empty((len(queries), k), dtype=np.int64)
+        for q, query in enumerate(queries):
+            start = time.perf_counter()
+            labels, _ = index.knn_query(query, k=k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found[q] = labels[0]
+
+        hits = sum(len(set(f) & set(t)) for f, t in zip(found.tolist(), truth.tolist()))
+        reports.append({
+            **asdict(params),
+            "recall_at_k": round(hits / float(truth.size), 4) if truth.size else 1.0,
+            "latency_ms_p50": round(float(np.percentile(latencies, 50)), 4),
+            "latency_ms_p95": round(float(np.percentile(latencies, 95)), 4),
+            "build_seconds": round(build_seconds, 4),
+            "k": k
+        })
+    return reports
+
+
+def pick_params(reports: Sequence[Dict[str, Any]], target_recall: float = 0.95) -> HNSWParams:
+    """
+    Cheapest parameters meeting the recall target (highest recall if none does)
+
+    Cheapest means lowest p95 latency, then the smallest graph (M).
+    """
+    if not reports:
+        raise ValueError("No benchmark reports to pick from")
+    meeting = [r for r in reports if r["recall_at_k"] >= target_recall]
+    if meeting:
+        best = min(meeting, key=lambda r: (r["latency_ms_p95"], r["M"], r["search_ef"]))
+    else:
+        best = max(reports, key=lambda r: (r["recall_at_k"], -r["latency_ms_p95"]))
+    return HNSWParams(M=best["M"], construction_ef=best["construction_ef"], search_ef=best["search_ef"])
+
+
+def tune_for_sample(
+    sample: np.ndarray,
+    tier: HNSWTier,
+    k: int = 10,
+    space: str = "l2",
+    query_count: int = 100,
+    target_recall: float = 0.95,
+    seed: int = 0
+) -> Tuple[HNSWParams, List[Dict[str, Any]]]:
+    """
+    Benchmark the tier's grid on a shard sample and pick parameters
+
+    Falls back to the tier defaults when hnswlib is missing or the sample is too
+    small to say anything.
+    """
+    sample = np.asarray(sample, dtype=np.float32)
+    if not HNSWLIB_AVAILABLE or sample.ndim != 2 or len(sample) < max(2 * k, 50):
+        return tier.params, []
+
+    rng = np.random.default_rng(seed)
+    order = rng.permutation(len(sample))
+    query_count = min(query_count, len(sample) // 5)
+    queries, indexed = sample[order[:query_count]], sample[order[query_count:]]
+
+    reports = benchmark_hnsw_params(indexed, queries, candidate_grid(tier), k=k, space=space)
+    return pick_params(reports, target_recall), reports
+
+
+def _exact_top_k(vectors: np.ndarray, queries: np.ndarray, k: int, space: str) -> np.ndarray:
+    sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+    rows, _ = top_k(distances_from_dots(queries @ vectors.T, queries, sq_norms, space), k)
+    return rows
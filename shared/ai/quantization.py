@@ -0,0 +1,464 @@
+"""
+Embedding Quantization
+Compressed embedding storage for the vector store and the Redis embedding cache
+
+Codecs:
+- float16: half-precision copy (2x smaller)
+- int8: scalar quantization with a per-vector scale (~4x smaller)
+- pq: product quantization with per-shard trained codebooks (dim/8 bytes by default)
+
+Search over compressed vectors uses asymmetric distance computation: queries stay
+in float32 and are compared against the decoded codes (for PQ via per-query lookup
+tables), optionally followed by full-precision re-ranking of the top candidates.
+"""
+
+import base64
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+COMPRESSION_TYPES = ("float16", "int8", "pq")
+
+# Vectors per block when decoding codes for distance computation
+_DECODE_BLOCK_ROWS = 4096
+
+
+class EmbeddingCodec(ABC):
+    """
+    Base class for embedding codecs
+
+    Encoded vectors are a tuple of arrays aligned on axis 0 so rows can be
+    appended, selected and compacted without knowing the codec.
+    """
+
+    name: str = ""
+
+    @property
+    def trained(self) -> bool:
+        return True
+
+    def train(self, vectors: np.ndarray) -> None:
+        """Fit codec parameters (no-op for codecs that need no training)"""
+
+    @abstractmethod
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, ...]:
+        """Encode float32 vectors (n, dim) into code arrays"""
+
+    @abstractmethod
+    def decode(self, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        """Decode code arrays back to float32 vectors (n, dim)"""
+
+    def dots(self, queries: np.ndarray, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        """Inner products between float32 queries and encoded vectors (q, n)"""
+        n = codes[0].shape[0]
+        result = np.empty((queries.shape[0], n), dtype=np.float32)
+        for start in range(0, n, _DECODE_BLOCK_ROWS):
+            block = tuple(array[start:start + _DECODE_BLOCK_ROWS] for array in codes)
+            result[:, start:start + _DECODE_BLOCK_ROWS] = queries @ self.decode(block).T
+        return result
+
+    def state(self) -> Dict[str, np.ndarray]:
+        """Trained parameters to persist alongside the store"""
+        return {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        """Restore trained parameters produced by ``state``"""
+
+
+class Float16Codec(EmbeddingCodec):
+    """Half-precision storage"""
+
+    name = "float16"
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, ...]:
+        return (np.asarray(vectors, dtype=np.float16),)
+
+    def decode(self, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        return codes[0].astype(np.float32)
+
+
+class Int8Codec(EmbeddingCodec):
+    """Symmetric scalar quantization to int8 with one float32 scale per vector"""
+
+    name = "int8"
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, ...]:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        scales = np.abs(vectors).max(axis=1) / 127.0
+        scales[scales == 0] = 1.0
+        codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+        return codes, scales.astype(np.float32)
+
+    def decode(self, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        values, scales = codes
+        return values.astype(np.float32) * scales[:, None]
+
+    def dots(self, queries: np.ndarray, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        values, scales = codes
+        result = np.empty((queries.shape[0], values.shape[0]), dtype=np.float32)
+        for start in range(0, values.shape[0], _DECODE_BLOCK_ROWS):
+            block = values[start:start + _DECODE_BLOCK_ROWS].astype(np.float32)
+            result[:, start:start + _DECODE_BLOCK_ROWS] = (
+                (queries @ block.T) * scales[start:start + _DECODE_BLOCK_ROWS]
+            )
+        return result
+
+
+class ProductQuantizer(EmbeddingCodec):
+    """
+    Product quantization
+
+    Splits each vector into ``subspaces`` contiguous chunks and replaces every
+    chunk by the index of its nearest centroid (``centroids`` <= 256 per
+    subspace, so one uint8 per chunk). Codebooks are trained with k-means.
+    """
+
+    name = "pq"
+
+    def __init__(
+        self,
+        subspaces: Optional[int] = None,
+        centroids: int = 256,
+        iterations: int = 20,
+        training_sample: int = 20000,
+        seed: int = 0
+    ):
+        if not 1 <= centroids <= 256:
+            raise ValueError("centroids must be between 1 and 256")
+        self.subspaces = subspaces
+        self.centroids = centroids
+        self.iterations = iterations
+        self.training_sample = training_sample
+        self.seed = seed
+        self.codebooks: Optional[np.ndarray] = None  # (subspaces, centroids, sub_dim)
+
+    @property
+    def trained(self) -> bool:
+        return self.codebooks is not None
+
+    @staticmethod
+    def _pick_subspaces(dim: int, requested: Optional[int]) -> int:
+        """Largest divisor of ``dim`` not above the request (default: 8 dims per chunk)"""
+        target = requested or max(1, dim // 8)
+        for candidate in range(min(target, dim), 0, -1):
+            if dim % candidate == 0:
+                return candidate
+        return 1
+
+    def train(self, vectors: np.ndarray) -> None:
+        vectors = np.asarray(vectors, dtype=np.float32)
+        n, dim = vectors.shape
+        if n == 0:
+            raise ValueError("Cannot train product quantizer on an empty set")
+
+        rng = np.random.default_rng(self.seed)
+        if n > self.training_sample:
+            vectors = vectors[rng.choice(n, self.training_sample, replace=False)]
+            n = self.training_sample
+
+        self.subspaces = self._pick_subspaces(dim, self.subspaces)
+        sub_dim = dim // self.subspaces
+        k = min(self.centroids, n)
+        codebooks = np.zeros((self.subspaces, self.centroids, sub_dim), dtype=np.float32)
+
+        for j in range(self.subspaces):
+            chunk = vectors[:, j * sub_dim:(j + 1) * sub_dim]
+            centers = chunk[rng.choice(n, k, replace=False)].copy()
+            for _ in range(self.iterations):
+                assignment = self._nearest(chunk, centers)
+                sums = np.zeros_like(centers)
+                np.add.at(sums, assignment, chunk)
+                counts = np.bincount(assignment, minlength=k)
+                filled = counts > 0
+                new_centers = centers.copy()
+                new_centers[filled] = sums[filled] / counts[filled, None]
+                if np.allclose(new_centers, centers):
+                    centers = new_centers
+                    break
+                centers = new_centers
+            codebooks[j, :k] = centers
+            if k < self.centroids:
+                # Unused slots repeat the first centroid so codes stay valid
+                codebooks[j, k:] = centers[0]
+
+        self.codebooks = codebooks
+
+    @staticmethod
+    def _nearest(chunk: np.ndarray, centers: np.ndarray) -> np.ndarray:
+        distances = (
+            np.einsum("ij,ij->i", chunk, chunk)[:, None]
+            - 2.0 * chunk @ centers.T
+            + np.einsum("ij,ij->i", centers, centers)[None, :]
+        )
+        return distances.argmin(axis=1)
+
+    def _require_trained(self) -> None:
+        if self.codebooks is None:
+            raise ValueError("Product quantizer must be trained before use")
+
+    def encode(self, vectors: np.ndarray) -> Tuple[np.ndarray, ...]:
+        self._require_trained()
+        vectors = np.asarray(vectors, dtype=np.float32)
+        sub_dim = self.codebooks.shape[2]
+        codes = np.empty((vectors.shape[0], self.subspaces), dtype=np.uint8)
+        for j in range(self.subspaces):
+            chunk = vectors[:, j * sub_dim:(j + 1) * sub_dim]
+            codes[:, j] = self._nearest(chunk, self.codebooks[j])
+        return (codes,)
+
+    def decode(self, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        self._require_trained()
+        values = codes[0]
+        parts = [self.codebooks[j][values[:, j]] for j in range(self.subspaces)]
+        return np.concatenate(parts, axis=1)
+
+    def dots(self, queries: np.ndarray, codes: Tuple[np.ndarray, ...]) -> np.ndarray:
+        """Asymmetric inner products via per-query lookup tables"""
+        self._require_trained()
+        values = codes[0]
+        sub_dim = self.codebooks.shape[2]
+        # tables[q, j, c] = <query chunk j, centroid c of subspace j>
+        tables = np.einsum(
+            "qjd,jcd->qjc",
+            queries.reshape(queries.shape[0], self.subspaces, sub_dim),
+            self.codebooks
+        )
+        result = np.zeros((queries.shape[0], values.shape[0]), dtype=np.float32)
+        for j in range(self.subspaces):
+            result += tables[:, j, values[:, j]]
+        return result
+
+    def state(self) -> Dict[str, np.ndarray]:
+        return {"codebooks": self.codebooks} if self.codebooks is not None else {}
+
+    def load_state(self, state: Dict[str, np.ndarray]) -> None:
+        codebooks = state.get("codebooks")
+        if codebooks is not None:
+            self.codebooks = np.asarray(codebooks, dtype=np.float32)
+            self.subspaces = self.codebooks.shape[0]
+            self.centroids = self.codebooks.shape[1]
+
+
+def create_codec(compression_type: str, **options: Any) -> EmbeddingCodec:
+    """
+    Build a codec by compression type name
+
+    Raises:
+        ValueError: If the compression type is unknown
+    """
+    if compression_type == "float16":
+        return Float16Codec()
+    if compression_type == "int8":
+        return Int8Codec()
+    if compression_type == "pq":
+        return ProductQuantizer(**options)
+    raise ValueError(f"Unsupported compression type: {compression_type}")
+
+
+class QuantizedVectors:
+    """Growable store of encoded vectors plus decoded squared norms"""
+
+    def __init__(self, codec: EmbeddingCodec):
+        self.codec = codec
+        self.codes: Optional[Tuple[np.ndarray, ...]] = None
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+
+    @property
+    def count(self) -> int:
+        return 0 if self.codes is None else self.codes[0].shape[0]
+
+    @property
+    def nbytes(self) -> int:
+        if self.codes is None:
+            return 0
+        return sum(array.nbytes for array in self.codes) + self.sq_norms.nbytes
+
+    def add(self, vectors: np.ndarray) -> None:
+        if len(vectors) == 0:
+            return
+        encoded = self.codec.encode(vectors)
+        decoded = self.codec.decode(encoded)
+        norms = np.einsum("ij,ij->i", decoded, decoded).astype(np.float32)
+        if self.codes is None:
+            self.codes = encoded
+        else:
+            self.codes = tuple(np.concatenate([old, new]) for old, new in zip(self.codes, encoded))
+        self.sq_norms = np.concatenate([self.sq_norms, norms])
+
+    def keep(self, rows: np.ndarray) -> None:
+        """Retain only ``rows`` (in the given order)"""
+        if self.codes is None:
+            return
+        self.codes = tuple(array[rows] for array in self.codes)
+        self.sq_norms = self.sq_norms[rows]
+
+    def select(self, rows: Optional[np.ndarray]) -> Tuple[Tuple[np.ndarray, ...], np.ndarray]:
+        if rows is None:
+            return self.codes, self.sq_norms
+        return tuple(array[rows] for array in self.codes), self.sq_norms[rows]
+
+
+def distances_from_dots(
+    dots: np.ndarray,
+    queries: np.ndarray,
+    sq_norms: np.ndarray,
+    space: str
+) -> np.ndarray:
+    """Convert inner products to ChromaDB-compatible distances for ``space``"""
+    if space == "ip":
+        return 1.0 - dots
+    if space == "cosine":
+        query_norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        denominators = np.maximum(query_norms * np.sqrt(sq_norms)[None, :], 1e-12)
+        return 1.0 - dots / denominators
+    # Squared L2, matching ChromaDB's "l2" space
+    query_sq = np.einsum("ij,ij->i", queries, queries)[:, None]
+    return np.maximum(sq_norms[None, :] - 2.0 * dots + query_sq, 0.0)
+
+
+def top_k(distances: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Column indices and distances of the ``k`` smallest entries per row, ascending"""
+    n = distances.shape[1]
+    k = min(k, n)
+    if k <= 0:
+        empty = np.zeros((distances.shape[0], 0))
+        return empty.astype(np.int64), empty.astype(np.float32)
+    if k < n:
+        top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+    else:
+        top = np.tile(np.arange(n), (distances.shape[0], 1))
+    top_distances = np.take_along_axis(distances, top, axis=1)
+    order = np.argsort(top_distances, axis=1, kind="stable")
+    return np.take_along_axis(top, order, axis=1), np.take_along_axis(top_distances, order, axis=1)
+
+
+# ----------------------------------------------------------------------------
+# Redis embedding cache payloads
+# ----------------------------------------------------------------------------
+
+def pack_embedding(embedding: Sequence[float], compression_type: Optional[str]) -> Any:
+    """
+    Compact JSON-safe representation of one embedding for the Redis cache
+
+    Product quantization needs a per-shard codebook and is too lossy for query
+    embeddings, so "pq" caches with int8. Without compression the plain float
+    list is returned unchanged.
+    """
+    if not compression_type:
+        return list(embedding)
+
+    vector = np.asarray(embedding, dtype=np.float32)[None, :]
+    if compression_type == "float16":
+        (codes,) = Float16Codec().encode(vector)
+        return {"codec": "float16", "data": base64.b64encode(codes.tobytes()).decode("ascii")}
+    if compression_type in ("int8", "pq"):
+        codes, scales = Int8Codec().encode(vector)
+        return {
+            "codec": "int8",
+            "scale": float(scales[0]),
+            "data": base64.b64encode(codes.tobytes()).decode("ascii")
+        }
+    raise ValueError(f"Unsupported compression type: {compression_type}")
+
+
+def unpack_embedding(payload: Any) -> Optional[List[float]]:
+    """Inverse of ``pack_embedding``; plain float lists pass through unchanged"""
+    if payload is None or isinstance(payload, list):
+        return payload
+    if not isinstance(payload, dict) or "codec" not in payload:
+        return None
+
+    raw = base64.b64decode(payload["data"])
+    if payload["codec"] == "float16":
+        return np.frombuffer(raw, dtype=np.float16).astype(np.float32).tolist()
+    if payload["codec"] == "int8":
+        values = np.frombuffer(raw, dtype=np.int8).astype(np.float32)
+        return (values * np.float32(payload["scale"])).tolist()
+    logger.warning(f"Unknown cached embedding codec: {payload['codec']}")
+    return None
+
+
+# ----------------------------------------------------------------------------
+# Recall vs. memory benchmark
+# ----------------------------------------------------------------------------
+
+def benchmark_compression(
+    vectors: np.ndarray,
+    queries: np.ndarray,
+    k: int = 10,
+    compression_types: Sequence[str] = COMPRESSION_TYPES,
+    space: str = "l2",
+    rerank_factor: int = 4,
+    pq_options: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Measure memory reduction and recall@k of each codec against exact float32 search
+
+    Args:
+        vectors: Corpus embeddings (n, dim)
+        queries: Query embeddings (q, dim)
+        k: Neighbours to compare
+        compression_types: Codecs to evaluate
+        space: Distance space ("l2", "ip" or "cosine")
+        rerank_factor: Candidates per result re-ranked at full precision
+        pq_options: Extra ProductQuantizer arguments
+
+    Returns:
+        One report per codec with bytes per vector, reduction, recall@k with and
+        without re-ranking, and mean search latency
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    queries = np.asarray(queries, dtype=np.float32)
+    sq_norms = np.einsum("ij,ij->i", vectors, vectors)
+    exact_distances = distances_from_dots(queries @ vectors.T, queries, sq_norms, space)
+    truth, _ = top_k(exact_distances, k)
+    full_bytes = vectors.shape[1] * 4
+
+    def recall(found: np.ndarray) -> float:
+        hits = sum(len(set(f) & set(t)) for f, t in zip(found.tolist(), truth.tolist()))
+        return hits / float(truth.size) if truth.size else 1.0
+
+    reports = []
+    for compression_type in compression_types:
+        options = (pq_options or {}) if compression_type == "pq" else {}
+        codec = create_codec(compression_type, **options)
+        train_start = time.perf_counter()
+        codec.train(vectors)
+        train_seconds = time.perf_counter() - train_start
+
+        store = QuantizedVectors(codec)
+        store.add(vectors)
+
+        search_start = time.perf_counter()
+        approx = distances_from_dots(codec.dots(queries, store.codes), queries, store.sq_norms, space)
+        approx_top, _ = top_k(approx, k)
+        search_seconds = time.perf_counter() - search_start
+
+        candidates, _ = top_k(approx, k * rerank_factor)
+        reranked = []
+        for q, rows in enumerate(candidates):
+            exact = distances_from_dots(
+                queries[q:q + 1] @ vectors[rows].T, queries[q:q + 1], sq_norms[rows], space
+            )
+            order, _ = top_k(exact, k)
+            reranked.append(rows[order[0]])
+
+        bytes_per_vector = store.nbytes / max(len(vectors), 1)
+        reports.append({
+            "compression_type": compression_type,
+            "bytes_per_vector": round(bytes_per_vector, 2),
+            "full_precision_bytes_per_vector": full_bytes,
+            "reduction": round(1.0 - bytes_per_vector / full_bytes, 4),
+            "recall_at_k": round(recall(approx_top), 4),
+            "recall_at_k_reranked": round(recall(np.array(reranked)), 4),
+            "k": k,
+            "train_seconds": round(train_seconds, 4),
+            "search_ms_per_query": round(search_seconds * 1000 / max(len(queries), 1), 4)
+        })
+    return reports
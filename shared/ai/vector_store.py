@@ -0,0 +1,963 @@
+"""
+Pluggable Vector Store Backends
+Defines the client/collection contract used by ChromaDBManager and an embedded
+NumPy backend for small tenants, offline load tests and development
+
+The contract mirrors the subset of the ChromaDB client API the platform uses
+(get/create/list/delete collections; add/query/get/delete on a collection), so
+the remote ChromaDB HttpClient and the local backend are interchangeable.
+
+The local backend keeps one float32 matrix per creator (partitioned on the
+``creator_id`` metadata field), optionally backed by a memory-mapped file:
+- exact top-k with a single matrix product plus ``argpartition``
+- equality metadata filters served from cached boolean masks
+- appends write in place into pre-allocated capacity
+- optional quantized in-memory index (see shared.ai.quantization) searched with
+  asymmetric distances, re-ranking the top candidates at full precision
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from shared.ai.quantization import (
+    COMPRESSION_TYPES,
+    EmbeddingCodec,
+    QuantizedVectors,
+    create_codec,
+    distances_from_dots,
+    top_k
+)
+
+logger = logging.getLogger(__name__)
+
+
+SUPPORTED_DISTANCE_SPACES = ("l2", "ip", "cosine")
+# Index settings ChromaDB accepts under its reserved "hnsw:" metadata prefix
+HNSW_METADATA_KEYS = (
+    "hnsw:space", "hnsw:M", "hnsw:construction_ef", "hnsw:search_ef", "hnsw:num_threads",
+    "hnsw:batch_size", "hnsw:sync_threshold", "hnsw:resize_factor"
+)
+DEFAULT_PARTITION_KEY = "creator_id"
+_DEFAULT_PARTITION = "__default__"
+_INITIAL_CAPACITY = 256
+_DEFAULT_RERANK_FACTOR = 4
+
+
+class VectorStoreCollection(ABC):
+    """Collection contract shared by every vector store backend"""
+
+    name: str
+    metadata: Dict[str, Any]
+
+    @abstractmethod
+    def add(
+        self,
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> None:
+        """Append embeddings with their documents and metadata"""
+
+    @abstractmethod
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Nearest-neighbour search, results nested per query embedding"""
+
+    @abstractmethod
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """Fetch stored records by id and/or metadata filter"""
+
+    @abstractmethod
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Delete records by id and/or metadata filter"""
+
+    @abstractmethod
+    def count(self) -> int:
+        """Number of records stored in the collection"""
+
+    @abstractmethod
+    def modify(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        """Replace collection metadata (``hnsw:*`` index settings are fixed at creation)"""
+
+
+class VectorStoreClient(ABC):
+    """Client contract shared by every vector store backend"""
+
+    @abstractmethod
+    def get_collection(self, name: str) -> VectorStoreCollection:
+        """Return an existing collection, raising ValueError if missing"""
+
+    @abstractmethod
+    def create_collection(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> VectorStoreCollection:
+        """Create a new collection, raising ValueError if it already exists"""
+
+    @abstractmethod
+    def list_collections(self) -> List[Any]:
+        """List collection descriptors (objects exposing ``name``)"""
+
+    @abstractmethod
+    def delete_collection(self, name: str) -> None:
+        """Delete a collection and its data"""
+
+    def get_or_create_collection(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> VectorStoreCollection:
+        """Return the named collection, creating it when missing"""
+        try:
+            return self.get_collection(name)
+        except ValueError:
+            return self.create_collection(name, metadata=metadata)
+
+
+class _CollectionInfo:
+    """Lightweight collection descriptor returned by list_collections"""
+
+    def __init__(self, name: str):
+        self.name = name
+
+
+def _mask_key(key: str, value: Any) -> Tuple[str, str, Any]:
+    """Cache key for an equality mask (type-qualified so True != 1)"""
+    return (key, type(value).__name__, value)
+
+
+def _compare(op: str, left: Any, right: Any) -> bool:
+    """Evaluate a range operator, treating missing/incomparable values as no match"""
+    if left is None:
+        return False
+    try:
+        if op == "$gt":
+            return left > right
+        if op == "$gte":
+            return left >= right
+        if op == "$lt":
+            return left < right
+        if op == "$lte":
+            return left <= right
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported where operator: {op}")
+
+
+class _PartitionSegment:
+    """
+    Dense float32 matrix plus records for a single partition (creator)
+
+    Rows ``[0, count)`` of ``vectors`` are live; rows ``[count, capacity)`` are
+    pre-allocated so appends write in place. When ``directory`` is set the
+    matrix is a memory-mapped file and records are appended to a JSONL log.
+    """
+
+    VECTORS_FILE = "vectors.f32"
+    RECORDS_FILE = "records.jsonl"
+    SEGMENT_FILE = "segment.json"
+
+    def __init__(self, partition: str, directory: Optional[Path] = None):
+        self.partition = partition
+        self.directory = directory
+        self.dim: Optional[int] = None
+        self.count = 0
+        self.capacity = 0
+        self.vectors: Optional[np.ndarray] = None
+        self.sq_norms = np.zeros(0, dtype=np.float32)
+        self.ids: List[str] = []
+        self.documents: List[Optional[str]] = []
+        self.metadatas: List[Dict[str, Any]] = []
+        self.row_by_id: Dict[str, int] = {}
+        self._eq_masks: Dict[Tuple[str, str, Any], np.ndarray] = {}
+        self.quantized: Optional[QuantizedVectors] = None
+
+        if directory is not None and (directory / self.SEGMENT_FILE).exists():
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Storage
+    # ------------------------------------------------------------------
+
+    def _allocate(self, capacity: int) -> np.ndarray:
+        """Allocate (or grow) the backing matrix to ``capacity`` rows"""
+        if self.directory is None:
+            grown = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self.vectors is not None and self.count:
+                grown[:self.count] = self.vectors[:self.count]
+            return grown
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / self.VECTORS_FILE
+        if self.vectors is not None:
+            self.vectors.flush()
+            self.vectors = None
+        with open(path, "ab") as handle:
+            handle.truncate(capacity * self.dim * 4)
+        return np.memmap(path, dtype=np.float32, mode="r+", shape=(capacity, self.dim))
+
+    def _ensure_capacity(self, extra: int) -> None:
+        needed = self.count + extra
+        if needed <= self.capacity:
+            return
+        new_capacity = max(_INITIAL_CAPACITY, self.capacity)
+        while new_capacity < needed:
+            new_capacity *= 2
+        self.vectors = self._allocate(new_capacity)
+        self.capacity = new_capacity
+
+    def _load(self) -> None:
+        """Map an existing on-disk segment"""
+        with open(self.directory / self.SEGMENT_FILE) as handle:
+            header = json.load(handle)
+        self.dim = int(header["dim"])
+        self.partition = header.get("partition", self.partition)
+
+        records_path = self.directory / self.RECORDS_FILE
+        if records_path.exists():
+            with open(records_path) as handle:
+                for line in handle:
+                    if not line.strip():
+                        continue
+                    record = json.loads(line)
+                    self.row_by_id[record["id"]] = len(self.ids)
+                    self.ids.append(record["id"])
+                    self.documents.append(record.get("document"))
+                    self.metadatas.append(record.get("metadata") or {})
+        self.count = len(self.ids)
+
+        vectors_path = self.directory / self.VECTORS_FILE
+        file_rows = vectors_path.stat().st_size // (self.dim * 4) if vectors_path.exists() else 0
+        if file_rows < self.count:
+            # Records outlived their vectors (interrupted append) - drop the tail
+            logger.warning(
+                f"Vector segment {self.directory} has {self.count} records but "
+                f"{file_rows} vectors, truncating records"
+            )
+            del self.ids[file_rows:], self.documents[file_rows:], self.metadatas[file_rows:]
+            self.row_by_id = {record_id: row for row, record_id in enumerate(self.ids)}
+            self.count = file_rows
+            self._rewrite_records()
+
+        self.capacity = max(file_rows, _INITIAL_CAPACITY)
+        self.vectors = self._allocate(self.capacity)
+        live = np.asarray(self.vectors[:self.count])
+        self.sq_norms = np.einsum("ij,ij->i", live, live).astype(np.float32)
+
+    def _write_header(self) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self.directory / self.SEGMENT_FILE, "w") as handle:
+            json.dump({"dim": self.dim, "partition": self.partition}, handle)
+
+    def _rewrite_records(self) -> None:
+        """Atomically rewrite the record log after a delete"""
+        path = self.directory / self.RECORDS_FILE
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as handle:
+            for record_id, document, metadata in zip(self.ids, self.documents, self.metadatas):
+                handle.write(json.dumps({"id": record_id, "document": document, "metadata": metadata}) + "\n")
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def append(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        documents: List[Optional[str]],
+        metadatas: List[Dict[str, Any]]
+    ) -> None:
+        if self.dim is None:
+            self.dim = int(vectors.shape[1])
+            if self.directory is not None:
+                self._write_header()
+        elif vectors.shape[1] != self.dim:
+            raise ValueError(
+                f"Embedding dimension {vectors.shape[1]} does not match "
+                f"collection dimension {self.dim}"
+            )
+
+        added = len(ids)
+        self._ensure_capacity(added)
+        start, end = self.count, self.count + added
+
+        # Vectors first, then records: a crash in between leaves orphan vector
+        # rows past ``count`` that the next append simply overwrites
+        self.vectors[start:end] = vectors
+        if self.directory is not None:
+            self.vectors.flush()
+            with open(self.directory / self.RECORDS_FILE, "a") as handle:
+                for record_id, document, metadata in zip(ids, documents, metadatas):
+                    handle.write(json.dumps({"id": record_id, "document": document, "metadata": metadata}) + "\n")
+
+        self.sq_norms = np.concatenate([self.sq_norms, np.einsum("ij,ij->i", vectors, vectors)])
+        if self.quantized is not None:
+            self.quantized.add(vectors)
+        for offset, record_id in enumerate(ids):
+            self.row_by_id[record_id] = start + offset
+        self.ids.extend(ids)
+        self.documents.extend(documents)
+        self.metadatas.extend(metadatas)
+        self.count = end
+
+        # Extend cached equality masks with the new rows instead of rebuilding
+        for cache_key, mask in list(self._eq_masks.items()):
+            key, _, value = cache_key
+            extension = np.fromiter(
+                (metadata.get(key) == value for metadata in metadatas), dtype=bool, count=added
+            )
+            self._eq_masks[cache_key] = np.concatenate([mask, extension])
+
+    def remove_rows(self, rows: np.ndarray) -> int:
+        """Compact the segment, dropping ``rows``; returns number removed"""
+        if rows.size == 0:
+            return 0
+        keep = np.ones(self.count, dtype=bool)
+        keep[rows] = False
+        keep_rows = np.flatnonzero(keep)
+        new_count = int(keep_rows.size)
+
+        self.vectors[:new_count] = self.vectors[keep_rows]
+        self.sq_norms = self.sq_norms[keep_rows]
+        if self.quantized is not None:
+            self.quantized.keep(keep_rows)
+        self.ids = [self.ids[row] for row in keep_rows]
+        self.documents = [self.documents[row] for row in keep_rows]
+        self.metadatas = [self.metadatas[row] for row in keep_rows]
+        self.row_by_id = {record_id: row for row, record_id in enumerate(self.ids)}
+        removed = self.count - new_count
+        self.count = new_count
+        self._eq_masks.clear()
+
+        if self.directory is not None:
+            self.vectors.flush()
+            self._rewrite_records()
+        return removed
+
+    def set_codec(self, codec: Optional[EmbeddingCodec]) -> None:
+        """Build (or drop, with None) the quantized index over live rows"""
+        if codec is None:
+            self.quantized = None
+            return
+        self.quantized = QuantizedVectors(codec)
+        if self.count:
+            self.quantized.add(np.asarray(self.vectors[:self.count]))
+
+    def close(self) -> None:
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        self.vectors = None
+
+    # ------------------------------------------------------------------
+    # Filtering and search
+    # ------------------------------------------------------------------
+
+    def eq_mask(self, key: str, value: Any) -> np.ndarray:
+        """Boolean mask of rows whose metadata ``key`` equals ``value`` (cached)"""
+        cache_key = _mask_key(key, value)
+        mask = self._eq_masks.get(cache_key)
+        if mask is None:
+            mask = np.fromiter(
+                (metadata.get(key) == value for metadata in self.metadatas),
+                dtype=bool,
+                count=self.count
+            )
+            self._eq_masks[cache_key] = mask
+        return mask
+
+    def where_mask(self, where: Optional[Dict[str, Any]]) -> Optional[np.ndarray]:
+        """Evaluate a ChromaDB-style where clause into a row mask (None = all rows)"""
+        if not where:
+            return None
+
+        mask = np.ones(self.count, dtype=bool)
+        for key, condition in where.items():
+            if key == "$and":
+                for clause in condition:
+                    clause_mask = self.where_mask(clause)
+                    if clause_mask is not None:
+                        mask &= clause_mask
+            elif key == "$or":
+                any_mask = np.zeros(self.count, dtype=bool)
+                for clause in condition:
+                    clause_mask = self.where_mask(clause)
+                    if clause_mask is None:
+                        any_mask[:] = True
+                        break
+                    any_mask |= clause_mask
+                mask &= any_mask
+            elif key.startswith("$"):
+                raise ValueError(f"Unsupported where operator: {key}")
+            elif isinstance(condition, dict):
+                for op, value in condition.items():
+                    mask &= self._operator_mask(key, op, value)
+            else:
+                mask &= self.eq_mask(key, condition)
+        return mask
+
+    def _operator_mask(self, key: str, op: str, value: Any) -> np.ndarray:
+        if op == "$eq":
+            return self.eq_mask(key, value)
+        if op == "$ne":
+            return ~self.eq_mask(key, value)
+        if op in ("$in", "$nin"):
+            any_mask = np.zeros(self.count, dtype=bool)
+            for item in value:
+                any_mask |= self.eq_mask(key, item)
+            return any_mask if op == "$in" else ~any_mask
+        return np.fromiter(
+            (_compare(op, metadata.get(key), value) for metadata in self.metadatas),
+            dtype=bool,
+            count=self.count
+        )
+
+    def search(
+        self,
+        queries: np.ndarray,
+        k: int,
+        space: str,
+        mask: Optional[np.ndarray] = None,
+        rerank_factor: int = _DEFAULT_RERANK_FACTOR
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Top-k search, exact over float32 or asymmetric over the quantized index
+
+        With a quantized index the best ``k * rerank_factor`` candidates are
+        re-scored against the full-precision rows (``rerank_factor`` <= 1 skips
+        re-ranking and returns approximate distances).
+
+        Returns:
+            (rows, distances), each shaped (n_queries, k'), ascending distance
+        """
+        candidates = None if mask is None else np.flatnonzero(mask)
+
+        if self.quantized is None:
+            matrix = self.vectors[:self.count] if candidates is None else self.vectors[candidates]
+            sq_norms = self.sq_norms if candidates is None else self.sq_norms[candidates]
+            distances = distances_from_dots(queries @ matrix.T, queries, sq_norms, space)
+            top, top_distances = top_k(distances, k)
+            rows = top if candidates is None else candidates[top]
+            return rows, top_distances.astype(np.float32)
+
+        codes, sq_norms = self.quantized.select(candidates)
+        approx = distances_from_dots(self.quantized.codec.dots(queries, codes), queries, sq_norms, space)
+        if rerank_factor <= 1:
+            top, top_distances = top_k(approx, k)
+            rows = top if candidates is None else candidates[top]
+            return rows, top_distances.astype(np.float32)
+
+        shortlist, _ = top_k(approx, k * rerank_factor)
+        shortlist_rows = shortlist if candidates is None else candidates[shortlist]
+        all_rows, all_distances = [], []
+        for q in range(queries.shape[0]):
+            rows_q = shortlist_rows[q]
+            exact = distances_from_dots(
+                queries[q:q + 1] @ self.vectors[rows_q].T, queries[q:q + 1], self.sq_norms[rows_q], space
+            )
+            order, ordered = top_k(exact, k)
+            all_rows.append(rows_q[order[0]])
+            all_distances.append(ordered[0])
+        return np.array(all_rows, dtype=np.int64), np.array(all_distances, dtype=np.float32)
+
+
+class LocalVectorCollection(VectorStoreCollection):
+    """
+    Embedded exact-search collection partitioned by creator
+
+    Queries that pin ``creator_id`` (as ChromaDBManager always does) touch only
+    that creator's matrix; other queries scan every partition and merge.
+    """
+
+    COLLECTION_FILE = "collection.json"
+    CODEC_STATE_FILE = "codec_state.npz"
+
+    def __init__(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        directory: Optional[Path] = None,
+        partition_key: str = DEFAULT_PARTITION_KEY
+    ):
+        self.name = name
+        self.metadata = dict(metadata or {})
+        self.directory = directory
+        self.partition_key = partition_key
+        self.space = self.metadata.get("hnsw:space", "l2")
+        if self.space not in SUPPORTED_DISTANCE_SPACES:
+            raise ValueError(f"Unsupported distance space: {self.space}")
+        self._segments: Dict[str, _PartitionSegment] = {}
+        self._codec: Optional[EmbeddingCodec] = None
+
+        if directory is not None:
+            directory.mkdir(parents=True, exist_ok=True)
+            info_path = directory / self.COLLECTION_FILE
+            if info_path.exists() and metadata is None:
+                with open(info_path) as handle:
+                    self.metadata = json.load(handle).get("metadata", {})
+                self.space = self.metadata.get("hnsw:space", "l2")
+            else:
+                self._save_metadata()
+            for child in sorted(directory.iterdir()):
+                if child.is_dir() and (child / _PartitionSegment.SEGMENT_FILE).exists():
+                    segment = _PartitionSegment(child.name, child)
+                    self._segments[segment.partition] = segment
+        self._restore_quantization()
+
+    @property
+    def compression_type(self) -> Optional[str]:
+        return self.metadata.get("quantization")
+
+    @property
+    def rerank_factor(self) -> int:
+        return int(self.metadata.get("quantization:rerank_factor", _DEFAULT_RERANK_FACTOR))
+
+    def _save_metadata(self) -> None:
+        if self.directory is not None:
+            with open(self.directory / self.COLLECTION_FILE, "w") as handle:
+                json.dump({"name": self.name, "metadata": self.metadata}, handle)
+
+    def _restore_quantization(self) -> None:
+        """Rebuild the quantized index of a reopened (or pre-configured) collection"""
+        compression_type = self.compression_type
+        if not compression_type:
+            return
+        codec = create_codec(compression_type)
+        state_path = self.directory / self.CODEC_STATE_FILE if self.directory is not None else None
+        if state_path is not None and state_path.exists():
+            with np.load(state_path) as state:
+                codec.load_state(dict(state))
+        if not codec.trained:
+            if not self.count():
+                logger.warning(f"Collection {self.name} has no vectors to train {compression_type} on yet")
+                return
+            logger.warning(f"Codec state missing for collection {self.name}, retraining")
+            self._train_codec(codec)
+        self._apply_codec(codec)
+
+    def _training_sample(self, limit: int) -> np.ndarray:
+        parts = [np.asarray(segment.vectors[:segment.count]) for segment in self._segments.values() if segment.count]
+        if not parts:
+            return np.zeros((0, 0), dtype=np.float32)
+        sample = np.concatenate(parts)
+        if len(sample) > limit:
+            rng = np.random.default_rng(0)
+            sample = sample[rng.choice(len(sample), limit, replace=False)]
+        return sample
+
+    def _train_codec(self, codec: EmbeddingCodec, sample_size: int = 20000) -> None:
+        sample = self._training_sample(sample_size)
+        if len(sample) == 0:
+            raise ValueError(f"Collection {self.name} has no vectors to train {codec.name} on")
+        codec.train(sample)
+
+    def _apply_codec(self, codec: Optional[EmbeddingCodec]) -> None:
+        self._codec = codec
+        for segment in self._segments.values():
+            segment.set_codec(codec)
+
+    def enable_quantization(
+        self,
+        compression_type: str,
+        rerank_factor: int = _DEFAULT_RERANK_FACTOR,
+        **codec_options: Any
+    ) -> Dict[str, Any]:
+        """
+        Store a compressed copy of every vector and search it asymmetrically
+
+        Product quantization is trained on this collection (shard); the float32
+        matrix stays on disk (or in memory) for re-ranking.
+
+        Args:
+            compression_type: "float16", "int8" or "pq"
+            rerank_factor: Candidates per result re-scored at full precision (1 = off)
+            **codec_options: Extra codec arguments (e.g. ``subspaces`` for PQ)
+
+        Returns:
+            Memory statistics after quantization
+        """
+        if compression_type not in COMPRESSION_TYPES:
+            raise ValueError(f"Unsupported compression type: {compression_type}")
+
+        codec = create_codec(compression_type, **codec_options)
+        if not codec.trained:
+            self._train_codec(codec)
+        self._apply_codec(codec)
+
+        self.metadata["quantization"] = compression_type
+        self.metadata["quantization:rerank_factor"] = int(rerank_factor)
+        self._save_metadata()
+        if self.directory is not None:
+            state = codec.state()
+            state_path = self.directory / self.CODEC_STATE_FILE
+            if state:
+                np.savez(state_path, **state)
+            elif state_path.exists():
+                state_path.unlink()
+
+        logger.info(f"Enabled {compression_type} quantization for collection {self.name}")
+        return self.memory_stats()
+
+    def disable_quantization(self) -> None:
+        """Drop the quantized index and search float32 exactly again"""
+        self._apply_codec(None)
+        self.metadata.pop("quantization", None)
+        self.metadata.pop("quantization:rerank_factor", None)
+        self._save_metadata()
+        if self.directory is not None and (self.directory / self.CODEC_STATE_FILE).exists():
+            (self.directory / self.CODEC_STATE_FILE).unlink()
+
+    def memory_stats(self) -> Dict[str, Any]:
+        """
+        Memory footprint of this collection
+
+        ``resident_bytes`` is what the collection holds in process memory: the
+        float32 matrix (kept for exact search and re-ranking when quantized),
+        its norms, the quantized index and the codec state. A memory-mapped
+        float32 matrix is paged in from disk on demand and is reported as
+        ``mapped_bytes`` instead. ``index_reduction`` compares the searched
+        index alone with the full-precision vectors.
+        """
+        vectors = sum(segment.count for segment in self._segments.values())
+        full_bytes = sum(segment.count * (segment.dim or 0) * 4 for segment in self._segments.values())
+        index_bytes = sum(
+            segment.quantized.nbytes for segment in self._segments.values() if segment.quantized is not None
+        )
+        float32_bytes = mapped_bytes = 0
+        for segment in self._segments.values():
+            if segment.vectors is None:
+                continue
+            if isinstance(segment.vectors, np.memmap):
+                mapped_bytes += segment.vectors.nbytes
+            else:
+                float32_bytes += segment.vectors.nbytes
+            float32_bytes += segment.sq_norms.nbytes
+        codec_bytes = sum(array.nbytes for array in self._codec.state().values()) if self._codec else 0
+
+        stats = {
+            "vectors": vectors,
+            "compression_type": self.compression_type,
+            "full_precision_bytes": full_bytes,
+            "index_bytes": index_bytes if self.compression_type else full_bytes,
+            "float32_bytes": float32_bytes,
+            "mapped_bytes": mapped_bytes,
+            "resident_bytes": float32_bytes + index_bytes + codec_bytes,
+        }
+        stats["index_reduction"] = round(1.0 - stats["index_bytes"] / full_bytes, 4) if full_bytes else 0.0
+        return stats
+
+    def _segment(self, partition: str, create: bool = False) -> Optional[_PartitionSegment]:
+        segment = self._segments.get(partition)
+        if segment is None and create:
+            directory = None
+            if self.directory is not None:
+                directory = self.directory / hashlib.sha1(partition.encode()).hexdigest()[:16]
+            segment = _PartitionSegment(partition, directory)
+            segment.set_codec(self._codec)
+            self._segments[partition] = segment
+        return segment
+
+    def _partition_of(self, metadata: Dict[str, Any]) -> str:
+        value = metadata.get(self.partition_key)
+        return str(value) if value is not None else _DEFAULT_PARTITION
+
+    def _split_where(self, where: Optional[Dict[str, Any]]) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """
+        Pull a top-level ``partition_key`` equality out of a where clause
+
+        Returns:
+            (partition or None, remaining where clause or None)
+        """
+        if not where:
+            return None, None
+
+        def as_partition(clause: Dict[str, Any]) -> Optional[str]:
+            if len(clause) != 1 or self.partition_key not in clause:
+                return None
+            condition = clause[self.partition_key]
+            if isinstance(condition, dict):
+                if set(condition) == {"$eq"}:
+                    return str(condition["$eq"])
+                return None
+            return str(condition)
+
+        partition = as_partition(where)
+        if partition is not None:
+            return partition, None
+
+        if set(where) == {"$and"}:
+            clauses = list(where["$and"])
+            for index, clause in enumerate(clauses):
+                partition = as_partition(clause)
+                if partition is not None:
+                    rest = clauses[:index] + clauses[index + 1:]
+                    if not rest:
+                        return partition, None
+                    return partition, rest[0] if len(rest) == 1 else {"$and": rest}
+        return None, where
+
+    def _target_segments(self, where: Optional[Dict[str, Any]]) -> Tuple[List[_PartitionSegment], Optional[Dict[str, Any]]]:
+        partition, remaining = self._split_where(where)
+        if partition is not None:
+            segment = self._segments.get(partition)
+            return ([segment] if segment is not None and segment.count else []), remaining
+        return [segment for segment in self._segments.values() if segment.count], where
+
+    def add(
+        self,
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+        ids: List[str]
+    ) -> None:
+        if not (len(embeddings) == len(ids) == len(metadatas) == len(documents)):
+            raise ValueError("embeddings, documents, metadatas and ids must have the same length")
+        if len(set(ids)) != len(ids):
+            raise ValueError("Duplicate IDs in add request")
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        if vectors.ndim != 2:
+            raise ValueError("embeddings must be a list of equal-length vectors")
+
+        grouped: Dict[str, List[int]] = {}
+        for index, (record_id, metadata) in enumerate(zip(ids, metadatas)):
+            partition = self._partition_of(metadata or {})
+            existing = self._segments.get(partition)
+            if existing is not None and record_id in existing.row_by_id:
+                logger.warning(f"Skipping existing embedding ID {record_id} in collection {self.name}")
+                continue
+            grouped.setdefault(partition, []).append(index)
+
+        for partition, indices in grouped.items():
+            segment = self._segment(partition, create=True)
+            segment.append(
+                vectors[indices],
+                [ids[i] for i in indices],
+                [documents[i] for i in indices],
+                [dict(metadatas[i] or {}) for i in indices]
+            )
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 5,
+        where: Optional[Dict[str, Any]] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        include = include or ["documents", "metadatas", "distances"]
+        queries = np.asarray(query_embeddings, dtype=np.float32)
+        if queries.ndim == 1:
+            queries = queries[None, :]
+
+        segments, remaining = self._target_segments(where)
+        # Per query: list of (distance, segment, row) candidates
+        candidates: List[List[Tuple[float, _PartitionSegment, int]]] = [[] for _ in range(len(queries))]
+        for segment in segments:
+            if queries.shape[1] != segment.dim:
+                raise ValueError(
+                    f"Query dimension {queries.shape[1]} does not match "
+                    f"collection dimension {segment.dim}"
+                )
+            mask = segment.where_mask(remaining)
+            rows, distances = segment.search(queries, n_results, self.space, mask, self.rerank_factor)
+            for q in range(len(queries)):
+                candidates[q].extend(
+                    (float(distance), segment, int(row))
+                    for row, distance in zip(rows[q], distances[q])
+                )
+
+        result: Dict[str, Any] = {"ids": []}
+        for field in ("documents", "metadatas", "distances", "embeddings"):
+            if field in include:
+                result[field] = []
+
+        for per_query in candidates:
+            if len(segments) > 1:
+                per_query.sort(key=lambda item: item[0])
+            per_query = per_query[:n_results]
+            result["ids"].append([segment.ids[row] for _, segment, row in per_query])
+            if "documents" in include:
+                result["documents"].append([segment.documents[row] for _, segment, row in per_query])
+            if "metadatas" in include:
+                result["metadatas"].append([segment.metadatas[row] for _, segment, row in per_query])
+            if "distances" in include:
+                result["distances"].append([distance for distance, _, _ in per_query])
+            if "embeddings" in include:
+                result["embeddings"].append([segment.vectors[row].tolist() for _, segment, row in per_query])
+
+        return result
+
+    def _matching_rows(
+        self,
+        ids: Optional[List[str]],
+        where: Optional[Dict[str, Any]]
+    ) -> List[Tuple[_PartitionSegment, np.ndarray]]:
+        segments, remaining = self._target_segments(where)
+        matches = []
+        for segment in segments:
+            mask = segment.where_mask(remaining)
+            if ids is not None:
+                id_mask = np.zeros(segment.count, dtype=bool)
+                rows = [segment.row_by_id[i] for i in ids if i in segment.row_by_id]
+                id_mask[rows] = True
+                mask = id_mask if mask is None else mask & id_mask
+            rows = np.arange(segment.count) if mask is None else np.flatnonzero(mask)
+            if rows.size:
+                matches.append((segment, rows))
+        return matches
+
+    def get(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None,
+        limit: Optional[int] = None,
+        offset: Optional[int] = None,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        include = include or ["documents", "metadatas"]
+        pairs = [
+            (segment, int(row))
+            for segment, rows in self._matching_rows(ids, where)
+            for row in rows
+        ]
+        start = offset or 0
+        pairs = pairs[start:start + limit] if limit is not None else pairs[start:]
+
+        result: Dict[str, Any] = {"ids": [segment.ids[row] for segment, row in pairs]}
+        if "documents" in include:
+            result["documents"] = [segment.documents[row] for segment, row in pairs]
+        if "metadatas" in include:
+            result["metadatas"] = [segment.metadatas[row] for segment, row in pairs]
+        if "embeddings" in include:
+            result["embeddings"] = [segment.vectors[row].tolist() for segment, row in pairs]
+        return result
+
+    def delete(
+        self,
+        ids: Optional[List[str]] = None,
+        where: Optional[Dict[str, Any]] = None
+    ) -> None:
+        if ids is None and not where:
+            raise ValueError("delete requires ids or a where clause")
+        for segment, rows in self._matching_rows(ids, where):
+            segment.remove_rows(rows)
+
+    def count(self) -> int:
+        return sum(segment.count for segment in self._segments.values())
+
+    def modify(self, metadata: Optional[Dict[str, Any]] = None) -> None:
+        if metadata is None:
+            return
+        # Index settings are changed through enable/disable_quantization or a rebuild
+        fixed = ("hnsw:", "quantization")
+        index_settings = {key: value for key, value in self.metadata.items() if key.startswith(fixed)}
+        self.metadata = {
+            **{key: value for key, value in metadata.items() if not key.startswith(fixed)},
+            **index_settings
+        }
+        self._save_metadata()
+
+    def partition_count(self, partition: str) -> int:
+        """Number of records stored for one partition (creator)"""
+        segment = self._segments.get(str(partition))
+        return segment.count if segment else 0
+
+    def partitions(self) -> List[str]:
+        """Partitions (creators) that currently hold records"""
+        return [partition for partition, segment in self._segments.items() if segment.count]
+
+    def close(self) -> None:
+        for segment in self._segments.values():
+            segment.close()
+        self._segments.clear()
+
+
+class LocalVectorStoreClient(VectorStoreClient):
+    """
+    Embedded vector store client
+
+    Args:
+        path: Directory for memory-mapped storage; None keeps everything in
+            process memory (deterministic, for tests and offline load runs)
+    """
+
+    def __init__(self, path: Optional[str] = None, partition_key: str = DEFAULT_PARTITION_KEY):
+        self.path = Path(path) if path else None
+        self.partition_key = partition_key
+        self._collections: Dict[str, LocalVectorCollection] = {}
+
+        if self.path is not None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            for child in sorted(self.path.iterdir()):
+                if (child / LocalVectorCollection.COLLECTION_FILE).exists():
+                    self._collections[child.name] = LocalVectorCollection(
+                        child.name, directory=child, partition_key=partition_key
+                    )
+
+        logger.info(f"Local vector store initialized (path: {self.path or 'in-memory'})")
+
+    def get_collection(self, name: str) -> LocalVectorCollection:
+        if name not in self._collections:
+            raise ValueError(f"Collection {name} does not exist.")
+        return self._collections[name]
+
+    def create_collection(
+        self,
+        name: str,
+        metadata: Optional[Dict[str, Any]] = None
+    ) -> LocalVectorCollection:
+        if name in self._collections:
+            raise ValueError(f"Collection {name} already exists.")
+        # Reject what ChromaDB rejects, so a shard layout that works here works there
+        reserved = [key for key in (metadata or {}) if key.startswith("hnsw:") and key not in HNSW_METADATA_KEYS]
+        if reserved:
+            raise ValueError(f"Unknown reserved hnsw: metadata keys: {', '.join(reserved)}")
+        directory = self.path / name if self.path is not None else None
+        collection = LocalVectorCollection(
+            name, metadata=metadata or {}, directory=directory, partition_key=self.partition_key
+        )
+        self._collections[name] = collection
+        return collection
+
+    def list_collections(self) -> List[_CollectionInfo]:
+        return [_CollectionInfo(name) for name in self._collections]
+
+    def delete_collection(self, name: str) -> None:
+        collection = self._collections.pop(name, None)
+        if collection is None:
+            return
+        collection.close()
+        if collection.directory is not None:
+            shutil.rmtree(collection.directory, ignore_errors=True)
+
+    def close(self) -> None:
+        for collection in self._collections.values():
+            collection.close()
+        self._collections.clear()
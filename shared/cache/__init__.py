@@ -1,4 +1,11 @@
 # Redis caching utilities package
 from .redis_client import get_redis_client, get_cache_manager, RedisClient, CacheManager
+from .usage_counters import get_usage_counters, UsageCounters
+from .websocket_fanout import get_websocket_fanout, WebSocketFanout
+from .deduplication import MessageDeduplicator
+from .leases import RedisLease, LeaseUnavailableError
+from .execution_checkpoints import get_execution_checkpoint_store, ExecutionCheckpointStore
 
-__all__ = ['get_redis_client', 'get_cache_manager', 'RedisClient', 'CacheManager']
\ No newline at end of file
+__all__ = ['get_redis_client', 'get_cache_manager', 'RedisClient', 'CacheManager', 'get_usage_counters', 'UsageCounters',
+           'get_websocket_fanout', 'WebSocketFanout', 'MessageDeduplicator', 'RedisLease', 'LeaseUnavailableError',
+           'get_execution_checkpoint_store', 'ExecutionCheckpointStore']
\ No newline at end of file
@@ -0,0 +1,78 @@
+"""
+Idempotent message processing for MVP Coaching AI Platform
+Claims external message IDs in Redis so redelivered events are handled once
+"""
+
+import logging
+from typing import Optional
+
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+PROCESSING = "processing"
+DONE = "done"
+
+
+class MessageDeduplicator:
+    """
+    Redis-backed "handle once" guard keyed by external message ID
+
+    ``claim`` takes a short-lived processing lease with SET NX; ``complete``
+    turns it into a long-lived marker so provider redeliveries are skipped;
+    ``release`` drops the lease after a failure so a retry can run. A worker
+    that dies mid-event leaves a lease that simply expires.
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        namespace: str,
+        processing_ttl: int = 300,
+        done_ttl: int = 86400
+    ):
+        """
+        Initialize deduplicator
+
+        Args:
+            redis_client: Redis client instance
+            namespace: Key namespace (e.g. "webhook")
+            processing_ttl: Seconds a processing lease is held
+            done_ttl: Seconds a processed ID is remembered
+        """
+        self.redis = redis_client
+        self.namespace = namespace
+        self.processing_ttl = processing_ttl
+        self.done_ttl = done_ttl
+
+    def _key(self, creator_id: str, message_key: str) -> str:
+        return self.redis._get_namespaced_key(creator_id, f"dedup:{self.namespace}:{message_key}")
+
+    async def claim(self, creator_id: str, message_key: str) -> bool:
+        """
+        Claim a message for processing
+
+        Returns:
+            True if the caller should process the message, False if it was
+            already processed or is being processed elsewhere
+        """
+        client = await self.redis.get_client()
+        return bool(await client.set(self._key(creator_id, message_key), PROCESSING, nx=True, ex=self.processing_ttl))
+
+    async def complete(self, creator_id: str, message_key: str) -> None:
+        """Remember a message as processed"""
+        client = await self.redis.get_client()
+        await client.set(self._key(creator_id, message_key), DONE, ex=self.done_ttl)
+
+    async def release(self, creator_id: str, message_key: str) -> None:
+        """Drop a processing lease so the message can be retried"""
+        try:
+            client = await self.redis.get_client()
+            await client.delete(self._key(creator_id, message_key))
+        except Exception as e:
+            logger.warning(f"Failed to release dedup lease {message_key}: {e}")
+
+    async def get_status(self, creator_id: str, message_key: str) -> Optional[str]:
+        """Current state of a message: "processing", "done" or None"""
+        client = await self.redis.get_client()
+        return await client.get(self._key(creator_id, message_key))
@@ -0,0 +1,204 @@
+"""
+Execution checkpoints for MVP Coaching AI Platform
+Multi-step executions save their progress after every step so a run cut
+short by a crash, deploy or timeout resumes where it stopped
+
+Each execution is one Redis hash, so a checkpoint write only carries the
+step that just finished:
+    meta        execution header, written once
+    state       mutable execution state, written only when it changed
+    step:<id>   step record
+
+Values are compact JSON; records above ``compress_threshold`` bytes
+(typically AI-generated content) are stored zlib-compressed as
+``z:<base64>``.
+"""
+
+import base64
+import json
+import logging
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+META_FIELD = "meta"
+STATE_FIELD = "state"
+STEP_PREFIX = "step:"
+COMPRESSED_PREFIX = "z:"
+
+
+def encode_record(record: Any, compress_threshold: int = 1024) -> str:
+    """Serialize a checkpoint value, compressing it when large"""
+    data = json.dumps(record, separators=(",", ":"), default=str)
+    if compress_threshold and len(data) >= compress_threshold:
+        compressed = base64.b64encode(zlib.compress(data.encode("utf-8"))).decode("ascii")
+        if len(compressed) + len(COMPRESSED_PREFIX) < len(data):
+            return COMPRESSED_PREFIX + compressed
+    return data
+
+
+def decode_record(value: str) -> Any:
+    """Inverse of ``encode_record``"""
+    if value.startswith(COMPRESSED_PREFIX):
+        value = zlib.decompress(base64.b64decode(value[len(COMPRESSED_PREFIX):])).decode("utf-8")
+    return json.loads(value)
+
+
+@dataclass
+class ExecutionCheckpoint:
+    """Saved progress of one execution"""
+    execution_id: str
+    meta: Dict[str, Any]
+    state: Dict[str, Any] = field(default_factory=dict)
+    steps: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+
+
+class ExecutionCheckpointStore:
+    """
+    Redis-backed checkpoints for resumable executions
+
+    Writes are best effort: a Redis failure is logged and reported through
+    the return value but never interrupts the execution being checkpointed.
+    Every write refreshes the TTL, so abandoned executions expire on their
+    own and an active one never does.
+    """
+
+    def __init__(self, redis_client: RedisClient, ttl: int = 86400, compress_threshold: int = 1024):
+        """
+        Initialize checkpoint store
+
+        Args:
+            redis_client: Redis client instance
+            ttl: Seconds a checkpoint is kept after its last write
+            compress_threshold: Records at least this many bytes are compressed
+        """
+        self.redis = redis_client
+        self.ttl = ttl
+        self.compress_threshold = compress_threshold
+        self.stats = {"writes": 0, "bytes_written": 0, "failed_writes": 0}
+
+    def _key(self, creator_id: str, execution_id: str) -> str:
+        return self.redis._get_namespaced_key(creator_id, f"execution:checkpoint:{execution_id}")
+
+    async def _write(self, creator_id: str, execution_id: str, fields: Dict[str, str]) -> int:
+        try:
+            client = await self.redis.get_client()
+            key = self._key(creator_id, execution_id)
+            async with client.pipeline(transaction=True) as pipe:
+                pipe.hset(key, mapping=fields)
+                pipe.expire(key, self.ttl)
+                await pipe.execute()
+        except Exception as e:
+            self.stats["failed_writes"] += 1
+            logger.exception(
+                f"Failed to checkpoint execution {execution_id} for creator {creator_id}: {e}"
+            )
+            return 0
+
+        written = sum(len(name) + len(value) for name, value in fields.items())
+        self.stats["writes"] += 1
+        self.stats["bytes_written"] += written
+        return written
+
+    async def begin(
+        self,
+        creator_id: str,
+        execution_id: str,
+        meta: Dict[str, Any],
+        state: Dict[str, Any]
+    ) -> int:
+        """
+        Start a checkpoint for a new execution
+
+        Args:
+            creator_id: Creator/tenant ID
+            execution_id: Execution identifier
+            meta: Immutable execution header (what to resume)
+            state: Initial mutable state
+
+        Returns:
+            Bytes written (0 if the write failed)
+        """
+        return await self._write(creator_id, execution_id, {
+            META_FIELD: encode_record(meta, self.compress_threshold),
+            STATE_FIELD: encode_record(state, self.compress_threshold)
+        })
+
+    async def save_step(
+        self,
+        creator_id: str,
+        execution_id: str,
+        step_id: str,
+        record: Dict[str, Any],
+        state: Optional[Dict[str, Any]] = None
+    ) -> int:
+        """
+        Record a finished step
+
+        Args:
+            creator_id: Creator/tenant ID
+            execution_id: Execution identifier
+            step_id: Step identifier
+            record: Step result to replay on resume
+            state: New mutable state, or None when unchanged since the last write
+
+        Returns:
+            Bytes written (0 if the write failed)
+        """
+        fields = {STEP_PREFIX + step_id: encode_record(record, self.compress_threshold)}
+        if state is not None:
+            fields[STATE_FIELD] = encode_record(state, self.compress_threshold)
+        return await self._write(creator_id, execution_id, fields)
+
+    async def load(self, creator_id: str, execution_id: str) -> Optional[ExecutionCheckpoint]:
+        """
+        Load an execution's checkpoint
+
+        Returns:
+            The checkpoint, or None if there is none (never started, finished or expired)
+        """
+        try:
+            client = await self.redis.get_client()
+            fields = await client.hgetall(self._key(creator_id, execution_id))
+        except Exception as e:
+            logger.exception(
+                f"Failed to load checkpoint {execution_id} for creator {creator_id}: {e}"
+            )
+            return None
+        if not fields or META_FIELD not in fields:
+            return None
+
+        checkpoint = ExecutionCheckpoint(
+            execution_id=execution_id,
+            meta=decode_record(fields[META_FIELD]),
+            state=decode_record(fields[STATE_FIELD]) if STATE_FIELD in fields else {}
+        )
+        for name, value in fields.items():
+            if name.startswith(STEP_PREFIX):
+                checkpoint.steps[name[len(STEP_PREFIX):]] = decode_record(value)
+        return checkpoint
+
+    async def delete(self, creator_id: str, execution_id: str) -> bool:
+        """Drop a checkpoint once its execution has finished"""
+        return await self.redis.delete(creator_id, f"execution:checkpoint:{execution_id}")
+
+
+# Global checkpoint store instance
+_checkpoint_store: Optional[ExecutionCheckpointStore] = None
+
+
+def get_execution_checkpoint_store() -> ExecutionCheckpointStore:
+    """Get global execution checkpoint store instance"""
+    global _checkpoint_store
+    if _checkpoint_store is None:
+        from shared.config.env_constants import EXECUTION_CHECKPOINT_TTL_SECONDS, get_env_value
+        from .redis_client import get_redis_client
+        _checkpoint_store = ExecutionCheckpointStore(
+            get_redis_client(),
+            ttl=int(get_env_value(EXECUTION_CHECKPOINT_TTL_SECONDS, default="86400"))
+        )
+    return _checkpoint_store
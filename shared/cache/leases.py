@@ -0,0 +1,117 @@
+"""
+Redis leases for MVP Coaching AI Platform
+Exclusive, expiring ownership of a piece of work shared by several workers
+
+A lease is a key set with SET NX PX to a random token. Only the holder of the
+token can renew or release it, so a worker whose lease expired (paused,
+partitioned) cannot release one another worker has taken over since.
+"""
+
+import logging
+import uuid
+from typing import Optional
+
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# Extend the lease only if the caller still holds it
+RENEW_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('PEXPIRE', KEYS[1], ARGV[2])
+end
+return 0
+"""
+
+# Delete the lease only if the caller still holds it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class LeaseUnavailableError(Exception):
+    """Raised when a lease is held by another worker"""
+    pass
+
+
+class RedisLease:
+    """
+    Exclusive lease on one named resource
+
+    Usable as an async context manager, which raises LeaseUnavailableError when
+    the lease is taken and releases it on exit. Long-running holders call
+    ``renew`` periodically and stop when it returns False.
+    """
+
+    def __init__(self, redis_client: RedisClient, creator_id: str, name: str, ttl_ms: int = 60000):
+        """
+        Initialize lease
+
+        Args:
+            redis_client: Redis client instance
+            creator_id: Creator/tenant ID ("system" for platform-wide work)
+            name: Resource name (e.g. "hnsw:rebuild:knowledge_shard_3")
+            ttl_ms: Milliseconds the lease lasts without a renewal
+        """
+        self.redis = redis_client
+        self.creator_id = creator_id
+        self.name = name
+        self.ttl_ms = ttl_ms
+        self.token = uuid.uuid4().hex
+        self.held = False
+
+    @property
+    def key(self) -> str:
+        return self.redis._get_namespaced_key(self.creator_id, f"lease:{self.name}")
+
+    async def acquire(self) -> bool:
+        """
+        Take the lease
+
+        Returns:
+            True if this instance now holds the lease, False if another one does
+        """
+        client = await self.redis.get_client()
+        self.held = bool(await client.set(self.key, self.token, nx=True, px=self.ttl_ms))
+        return self.held
+
+    async def renew(self) -> bool:
+        """
+        Extend the lease by its TTL
+
+        Returns:
+            False if the lease was lost (expired and possibly taken over)
+        """
+        if not self.held:
+            return False
+        client = await self.redis.get_client()
+        self.held = bool(await client.eval(RENEW_SCRIPT, 1, self.key, self.token, self.ttl_ms))
+        return self.held
+
+    async def release(self) -> None:
+        """Give the lease up if this instance still holds it"""
+        if not self.held:
+            return
+        self.held = False
+        try:
+            client = await self.redis.get_client()
+            await client.eval(RELEASE_SCRIPT, 1, self.key, self.token)
+        except Exception as e:
+            # The lease expires on its own
+            logger.warning(f"Failed to release lease {self.name}: {e}")
+
+    async def holder(self) -> Optional[str]:
+        """Token of the current holder, if any"""
+        client = await self.redis.get_client()
+        return await client.get(self.key)
+
+    async def __aenter__(self) -> "RedisLease":
+        if not await self.acquire():
+            raise LeaseUnavailableError(f"Lease {self.name} is held by another worker")
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.release()
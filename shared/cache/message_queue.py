@@ -1,37 +1,143 @@
 """
 Redis Streams-based message queue for MVP Coaching AI Platform
 Handles asynchronous message processing with multi-tenant support
+
+Every queue has one stream per priority lane. Consumers spread reads over the
+lanes by weight, so high-priority work is picked up first without starving
+the others. Failed messages wait in a sorted set and are moved back onto
+their lane once their backoff has elapsed. Messages that keep failing go to a
+dead-letter stream, from which they can be replayed.
 """
 
 import json
 import logging
-from typing import Optional, Dict, Any, Callable, Awaitable
+import random
+import time
+from typing import Optional, Dict, Any, Callable, Awaitable, List, Set, Tuple
+from collections import deque
 from datetime import datetime
 import asyncio
 import uuid
+
+from shared.utils.circuit_breaker import get_optional_metrics_collector
 from .redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+# Priority lanes, highest first
+PRIORITIES = ("high", "normal", "low")
+DEFAULT_PRIORITY = "normal"
+
+# Share of reads each lane gets while all of them have work
+PRIORITY_WEIGHTS = {"high": 6, "normal": 3, "low": 1}
+
+# Move due delayed retries onto their lane streams
+# KEYS: delayed set, then one stream per lane; ARGV: now, limit, then one priority per lane
+PROMOTE_DUE_SCRIPT = """
+local due = redis.call('ZRANGEBYSCORE', KEYS[1], '-inf', ARGV[1], 'LIMIT', 0, tonumber(ARGV[2]))
+local lanes = {}
+for i = 2, #KEYS do
+    lanes[ARGV[i + 1]] = KEYS[i]
+end
+for _, member in ipairs(due) do
+    redis.call('ZREM', KEYS[1], member)
+    local entry = cjson.decode(member)
+    local args = {}
+    for field, value in pairs(entry.fields) do
+        table.insert(args, field)
+        table.insert(args, value)
+    end
+    redis.call('XADD', lanes[entry.priority] or KEYS[2], '*', unpack(args))
+end
+return #due
+"""
+
+# (stream, entry id, fields) as read from a lane
+StreamEntry = Tuple[str, str, Dict[str, str]]
+
+
+class _LaneSchedule:
+    """Smooth weighted round robin deciding how many reads each lane gets"""
+    
+    def __init__(self, weights: Dict[str, int]):
+        self.weights = weights
+        self.total = sum(weights.values())
+        self.credits = {priority: 0 for priority in weights}
+    
+    def allocate(self, count: int) -> Dict[str, int]:
+        shares = {priority: 0 for priority in self.weights}
+        for _ in range(count):
+            for priority, weight in self.weights.items():
+                self.credits[priority] += weight
+            chosen = max(self.credits, key=self.credits.get)
+            self.credits[chosen] -= self.total
+            shares[chosen] += 1
+        return shares
+
+
+class _KeyHold:
+    """Messages of one ordering key parked behind a message waiting for its retry"""
+    
+    def __init__(self, head_due: float):
+        self.head_due = head_due  # When the retry of the first message is promoted
+        self.tail_due = head_due  # Latest due time handed to a parked message
+        self.message_ids: deque = deque()  # Logical order of the parked messages
+    
+    def next_due(self) -> float:
+        """Due time that places a message behind everything already parked"""
+        self.tail_due = max(self.tail_due, time.time()) + 0.001
+        return self.tail_due
+
 
 class MessageQueue:
     """Redis Streams-based message queue with multi-tenant support"""
     
-    def __init__(self, redis_client: RedisClient, stream_prefix: str = "queue"):
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        stream_prefix: str = "queue",
+        max_retries: int = 3,
+        retry_base_delay: float = 1.0,
+        retry_max_delay: float = 300.0,
+        priority_weights: Optional[Dict[str, int]] = None
+    ):
         """
         Initialize message queue
         
         Args:
             redis_client: Redis client instance
             stream_prefix: Prefix for stream names
+            max_retries: Retries before a message is dead-lettered
+            retry_base_delay: Backoff before the first retry in seconds (doubles per retry)
+            retry_max_delay: Backoff cap in seconds
+            priority_weights: Read share per priority lane (defaults to PRIORITY_WEIGHTS)
         """
         self.redis = redis_client
         self.stream_prefix = stream_prefix
+        self.max_retries = max_retries
+        self.retry_base_delay = retry_base_delay
+        self.retry_max_delay = retry_max_delay
+        weights = priority_weights or PRIORITY_WEIGHTS
+        self.priority_weights = {priority: max(1, weights.get(priority, 1)) for priority in PRIORITIES}
         self._consumers: Dict[str, bool] = {}  # Track active consumers
     
-    def _get_stream_name(self, creator_id: str, queue_name: str) -> str:
-        """Generate stream name with tenant isolation"""
-        return f"tenant:{creator_id}:{self.stream_prefix}:{queue_name}"
+    def _get_stream_name(self, creator_id: str, queue_name: str, priority: str = DEFAULT_PRIORITY) -> str:
+        """Generate stream name with tenant isolation (the normal lane keeps the plain name)"""
+        stream_name = f"tenant:{creator_id}:{self.stream_prefix}:{queue_name}"
+        if priority == DEFAULT_PRIORITY:
+            return stream_name
+        return f"{stream_name}:{priority}"
+    
+    def _get_lane_streams(self, creator_id: str, queue_name: str) -> Dict[str, str]:
+        """Stream of every priority lane, highest priority first"""
+        return {priority: self._get_stream_name(creator_id, queue_name, priority) for priority in PRIORITIES}
+    
+    def _get_delayed_key(self, creator_id: str, queue_name: str) -> str:
+        """Sorted set of messages waiting for their retry backoff"""
+        return f"{self._get_stream_name(creator_id, queue_name)}:delayed"
+    
+    def _get_dead_letter_stream(self, creator_id: str, queue_name: str) -> str:
+        return f"{self._get_stream_name(creator_id, queue_name)}:dead_letter"
     
     def _get_consumer_group_name(self, queue_name: str) -> str:
         """Generate consumer group name"""
@@ -41,9 +147,13 @@ class MessageQueue:
         """Generate unique consumer name"""
         return f"{queue_name}_consumer_{uuid.uuid4().hex[:8]}"
     
+    @staticmethod
+    def _get_priority(priority: Optional[str]) -> str:
+        return priority if priority in PRIORITIES else DEFAULT_PRIORITY
+    
     async def create_stream(self, creator_id: str, queue_name: str) -> bool:
         """
-        Create a stream and consumer group
+        Create the lane streams and their consumer group
         
         Args:
             creator_id: Creator/tenant ID
@@ -54,19 +164,19 @@ class MessageQueue:
         """
         try:
             client = await self.redis.get_client()
-            stream_name = self._get_stream_name(creator_id, queue_name)
             group_name = self._get_consumer_group_name(queue_name)
             
-            # Create consumer group (this also creates the stream if it doesn't exist)
-            try:
-                await client.xgroup_create(stream_name, group_name, id="0", mkstream=True)
-                logger.info(f"Created stream {stream_name} with consumer group {group_name}")
-            except Exception as e:
-                if "BUSYGROUP" in str(e):
-                    # Consumer group already exists
-                    logger.debug(f"Consumer group {group_name} already exists for stream {stream_name}")
-                else:
-                    raise e
+            for stream_name in self._get_lane_streams(creator_id, queue_name).values():
+                # Create consumer group (this also creates the stream if it doesn't exist)
+                try:
+                    await client.xgroup_create(stream_name, group_name, id="0", mkstream=True)
+                    logger.info(f"Created stream {stream_name} with consumer group {group_name}")
+                except Exception as e:
+                    if "BUSYGROUP" in str(e):
+                        # Consumer group already exists
+                        logger.debug(f"Consumer group {group_name} already exists for stream {stream_name}")
+                    else:
+                        raise e
             
             return True
         except Exception as e:
@@ -79,7 +189,7 @@ class MessageQueue:
         queue_name: str, 
         message_type: str,
         data: Dict[str, Any],
-        priority: str = "normal"
+        priority: str = DEFAULT_PRIORITY
     ) -> Optional[str]:
         """
         Send a message to the queue
@@ -95,8 +205,12 @@ class MessageQueue:
             Message ID if successful
         """
         try:
+            if priority not in PRIORITIES:
+                logger.warning(f"Unknown priority {priority!r} for queue {queue_name}, using {DEFAULT_PRIORITY}")
+                priority = DEFAULT_PRIORITY
+            
             client = await self.redis.get_client()
-            stream_name = self._get_stream_name(creator_id, queue_name)
+            stream_name = self._get_stream_name(creator_id, queue_name, priority)
             
             # Prepare message
             message = {
@@ -111,7 +225,7 @@ class MessageQueue:
             
             # Send to stream
             message_id = await client.xadd(stream_name, message)
-            logger.debug(f"Sent message {message['id']} to queue {queue_name}")
+            logger.debug(f"Sent message {message['id']} to queue {queue_name} ({priority})")
             
             return message_id
         except Exception as e:
@@ -124,134 +238,648 @@ class MessageQueue:
         queue_name: str,
         handler: Callable[[Dict[str, Any]], Awaitable[bool]],
         batch_size: int = 10,
-        block_time: int = 1000  # milliseconds
+        block_time: int = 1000,  # milliseconds
+        concurrency: int = 1,
+        claim_idle_ms: int = 60000,
+        claim_interval: float = 30.0,
+        drain_timeout: float = 30.0
     ) -> None:
         """
         Consume messages from the queue
         
+        Up to ``concurrency`` handlers run at once. Reads only fill free
+        handler slots and are spread over the priority lanes by weight, so a
+        high-priority message waits at most for a free slot rather than behind
+        a read-ahead batch of bulk work. Finished messages are acknowledged
+        with one XACK per lane and loop iteration. Entries left pending by a
+        consumer that died are taken over with XAUTOCLAIM once they have been
+        idle for ``claim_idle_ms``. When the consumer is stopped it stops
+        reading, waits for in-flight handlers and acknowledges them.
+        
         Args:
             creator_id: Creator/tenant ID
             queue_name: Queue name
             handler: Async function to handle messages
-            batch_size: Number of messages to process at once
+            batch_size: Maximum number of messages to read at once
             block_time: Time to block waiting for messages (ms)
+            concurrency: Handlers running at the same time
+            claim_idle_ms: Idle time before another consumer's pending entry is reclaimed (0 disables)
+            claim_interval: Seconds between reclaim passes and lag reports
+            drain_timeout: Seconds to wait for in-flight handlers on shutdown
         """
         client = await self.redis.get_client()
-        stream_name = self._get_stream_name(creator_id, queue_name)
+        lanes = self._get_lane_streams(creator_id, queue_name)
         group_name = self._get_consumer_group_name(queue_name)
         consumer_name = self._get_consumer_name(queue_name)
         
-        # Ensure stream and consumer group exist
+        # Ensure streams and consumer group exist
         await self.create_stream(creator_id, queue_name)
         
         consumer_key = f"{creator_id}:{queue_name}:{consumer_name}"
         self._consumers[consumer_key] = True
         
-        logger.info(f"Starting consumer {consumer_name} for queue {queue_name}")
+        concurrency = max(1, concurrency)
+        schedule = _LaneSchedule(self.priority_weights)
+        in_flight: Set[asyncio.Task] = set()
+        to_ack: Dict[str, List[str]] = {}
+        
+        async def run(stream_name: str, message_id: str, fields: Dict[str, str]) -> None:
+            if await self._process_message(client, creator_id, queue_name, handler, message_id, fields):
+                to_ack.setdefault(stream_name, []).append(message_id)
+        
+        def dispatch(entries: List[StreamEntry]) -> None:
+            for stream_name, message_id, fields in entries:
+                task = asyncio.create_task(run(stream_name, message_id, fields))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+        
+        logger.info(f"Starting consumer {consumer_name} for queue {queue_name} (concurrency {concurrency})")
+        last_claim = 0.0
         
         try:
             while self._consumers.get(consumer_key, False):
                 try:
-                    # Read messages from stream
-                    messages = await client.xreadgroup(
-                        group_name,
-                        consumer_name,
-                        {stream_name: ">"},
-                        count=batch_size,
-                        block=block_time
-                    )
+                    await self._ack(client, group_name, to_ack)
+                    await self._promote_due(client, creator_id, queue_name)
                     
-                    if not messages:
+                    if len(in_flight) >= concurrency:
+                        await asyncio.wait(
+                            set(in_flight), timeout=block_time / 1000, return_when=asyncio.FIRST_COMPLETED
+                        )
                         continue
                     
-                    # Process messages
-                    for stream, stream_messages in messages:
-                        for message_id, fields in stream_messages:
-                            try:
-                                # Parse message
-                                message_data = {
-                                    "message_id": message_id,
-                                    "id": fields.get("id"),
-                                    "type": fields.get("type"),
-                                    "creator_id": fields.get("creator_id"),
-                                    "priority": fields.get("priority", "normal"),
-                                    "data": json.loads(fields.get("data", "{}")),
-                                    "timestamp": fields.get("timestamp"),
-                                    "retry_count": int(fields.get("retry_count", 0))
-                                }
-                                
-                                # Handle message
-                                success = await handler(message_data)
-                                
-                                if success:
-                                    # Acknowledge message
-                                    await client.xack(stream_name, group_name, message_id)
-                                    logger.debug(f"Processed message {message_data['id']}")
-                                else:
-                                    # Handle retry logic
-                                    await self._handle_message_retry(
-                                        client, stream_name, group_name, message_id, message_data
-                                    )
-                                
-                            except Exception as e:
-                                logger.error(f"Error processing message {message_id}: {e}")
-                                # Handle retry logic
-                                await self._handle_message_retry(
-                                    client, stream_name, group_name, message_id, 
-                                    {"retry_count": int(fields.get("retry_count", 0))}
-                                )
+                    if time.monotonic() - last_claim >= claim_interval:
+                        last_claim = time.monotonic()
+                        await self._report_lag(creator_id, queue_name)
+                        if claim_idle_ms > 0:
+                            dispatch(await self._reclaim(
+                                client, lanes, group_name, consumer_name, claim_idle_ms, concurrency - len(in_flight)
+                            ))
+                            if len(in_flight) >= concurrency:
+                                continue
+                    
+                    # Read messages (short block while handlers are finishing)
+                    dispatch(await self._read_lanes(
+                        client,
+                        lanes,
+                        group_name,
+                        consumer_name,
+                        schedule,
+                        min(batch_size, concurrency - len(in_flight)),
+                        min(block_time, 100) if in_flight else block_time
+                    ))
                 
                 except Exception as e:
                     logger.error(f"Error in message consumer loop: {e}")
                     await asyncio.sleep(5)  # Wait before retrying
+            
+            # Graceful drain: finish what was already handed to handlers
+            if in_flight:
+                await asyncio.wait(set(in_flight), timeout=drain_timeout)
         
         finally:
+            try:
+                await self._ack(client, group_name, to_ack)
+            except Exception as e:
+                logger.error(f"Failed to acknowledge drained messages for queue {queue_name}: {e}")
+            for task in in_flight:
+                # Unfinished entries stay pending and are reclaimed by another consumer
+                task.cancel()
             logger.info(f"Stopping consumer {consumer_name} for queue {queue_name}")
             self._consumers.pop(consumer_key, None)
     
+    async def consume_ordered(
+        self,
+        creator_id: str,
+        queue_name: str,
+        handler: Callable[[Dict[str, Any]], Awaitable[bool]],
+        key_func: Callable[[Dict[str, Any]], str],
+        batch_size: int = 50,
+        concurrency: int = 10,
+        block_time: int = 1000,  # milliseconds
+        claim_idle_ms: int = 60000,
+        claim_interval: float = 30.0,
+        hold_timeout: float = 60.0
+    ) -> None:
+        """
+        Consume messages concurrently while keeping per-key order
+        
+        Each batch is split into lanes by ``key_func``; up to ``concurrency``
+        lanes run at once and messages within a lane are handled in stream
+        order. The next batch is read only after the current one finished,
+        so messages sharing a key are never handled concurrently by this
+        consumer. Order is kept among messages sent with the same priority.
+        Each batch is acknowledged with a single XACK per priority lane.
+        
+        When a message fails, later messages with the same key are parked in
+        the delayed set behind its retry instead of overtaking it, and are
+        handled once it succeeded or was dead-lettered. A hold whose retry
+        does not come back to this consumer within ``hold_timeout`` seconds
+        of being due (another consumer took it) is released.
+        
+        Args:
+            creator_id: Creator/tenant ID
+            queue_name: Queue name
+            handler: Async function to handle messages
+            key_func: Returns the ordering key of a parsed message
+            batch_size: Number of messages read per batch
+            concurrency: Lanes processed at the same time
+            block_time: Time to block waiting for messages (ms)
+            claim_idle_ms: Idle time before another consumer's pending entry is reclaimed (0 disables)
+            claim_interval: Seconds between reclaim passes and lag reports
+            hold_timeout: Seconds a key stays held after its retry was due
+        """
+        client = await self.redis.get_client()
+        lanes = self._get_lane_streams(creator_id, queue_name)
+        group_name = self._get_consumer_group_name(queue_name)
+        consumer_name = self._get_consumer_name(queue_name)
+        
+        await self.create_stream(creator_id, queue_name)
+        
+        consumer_key = f"{creator_id}:{queue_name}:{consumer_name}"
+        self._consumers[consumer_key] = True
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        schedule = _LaneSchedule(self.priority_weights)
+        to_ack: Dict[str, List[str]] = {}
+        holds: Dict[str, _KeyHold] = {}
+        
+        async def run_lane(key: str, lane: List[StreamEntry]) -> None:
+            async with semaphore:
+                for stream_name, message_id, fields in lane:
+                    if not await self._process_ordered(
+                        client, creator_id, queue_name, handler, holds, key, message_id, fields, hold_timeout
+                    ):
+                        # Leave the rest of the lane pending so it is reclaimed in order
+                        break
+                    to_ack.setdefault(stream_name, []).append(message_id)
+        
+        logger.info(f"Starting ordered consumer {consumer_name} for queue {queue_name} (concurrency {concurrency})")
+        last_claim = 0.0
+        
+        try:
+            while self._consumers.get(consumer_key, False):
+                try:
+                    await self._promote_due(client, creator_id, queue_name)
+                    
+                    entries: List[StreamEntry] = []
+                    if time.monotonic() - last_claim >= claim_interval:
+                        last_claim = time.monotonic()
+                        await self._report_lag(creator_id, queue_name)
+                        if claim_idle_ms > 0:
+                            entries.extend(await self._reclaim(
+                                client, lanes, group_name, consumer_name, claim_idle_ms, batch_size
+                            ))
+                    
+                    if not entries:
+                        entries = await self._read_lanes(
+                            client, lanes, group_name, consumer_name, schedule, batch_size, block_time
+                        )
+                    
+                    if not entries:
+                        continue
+                    
+                    key_lanes: Dict[str, List[StreamEntry]] = {}
+                    for entry in entries:
+                        try:
+                            key = key_func(self._parse_message(entry[1], entry[2]))
+                        except Exception:
+                            key = entry[1]
+                        key_lanes.setdefault(key, []).append(entry)
+                    
+                    await asyncio.gather(*(run_lane(key, lane) for key, lane in key_lanes.items()))
+                    await self._ack(client, group_name, to_ack)
+                
+                except Exception as e:
+                    logger.error(f"Error in ordered consumer loop: {e}")
+                    await asyncio.sleep(5)  # Wait before retrying
+        
+        finally:
+            logger.info(f"Stopping ordered consumer {consumer_name} for queue {queue_name}")
+            self._consumers.pop(consumer_key, None)
+    
+    async def _read_lanes(
+        self,
+        client,
+        lanes: Dict[str, str],
+        group_name: str,
+        consumer_name: str,
+        schedule: _LaneSchedule,
+        count: int,
+        block_time: int
+    ) -> List[StreamEntry]:
+        """
+        Read up to ``count`` new entries spread over the lanes by weight
+        
+        Reads left unused by empty lanes go to the busy ones, highest
+        priority first. Blocks on all lanes only when every lane is empty.
+        """
+        if count <= 0:
+            return []
+        
+        shares = [(priority, share) for priority, share in schedule.allocate(count).items() if share]
+        async with client.pipeline(transaction=False) as pipe:
+            for priority, share in shares:
+                pipe.xreadgroup(group_name, consumer_name, {lanes[priority]: ">"}, count=share)
+            results = await pipe.execute()
+        
+        entries: List[StreamEntry] = []
+        busy: List[str] = []
+        for (priority, share), result in zip(shares, results):
+            read = self._flatten_read(result)
+            entries.extend(read)
+            if len(read) == share:
+                busy.append(priority)
+        
+        for priority in PRIORITIES:
+            if len(entries) >= count:
+                break
+            if priority in busy:
+                entries.extend(self._flatten_read(await client.xreadgroup(
+                    group_name, consumer_name, {lanes[priority]: ">"}, count=count - len(entries)
+                )))
+        
+        if not entries and block_time:
+            entries = self._flatten_read(await client.xreadgroup(
+                group_name,
+                consumer_name,
+                {stream_name: ">" for stream_name in lanes.values()},
+                count=count,
+                block=block_time
+            ))
+        
+        rank = {stream_name: index for index, stream_name in enumerate(lanes.values())}
+        entries.sort(key=lambda entry: rank.get(entry[0], len(rank)))
+        return entries
+    
+    @staticmethod
+    def _flatten_read(result) -> List[StreamEntry]:
+        return [
+            (stream_name, message_id, fields)
+            for stream_name, stream_messages in result or []
+            for message_id, fields in stream_messages
+        ]
+    
+    async def _promote_due(self, client, creator_id: str, queue_name: str, limit: int = 100) -> int:
+        """Move delayed retries whose backoff elapsed back onto their lanes"""
+        lanes = self._get_lane_streams(creator_id, queue_name)
+        promoted = await client.eval(
+            PROMOTE_DUE_SCRIPT,
+            1 + len(lanes),
+            self._get_delayed_key(creator_id, queue_name),
+            *lanes.values(),
+            time.time(),
+            limit,
+            *lanes.keys()
+        )
+        if promoted:
+            logger.debug(f"Promoted {promoted} delayed messages on queue {queue_name}")
+        return promoted
+    
+    def _parse_message(self, message_id: str, fields: Dict[str, str]) -> Dict[str, Any]:
+        """Turn raw stream fields into the message dict handed to handlers"""
+        return {
+            "message_id": message_id,
+            "id": fields.get("id"),
+            "type": fields.get("type"),
+            "creator_id": fields.get("creator_id"),
+            "priority": fields.get("priority", DEFAULT_PRIORITY),
+            "data": json.loads(fields.get("data", "{}")),
+            "timestamp": fields.get("timestamp"),
+            "retry_count": int(fields.get("retry_count", 0))
+        }
+    
+    def _message_fields(self, message_data: Dict[str, Any], retry_count: int, **extra: str) -> Dict[str, str]:
+        """Stream fields for re-sending a parsed message"""
+        fields = {
+            "id": message_data.get("id") or str(uuid.uuid4()),
+            "type": message_data.get("type") or "unknown",
+            "creator_id": message_data.get("creator_id") or "",
+            "priority": self._get_priority(message_data.get("priority")),
+            "data": json.dumps(message_data.get("data", {})),
+            "timestamp": datetime.utcnow().isoformat(),
+            "retry_count": str(retry_count)
+        }
+        fields.update(extra)
+        return fields
+    
+    async def _run_handler(
+        self,
+        handler: Callable[[Dict[str, Any]], Awaitable[bool]],
+        message_id: str,
+        fields: Dict[str, str]
+    ) -> Tuple[bool, Dict[str, Any]]:
+        """
+        Run the handler for one message
+        
+        Returns:
+            Whether the handler succeeded, and the parsed message
+        """
+        message_data: Dict[str, Any] = {
+            "id": fields.get("id"),
+            "type": fields.get("type"),
+            "creator_id": fields.get("creator_id"),
+            "priority": fields.get("priority"),
+            "retry_count": int(fields.get("retry_count", 0))
+        }
+        try:
+            # Parse message
+            message_data = self._parse_message(message_id, fields)
+            
+            # Handle message
+            if await handler(message_data):
+                logger.debug(f"Processed message {message_data['id']}")
+                return True, message_data
+            
+        except Exception as e:
+            logger.error(f"Error processing message {message_id}: {e}")
+        
+        return False, message_data
+    
+    async def _process_message(
+        self,
+        client,
+        creator_id: str,
+        queue_name: str,
+        handler: Callable[[Dict[str, Any]], Awaitable[bool]],
+        message_id: str,
+        fields: Dict[str, str]
+    ) -> bool:
+        """
+        Run the handler for one message, scheduling a retry if it fails
+        
+        Returns:
+            True once the entry can be acknowledged, False to leave it pending
+        """
+        succeeded, message_data = await self._run_handler(handler, message_id, fields)
+        if succeeded:
+            return True
+        
+        try:
+            await self._handle_message_retry(client, creator_id, queue_name, message_id, message_data)
+            return True
+        except Exception as e:
+            logger.error(f"Failed to schedule retry for message {message_id}: {e}")
+            return False
+    
+    async def _process_ordered(
+        self,
+        client,
+        creator_id: str,
+        queue_name: str,
+        handler: Callable[[Dict[str, Any]], Awaitable[bool]],
+        holds: Dict[str, _KeyHold],
+        key: str,
+        message_id: str,
+        fields: Dict[str, str],
+        hold_timeout: float
+    ) -> bool:
+        """
+        Handle one message of an ordered lane, parking it behind a pending retry of its key
+        
+        Returns:
+            True once the entry can be acknowledged, False to leave it (and the rest of its lane) pending
+        """
+        logical_id = fields.get("id") or message_id
+        hold = holds.get(key)
+        if hold is not None and time.time() > hold.head_due + hold_timeout:
+            logger.warning(f"Releasing order hold on key {key}: its retry did not come back in time")
+            holds.pop(key, None)
+            hold = None
+        
+        if hold is not None and hold.message_ids and hold.message_ids[0] != logical_id:
+            # An earlier message of this key is waiting for its retry; queue up behind it
+            try:
+                entry = {
+                    "priority": self._get_priority(fields.get("priority")),
+                    "fields": {**fields, "id": logical_id}
+                }
+                await client.zadd(self._get_delayed_key(creator_id, queue_name), {json.dumps(entry): hold.next_due()})
+            except Exception as e:
+                logger.error(f"Failed to park message {message_id} behind key {key}: {e}")
+                return False
+            if logical_id not in hold.message_ids:
+                hold.message_ids.append(logical_id)
+            return True
+        
+        succeeded, message_data = await self._run_handler(handler, message_id, fields)
+        if not succeeded:
+            try:
+                due = await self._handle_message_retry(client, creator_id, queue_name, message_id, message_data)
+            except Exception as e:
+                logger.error(f"Failed to schedule retry for message {message_id}: {e}")
+                return False
+            if due is not None:
+                if hold is None:
+                    hold = holds[key] = _KeyHold(due)
+                if not hold.message_ids or hold.message_ids[0] != logical_id:
+                    hold.message_ids.appendleft(logical_id)
+                hold.head_due = due
+                hold.tail_due = max(hold.tail_due, due)
+                return True
+        
+        # Handled or dead-lettered: the next parked message of the key may run
+        if hold is not None:
+            if hold.message_ids and hold.message_ids[0] == logical_id:
+                hold.message_ids.popleft()
+            if hold.message_ids:
+                hold.head_due = hold.tail_due
+            else:
+                holds.pop(key, None)
+        return True
+    
+    async def _ack(self, client, group_name: str, to_ack: Dict[str, List[str]]) -> None:
+        """Acknowledge collected entries with a single XACK per stream"""
+        for stream_name, message_ids in to_ack.items():
+            if not message_ids:
+                continue
+            batch = message_ids[:]
+            del message_ids[:len(batch)]
+            try:
+                await client.xack(stream_name, group_name, *batch)
+            except Exception:
+                message_ids.extend(batch)
+                raise
+    
+    async def _reclaim(
+        self,
+        client,
+        lanes: Dict[str, str],
+        group_name: str,
+        consumer_name: str,
+        min_idle_ms: int,
+        count: int
+    ) -> List[StreamEntry]:
+        """Take over entries another consumer left pending for at least ``min_idle_ms``"""
+        claimed: List[StreamEntry] = []
+        for stream_name in lanes.values():
+            start_id = "0-0"
+            while len(claimed) < count:
+                result = await client.xautoclaim(
+                    stream_name, group_name, consumer_name, min_idle_ms, start_id=start_id, count=count - len(claimed)
+                )
+                start_id, entries = result[0], result[1]
+                # Entries deleted from the stream come back without fields
+                claimed.extend(
+                    (stream_name, message_id, fields) for message_id, fields in entries if fields
+                )
+                if start_id in ("0-0", b"0-0"):
+                    break
+        if claimed:
+            logger.warning(f"Reclaimed {len(claimed)} stale pending messages from {lanes[DEFAULT_PRIORITY]}")
+        return claimed
+    
+    async def get_consumer_lag(self, creator_id: str, queue_name: str) -> Dict[str, Any]:
+        """
+        Backlog of a queue's consumer group over all priority lanes
+        
+        Returns:
+            ``pending`` (delivered, not yet acknowledged), ``lag`` (not yet
+            delivered; None on Redis < 7) and ``consumers``
+        """
+        client = await self.redis.get_client()
+        group_name = self._get_consumer_group_name(queue_name)
+        backlog: Dict[str, Any] = {"pending": 0, "lag": None, "consumers": 0}
+        lag: Optional[int] = 0
+        found = False
+        for stream_name in self._get_lane_streams(creator_id, queue_name).values():
+            if not await client.exists(stream_name):
+                continue
+            for group in await client.xinfo_groups(stream_name):
+                if group.get("name") == group_name:
+                    found = True
+                    backlog["pending"] += group.get("pending", 0)
+                    backlog["consumers"] = max(backlog["consumers"], group.get("consumers", 0))
+                    group_lag = group.get("lag")
+                    lag = None if lag is None or group_lag is None else lag + group_lag
+        if found:
+            backlog["lag"] = lag
+        return backlog
+    
+    async def _report_lag(self, creator_id: str, queue_name: str) -> None:
+        metrics = get_optional_metrics_collector()
+        if metrics is None:
+            return
+        try:
+            lag = await self.get_consumer_lag(creator_id, queue_name)
+            metrics.set_message_queue_lag(queue_name, lag["lag"] or 0, lag["pending"])
+        except Exception as e:
+            logger.debug(f"Failed to report consumer lag for {queue_name}: {e}")
+    
+    def retry_delay(self, retry_count: int) -> float:
+        """Backoff before retry number ``retry_count`` (exponential, jittered, capped)"""
+        delay = min(self.retry_max_delay, self.retry_base_delay * (2 ** (retry_count - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+    
     async def _handle_message_retry(
         self, 
         client, 
-        stream_name: str, 
-        group_name: str, 
+        creator_id: str,
+        queue_name: str,
         message_id: str,
-        message_data: Dict[str, Any],
-        max_retries: int = 3
-    ) -> None:
-        """Handle message retry logic"""
+        message_data: Dict[str, Any]
+    ) -> Optional[float]:
+        """
+        Schedule a delayed retry or dead-letter the message (the caller acknowledges the original)
+        
+        Returns:
+            When the retry is due, or None if the message was dead-lettered
+        """
         retry_count = message_data.get("retry_count", 0)
         
-        if retry_count < max_retries:
-            # Increment retry count and re-add to stream
+        if retry_count < self.max_retries:
+            # Park the message until its backoff elapsed; consumers promote it back onto its lane
             retry_count += 1
-            retry_message = {
-                "id": message_data.get("id", str(uuid.uuid4())),
-                "type": message_data.get("type", "unknown"),
-                "creator_id": message_data.get("creator_id"),
-                "priority": message_data.get("priority", "normal"),
-                "data": json.dumps(message_data.get("data", {})),
-                "timestamp": datetime.utcnow().isoformat(),
-                "retry_count": str(retry_count),
-                "original_message_id": message_id
+            delay = self.retry_delay(retry_count)
+            entry = {
+                "priority": self._get_priority(message_data.get("priority")),
+                "fields": self._message_fields(message_data, retry_count, original_message_id=message_id)
             }
-            
-            await client.xadd(stream_name, retry_message)
-            logger.warning(f"Retrying message {message_data.get('id')} (attempt {retry_count})")
+            due = time.time() + delay
+            await client.zadd(self._get_delayed_key(creator_id, queue_name), {json.dumps(entry): due})
+            logger.warning(f"Retrying message {message_data.get('id')} in {delay:.1f}s (attempt {retry_count})")
+            return due
         else:
             # Move to dead letter queue
-            dead_letter_stream = f"{stream_name}:dead_letter"
-            dead_letter_message = {
-                "original_message_id": message_id,
-                "failed_at": datetime.utcnow().isoformat(),
-                "retry_count": str(retry_count),
-                **{k: v for k, v in message_data.items() if k != "retry_count"}
+            dead_letter_message = self._message_fields(
+                message_data,
+                retry_count,
+                original_message_id=message_id,
+                failed_at=datetime.utcnow().isoformat()
+            )
+            await client.xadd(self._get_dead_letter_stream(creator_id, queue_name), dead_letter_message)
+            logger.error(f"Message {message_data.get('id')} moved to dead letter queue after {retry_count} retries")
+            return None
+    
+    async def get_dead_letters(self, creator_id: str, queue_name: str, count: int = 100) -> List[Dict[str, Any]]:
+        """
+        List dead-lettered messages, oldest first
+        
+        Args:
+            creator_id: Creator/tenant ID
+            queue_name: Queue name
+            count: Maximum number of messages to return
+            
+        Returns:
+            Parsed messages with ``original_message_id`` and ``failed_at``
+        """
+        client = await self.redis.get_client()
+        entries = await client.xrange(self._get_dead_letter_stream(creator_id, queue_name), count=count)
+        return [
+            {
+                **self._parse_message(message_id, fields),
+                "original_message_id": fields.get("original_message_id"),
+                "failed_at": fields.get("failed_at")
             }
+            for message_id, fields in entries
+        ]
+    
+    async def replay_dead_letters(
+        self,
+        creator_id: str,
+        queue_name: str,
+        count: int = 100,
+        message_ids: Optional[List[str]] = None,
+        priority: Optional[str] = None
+    ) -> int:
+        """
+        Move dead-lettered messages back onto their lanes with a fresh retry budget
+        
+        Args:
+            creator_id: Creator/tenant ID
+            queue_name: Queue name
+            count: Maximum number of messages to replay, oldest first
+            message_ids: Replay only these dead-letter entries
+            priority: Lane to replay into (defaults to each message's own)
             
-            await client.xadd(dead_letter_stream, dead_letter_message)
-            logger.error(f"Message {message_data.get('id')} moved to dead letter queue after {retry_count} retries")
+        Returns:
+            Number of messages replayed
+        """
+        if priority is not None and priority not in PRIORITIES:
+            raise ValueError(f"Unknown priority {priority!r}, expected one of {', '.join(PRIORITIES)}")
         
-        # Acknowledge original message
-        await client.xack(stream_name, group_name, message_id)
+        client = await self.redis.get_client()
+        dead_letter_stream = self._get_dead_letter_stream(creator_id, queue_name)
+        if message_ids:
+            entries = []
+            for message_id in message_ids:
+                entries.extend(await client.xrange(dead_letter_stream, message_id, message_id))
+        else:
+            entries = await client.xrange(dead_letter_stream, count=count)
+        if not entries:
+            return 0
+        
+        await self.create_stream(creator_id, queue_name)
+        async with client.pipeline(transaction=True) as pipe:
+            for message_id, fields in entries:
+                lane = priority or self._get_priority(fields.get("priority"))
+                message = {k: v for k, v in fields.items() if k not in ("failed_at", "original_message_id")}
+                message.update(priority=lane, retry_count="0", replayed_from=message_id)
+                pipe.xadd(self._get_stream_name(creator_id, queue_name, lane), message)
+                pipe.xdel(dead_letter_stream, message_id)
+            await pipe.execute()
+        
+        logger.info(f"Replayed {len(entries)} dead-lettered messages on queue {queue_name} for creator {creator_id}")
+        return len(entries)
     
     async def stop_consumer(self, creator_id: str, queue_name: str, consumer_name: str) -> None:
         """Stop a specific consumer"""
@@ -280,10 +908,17 @@ class MessageQueue:
             
             # Get stream info
             info = await client.xinfo_stream(stream_name)
+            lanes = {
+                priority: await client.xlen(lane_stream)
+                for priority, lane_stream in self._get_lane_streams(creator_id, queue_name).items()
+            }
             
             return {
                 "stream_name": stream_name,
-                "length": info.get("length", 0),
+                "length": sum(lanes.values()),
+                "lanes": lanes,
+                "delayed": await client.zcard(self._get_delayed_key(creator_id, queue_name)),
+                "dead_letter": await client.xlen(self._get_dead_letter_stream(creator_id, queue_name)),
                 "first_entry": info.get("first-entry"),
                 "last_entry": info.get("last-entry"),
                 "groups": info.get("groups", 0)
@@ -294,7 +929,7 @@ class MessageQueue:
     
     async def purge_queue(self, creator_id: str, queue_name: str) -> bool:
         """
-        Purge all messages from a queue
+        Purge all messages from a queue (every lane and pending retries)
         
         Args:
             creator_id: Creator/tenant ID
@@ -305,10 +940,12 @@ class MessageQueue:
         """
         try:
             client = await self.redis.get_client()
-            stream_name = self._get_stream_name(creator_id, queue_name)
             
-            # Delete the stream (this removes all messages)
-            await client.delete(stream_name)
+            # Delete the streams (this removes all messages)
+            await client.delete(
+                *self._get_lane_streams(creator_id, queue_name).values(),
+                self._get_delayed_key(creator_id, queue_name)
+            )
             
             # Recreate the stream and consumer group
             await self.create_stream(creator_id, queue_name)
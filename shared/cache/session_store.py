@@ -1,40 +1,175 @@
 """
 Redis-based session storage for MVP Coaching AI Platform
 Handles user sessions with multi-tenant support
+
+Reads only record activity in process; it is flushed to a per-creator sorted
+set (session ID scored by last activity) every ``activity_flush_interval``
+seconds, instead of rewriting the session JSON on every read. A user's
+sessions are indexed in a Redis set.
+
+Statistics come from per-creator counters of active sessions by channel,
+kept up to date on create, end and delete, so reading them costs one HGETALL
+and one ZCARD. Sessions that expire through their key TTL are taken out of
+the counters using a second sorted set scored by each key's expiry time.
+Expiry sweeps read idle sessions from the activity set.
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional, Dict, Any, List
-from datetime import datetime, timedelta
+import time
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime
 import uuid
 from .redis_client import RedisClient
 
 logger = logging.getLogger(__name__)
 
+# Atomic session update; values are stored in RedisClient's {"__cached__", "v"} envelope
+# KEYS: session, stats hash, channels hash; ARGV: updates JSON, timestamp, session ID
+UPDATE_SESSION_SCRIPT = """
+local key = KEYS[1]
+local updates_json = ARGV[1]
+local current_time = ARGV[2]
+
+-- Get current session data
+local current_data = redis.call('GET', key)
+if not current_data then
+    return 0  -- Session not found
+end
+
+-- Parse current data
+local envelope = cjson.decode(current_data)
+local session_data = envelope
+if envelope.__cached__ then
+    session_data = envelope.v
+end
+if type(session_data) ~= 'table' or not session_data.is_active then
+    return 0  -- Session not active
+end
+
+-- Parse updates
+local updates = cjson.decode(updates_json)
+
+-- Apply updates
+for k, v in pairs(updates) do
+    session_data[k] = v
+end
+
+-- Update last activity
+session_data.last_activity = current_time
+
+-- Ending the session takes it out of the active counters (once)
+if session_data.is_active == false then
+    local channel = redis.call('HGET', KEYS[3], ARGV[3])
+    if channel and redis.call('HDEL', KEYS[3], ARGV[3]) == 1 then
+        redis.call('HINCRBY', KEYS[2], 'active:' .. channel, -1)
+    end
+end
+
+-- Save updated data with original TTL
+local ttl = redis.call('TTL', key)
+if ttl > 0 then
+    redis.call('SETEX', key, ttl, cjson.encode(envelope))
+else
+    redis.call('SET', key, cjson.encode(envelope))
+end
+
+return 1  -- Success
+"""
+
+# Drop sessions from the activity and expiry indexes and the active counters
+# KEYS: activity set, stats hash, channels hash, expiry set; ARGV: session IDs
+UNCOUNT_SESSIONS_SCRIPT = """
+for _, session_id in ipairs(ARGV) do
+    redis.call('ZREM', KEYS[1], session_id)
+    redis.call('ZREM', KEYS[4], session_id)
+    local channel = redis.call('HGET', KEYS[3], session_id)
+    if channel and redis.call('HDEL', KEYS[3], session_id) == 1 then
+        redis.call('HINCRBY', KEYS[2], 'active:' .. channel, -1)
+    end
+end
+return #ARGV
+"""
+
+# Prefix of the per-channel active session counters
+ACTIVE_COUNTER_PREFIX = "active:"
+
 
 class SessionStore:
     """Redis-based session storage with multi-tenant support"""
     
-    def __init__(self, redis_client: RedisClient, default_ttl: int = 86400):  # 24 hours
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        default_ttl: int = 86400,  # 24 hours
+        activity_flush_interval: float = 30.0
+    ):
         """
         Initialize session store
         
         Args:
             redis_client: Redis client instance
             default_ttl: Default session TTL in seconds
+            activity_flush_interval: Seconds between writes of buffered session activity
         """
         self.redis = redis_client
         self.default_ttl = default_ttl
+        self.activity_flush_interval = activity_flush_interval
+        # (creator_id, session_id) -> last activity (epoch seconds) not yet written
+        self._pending_activity: Dict[Tuple[str, str], float] = {}
+        self._last_activity_flush = time.monotonic()
+        self._flusher: Optional[asyncio.Task] = None
+    
+    async def start(self) -> None:
+        """Flush buffered activity every ``activity_flush_interval`` seconds in the background"""
+        if self._flusher is not None:
+            return
+        self._flusher = asyncio.create_task(self._flush_periodically())
+    
+    async def stop(self) -> None:
+        """Stop the background flush and write what is still buffered"""
+        if self._flusher:
+            self._flusher.cancel()
+            try:
+                await self._flusher
+            except asyncio.CancelledError:
+                pass
+            self._flusher = None
+        await self.flush_activity()
+    
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.activity_flush_interval)
+            try:
+                await self.flush_activity()
+            except Exception as e:
+                logger.error(f"Session activity flush failed: {e}")
     
     def _get_session_key(self, session_id: str) -> str:
         """Generate session key"""
         return f"session:{session_id}"
     
     def _get_user_sessions_key(self, creator_id: str, user_id: str) -> str:
-        """Generate key for user's active sessions"""
+        """Generate key for the set of a user's session IDs"""
         return f"user_sessions:{user_id}"
     
+    def _get_activity_key(self, creator_id: str) -> str:
+        """Generate key for the creator's sessions ordered by last activity"""
+        return "session_activity"
+    
+    def _get_expiry_key(self, creator_id: str) -> str:
+        """Generate key for the creator's sessions ordered by when their key expires"""
+        return "session_expiry"
+    
+    def _get_stats_key(self, creator_id: str) -> str:
+        """Generate key for the creator's active session counters by channel"""
+        return "session_stats"
+    
+    def _get_channels_key(self, creator_id: str) -> str:
+        """Generate key for the channel of every counted active session"""
+        return "session_channels"
+    
     async def create_session(
         self, 
         creator_id: str, 
@@ -76,10 +211,39 @@ class SessionStore:
         session_key = self._get_session_key(session_id)
         success = await self.redis.set(creator_id, session_key, session_data, ttl)
         
-        if success and user_id:
-            # Add to user's active sessions list
-            user_sessions_key = self._get_user_sessions_key(creator_id, user_id)
-            await self.redis.set(creator_id, f"{user_sessions_key}:{session_id}", session_id, ttl)
+        if success:
+            try:
+                client = await self.redis.get_client()
+                async with client.pipeline(transaction=True) as pipe:
+                    pipe.zadd(
+                        self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id)),
+                        {session_id: time.time()}
+                    )
+                    pipe.zadd(
+                        self.redis._get_namespaced_key(creator_id, self._get_expiry_key(creator_id)),
+                        {session_id: time.time() + ttl}
+                    )
+                    pipe.hset(
+                        self.redis._get_namespaced_key(creator_id, self._get_channels_key(creator_id)),
+                        session_id,
+                        channel
+                    )
+                    pipe.hincrby(
+                        self.redis._get_namespaced_key(creator_id, self._get_stats_key(creator_id)),
+                        f"{ACTIVE_COUNTER_PREFIX}{channel}",
+                        1
+                    )
+                    await pipe.execute()
+                if user_id:
+                    # Index the session under its user; the set lives as long as the newest session
+                    user_sessions_key = self.redis._get_namespaced_key(
+                        creator_id, self._get_user_sessions_key(creator_id, user_id)
+                    )
+                    await client.sadd(user_sessions_key, session_id)
+                    if await client.ttl(user_sessions_key) < ttl:
+                        await client.expire(user_sessions_key, ttl)
+            except Exception as e:
+                logger.warning(f"Failed to index session {session_id} for creator {creator_id}: {e}")
         
         logger.info(f"Created session {session_id} for creator {creator_id}")
         return session_id
@@ -91,7 +255,7 @@ class SessionStore:
         Args:
             creator_id: Creator/tenant ID
             session_id: Session ID
-            update_activity: Whether to update last activity timestamp
+            update_activity: Whether to record activity (buffered, see ``touch_session``)
             
         Returns:
             Session data or None if not found
@@ -101,12 +265,71 @@ class SessionStore:
         
         if session_data and session_data.get("is_active"):
             if update_activity:
-                # Update last activity atomically
-                await self.update_session(creator_id, session_id, {})
+                session_data["last_activity"] = datetime.utcnow().isoformat()
+                await self.touch_session(creator_id, session_id)
             return session_data
         
         return None
     
+    async def touch_session(self, creator_id: str, session_id: str) -> None:
+        """
+        Record session activity
+        
+        The timestamp is buffered in process; buffered activity of all
+        sessions is written in one batch once ``activity_flush_interval``
+        has passed since the last flush, here or in the background flush
+        started by ``start``.
+        """
+        self._pending_activity[(creator_id, session_id)] = time.time()
+        if time.monotonic() - self._last_activity_flush >= self.activity_flush_interval:
+            await self.flush_activity()
+    
+    async def flush_activity(self) -> int:
+        """
+        Write buffered session activity to the per-creator activity sets
+        
+        Returns:
+            Number of sessions written
+        """
+        self._last_activity_flush = time.monotonic()
+        if not self._pending_activity:
+            return 0
+        
+        pending, self._pending_activity = self._pending_activity, {}
+        by_creator: Dict[str, Dict[str, float]] = {}
+        for (creator_id, session_id), last_activity in pending.items():
+            by_creator.setdefault(creator_id, {})[session_id] = last_activity
+        
+        try:
+            client = await self.redis.get_client()
+            async with client.pipeline(transaction=False) as pipe:
+                for creator_id, activity in by_creator.items():
+                    # GT: never move a session back to an older timestamp
+                    pipe.zadd(
+                        self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id)),
+                        activity,
+                        gt=True
+                    )
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to flush session activity: {e}")
+            for key, last_activity in pending.items():
+                self._pending_activity.setdefault(key, last_activity)
+            return 0
+        
+        logger.debug(f"Flushed activity of {len(pending)} sessions")
+        return len(pending)
+    
+    async def get_last_activity(self, creator_id: str, session_id: str) -> Optional[float]:
+        """Last activity of a session (epoch seconds), including buffered activity"""
+        pending = self._pending_activity.get((creator_id, session_id))
+        if pending is not None:
+            return pending
+        client = await self.redis.get_client()
+        return await client.zscore(
+            self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id)), session_id
+        )
+    
     async def update_session(
         self, 
         creator_id: str, 
@@ -127,46 +350,6 @@ class SessionStore:
         session_key = self._get_session_key(session_id)
         namespaced_key = self.redis._get_namespaced_key(creator_id, session_key)
         
-        # Lua script for atomic session update
-        lua_script = """
-        local key = KEYS[1]
-        local updates_json = ARGV[1]
-        local current_time = ARGV[2]
-        
-        -- Get current session data
-        local current_data = redis.call('GET', key)
-        if not current_data then
-            return 0  -- Session not found
-        end
-        
-        -- Parse current data
-        local session_data = cjson.decode(current_data)
-        if not session_data.is_active then
-            return 0  -- Session not active
-        end
-        
-        -- Parse updates
-        local updates = cjson.decode(updates_json)
-        
-        -- Apply updates
-        for k, v in pairs(updates) do
-            session_data[k] = v
-        end
-        
-        -- Update last activity
-        session_data.last_activity = current_time
-        
-        -- Save updated data with original TTL
-        local ttl = redis.call('TTL', key)
-        if ttl > 0 then
-            redis.call('SETEX', key, ttl, cjson.encode(session_data))
-        else
-            redis.call('SET', key, cjson.encode(session_data))
-        end
-        
-        return 1  -- Success
-        """
-        
         try:
             client = await self.redis.get_client()
             
@@ -176,14 +359,18 @@ class SessionStore:
             
             # Execute Lua script
             result = await client.eval(
-                lua_script, 
-                1, 
+                UPDATE_SESSION_SCRIPT, 
+                3, 
                 namespaced_key, 
+                self.redis._get_namespaced_key(creator_id, self._get_stats_key(creator_id)),
+                self.redis._get_namespaced_key(creator_id, self._get_channels_key(creator_id)),
                 updates_json, 
-                current_time
+                current_time,
+                session_id
             )
             
             if result == 1:
+                self._pending_activity[(creator_id, session_id)] = time.time()
                 logger.debug(f"Successfully updated session {session_id} for creator {creator_id}")
                 return True
             else:
@@ -234,7 +421,24 @@ class SessionStore:
             True if successful
         """
         session_key = self._get_session_key(session_id)
-        return await self.redis.delete(creator_id, session_key)
+        session_data = await self.redis.get(creator_id, session_key)
+        deleted = await self.redis.delete(creator_id, session_key)
+        
+        self._pending_activity.pop((creator_id, session_id), None)
+        try:
+            await self._uncount_sessions(creator_id, [session_id])
+            client = await self.redis.get_client()
+            if isinstance(session_data, dict) and session_data.get("user_id"):
+                await client.srem(
+                    self.redis._get_namespaced_key(
+                        creator_id, self._get_user_sessions_key(creator_id, session_data["user_id"])
+                    ),
+                    session_id
+                )
+        except Exception as e:
+            logger.warning(f"Failed to unindex session {session_id} for creator {creator_id}: {e}")
+        
+        return deleted
     
     async def get_user_sessions(self, creator_id: str, user_id: str) -> List[Dict[str, Any]]:
         """
@@ -247,49 +451,125 @@ class SessionStore:
         Returns:
             List of active sessions
         """
-        # Get session IDs for user
-        pattern = f"user_sessions:{user_id}:*"
-        session_keys = await self.redis.get_keys_pattern(creator_id, pattern)
+        client = await self.redis.get_client()
+        user_sessions_key = self.redis._get_namespaced_key(
+            creator_id, self._get_user_sessions_key(creator_id, user_id)
+        )
+        session_ids = sorted(await client.smembers(user_sessions_key))
+        if not session_ids:
+            return []
+        
+        values = await client.mget([
+            self.redis._get_namespaced_key(creator_id, self._get_session_key(session_id))
+            for session_id in session_ids
+        ])
         
         sessions = []
-        for key in session_keys:
-            session_id = key.split(":")[-1]
-            session_data = await self.get_session(creator_id, session_id)
-            if session_data and session_data.get("is_active"):
+        expired = []
+        for session_id, value in zip(session_ids, values):
+            if value is None:
+                expired.append(session_id)
+                continue
+            session_data = self.redis._deserialize_value(value)
+            if isinstance(session_data, dict) and session_data.get("__cached__") is True:
+                session_data = session_data.get("v")
+            if isinstance(session_data, dict) and session_data.get("is_active"):
                 sessions.append(session_data)
         
+        if expired:
+            # Sessions that expired through their TTL drop out of the index lazily
+            await client.srem(user_sessions_key, *expired)
+        
         return sessions
     
-    async def cleanup_expired_sessions(self, creator_id: str) -> int:
+    async def _uncount_sessions(self, creator_id: str, session_ids: List[str]) -> None:
+        client = await self.redis.get_client()
+        await client.eval(
+            UNCOUNT_SESSIONS_SCRIPT,
+            4,
+            self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id)),
+            self.redis._get_namespaced_key(creator_id, self._get_stats_key(creator_id)),
+            self.redis._get_namespaced_key(creator_id, self._get_channels_key(creator_id)),
+            self.redis._get_namespaced_key(creator_id, self._get_expiry_key(creator_id)),
+            *session_ids
+        )
+    
+    async def _uncount_expired_sessions(self, creator_id: str, batch_size: int = 500) -> int:
+        """
+        Take sessions whose key expired through its TTL out of the indexes and counters
+        
+        Sessions due to expire whose key still exists (clock skew, a TTL
+        changed since creation) are rescheduled at their remaining TTL.
+        
+        Returns:
+            Number of expired sessions uncounted
+        """
+        client = await self.redis.get_client()
+        expiry_key = self.redis._get_namespaced_key(creator_id, self._get_expiry_key(creator_id))
+        
+        uncounted = 0
+        while True:
+            now = time.time()
+            session_ids = await client.zrangebyscore(expiry_key, "-inf", now, start=0, num=batch_size)
+            if not session_ids:
+                break
+            
+            async with client.pipeline(transaction=False) as pipe:
+                for session_id in session_ids:
+                    pipe.pttl(self.redis._get_namespaced_key(creator_id, self._get_session_key(session_id)))
+                remaining = await pipe.execute()
+            
+            expired = [session_id for session_id, ttl in zip(session_ids, remaining) if ttl == -2]
+            alive = {
+                session_id: now + ttl / 1000
+                for session_id, ttl in zip(session_ids, remaining) if ttl >= 0
+            }
+            persistent = [session_id for session_id, ttl in zip(session_ids, remaining) if ttl == -1]
+            if expired:
+                await self._uncount_sessions(creator_id, expired)
+            if alive:
+                await client.zadd(expiry_key, alive)
+            if persistent:
+                await client.zrem(expiry_key, *persistent)
+            uncounted += len(expired)
+        
+        return uncounted
+    
+    async def cleanup_expired_sessions(self, creator_id: str, batch_size: int = 500) -> int:
         """
         Clean up expired sessions for a creator
         
+        Sessions idle for longer than ``default_ttl`` are read from the
+        activity set and deleted in batches, together with their index and
+        counter entries. Sessions that already expired through their TTL
+        (whatever TTL they were created with) are only removed from the
+        index and counters.
+        
         Args:
             creator_id: Creator/tenant ID
+            batch_size: Sessions removed per round trip
             
         Returns:
             Number of sessions cleaned up
         """
-        # Get all session keys
-        pattern = "session:*"
-        session_keys = await self.redis.get_keys_pattern(creator_id, pattern)
-        
-        cleaned_count = 0
-        for key in session_keys:
-            session_data = await self.redis.get(creator_id, key)
-            if not session_data:
-                continue
+        await self.flush_activity()
+        cleaned_count = await self._uncount_expired_sessions(creator_id, batch_size)
+        
+        client = await self.redis.get_client()
+        activity_key = self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id))
+        cutoff = time.time() - self.default_ttl
+        
+        while True:
+            session_ids = await client.zrangebyscore(activity_key, "-inf", cutoff, start=0, num=batch_size)
+            if not session_ids:
+                break
             
-            # Check if session is expired based on last activity
-            try:
-                last_activity = datetime.fromisoformat(session_data.get("last_activity", ""))
-                if datetime.utcnow() - last_activity > timedelta(seconds=self.default_ttl):
-                    await self.redis.delete(creator_id, key)
-                    cleaned_count += 1
-            except (ValueError, TypeError):
-                # Invalid timestamp, delete session
-                await self.redis.delete(creator_id, key)
-                cleaned_count += 1
+            await client.delete(*(
+                self.redis._get_namespaced_key(creator_id, self._get_session_key(session_id))
+                for session_id in session_ids
+            ))
+            await self._uncount_sessions(creator_id, session_ids)
+            cleaned_count += len(session_ids)
         
         if cleaned_count > 0:
             logger.info(f"Cleaned up {cleaned_count} expired sessions for creator {creator_id}")
@@ -300,35 +580,33 @@ class SessionStore:
         """
         Get session statistics for a creator
         
+        Sessions count until they are ended, deleted, swept by
+        ``cleanup_expired_sessions`` or their key expires.
+        
         Args:
             creator_id: Creator/tenant ID
             
         Returns:
             Session statistics
         """
-        # Get all session keys
-        pattern = "session:*"
-        session_keys = await self.redis.get_keys_pattern(creator_id, pattern)
+        await self._uncount_expired_sessions(creator_id)
         
-        total_sessions = len(session_keys)
-        active_sessions = 0
-        channels = {}
+        client = await self.redis.get_client()
+        counters = await client.hgetall(self.redis._get_namespaced_key(creator_id, self._get_stats_key(creator_id)))
+        total_sessions = await client.zcard(
+            self.redis._get_namespaced_key(creator_id, self._get_activity_key(creator_id))
+        )
         
-        for key in session_keys:
-            session_data = await self.redis.get(creator_id, key)
-            if not session_data:
-                continue
-            
-            if session_data.get("is_active"):
-                active_sessions += 1
-                
-                channel = session_data.get("channel", "unknown")
-                channels[channel] = channels.get(channel, 0) + 1
+        channels = {}
+        for field, value in counters.items():
+            if field.startswith(ACTIVE_COUNTER_PREFIX) and int(value) > 0:
+                channels[field[len(ACTIVE_COUNTER_PREFIX):]] = int(value)
+        active_sessions = sum(channels.values())
         
         return {
             "total_sessions": total_sessions,
             "active_sessions": active_sessions,
-            "inactive_sessions": total_sessions - active_sessions,
+            "inactive_sessions": max(0, total_sessions - active_sessions),
             "channels": channels
         }
 
@@ -0,0 +1,219 @@
+"""
+Day/month-bucketed usage counters for MVP Coaching AI Platform
+Atomic limit checks in Redis with write-behind flushing to the database
+"""
+
+import logging
+from typing import Optional, Dict, Any, List, Tuple
+from datetime import datetime, timedelta, timezone
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+
+# Reserve ``amount`` in the day and month buckets unless either limit would be
+# exceeded (limit < 0 = unlimited); marks the entity dirty for the next flush.
+# Buckets expire on their own, which is what resets the counts.
+#
+# KEYS: day key, month key, dirty set
+# ARGV: amount, daily limit, monthly limit, day expire-at, month expire-at, dirty member
+# Returns: {allowed, daily count, monthly count}
+RESERVE_SCRIPT = """
+local amount = tonumber(ARGV[1])
+local daily_limit = tonumber(ARGV[2])
+local monthly_limit = tonumber(ARGV[3])
+local daily = tonumber(redis.call('GET', KEYS[1]) or '0')
+local monthly = tonumber(redis.call('GET', KEYS[2]) or '0')
+
+if (daily_limit >= 0 and daily + amount > daily_limit) or
+   (monthly_limit >= 0 and monthly + amount > monthly_limit) then
+    return {0, daily, monthly}
+end
+
+daily = redis.call('INCRBY', KEYS[1], amount)
+monthly = redis.call('INCRBY', KEYS[2], amount)
+redis.call('EXPIREAT', KEYS[1], ARGV[4])
+redis.call('EXPIREAT', KEYS[2], ARGV[5])
+redis.call('SADD', KEYS[3], ARGV[6])
+return {1, daily, monthly}
+"""
+
+# Give back a reservation whose message was never sent (never below zero)
+RELEASE_SCRIPT = """
+local amount = tonumber(ARGV[1])
+local counts = {}
+for i = 1, 2 do
+    local value = tonumber(redis.call('GET', KEYS[i]) or '0')
+    if value > 0 then
+        value = redis.call('DECRBY', KEYS[i], math.min(amount, value))
+    end
+    counts[i] = value
+end
+redis.call('SADD', KEYS[3], ARGV[2])
+return counts
+"""
+
+
+class UsageCounters:
+    """
+    Usage counters kept in Redis and flushed to the database in batches
+
+    Each entity (e.g. a channel configuration) gets a day bucket and a month
+    bucket. Checks and increments are one atomic script call; the database copy
+    is a snapshot written by a periodic flush of the entities marked dirty.
+    """
+
+    _MEMBER_SEPARATOR = "|"
+
+    def __init__(self, redis_client: RedisClient, name: str = "usage", retention_days: int = 2):
+        """
+        Initialize usage counters
+
+        Args:
+            redis_client: Redis client instance
+            name: Counter family name (part of every key)
+            retention_days: Days a bucket outlives its period (lets late flushes read it)
+        """
+        self.redis = redis_client
+        self.name = name
+        self.retention = timedelta(days=retention_days)
+        self._reserve_script = None
+        self._release_script = None
+        self._script_client = None
+
+    @property
+    def dirty_key(self) -> str:
+        return f"usage:{self.name}:dirty"
+
+    def _bucket_keys(
+        self,
+        creator_id: str,
+        entity_id: str,
+        now: Optional[datetime] = None
+    ) -> Tuple[str, str, int, int]:
+        """Day key, month key and their expire-at timestamps (UTC buckets)"""
+        now = now or datetime.now(timezone.utc)
+        day_start = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        next_day = day_start + timedelta(days=1)
+        next_month = (day_start.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+        prefix = self.redis._get_namespaced_key(creator_id, f"usage:{self.name}:{entity_id}")
+        return (
+            f"{prefix}:d:{now:%Y%m%d}",
+            f"{prefix}:m:{now:%Y%m}",
+            int((next_day + self.retention).timestamp()),
+            int((next_month + self.retention).timestamp())
+        )
+
+    def _member(self, creator_id: str, entity_id: str) -> str:
+        return f"{creator_id}{self._MEMBER_SEPARATOR}{entity_id}"
+
+    async def _scripts(self):
+        client = await self.redis.get_client()
+        if self._script_client is not client:
+            self._reserve_script = client.register_script(RESERVE_SCRIPT)
+            self._release_script = client.register_script(RELEASE_SCRIPT)
+            self._script_client = client
+        return client
+
+    async def reserve(
+        self,
+        creator_id: str,
+        entity_id: str,
+        daily_limit: Optional[int] = None,
+        monthly_limit: Optional[int] = None,
+        amount: int = 1
+    ) -> Tuple[bool, Dict[str, int]]:
+        """
+        Atomically count ``amount`` units if both limits allow it
+
+        Args:
+            creator_id: Creator/tenant ID
+            entity_id: Counted entity (e.g. channel configuration ID)
+            daily_limit: Daily limit (None = unlimited)
+            monthly_limit: Monthly limit (None = unlimited)
+            amount: Units to reserve
+
+        Returns:
+            Tuple of (allowed, {"daily": count, "monthly": count})
+        """
+        await self._scripts()
+        day_key, month_key, day_expire_at, month_expire_at = self._bucket_keys(creator_id, entity_id)
+        allowed, daily, monthly = await self._reserve_script(
+            keys=[day_key, month_key, self.dirty_key],
+            args=[
+                amount,
+                -1 if daily_limit is None else daily_limit,
+                -1 if monthly_limit is None else monthly_limit,
+                day_expire_at,
+                month_expire_at,
+                self._member(creator_id, entity_id)
+            ]
+        )
+        return int(allowed) == 1, {"daily": int(daily), "monthly": int(monthly)}
+
+    async def increment(self, creator_id: str, entity_id: str, amount: int = 1) -> Dict[str, int]:
+        """Count ``amount`` units without a limit check"""
+        _, counts = await self.reserve(creator_id, entity_id, amount=amount)
+        return counts
+
+    async def release(self, creator_id: str, entity_id: str, amount: int = 1) -> Dict[str, int]:
+        """Give back a reservation that was not used"""
+        await self._scripts()
+        day_key, month_key, _, _ = self._bucket_keys(creator_id, entity_id)
+        daily, monthly = await self._release_script(
+            keys=[day_key, month_key, self.dirty_key],
+            args=[amount, self._member(creator_id, entity_id)]
+        )
+        return {"daily": int(daily), "monthly": int(monthly)}
+
+    async def get_counts(self, creator_id: str, entity_id: str) -> Dict[str, int]:
+        """Current day and month counts"""
+        client = await self.redis.get_client()
+        day_key, month_key, _, _ = self._bucket_keys(creator_id, entity_id)
+        daily, monthly = await client.mget(day_key, month_key)
+        return {"daily": int(daily or 0), "monthly": int(monthly or 0)}
+
+    async def drain_dirty(self, batch_size: int = 500) -> List[Dict[str, Any]]:
+        """
+        Pop up to ``batch_size`` changed entities with their current counts
+
+        Callers that fail to persist the batch should hand it back to
+        ``mark_dirty`` so the next flush retries it.
+        """
+        client = await self.redis.get_client()
+        members = await client.spop(self.dirty_key, batch_size)
+        if not members:
+            return []
+
+        entries = []
+        pipe = client.pipeline(transaction=False)
+        for member in members:
+            creator_id, _, entity_id = member.partition(self._MEMBER_SEPARATOR)
+            day_key, month_key, _, _ = self._bucket_keys(creator_id, entity_id)
+            pipe.mget(day_key, month_key)
+            entries.append({"creator_id": creator_id, "entity_id": entity_id})
+
+        for entry, (daily, monthly) in zip(entries, await pipe.execute()):
+            entry["daily"] = int(daily or 0)
+            entry["monthly"] = int(monthly or 0)
+        return entries
+
+    async def mark_dirty(self, entries: List[Dict[str, Any]]) -> None:
+        """Re-queue entities for the next flush"""
+        if not entries:
+            return
+        client = await self.redis.get_client()
+        await client.sadd(self.dirty_key, *(self._member(e["creator_id"], e["entity_id"]) for e in entries))
+
+
+# Global usage counter instances by name
+_usage_counters: Dict[str, UsageCounters] = {}
+
+
+def get_usage_counters(name: str) -> UsageCounters:
+    """Get global usage counters for a counter family"""
+    if name not in _usage_counters:
+        from .redis_client import get_redis_client
+        _usage_counters[name] = UsageCounters(get_redis_client(), name=name)
+    return _usage_counters[name]
@@ -0,0 +1,355 @@
+"""
+Cross-worker WebSocket delivery for MVP Coaching AI Platform
+Session → node routing in Redis with pub/sub fan-out to the owning node
+"""
+
+import asyncio
+import json
+import logging
+import os
+import socket
+import uuid
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from .redis_client import RedisClient
+
+logger = logging.getLogger(__name__)
+
+# WebSocket close code 1013: "Try Again Later" (used for slow-consumer eviction)
+SLOW_CONSUMER_CLOSE_CODE = 1013
+
+# Delete a route only if it still points at this node (the session may have reconnected elsewhere)
+UNROUTE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+@dataclass
+class LocalConnection:
+    """A WebSocket owned by this node with its bounded outbound queue"""
+    session_id: str
+    websocket: Any
+    queue: asyncio.Queue
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    writer: Optional[asyncio.Task] = None
+    closed: bool = False
+
+
+class WebSocketFanout:
+    """
+    Deliver messages to WebSocket sessions regardless of which worker holds them
+
+    Each node (worker process) subscribes to its own pub/sub channel and records
+    ``session → node`` routes in Redis. ``send`` enqueues locally when the session
+    is on this node and otherwise publishes to the owning node. Every connection
+    has a bounded send queue drained by its own writer task; a client that cannot
+    keep up (queue full or a send exceeding the timeout) is evicted so one slow
+    browser never holds memory or blocks other sessions.
+    """
+
+    def __init__(
+        self,
+        redis_client: RedisClient,
+        node_id: Optional[str] = None,
+        queue_size: int = 100,
+        send_timeout: float = 5.0,
+        route_ttl: int = 60
+    ):
+        """
+        Initialize WebSocket fan-out
+
+        Args:
+            redis_client: Redis client instance
+            node_id: Unique node identifier (generated per process when omitted)
+            queue_size: Outbound messages buffered per connection before eviction
+            send_timeout: Seconds a single send may take before eviction
+            route_ttl: Route key TTL in seconds (refreshed while the node is alive)
+        """
+        self.redis = redis_client
+        self.node_id = node_id or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.queue_size = queue_size
+        self.send_timeout = send_timeout
+        self.route_ttl = route_ttl
+
+        self.connections: Dict[str, LocalConnection] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._pubsub = None
+        self._unroute_script = None
+        self.stats = {"local_sends": 0, "remote_publishes": 0, "undeliverable": 0, "evictions": 0}
+
+    def _route_key(self, session_id: str) -> str:
+        return self.redis._get_namespaced_key("system", f"ws:route:{session_id}")
+
+    @property
+    def node_channel(self) -> str:
+        return self._channel_for(self.node_id)
+
+    @staticmethod
+    def _channel_for(node_id: str) -> str:
+        return f"ws:node:{node_id}"
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self) -> None:
+        """Subscribe to this node's channel and start refreshing routes"""
+        if self._listener is not None:
+            return
+        client = await self.redis.get_client()
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(self.node_channel)
+        self._listener = asyncio.create_task(self._listen())
+        self._heartbeat = asyncio.create_task(self._refresh_routes())
+        logger.info(f"WebSocket fan-out started on node {self.node_id}")
+
+    async def stop(self) -> None:
+        """Close local connections, drop their routes and unsubscribe"""
+        for task in (self._listener, self._heartbeat):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = self._heartbeat = None
+
+        for session_id in list(self.connections):
+            await self.disconnect(session_id, close_code=1001)
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(self.node_channel)
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close fan-out subscription: {e}")
+            self._pubsub = None
+
+    # ------------------------------------------------------------------
+    # Connections
+    # ------------------------------------------------------------------
+
+    async def connect(
+        self, session_id: str, websocket: Any, metadata: Optional[Dict[str, Any]] = None
+    ) -> LocalConnection:
+        """
+        Register an accepted WebSocket on this node
+
+        A session that was already connected here is replaced (its old socket
+        closed). Local delivery keeps working if the route cannot be written.
+
+        Returns:
+            The connection; pass it to ``disconnect`` so cleanup of a replaced
+            socket cannot remove the session's newer connection
+        """
+        previous = self.connections.get(session_id)
+        if previous is not None:
+            await self._close(previous, 1000)
+
+        connection = LocalConnection(
+            session_id=session_id,
+            websocket=websocket,
+            queue=asyncio.Queue(maxsize=self.queue_size),
+            metadata=metadata or {}
+        )
+        connection.writer = asyncio.create_task(self._write(connection))
+        self.connections[session_id] = connection
+
+        try:
+            client = await self.redis.get_client()
+            await client.set(self._route_key(session_id), self.node_id, ex=self.route_ttl)
+        except Exception as e:
+            logger.warning(f"Failed to publish route for session {session_id}: {e}")
+        return connection
+
+    async def disconnect(
+        self,
+        session_id: str,
+        close_code: Optional[int] = None,
+        connection: Optional[LocalConnection] = None
+    ) -> None:
+        """
+        Forget a session on this node (optionally closing its socket)
+
+        Args:
+            session_id: Session to disconnect
+            close_code: Close the socket with this code
+            connection: Only disconnect this connection; if the session has
+                since reconnected, the newer connection and its route are kept
+        """
+        current = self.connections.get(session_id)
+        if connection is not None and current is not connection:
+            # Stale cleanup for a replaced socket
+            await self._close(connection, close_code)
+            return
+        if current is None:
+            return
+        del self.connections[session_id]
+        await self._close(current, close_code)
+
+        try:
+            client = await self.redis.get_client()
+            if self._unroute_script is None:
+                self._unroute_script = client.register_script(UNROUTE_SCRIPT)
+            await self._unroute_script(keys=[self._route_key(session_id)], args=[self.node_id])
+        except Exception as e:
+            logger.warning(f"Failed to remove route for session {session_id}: {e}")
+
+    def is_local(self, session_id: str) -> bool:
+        return session_id in self.connections
+
+    async def get_route(self, session_id: str) -> Optional[str]:
+        """Node currently holding a session, if any"""
+        client = await self.redis.get_client()
+        return await client.get(self._route_key(session_id))
+
+    # ------------------------------------------------------------------
+    # Delivery
+    # ------------------------------------------------------------------
+
+    async def send(self, session_id: str, message: Dict[str, Any]) -> bool:
+        """
+        Deliver a JSON message to a session on whichever node holds it
+
+        Returns:
+            True if the message was queued locally or published to a live
+            node, False if the session is not connected anywhere
+        """
+        if self._enqueue(session_id, message):
+            self.stats["local_sends"] += 1
+            return True
+
+        try:
+            node_id = await self.get_route(session_id)
+            if node_id and node_id != self.node_id:
+                client = await self.redis.get_client()
+                envelope = json.dumps({"session_id": session_id, "message": message}, default=str)
+                if await client.publish(self._channel_for(node_id), envelope):
+                    self.stats["remote_publishes"] += 1
+                    return True
+        except Exception as e:
+            logger.warning(f"Failed to route message for session {session_id}: {e}")
+
+        self.stats["undeliverable"] += 1
+        return False
+
+    def _enqueue(self, session_id: str, message: Dict[str, Any]) -> bool:
+        connection = self.connections.get(session_id)
+        if connection is None or connection.closed:
+            return False
+        try:
+            connection.queue.put_nowait(message)
+            return True
+        except asyncio.QueueFull:
+            logger.warning(f"Evicting slow WebSocket consumer {session_id} (send queue full)")
+            self._evict(connection)
+            return False
+
+    def _evict(self, connection: LocalConnection) -> None:
+        if connection.closed:
+            return
+        connection.closed = True
+        self.stats["evictions"] += 1
+        asyncio.ensure_future(self.disconnect(
+            connection.session_id, close_code=SLOW_CONSUMER_CLOSE_CODE, connection=connection
+        ))
+
+    async def _write(self, connection: LocalConnection) -> None:
+        """Drain one connection's queue; evict it if a send stalls or fails"""
+        try:
+            while True:
+                message = await connection.queue.get()
+                await asyncio.wait_for(connection.websocket.send_json(message), timeout=self.send_timeout)
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            logger.warning(f"Evicting slow WebSocket consumer {connection.session_id} (send timed out)")
+            self._evict(connection)
+        except Exception as e:
+            logger.info(f"WebSocket {connection.session_id} send failed, dropping connection: {e}")
+            asyncio.ensure_future(self.disconnect(connection.session_id, connection=connection))
+
+    async def _close(self, connection: LocalConnection, close_code: Optional[int]) -> None:
+        connection.closed = True
+        if connection.writer is not None and connection.writer is not asyncio.current_task():
+            connection.writer.cancel()
+        if close_code is not None:
+            try:
+                await connection.websocket.close(code=close_code)
+            except Exception:
+                pass
+
+    async def _listen(self) -> None:
+        """Hand messages published to this node to the local connections"""
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        envelope = json.loads(item["data"])
+                        delivered = self._enqueue(envelope["session_id"], envelope["message"])
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed fan-out message: {e}")
+                        continue
+                    if not delivered:
+                        self.stats["undeliverable"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"WebSocket fan-out listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+                try:
+                    await self._pubsub.subscribe(self.node_channel)
+                except Exception:
+                    pass
+
+    async def _refresh_routes(self) -> None:
+        """Keep this node's routes alive; they expire on their own if the node dies"""
+        interval = max(1.0, self.route_ttl / 3)
+        while True:
+            await asyncio.sleep(interval)
+            if not self.connections:
+                continue
+            try:
+                client = await self.redis.get_client()
+                pipe = client.pipeline(transaction=False)
+                for session_id in list(self.connections):
+                    pipe.set(self._route_key(session_id), self.node_id, ex=self.route_ttl)
+                await pipe.execute()
+            except Exception as e:
+                logger.warning(f"Failed to refresh WebSocket routes: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "node_id": self.node_id,
+            "local_connections": len(self.connections),
+            "queued_messages": sum(c.queue.qsize() for c in self.connections.values()),
+            **self.stats
+        }
+
+
+# Global fan-out instance
+_websocket_fanout: Optional[WebSocketFanout] = None
+
+
+def get_websocket_fanout() -> WebSocketFanout:
+    """Get global WebSocket fan-out instance"""
+    global _websocket_fanout
+    if _websocket_fanout is None:
+        from shared.config.env_constants import (
+            WEBSOCKET_SEND_QUEUE_SIZE, WEBSOCKET_SEND_TIMEOUT_SECONDS, WEBSOCKET_ROUTE_TTL_SECONDS, get_env_value
+        )
+        from .redis_client import get_redis_client
+        _websocket_fanout = WebSocketFanout(
+            get_redis_client(),
+            queue_size=int(get_env_value(WEBSOCKET_SEND_QUEUE_SIZE, default="100")),
+            send_timeout=float(get_env_value(WEBSOCKET_SEND_TIMEOUT_SECONDS, default="5")),
+            route_ttl=int(get_env_value(WEBSOCKET_ROUTE_TTL_SECONDS, default="60"))
+        )
+    return _websocket_fanout
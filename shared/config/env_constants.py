@@ -52,6 +52,10 @@ AI_ENGINE_URL = "AI_ENGINE_URL"
 CHAT_MODEL = "CHAT_MODEL"
 CHROMA_SHARD_COUNT = "CHROMA_SHARD_COUNT"
 CHROMA_MAX_CONNECTIONS_PER_INSTANCE = "CHROMA_MAX_CONNECTIONS_PER_INSTANCE"
+VECTOR_STORE_BACKEND = "VECTOR_STORE_BACKEND"
+VECTOR_STORE_PATH = "VECTOR_STORE_PATH"
+HNSW_MAINTENANCE_INTERVAL_SECONDS = "HNSW_MAINTENANCE_INTERVAL_SECONDS"
+HNSW_TARGET_RECALL = "HNSW_TARGET_RECALL"
 DEFAULT_CHUNK_SIZE = "DEFAULT_CHUNK_SIZE"
 DEFAULT_CHUNK_OVERLAP = "DEFAULT_CHUNK_OVERLAP"
 
@@ -60,6 +64,11 @@ AUTH_SERVICE_URL = "AUTH_SERVICE_URL"
 AI_ENGINE_SERVICE_URL = "AI_ENGINE_SERVICE_URL"
 CREATOR_HUB_SERVICE_URL = "CREATOR_HUB_SERVICE_URL"
 CHANNEL_SERVICE_URL = "CHANNEL_SERVICE_URL"
+HTTP_CLIENT_MAX_CONNECTIONS = "HTTP_CLIENT_MAX_CONNECTIONS"
+HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS = "HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS"
+HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS = "HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS"
+HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS = "HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS"
+HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS = "HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS"
 
 # Security Configuration
 CORS_ORIGINS = "CORS_ORIGINS"
@@ -83,6 +92,35 @@ SLOW_QUERY_THRESHOLD = "SLOW_QUERY_THRESHOLD"
 # Rate Limiting Configuration
 RATE_LIMIT_PER_MINUTE = "RATE_LIMIT_PER_MINUTE"
 RATE_LIMIT_PER_HOUR = "RATE_LIMIT_PER_HOUR"
+RATE_LIMIT_LEASE_SIZE = "RATE_LIMIT_LEASE_SIZE"
+RATE_LIMIT_LEASE_TTL_SECONDS = "RATE_LIMIT_LEASE_TTL_SECONDS"
+RATE_LIMIT_EXPECTED_WORKERS = "RATE_LIMIT_EXPECTED_WORKERS"
+CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS = "CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS"
+AI_ENGINE_BREAKER_FAILURE_THRESHOLD = "AI_ENGINE_BREAKER_FAILURE_THRESHOLD"
+AI_ENGINE_BREAKER_RECOVERY_SECONDS = "AI_ENGINE_BREAKER_RECOVERY_SECONDS"
+AI_ENGINE_HEDGE_URL = "AI_ENGINE_HEDGE_URL"
+AI_ENGINE_HEDGE_MIN_DELAY_MS = "AI_ENGINE_HEDGE_MIN_DELAY_MS"
+WEBSOCKET_SEND_QUEUE_SIZE = "WEBSOCKET_SEND_QUEUE_SIZE"
+WEBSOCKET_SEND_TIMEOUT_SECONDS = "WEBSOCKET_SEND_TIMEOUT_SECONDS"
+WEBSOCKET_ROUTE_TTL_SECONDS = "WEBSOCKET_ROUTE_TTL_SECONDS"
+WEBHOOK_WORKER_CONCURRENCY = "WEBHOOK_WORKER_CONCURRENCY"
+WEBHOOK_WORKER_BATCH_SIZE = "WEBHOOK_WORKER_BATCH_SIZE"
+WEBHOOK_DEDUP_TTL_SECONDS = "WEBHOOK_DEDUP_TTL_SECONDS"
+WHATSAPP_SEND_RATE_PER_SECOND = "WHATSAPP_SEND_RATE_PER_SECOND"
+TELEGRAM_SEND_RATE_PER_SECOND = "TELEGRAM_SEND_RATE_PER_SECOND"
+OUTBOUND_DELIVERY_MAX_ATTEMPTS = "OUTBOUND_DELIVERY_MAX_ATTEMPTS"
+AUTH_TOKEN_CACHE_SIZE = "AUTH_TOKEN_CACHE_SIZE"
+AUTH_REVOCATION_BLOOM_CAPACITY = "AUTH_REVOCATION_BLOOM_CAPACITY"
+AUTH_CREATOR_STATUS_TTL_SECONDS = "AUTH_CREATOR_STATUS_TTL_SECONDS"
+AUTH_JWKS_REFRESH_SECONDS = "AUTH_JWKS_REFRESH_SECONDS"
+PASSWORD_HASH_WORKERS = "PASSWORD_HASH_WORKERS"
+PASSWORD_HASH_MAX_QUEUE = "PASSWORD_HASH_MAX_QUEUE"
+PASSWORD_HASH_EXECUTOR = "PASSWORD_HASH_EXECUTOR"
+BREACHED_PASSWORDS_INDEX_PATH = "BREACHED_PASSWORDS_INDEX_PATH"
+CONDITION_RESULT_CACHE_SIZE = "CONDITION_RESULT_CACHE_SIZE"
+CONDITION_RESULT_CACHE_SHARED = "CONDITION_RESULT_CACHE_SHARED"
+EXECUTION_CHECKPOINTS_ENABLED = "EXECUTION_CHECKPOINTS_ENABLED"
+EXECUTION_CHECKPOINT_TTL_SECONDS = "EXECUTION_CHECKPOINT_TTL_SECONDS"
 
 # WebSocket Configuration
 WEBSOCKET_TIMEOUT = "WEBSOCKET_TIMEOUT"
@@ -173,6 +211,10 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         CHAT_MODEL: "llama3.2:1b",
         CHROMA_SHARD_COUNT: "5",
         CHROMA_MAX_CONNECTIONS_PER_INSTANCE: "10",
+        VECTOR_STORE_BACKEND: "chromadb",
+        VECTOR_STORE_PATH: "./data/vector_store",
+        HNSW_MAINTENANCE_INTERVAL_SECONDS: "3600",
+        HNSW_TARGET_RECALL: "0.95",
         DEFAULT_CHUNK_SIZE: "1000",
         DEFAULT_CHUNK_OVERLAP: "200",
         
@@ -181,6 +223,11 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         AI_ENGINE_SERVICE_URL: "http://localhost:8003",
         CREATOR_HUB_SERVICE_URL: "http://localhost:8002",
         CHANNEL_SERVICE_URL: "http://localhost:8004",
+        HTTP_CLIENT_MAX_CONNECTIONS: "100",
+        HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: "20",
+        HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS: "50",
+        HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: "30",
+        HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: "5",
         
         # Security
         CORS_ORIGINS: "http://localhost:3000,http://localhost:8080",
@@ -204,6 +251,35 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         # Rate Limiting
         RATE_LIMIT_PER_MINUTE: "60",
         RATE_LIMIT_PER_HOUR: "1000",
+        RATE_LIMIT_LEASE_SIZE: "20",
+        RATE_LIMIT_LEASE_TTL_SECONDS: "2",
+        RATE_LIMIT_EXPECTED_WORKERS: "4",
+        CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS: "30",
+        AI_ENGINE_BREAKER_FAILURE_THRESHOLD: "5",
+        AI_ENGINE_BREAKER_RECOVERY_SECONDS: "30",
+        AI_ENGINE_HEDGE_URL: "",
+        AI_ENGINE_HEDGE_MIN_DELAY_MS: "250",
+        WEBSOCKET_SEND_QUEUE_SIZE: "100",
+        WEBSOCKET_SEND_TIMEOUT_SECONDS: "5",
+        WEBSOCKET_ROUTE_TTL_SECONDS: "60",
+        WEBHOOK_WORKER_CONCURRENCY: "10",
+        WEBHOOK_WORKER_BATCH_SIZE: "50",
+        WEBHOOK_DEDUP_TTL_SECONDS: "86400",
+        WHATSAPP_SEND_RATE_PER_SECOND: "80",
+        TELEGRAM_SEND_RATE_PER_SECOND: "30",
+        OUTBOUND_DELIVERY_MAX_ATTEMPTS: "5",
+        AUTH_TOKEN_CACHE_SIZE: "10000",
+        AUTH_REVOCATION_BLOOM_CAPACITY: "100000",
+        AUTH_CREATOR_STATUS_TTL_SECONDS: "60",
+        AUTH_JWKS_REFRESH_SECONDS: "300",
+        PASSWORD_HASH_WORKERS: "2",
+        PASSWORD_HASH_MAX_QUEUE: "32",
+        PASSWORD_HASH_EXECUTOR: "thread",
+        BREACHED_PASSWORDS_INDEX_PATH: "",
+        CONDITION_RESULT_CACHE_SIZE: "1000",
+        CONDITION_RESULT_CACHE_SHARED: "false",
+        EXECUTION_CHECKPOINTS_ENABLED: "false",
+        EXECUTION_CHECKPOINT_TTL_SECONDS: "86400",
         
         # WebSocket
         WEBSOCKET_TIMEOUT: "60",
@@ -288,6 +364,10 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         CHAT_MODEL: "llama3.2",
         CHROMA_SHARD_COUNT: "5",
         CHROMA_MAX_CONNECTIONS_PER_INSTANCE: "5",
+        VECTOR_STORE_BACKEND: "chromadb",
+        VECTOR_STORE_PATH: "",
+        HNSW_MAINTENANCE_INTERVAL_SECONDS: "0",
+        HNSW_TARGET_RECALL: "0.95",
         DEFAULT_CHUNK_SIZE: "500",
         DEFAULT_CHUNK_OVERLAP: "100",
         
@@ -296,6 +376,11 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         AI_ENGINE_SERVICE_URL: "http://ai-engine-service:8003",
         CREATOR_HUB_SERVICE_URL: "http://creator-hub-service:8002",
         CHANNEL_SERVICE_URL: "http://channel-service:8004",
+        HTTP_CLIENT_MAX_CONNECTIONS: "20",
+        HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: "5",
+        HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS: "10",
+        HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: "5",
+        HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: "2",
         
         # Security
         CORS_ORIGINS: "http://localhost:3000",
@@ -319,6 +404,35 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         # Rate Limiting
         RATE_LIMIT_PER_MINUTE: "30",
         RATE_LIMIT_PER_HOUR: "500",
+        RATE_LIMIT_LEASE_SIZE: "0",
+        RATE_LIMIT_LEASE_TTL_SECONDS: "2",
+        RATE_LIMIT_EXPECTED_WORKERS: "1",
+        CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS: "0",
+        AI_ENGINE_BREAKER_FAILURE_THRESHOLD: "3",
+        AI_ENGINE_BREAKER_RECOVERY_SECONDS: "1",
+        AI_ENGINE_HEDGE_URL: "",
+        AI_ENGINE_HEDGE_MIN_DELAY_MS: "10",
+        WEBSOCKET_SEND_QUEUE_SIZE: "10",
+        WEBSOCKET_SEND_TIMEOUT_SECONDS: "1",
+        WEBSOCKET_ROUTE_TTL_SECONDS: "10",
+        WEBHOOK_WORKER_CONCURRENCY: "2",
+        WEBHOOK_WORKER_BATCH_SIZE: "10",
+        WEBHOOK_DEDUP_TTL_SECONDS: "60",
+        WHATSAPP_SEND_RATE_PER_SECOND: "1000",
+        TELEGRAM_SEND_RATE_PER_SECOND: "1000",
+        OUTBOUND_DELIVERY_MAX_ATTEMPTS: "2",
+        AUTH_TOKEN_CACHE_SIZE: "100",
+        AUTH_REVOCATION_BLOOM_CAPACITY: "1000",
+        AUTH_CREATOR_STATUS_TTL_SECONDS: "1",
+        AUTH_JWKS_REFRESH_SECONDS: "5",
+        PASSWORD_HASH_WORKERS: "1",
+        PASSWORD_HASH_MAX_QUEUE: "8",
+        PASSWORD_HASH_EXECUTOR: "thread",
+        BREACHED_PASSWORDS_INDEX_PATH: "",
+        CONDITION_RESULT_CACHE_SIZE: "1000",
+        CONDITION_RESULT_CACHE_SHARED: "false",
+        EXECUTION_CHECKPOINTS_ENABLED: "false",
+        EXECUTION_CHECKPOINT_TTL_SECONDS: "3600",
         
         # WebSocket
         WEBSOCKET_TIMEOUT: "30",
@@ -411,6 +525,10 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         CHAT_MODEL: "llama3.2",
         CHROMA_SHARD_COUNT: "5",
         CHROMA_MAX_CONNECTIONS_PER_INSTANCE: "20",
+        VECTOR_STORE_BACKEND: "chromadb",
+        VECTOR_STORE_PATH: "/var/lib/vector_store",
+        HNSW_MAINTENANCE_INTERVAL_SECONDS: "3600",
+        HNSW_TARGET_RECALL: "0.95",
         DEFAULT_CHUNK_SIZE: "1000",
         DEFAULT_CHUNK_OVERLAP: "200",
         
@@ -419,6 +537,11 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         AI_ENGINE_SERVICE_URL: "",  # Must be set via environment
         CREATOR_HUB_SERVICE_URL: "",  # Must be set via environment
         CHANNEL_SERVICE_URL: "",  # Must be set via environment
+        HTTP_CLIENT_MAX_CONNECTIONS: "200",
+        HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: "50",
+        HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS: "100",
+        HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS: "60",
+        HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS: "5",
         
         # Security
         CORS_ORIGINS: "",  # Must be set via environment
@@ -442,6 +565,35 @@ ENVIRONMENT_DEFAULTS: Dict[str, Dict[str, Any]] = {
         # Rate Limiting
         RATE_LIMIT_PER_MINUTE: "100",
         RATE_LIMIT_PER_HOUR: "5000",
+        RATE_LIMIT_LEASE_SIZE: "20",
+        RATE_LIMIT_LEASE_TTL_SECONDS: "2",
+        RATE_LIMIT_EXPECTED_WORKERS: "4",
+        CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS: "30",
+        AI_ENGINE_BREAKER_FAILURE_THRESHOLD: "5",
+        AI_ENGINE_BREAKER_RECOVERY_SECONDS: "30",
+        AI_ENGINE_HEDGE_URL: "",
+        AI_ENGINE_HEDGE_MIN_DELAY_MS: "250",
+        WEBSOCKET_SEND_QUEUE_SIZE: "100",
+        WEBSOCKET_SEND_TIMEOUT_SECONDS: "5",
+        WEBSOCKET_ROUTE_TTL_SECONDS: "60",
+        WEBHOOK_WORKER_CONCURRENCY: "10",
+        WEBHOOK_WORKER_BATCH_SIZE: "50",
+        WEBHOOK_DEDUP_TTL_SECONDS: "86400",
+        WHATSAPP_SEND_RATE_PER_SECOND: "80",
+        TELEGRAM_SEND_RATE_PER_SECOND: "30",
+        OUTBOUND_DELIVERY_MAX_ATTEMPTS: "5",
+        AUTH_TOKEN_CACHE_SIZE: "10000",
+        AUTH_REVOCATION_BLOOM_CAPACITY: "100000",
+        AUTH_CREATOR_STATUS_TTL_SECONDS: "60",
+        AUTH_JWKS_REFRESH_SECONDS: "300",
+        PASSWORD_HASH_WORKERS: "4",
+        PASSWORD_HASH_MAX_QUEUE: "64",
+        PASSWORD_HASH_EXECUTOR: "thread",
+        BREACHED_PASSWORDS_INDEX_PATH: "",
+        CONDITION_RESULT_CACHE_SIZE: "10000",
+        CONDITION_RESULT_CACHE_SHARED: "true",
+        EXECUTION_CHECKPOINTS_ENABLED: "true",
+        EXECUTION_CHECKPOINT_TTL_SECONDS: "86400",
         
         # WebSocket
         WEBSOCKET_TIMEOUT: "120",
@@ -617,9 +769,12 @@ ALL_ENV_VARS: Tuple[str, ...] = (
     # AI Services
     OLLAMA_URL, OLLAMA_HOST, CHROMADB_URL, CHROMA_SERVER_HOST, CHROMA_SERVER_HTTP_PORT,
     EMBEDDING_MODEL, CHAT_MODEL, CHROMA_SHARD_COUNT, CHROMA_MAX_CONNECTIONS_PER_INSTANCE,
-    DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+    VECTOR_STORE_BACKEND, VECTOR_STORE_PATH, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+    HNSW_MAINTENANCE_INTERVAL_SECONDS, HNSW_TARGET_RECALL,
     # Service URLs
     AUTH_SERVICE_URL, AI_ENGINE_SERVICE_URL, CREATOR_HUB_SERVICE_URL, CHANNEL_SERVICE_URL,
+    HTTP_CLIENT_MAX_CONNECTIONS, HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS, HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS,
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS, HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
     # Security
     CORS_ORIGINS, ALLOWED_HOSTS, MAX_FAILED_LOGIN_ATTEMPTS,
     ACCOUNT_LOCKOUT_DURATION_MINUTES, PASSWORD_RESET_TOKEN_EXPIRE_MINUTES,
@@ -629,6 +784,19 @@ ALL_ENV_VARS: Tuple[str, ...] = (
     ENVIRONMENT, DEBUG, LOG_LEVEL, SQL_ECHO, SLOW_QUERY_THRESHOLD,
     # Rate Limiting
     RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_HOUR,
+    RATE_LIMIT_LEASE_SIZE, RATE_LIMIT_LEASE_TTL_SECONDS, RATE_LIMIT_EXPECTED_WORKERS,
+    CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS,
+    AI_ENGINE_BREAKER_FAILURE_THRESHOLD, AI_ENGINE_BREAKER_RECOVERY_SECONDS,
+    AI_ENGINE_HEDGE_URL, AI_ENGINE_HEDGE_MIN_DELAY_MS,
+    WEBSOCKET_SEND_QUEUE_SIZE, WEBSOCKET_SEND_TIMEOUT_SECONDS, WEBSOCKET_ROUTE_TTL_SECONDS,
+    WEBHOOK_WORKER_CONCURRENCY, WEBHOOK_WORKER_BATCH_SIZE, WEBHOOK_DEDUP_TTL_SECONDS,
+    WHATSAPP_SEND_RATE_PER_SECOND, TELEGRAM_SEND_RATE_PER_SECOND, OUTBOUND_DELIVERY_MAX_ATTEMPTS,
+    AUTH_TOKEN_CACHE_SIZE, AUTH_REVOCATION_BLOOM_CAPACITY, AUTH_CREATOR_STATUS_TTL_SECONDS,
+    AUTH_JWKS_REFRESH_SECONDS,
+    PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_EXECUTOR,
+    BREACHED_PASSWORDS_INDEX_PATH,
+    CONDITION_RESULT_CACHE_SIZE, CONDITION_RESULT_CACHE_SHARED,
+    EXECUTION_CHECKPOINTS_ENABLED, EXECUTION_CHECKPOINT_TTL_SECONDS,
     # WebSocket
     WEBSOCKET_TIMEOUT, MAX_CONNECTIONS_PER_INSTANCE, HEARTBEAT_INTERVAL,
     # Email
@@ -698,10 +866,13 @@ CATEGORY_VARS: Dict[str, List[str]] = {
     "ai_services": [
         OLLAMA_URL, OLLAMA_HOST, CHROMADB_URL, CHROMA_SERVER_HOST, CHROMA_SERVER_HTTP_PORT,
         EMBEDDING_MODEL, CHAT_MODEL, CHROMA_SHARD_COUNT, CHROMA_MAX_CONNECTIONS_PER_INSTANCE,
-        DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+        VECTOR_STORE_BACKEND, VECTOR_STORE_PATH, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+        HNSW_MAINTENANCE_INTERVAL_SECONDS, HNSW_TARGET_RECALL,
     ],
     "service_urls": [
         AUTH_SERVICE_URL, AI_ENGINE_SERVICE_URL, CREATOR_HUB_SERVICE_URL, CHANNEL_SERVICE_URL,
+        HTTP_CLIENT_MAX_CONNECTIONS, HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS, HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS,
+        HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS, HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
     ],
     "security": [
         CORS_ORIGINS, ALLOWED_HOSTS, MAX_FAILED_LOGIN_ATTEMPTS,
@@ -716,6 +887,19 @@ CATEGORY_VARS: Dict[str, List[str]] = {
     ],
     "rate_limiting": [
         RATE_LIMIT_PER_MINUTE, RATE_LIMIT_PER_HOUR,
+        RATE_LIMIT_LEASE_SIZE, RATE_LIMIT_LEASE_TTL_SECONDS, RATE_LIMIT_EXPECTED_WORKERS,
+        CHANNEL_COUNTER_FLUSH_INTERVAL_SECONDS,
+        AI_ENGINE_BREAKER_FAILURE_THRESHOLD, AI_ENGINE_BREAKER_RECOVERY_SECONDS,
+        AI_ENGINE_HEDGE_URL, AI_ENGINE_HEDGE_MIN_DELAY_MS,
+        WEBSOCKET_SEND_QUEUE_SIZE, WEBSOCKET_SEND_TIMEOUT_SECONDS, WEBSOCKET_ROUTE_TTL_SECONDS,
+        WEBHOOK_WORKER_CONCURRENCY, WEBHOOK_WORKER_BATCH_SIZE, WEBHOOK_DEDUP_TTL_SECONDS,
+        WHATSAPP_SEND_RATE_PER_SECOND, TELEGRAM_SEND_RATE_PER_SECOND, OUTBOUND_DELIVERY_MAX_ATTEMPTS,
+        AUTH_TOKEN_CACHE_SIZE, AUTH_REVOCATION_BLOOM_CAPACITY, AUTH_CREATOR_STATUS_TTL_SECONDS,
+        AUTH_JWKS_REFRESH_SECONDS,
+        PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_EXECUTOR,
+        BREACHED_PASSWORDS_INDEX_PATH,
+        CONDITION_RESULT_CACHE_SIZE, CONDITION_RESULT_CACHE_SHARED,
+        EXECUTION_CHECKPOINTS_ENABLED, EXECUTION_CHECKPOINT_TTL_SECONDS,
     ],
     "websocket": [
         WEBSOCKET_TIMEOUT, MAX_CONNECTIONS_PER_INSTANCE, HEARTBEAT_INTERVAL,
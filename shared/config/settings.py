@@ -32,6 +32,7 @@ from shared.config.env_constants import (
     AUTH_SERVICE_URL, AI_ENGINE_SERVICE_URL, MAX_UPLOAD_SIZE, UPLOADS_DIR, SUPPORTED_FORMATS,
     OLLAMA_URL, CHROMADB_URL, EMBEDDING_MODEL, CHAT_MODEL, CHROMA_SHARD_COUNT,
     CHROMA_MAX_CONNECTIONS_PER_INSTANCE, DEFAULT_CHUNK_SIZE, DEFAULT_CHUNK_OVERLAP,
+    VECTOR_STORE_BACKEND, VECTOR_STORE_PATH,
     WEBSOCKET_TIMEOUT, MAX_CONNECTIONS_PER_INSTANCE, HEARTBEAT_INTERVAL,
     VAULT_URL, VAULT_TOKEN, VAULT_MOUNT_POINT, VAULT_ENABLED,
     # Helper functions
@@ -356,6 +357,16 @@ class AIEngineServiceConfig(BaseConfig):
         env=CHROMA_MAX_CONNECTIONS_PER_INSTANCE
     )
     
+    # Vector Store Backend - "chromadb" (remote) or "local" (embedded NumPy store)
+    vector_store_backend: str = Field(
+        default_factory=lambda: get_env_value(VECTOR_STORE_BACKEND, fallback=True) or "chromadb",
+        env=VECTOR_STORE_BACKEND
+    )
+    vector_store_path: str = Field(
+        default_factory=lambda: get_env_value(VECTOR_STORE_PATH, fallback=True) or "",
+        env=VECTOR_STORE_PATH
+    )
+    
     # Processing Configuration - using centralized constants and defaults
     default_chunk_size: int = Field(
         default_factory=lambda: safe_int_env(DEFAULT_CHUNK_SIZE, 1000),
@@ -373,6 +384,13 @@ class AIEngineServiceConfig(BaseConfig):
             raise ValueError('chroma_shard_count must be between 5 and 50')
         return v
 
+    @field_validator('vector_store_backend')
+    @classmethod
+    def validate_vector_store_backend(cls, v):
+        if v not in ('chromadb', 'local'):
+            raise ValueError('vector_store_backend must be "chromadb" or "local"')
+        return v
+
 
 class ChannelServiceConfig(BaseConfig):
     """
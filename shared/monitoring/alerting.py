@@ -12,7 +12,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 
-import httpx
+from shared.utils.http_client import get_http_client
 from shared.config.env_constants import get_env_value
 from .metrics import get_metrics_collector, OperationType
 
@@ -732,8 +732,8 @@ async def slack_notification_handler(alert: Alert):
     }
     
     try:
-        async with httpx.AsyncClient() as client:
-            await client.post(slack_webhook, json=message)
+        client = get_http_client()
+        await client.post(slack_webhook, json=message)
     except Exception as e:
         logger.error(f"Failed to send Slack notification: {e}")
 
@@ -13,7 +13,7 @@ from dataclasses import dataclass, field
 from enum import Enum
 from datetime import datetime, timedelta
 
-import httpx
+from shared.utils.http_client import get_http_client
 from .metrics import get_metrics_collector, OperationType
 
 logger = logging.getLogger(__name__)
@@ -117,47 +117,47 @@ class ModelHealthChecker:
         start_time = time.time()
         
         try:
-            async with httpx.AsyncClient(timeout=10.0) as client:
-                response = await client.get(f"{service_url}/health")
-                duration_ms = (time.time() - start_time) * 1000
-                
-                if response.status_code == 200:
-                    try:
-                        health_data = response.json()
-                        return HealthCheckResult(
-                            check_name=f"{service_name}_availability",
-                            check_type=CheckType.AVAILABILITY,
-                            status=HealthStatus.HEALTHY,
-                            timestamp=datetime.utcnow(),
-                            duration_ms=duration_ms,
-                            details={
-                                "status_code": response.status_code,
-                                "response_data": health_data,
-                                "service_url": service_url
-                            }
-                        )
-                    except Exception:
-                        # Service responded but not with valid JSON
-                        return HealthCheckResult(
-                            check_name=f"{service_name}_availability",
-                            check_type=CheckType.AVAILABILITY,
-                            status=HealthStatus.DEGRADED,
-                            timestamp=datetime.utcnow(),
-                            duration_ms=duration_ms,
-                            details={"status_code": response.status_code},
-                            error_message="Service responded but not with valid health data"
-                        )
-                else:
+            client = get_http_client()
+            response = await client.get(f"{service_url}/health", timeout=10.0)
+            duration_ms = (time.time() - start_time) * 1000
+            
+            if response.status_code == 200:
+                try:
+                    health_data = response.json()
                     return HealthCheckResult(
                         check_name=f"{service_name}_availability",
                         check_type=CheckType.AVAILABILITY,
-                        status=HealthStatus.UNHEALTHY,
+                        status=HealthStatus.HEALTHY,
+                        timestamp=datetime.utcnow(),
+                        duration_ms=duration_ms,
+                        details={
+                            "status_code": response.status_code,
+                            "response_data": health_data,
+                            "service_url": service_url
+                        }
+                    )
+                except Exception:
+                    # Service responded but not with valid JSON
+                    return HealthCheckResult(
+                        check_name=f"{service_name}_availability",
+                        check_type=CheckType.AVAILABILITY,
+                        status=HealthStatus.DEGRADED,
                         timestamp=datetime.utcnow(),
                         duration_ms=duration_ms,
                         details={"status_code": response.status_code},
-                        error_message=f"Service returned status code {response.status_code}"
+                        error_message="Service responded but not with valid health data"
                     )
-                    
+            else:
+                return HealthCheckResult(
+                    check_name=f"{service_name}_availability",
+                    check_type=CheckType.AVAILABILITY,
+                    status=HealthStatus.UNHEALTHY,
+                    timestamp=datetime.utcnow(),
+                    duration_ms=duration_ms,
+                    details={"status_code": response.status_code},
+                    error_message=f"Service returned status code {response.status_code}"
+                )
+                
         except Exception as e:
             duration_ms = (time.time() - start_time) * 1000
             return HealthCheckResult(
@@ -181,6 +181,85 @@ class MetricsCollector:
             registry=self.registry
         )
         
+        # === Resilience Metrics ===
+        
+        # Circuit breaker state (0=closed, 1=half-open, 2=open)
+        self.circuit_breaker_state = Gauge(
+            'circuit_breaker_state',
+            'Circuit breaker state (0=closed, 1=half_open, 2=open)',
+            ['breaker', 'service'],
+            registry=self.registry
+        )
+        
+        # Circuit breaker trips (closed/half-open -> open)
+        self.circuit_breaker_trips = Counter(
+            'circuit_breaker_trips_total',
+            'Total number of times a circuit breaker opened',
+            ['breaker', 'service'],
+            registry=self.registry
+        )
+        
+        # Hedged requests by winning attempt
+        self.hedged_requests = Counter(
+            'hedged_requests_total',
+            'Requests that sent a hedge, by which attempt answered first',
+            ['breaker', 'service', 'winner'],
+            registry=self.registry
+        )
+        
+        # === Outbound Delivery Metrics ===
+        
+        # Provider sends by outcome (sent, retried, failed)
+        self.outbound_deliveries = Counter(
+            'outbound_deliveries_total',
+            'Outbound provider API sends by channel and outcome',
+            ['channel', 'status'],
+            registry=self.registry
+        )
+        
+        # Send quota the scheduler paces each channel to (messages per second)
+        self.outbound_delivery_quota = Gauge(
+            'outbound_delivery_quota_per_second',
+            'Configured outbound send rate per channel and worker',
+            ['channel'],
+            registry=self.registry
+        )
+        
+        # === Message Queue Metrics ===
+        
+        # Entries not yet delivered to the consumer group
+        self.message_queue_lag = Gauge(
+            'message_queue_consumer_lag',
+            'Stream entries not yet delivered to the consumer group',
+            ['queue'],
+            registry=self.registry
+        )
+        
+        # Entries delivered but not acknowledged
+        self.message_queue_pending = Gauge(
+            'message_queue_pending_messages',
+            'Stream entries delivered to a consumer but not yet acknowledged',
+            ['queue'],
+            registry=self.registry
+        )
+        
+        # === Password Hashing Metrics ===
+        
+        # Hash/verify jobs by outcome (completed, rejected)
+        self.password_hash_operations = Counter(
+            'password_hash_operations_total',
+            'Password hash and verify jobs by operation and outcome',
+            ['operation', 'outcome'],
+            registry=self.registry
+        )
+        
+        # Jobs running or waiting in the hashing pool
+        self.password_hash_pending = Gauge(
+            'password_hash_pending_jobs',
+            'Password hashing jobs running or queued in the worker pool',
+            registry=self.registry
+        )
+        
         # === SLA Compliance Metrics ===
         
         # SLA violation counter
@@ -438,6 +517,71 @@ class MetricsCollector:
         except Exception as e:
             logger.error(f"Failed to set queue depth: {e}")
     
+    def set_circuit_breaker_state(self, breaker: str, service: str, state: int):
+        """
+        Set circuit breaker state
+        
+        Args:
+            breaker: Breaker name
+            service: Service owning the breaker
+            state: 0=closed, 1=half-open, 2=open
+        """
+        try:
+            self.circuit_breaker_state.labels(breaker=breaker, service=service).set(state)
+            
+        except Exception as e:
+            logger.error(f"Failed to set circuit breaker state: {e}")
+    
+    def record_circuit_breaker_trip(self, breaker: str, service: str):
+        """Record a circuit breaker opening"""
+        try:
+            self.circuit_breaker_trips.labels(breaker=breaker, service=service).inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record circuit breaker trip: {e}")
+    
+    def record_hedged_request(self, breaker: str, service: str, winner: str):
+        """Record a hedged request and which attempt ("primary" or "hedge") won"""
+        try:
+            self.hedged_requests.labels(breaker=breaker, service=service, winner=winner).inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record hedged request: {e}")
+    
+    def record_outbound_delivery(self, channel: str, status: str):
+        """Record an outbound send attempt outcome ("sent", "retrying" or "failed")"""
+        try:
+            self.outbound_deliveries.labels(channel=channel, status=status).inc()
+            
+        except Exception as e:
+            logger.error(f"Failed to record outbound delivery: {e}")
+    
+    def set_outbound_delivery_quota(self, channel: str, rate: float):
+        """Set the send rate a channel is paced to"""
+        try:
+            self.outbound_delivery_quota.labels(channel=channel).set(rate)
+            
+        except Exception as e:
+            logger.error(f"Failed to set outbound delivery quota: {e}")
+    
+    def set_message_queue_lag(self, queue: str, lag: int, pending: int):
+        """Set the undelivered and unacknowledged backlog of a queue"""
+        try:
+            self.message_queue_lag.labels(queue=queue).set(lag)
+            self.message_queue_pending.labels(queue=queue).set(pending)
+            
+        except Exception as e:
+            logger.error(f"Failed to set message queue lag: {e}")
+    
+    def record_password_hash(self, operation: str, outcome: str, pending: int):
+        """Record a hashing pool job outcome ("completed" or "rejected") and the current backlog"""
+        try:
+            self.password_hash_operations.labels(operation=operation, outcome=outcome).inc()
+            self.password_hash_pending.set(pending)
+            
+        except Exception as e:
+            logger.error(f"Failed to record password hash operation: {e}")
+    
     def _check_sla_violations(
         self,
         operation_type: OperationType,
@@ -11,19 +11,47 @@ from .password_security import (
     check_password_policy
 )
 
+from .breached_passwords import (
+    BreachedPasswordIndex,
+    build_breached_password_index,
+    get_breached_password_index
+)
+
+from .hashing_pool import (
+    PasswordHashingPool,
+    HashingPoolBusy,
+    get_password_hashing_pool
+)
+
 from .jwt_manager import (
     JWTManager,
     get_jwt_manager
 )
 
+from .jwks import (
+    JWKSVerifier,
+    get_jwks_verifier
+)
+
+from .token_cache import (
+    AuthStateCache,
+    VerifiedTokenCache,
+    get_auth_state_cache
+)
+
+from shared.utils.bloom_filter import BloomFilter
+
 from .rbac import (
     Role,
     Permission,
-    RBACManager
+    RBACManager,
+    permission_claims
 )
 
 from .rate_limiter import (
     RateLimiter,
+    HybridRateLimiter,
+    RateLimitCheck,
     RateLimitType,
     RateLimitError,
     get_rate_limiter,
@@ -45,18 +73,35 @@ __all__ = [
     "verify_password",
     "validate_password_strength",
     "check_password_policy",
+    "PasswordHashingPool",
+    "HashingPoolBusy",
+    "get_password_hashing_pool",
+    "BreachedPasswordIndex",
+    "build_breached_password_index",
+    "get_breached_password_index",
     
     # JWT Management
     "JWTManager",
     "get_jwt_manager",
+    "JWKSVerifier",
+    "get_jwks_verifier",
+    
+    # Authentication Caches
+    "AuthStateCache",
+    "BloomFilter",
+    "VerifiedTokenCache",
+    "get_auth_state_cache",
     
     # RBAC
     "Role",
     "Permission", 
     "RBACManager",
+    "permission_claims",
     
     # Rate Limiting
     "RateLimiter",
+    "HybridRateLimiter",
+    "RateLimitCheck",
     "RateLimitType",
     "RateLimitError",
     "get_rate_limiter",
@@ -0,0 +1,312 @@
+"""
+Offline breached-password index
+A downloaded Pwned Passwords SHA-1 list is converted once into a sorted
+binary file that is memory-mapped and binary-searched, so breach checks
+need no network access and memory stays bounded by the page cache
+
+File layout (little endian):
+    header   magic "PWNDIDX1", record count (u64), minimum breach count (u64)
+    fanout   65536 x u64: number of records whose first two bytes are <= i
+    records  sorted, de-duplicated 20-byte SHA-1 digests
+
+An optional ``<index>.bloom`` sidecar answers most negative lookups without
+touching the record pages:
+    header   magic "PWNDBLM2", capacity (u64), error rate (f64),
+             index record count (u64), SHA-256 of the index header and fanout
+    bits     Bloom filter bit array
+
+A sidecar whose record count or digest does not match the index it sits
+next to was built for another index and is ignored, since it would turn
+breached passwords into misses.
+"""
+
+import hashlib
+import heapq
+import logging
+import mmap
+import os
+import struct
+import tempfile
+from typing import BinaryIO, Iterable, Iterator, List, Optional
+
+from shared.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b"PWNDIDX1"
+BLOOM_MAGIC = b"PWNDBLM2"
+BLOOM_SUFFIX = ".bloom"
+
+DIGEST_SIZE = 20
+FANOUT_SIZE = 65536
+
+_HEADER = struct.Struct("<8sQQ")
+_BLOOM_HEADER = struct.Struct("<8sQdQ32s")
+_U64 = struct.Struct("<Q")
+_RECORDS_OFFSET = _HEADER.size + FANOUT_SIZE * _U64.size
+
+
+def _index_digest(header_and_fanout: bytes) -> bytes:
+    """Fingerprint tying a Bloom sidecar to one index (the fanout reflects every record)"""
+    return hashlib.sha256(header_and_fanout).digest()
+
+
+def _parse_hash_lines(lines: Iterable[str], min_count: int) -> Iterator[bytes]:
+    """Digests from "SHA1[:COUNT]" lines with at least ``min_count`` breaches"""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        hex_digest, _, count = line.partition(":")
+        try:
+            if min_count > 1 and count and int(count) < min_count:
+                continue
+            digest = bytes.fromhex(hex_digest)
+        except ValueError:
+            continue
+        if len(digest) == DIGEST_SIZE:
+            yield digest
+
+
+def _read_records(handle: BinaryIO) -> Iterator[bytes]:
+    while True:
+        record = handle.read(DIGEST_SIZE)
+        if len(record) < DIGEST_SIZE:
+            return
+        yield record
+
+
+def _write_sorted_run(digests: List[bytes], directory: str) -> str:
+    digests.sort()
+    fd, path = tempfile.mkstemp(prefix="pwned-run-", dir=directory)
+    with os.fdopen(fd, "wb", buffering=1 << 20) as handle:
+        handle.writelines(digests)
+    return path
+
+
+def build_breached_password_index(
+    sources: Iterable[str],
+    output_path: str,
+    min_count: int = 1,
+    bloom_error_rate: Optional[float] = None,
+    chunk_size: int = 2_000_000
+) -> int:
+    """
+    Convert Pwned Passwords SHA-1 lists into a sorted binary index
+
+    Input may be in any order: it is sorted in ``chunk_size`` runs that are
+    merged from disk, so memory use does not grow with the list size.
+
+    Args:
+        sources: Paths of "SHA1:COUNT" text files (HIBP download format)
+        output_path: Index file to write
+        min_count: Skip hashes seen in fewer breaches than this
+        bloom_error_rate: Also write a Bloom filter sidecar with this false-positive rate
+        chunk_size: Digests sorted in memory at a time
+
+    Returns:
+        Number of distinct hashes written
+    """
+    directory = os.path.dirname(os.path.abspath(output_path))
+    # A sidecar of the previous index would give false negatives on the new one
+    bloom_path = f"{output_path}{BLOOM_SUFFIX}"
+    if os.path.exists(bloom_path):
+        os.unlink(bloom_path)
+    runs: List[str] = []
+    try:
+        chunk: List[bytes] = []
+        for source in sources:
+            with open(source, "r", encoding="ascii", errors="ignore") as handle:
+                for digest in _parse_hash_lines(handle, min_count):
+                    chunk.append(digest)
+                    if len(chunk) >= chunk_size:
+                        runs.append(_write_sorted_run(chunk, directory))
+                        chunk = []
+        if chunk or not runs:
+            runs.append(_write_sorted_run(chunk, directory))
+
+        fanout = [0] * FANOUT_SIZE
+        count = 0
+        tmp_output = f"{output_path}.tmp"
+        handles = [open(run, "rb", buffering=1 << 20) for run in runs]
+        try:
+            with open(tmp_output, "wb", buffering=1 << 20) as out:
+                out.write(_HEADER.pack(INDEX_MAGIC, 0, min_count))
+                out.write(bytes(FANOUT_SIZE * _U64.size))
+                previous = None
+                for digest in heapq.merge(*(_read_records(h) for h in handles)):
+                    if digest == previous:
+                        continue
+                    out.write(digest)
+                    fanout[(digest[0] << 8) | digest[1]] += 1
+                    previous = digest
+                    count += 1
+
+                # Cumulative counts: records with a 16-bit prefix <= i
+                total = 0
+                for i, bucket in enumerate(fanout):
+                    total += bucket
+                    fanout[i] = total
+                out.seek(0)
+                out.write(_HEADER.pack(INDEX_MAGIC, count, min_count))
+                out.write(struct.pack(f"<{FANOUT_SIZE}Q", *fanout))
+        finally:
+            for handle in handles:
+                handle.close()
+        os.replace(tmp_output, output_path)
+    finally:
+        for run in runs:
+            os.unlink(run)
+
+    if bloom_error_rate:
+        _build_bloom_sidecar(output_path, count, bloom_error_rate)
+
+    logger.info(f"Wrote breached-password index {output_path} with {count} hashes")
+    return count
+
+
+def _build_bloom_sidecar(index_path: str, count: int, error_rate: float) -> None:
+    bloom = BloomFilter(max(1, count), error_rate)
+    with open(index_path, "rb") as handle:
+        index_digest = _index_digest(handle.read(_RECORDS_OFFSET))
+        for digest in _read_records(handle):
+            bloom.add(digest.hex())
+    tmp_path = f"{index_path}{BLOOM_SUFFIX}.tmp"
+    with open(tmp_path, "wb") as out:
+        out.write(_BLOOM_HEADER.pack(BLOOM_MAGIC, bloom.capacity, error_rate, count, index_digest))
+        out.write(bloom.to_bytes())
+    os.replace(tmp_path, f"{index_path}{BLOOM_SUFFIX}")
+
+
+class BreachedPasswordIndex:
+    """
+    Memory-mapped lookup over a breached-password index file
+
+    A lookup reads the 16-bit fanout bucket and binary-searches the few
+    records inside it (about log2(n / 65536) comparisons), touching only a
+    handful of pages. With a Bloom sidecar most passwords that are not in
+    the list are rejected before the records are read.
+
+    Args:
+        path: Index file written by ``build_breached_password_index``
+        use_bloom: Load ``<path>.bloom`` when present and built for this index
+
+    Raises:
+        ValueError: If the file is not a valid index
+    """
+
+    def __init__(self, path: str, use_bloom: bool = True):
+        self.path = path
+        self._bloom_file = None
+        self._bloom_map = None
+        self.bloom: Optional[BloomFilter] = None
+        self._map = None
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, self.min_count = _HEADER.unpack_from(self._map, 0)
+        except (ValueError, struct.error):
+            self.close()
+            raise ValueError(f"{path} is not a breached-password index")
+        if magic != INDEX_MAGIC or len(self._map) != _RECORDS_OFFSET + self.count * DIGEST_SIZE:
+            self.close()
+            raise ValueError(f"{path} is not a breached-password index")
+
+        if use_bloom and os.path.exists(path + BLOOM_SUFFIX):
+            self._load_bloom(path + BLOOM_SUFFIX)
+
+    def _load_bloom(self, bloom_path: str) -> None:
+        bloom_file = open(bloom_path, "rb")
+        bloom_map = bits = None
+        try:
+            bloom_map = mmap.mmap(bloom_file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, capacity, error_rate, count, index_digest = _BLOOM_HEADER.unpack_from(bloom_map, 0)
+            if magic != BLOOM_MAGIC:
+                raise ValueError("bad magic")
+            if count != self.count or index_digest != _index_digest(self._map[:_RECORDS_OFFSET]):
+                raise ValueError("built for a different index")
+            # Checked before any view of the map exists, which would keep it from closing
+            if len(bloom_map) - _BLOOM_HEADER.size != BloomFilter.byte_length(capacity, error_rate):
+                raise ValueError("truncated or corrupt bit array")
+            bits = memoryview(bloom_map)[_BLOOM_HEADER.size:]
+            self.bloom = BloomFilter(capacity, error_rate, bits=bits, count=self.count)
+        except (ValueError, OverflowError, struct.error) as e:
+            logger.warning(f"Ignoring invalid Bloom sidecar {bloom_path}: {e}")
+            if bits is not None:
+                bits.release()
+            if bloom_map is not None:
+                bloom_map.close()
+            bloom_file.close()
+            return
+        self._bloom_file, self._bloom_map = bloom_file, bloom_map
+
+    def _fanout(self, bucket: int) -> int:
+        if bucket < 0:
+            return 0
+        return _U64.unpack_from(self._map, _HEADER.size + bucket * _U64.size)[0]
+
+    def contains_digest(self, digest: bytes) -> bool:
+        """Whether a raw 20-byte SHA-1 digest is in the index"""
+        if self.bloom is not None and digest.hex() not in self.bloom:
+            return False
+
+        bucket = (digest[0] << 8) | digest[1]
+        lo, hi = self._fanout(bucket - 1), self._fanout(bucket)
+        records = self._map
+        while lo < hi:
+            mid = (lo + hi) // 2
+            offset = _RECORDS_OFFSET + mid * DIGEST_SIZE
+            record = records[offset:offset + DIGEST_SIZE]
+            if record == digest:
+                return True
+            if record < digest:
+                lo = mid + 1
+            else:
+                hi = mid
+        return False
+
+    def contains_password(self, password: str) -> bool:
+        """Whether a plain-text password appears in the breach list"""
+        return self.contains_digest(hashlib.sha1(password.encode("utf-8")).digest())
+
+    def __len__(self) -> int:
+        return self.count
+
+    def close(self) -> None:
+        if self.bloom is not None:
+            # Release the memoryview before unmapping
+            self.bloom._bits.release()
+            self.bloom = None
+        for resource in (self._bloom_map, self._bloom_file, self._map, self._file):
+            if resource is not None:
+                resource.close()
+
+
+# Global index instance (None when offline checks are not configured)
+_breached_password_index: Optional[BreachedPasswordIndex] = None
+_index_loaded = False
+
+
+def get_breached_password_index() -> Optional[BreachedPasswordIndex]:
+    """
+    Get the offline breached-password index configured by BREACHED_PASSWORDS_INDEX_PATH
+
+    Returns:
+        The opened index, or None when unset or unreadable (callers then fall
+        back to the online range API)
+    """
+    global _breached_password_index, _index_loaded
+    if not _index_loaded:
+        _index_loaded = True
+        from shared.config.env_constants import BREACHED_PASSWORDS_INDEX_PATH, get_env_value
+        path = get_env_value(BREACHED_PASSWORDS_INDEX_PATH, default="")
+        if path:
+            try:
+                _breached_password_index = BreachedPasswordIndex(path)
+                logger.info(
+                    f"Offline breached-password index loaded: {len(_breached_password_index)} hashes"
+                    f"{' with Bloom filter' if _breached_password_index.bloom else ''}"
+                )
+            except (OSError, ValueError) as e:
+                logger.error(f"Cannot open breached-password index {path}, using the online API: {e}")
+    return _breached_password_index
@@ -0,0 +1,201 @@
+"""
+Off-loop password hashing
+Argon2id/bcrypt run on a bounded worker pool so a login burst cannot stall
+the event loop; once the backlog is full new jobs are rejected immediately
+"""
+
+import asyncio
+import logging
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from shared.utils.circuit_breaker import get_optional_metrics_collector
+from .password_security import PasswordHasher
+
+logger = logging.getLogger(__name__)
+
+EXECUTOR_TYPES = ("thread", "process")
+
+# Hasher used inside process-pool workers (built from the same environment settings)
+_worker_hasher: Optional[PasswordHasher] = None
+
+
+def _process_hasher() -> PasswordHasher:
+    global _worker_hasher
+    if _worker_hasher is None:
+        _worker_hasher = PasswordHasher()
+    return _worker_hasher
+
+
+def _process_hash(password: str, use_argon2: bool) -> str:
+    return _process_hasher().hash_password(password, use_argon2)
+
+
+def _process_verify(password: str, hashed_password: str) -> bool:
+    return _process_hasher().verify_password(password, hashed_password)
+
+
+class HashingPoolBusy(Exception):
+    """
+    Raised when the hashing backlog is full
+
+    Args:
+        retry_after: Seconds the client should wait before retrying
+    """
+
+    def __init__(self, retry_after: int = 1):
+        super().__init__("Password hashing pool is saturated")
+        self.retry_after = retry_after
+
+
+class PasswordHashingPool:
+    """
+    Bounded executor for password hashing and verification
+
+    Threads are the default: argon2-cffi and bcrypt release the GIL while
+    hashing, so workers run in parallel without pickling overhead. The
+    process executor isolates hashing from the interpreter completely at
+    the cost of a process per worker (and ignores ``hasher``; workers build
+    their own from the environment).
+
+    At most ``max_workers`` jobs run and ``max_queue`` wait; any further job
+    raises ``HashingPoolBusy`` instead of queueing behind the burst.
+
+    Args:
+        hasher: Password hasher used by thread workers
+        max_workers: Concurrent hashing jobs
+        max_queue: Jobs allowed to wait for a worker
+        executor: "thread" or "process"
+        retry_after: Retry-After hint attached to rejections
+        metrics: Metrics collector (defaults to the global one when available)
+    """
+
+    def __init__(
+        self,
+        hasher: Optional[PasswordHasher] = None,
+        max_workers: Optional[int] = None,
+        max_queue: int = 32,
+        executor: str = "thread",
+        retry_after: int = 1,
+        metrics: Any = None
+    ):
+        if executor not in EXECUTOR_TYPES:
+            raise ValueError(f"Unknown hashing executor '{executor}', expected one of {EXECUTOR_TYPES}")
+        self.hasher = hasher or PasswordHasher()
+        self.max_workers = max(1, max_workers or min(4, os.cpu_count() or 1))
+        self.max_queue = max(0, max_queue)
+        self.executor_type = executor
+        self.retry_after = retry_after
+        self._metrics = metrics
+        self._executor: Optional[Executor] = None
+        self._pending = 0
+        self.stats = {"completed": 0, "rejected": 0, "peak_pending": 0}
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.executor_type == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="password-hash"
+                )
+        return self._executor
+
+    def _record(self, operation: str, outcome: str) -> None:
+        metrics = self._metrics or get_optional_metrics_collector()
+        if metrics is not None:
+            metrics.record_password_hash(operation, outcome, self._pending)
+
+    def _release(self, operation: str) -> None:
+        self._pending -= 1
+        self.stats["completed"] += 1
+        self._record(operation, "completed")
+
+    async def _run(self, operation: str, fn: Callable, *args) -> Any:
+        if self._pending >= self.max_workers + self.max_queue:
+            self.stats["rejected"] += 1
+            self._record(operation, "rejected")
+            raise HashingPoolBusy(self.retry_after)
+
+        loop = asyncio.get_running_loop()
+        future = self._get_executor().submit(fn, *args)
+        # Count the job until the worker is done with it, even if the caller
+        # stops waiting (client disconnect), so the bound reflects real load
+        self._pending += 1
+        self.stats["peak_pending"] = max(self.stats["peak_pending"], self._pending)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, operation))
+        return await asyncio.wrap_future(future)
+
+    async def hash_password(self, password: str, use_argon2: bool = True) -> str:
+        """
+        Hash a password off the event loop
+
+        Raises:
+            HashingPoolBusy: If the backlog is full
+            HashingError: If hashing fails
+        """
+        if self.executor_type == "process":
+            return await self._run("hash", _process_hash, password, use_argon2)
+        return await self._run("hash", self.hasher.hash_password, password, use_argon2)
+
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """
+        Verify a password off the event loop
+
+        Raises:
+            HashingPoolBusy: If the backlog is full
+        """
+        if self.executor_type == "process":
+            return await self._run("verify", _process_verify, password, hashed_password)
+        return await self._run("verify", self.hasher.verify_password, password, hashed_password)
+
+    def needs_rehash(self, hashed_password: str) -> bool:
+        """Cheap hash-format check, safe to call on the loop"""
+        return self.hasher.needs_rehash(hashed_password)
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def shutdown(self, wait: bool = True) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "executor": self.executor_type,
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            **self.stats
+        }
+
+
+# Global hashing pool instance
+_hashing_pool: Optional[PasswordHashingPool] = None
+
+
+def get_password_hashing_pool() -> PasswordHashingPool:
+    """Get global password hashing pool instance"""
+    global _hashing_pool
+    if _hashing_pool is None:
+        from shared.config.env_constants import (
+            PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE, PASSWORD_HASH_EXECUTOR, get_env_value
+        )
+        workers = get_env_value(PASSWORD_HASH_WORKERS)
+        _hashing_pool = PasswordHashingPool(
+            max_workers=int(workers) if workers else None,
+            max_queue=int(get_env_value(PASSWORD_HASH_MAX_QUEUE, default="32")),
+            executor=get_env_value(PASSWORD_HASH_EXECUTOR, default="thread")
+        )
+    return _hashing_pool
+
+
+def close_password_hashing_pool() -> None:
+    """Shut down the global hashing pool's workers"""
+    global _hashing_pool
+    if _hashing_pool is not None:
+        _hashing_pool.shutdown(wait=False)
+        _hashing_pool = None
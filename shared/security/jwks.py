@@ -0,0 +1,248 @@
+"""
+Local JWT verification against the auth service's published key set
+Public keys are fetched from the JWKS endpoint, cached by ``kid`` and
+refreshed in the background, so requests are verified without network calls
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional, Sequence
+
+from jose import JWTError, jwk, jwt
+
+logger = logging.getLogger(__name__)
+
+# Path the auth service serves its JWK Set on
+JWKS_PATH = "/.well-known/jwks.json"
+
+JWKSLoader = Callable[[], Awaitable[Dict[str, Any]]]
+
+# Algorithms a shared secret can verify; an RS*/ES* name with a secret as the
+# key would make the secret act as a public key
+LEGACY_ALGORITHMS = ("HS256", "HS384", "HS512")
+
+
+def http_jwks_loader(url: str, timeout: float = 5.0) -> JWKSLoader:
+    """
+    Loader that fetches a JWKS document over the pooled HTTP client
+
+    Args:
+        url: JWKS endpoint URL
+        timeout: Request timeout in seconds
+    """
+    async def load() -> Dict[str, Any]:
+        from shared.utils.http_client import get_http_client
+        response = await get_http_client().get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.json()
+
+    return load
+
+
+class JWKSVerifier:
+    """
+    Verifies RS256 access tokens with locally cached public keys
+
+    Keys are looked up by the token's ``kid`` header. A token signed with a
+    key that is not cached yet (a rotation happened since the last refresh)
+    triggers one immediate refresh, at most every ``min_refresh_interval``
+    seconds, so forged ``kid`` values cannot be used to hammer the auth
+    service. If a refresh fails the previous key set stays in use.
+
+    Args:
+        load_jwks: Returns the current JWKS document
+        refresh_interval: Seconds between background refreshes
+        min_refresh_interval: Minimum seconds between on-demand refreshes
+        audience: Expected ``aud`` claim
+        issuer: Expected ``iss`` claim
+        algorithms: Accepted signing algorithms
+        legacy_secret: Shared secret for tokens issued without a ``kid``
+        legacy_algorithm: Algorithm of legacy shared-secret tokens (HS256/384/512)
+        clock: Monotonic clock (injectable for tests)
+
+    Raises:
+        ValueError: If a legacy secret is given with a non-HMAC algorithm
+    """
+
+    def __init__(
+        self,
+        load_jwks: JWKSLoader,
+        refresh_interval: float = 300.0,
+        min_refresh_interval: float = 30.0,
+        audience: Optional[str] = "api",
+        issuer: Optional[str] = "mvp-coaching-ai-platform",
+        algorithms: Sequence[str] = ("RS256",),
+        legacy_secret: Optional[str] = None,
+        legacy_algorithm: str = "HS256",
+        clock: Callable[[], float] = time.monotonic
+    ):
+        if legacy_secret and legacy_algorithm not in LEGACY_ALGORITHMS:
+            raise ValueError(
+                f"Legacy shared-secret tokens need an HMAC algorithm, not {legacy_algorithm}"
+            )
+        self._load_jwks = load_jwks
+        self.refresh_interval = refresh_interval
+        self.min_refresh_interval = min_refresh_interval
+        self.audience = audience
+        self.issuer = issuer
+        self.algorithms = list(algorithms)
+        self.legacy_secret = legacy_secret
+        self.legacy_algorithm = legacy_algorithm
+        self._clock = clock
+        self._keys: Dict[str, Any] = {}
+        self._refreshed_at: Optional[float] = None
+        self._refresh_lock = asyncio.Lock()
+        self._refresher: Optional[asyncio.Task] = None
+        self.stats = {"verified": 0, "refreshes": 0, "refresh_failures": 0, "unknown_kid": 0}
+
+    async def start(self) -> None:
+        """Load the key set and keep it refreshed in the background"""
+        if self._refresher is not None:
+            return
+        await self.refresh()
+        self._refresher = asyncio.create_task(self._refresh_periodically())
+
+    async def stop(self) -> None:
+        if self._refresher:
+            self._refresher.cancel()
+            try:
+                await self._refresher
+            except asyncio.CancelledError:
+                pass
+            self._refresher = None
+
+    async def refresh(self, min_age: Optional[float] = None) -> bool:
+        """
+        Replace the cached keys with the current JWKS document
+
+        Args:
+            min_age: Skip the fetch if the last one was less than this many seconds ago
+
+        Returns:
+            True if the key set was loaded
+        """
+        async with self._refresh_lock:
+            # Callers queued behind a refresh that just finished reuse its result
+            if min_age is not None and self._refreshed_at is not None:
+                if self._clock() - self._refreshed_at < min_age:
+                    return False
+            self._refreshed_at = self._clock()
+            try:
+                document = await self._load_jwks()
+                keys = {}
+                for key_data in document.get("keys", []):
+                    kid = key_data.get("kid")
+                    if not kid or key_data.get("use", "sig") != "sig":
+                        continue
+                    keys[kid] = jwk.construct(key_data, algorithm=key_data.get("alg", "RS256"))
+            except Exception as e:
+                self.stats["refresh_failures"] += 1
+                logger.error(f"Failed to refresh JWKS, keeping {len(self._keys)} cached keys: {e}")
+                return False
+
+            self._keys = keys
+            self.stats["refreshes"] += 1
+            logger.debug(f"JWKS refreshed: {sorted(keys)}")
+            return True
+
+    async def _refresh_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    async def _get_key(self, kid: str) -> Any:
+        key = self._keys.get(kid)
+        if key is not None:
+            return key
+
+        self.stats["unknown_kid"] += 1
+        await self.refresh(min_age=self.min_refresh_interval)
+        key = self._keys.get(kid)
+        if key is None:
+            raise JWTError(f"Unknown key ID: {kid}")
+        return key
+
+    async def verify(
+        self,
+        token: str,
+        audience: Optional[str] = None,
+        issuer: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Verify a token's signature and standard claims
+
+        Args:
+            token: Encoded JWT
+            audience: Expected ``aud`` (defaults to the verifier's)
+            issuer: Expected ``iss`` (defaults to the verifier's)
+
+        Returns:
+            Token claims
+
+        Raises:
+            ExpiredSignatureError: If the token has expired
+            JWTClaimsError: If audience or issuer do not match
+            JWTError: If the token is malformed, unsigned by a known key or invalid
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+        if kid:
+            key, algorithms = await self._get_key(kid), self.algorithms
+        elif self.legacy_secret:
+            key, algorithms = self.legacy_secret, [self.legacy_algorithm]
+        else:
+            raise JWTError("Missing key ID in token header")
+
+        claims = jwt.decode(
+            token,
+            key,
+            algorithms=algorithms,
+            audience=audience or self.audience,
+            issuer=issuer or self.issuer
+        )
+        self.stats["verified"] += 1
+        return claims
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {"cached_keys": sorted(self._keys), **self.stats}
+
+
+# Global verifier instance
+_jwks_verifier: Optional[JWKSVerifier] = None
+
+
+def get_jwks_verifier(load_jwks: Optional[JWKSLoader] = None) -> JWKSVerifier:
+    """
+    Get global JWKS verifier instance
+
+    Args:
+        load_jwks: Key set source used when the verifier is first created
+            (defaults to fetching ``AUTH_SERVICE_URL`` + ``JWKS_PATH``)
+    """
+    global _jwks_verifier
+    if _jwks_verifier is None:
+        from shared.config.env_constants import (
+            AUTH_SERVICE_URL, AUTH_JWKS_REFRESH_SECONDS, JWT_AUDIENCE, JWT_ISSUER,
+            JWT_SECRET_KEY, JWT_ALGORITHM, get_env_value
+        )
+        if load_jwks is None:
+            auth_service_url = get_env_value(AUTH_SERVICE_URL, default="http://auth-service:8001")
+            load_jwks = http_jwks_loader(auth_service_url.rstrip("/") + JWKS_PATH)
+        legacy_secret = get_env_value(JWT_SECRET_KEY) or None
+        legacy_algorithm = get_env_value(JWT_ALGORITHM, default="HS256")
+        if legacy_secret and legacy_algorithm not in LEGACY_ALGORITHMS:
+            logger.warning(
+                f"JWT_ALGORITHM is {legacy_algorithm}; shared-secret tokens without a key ID "
+                f"will not be accepted"
+            )
+            legacy_secret = None
+        _jwks_verifier = JWKSVerifier(
+            load_jwks,
+            refresh_interval=float(get_env_value(AUTH_JWKS_REFRESH_SECONDS, default="300")),
+            # Same claims the auth service issues tokens with
+            audience=get_env_value(JWT_AUDIENCE, fallback=False, default="api"),
+            issuer=get_env_value(JWT_ISSUER, fallback=False, default="mvp-coaching-ai-platform"),
+            legacy_secret=legacy_secret,
+            legacy_algorithm=legacy_algorithm
+        )
+    return _jwks_verifier
@@ -15,13 +15,15 @@ from cryptography.hazmat.primitives import serialization
 from cryptography.hazmat.primitives.asymmetric import rsa
 from cryptography.hazmat.backends import default_backend
 
-from jose import JWTError, jwt
+from jose import JWTError, jwk, jwt
 from jose.exceptions import ExpiredSignatureError, JWTClaimsError
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete, and_
 
 from shared.models.database import JWTBlacklist, RefreshToken
 from shared.cache import get_cache_manager
+from .rbac import permission_claims
+from .token_cache import get_auth_state_cache
 
 logger = logging.getLogger(__name__)
 
@@ -47,6 +49,12 @@ class JWTKeyManager:
                 await self._generate_initial_key()
             await self._set_current_key()
     
+    async def reload(self):
+        """Re-read keys from disk to pick up rotations made by other workers"""
+        async with self._lock:
+            await self._load_existing_keys()
+            await self._set_current_key()
+    
     async def _load_existing_keys(self):
         """Load existing keys from filesystem"""
         try:
@@ -184,6 +192,28 @@ class JWTKeyManager:
         
         return self.keys[key_id]['public_key']
     
+    async def get_jwks(self) -> Dict[str, Any]:
+        """
+        Public JWK Set of the keys tokens may currently be signed with
+        
+        Includes the current key and keys still inside their rotation grace
+        period, so tokens issued before a rotation keep verifying.
+        
+        Returns:
+            JWKS document ({"keys": [...]})
+        """
+        if not self.keys:
+            await self.initialize()
+        
+        keys = []
+        for key_id, key_data in sorted(self.keys.items(), key=lambda item: item[1]['created_at'], reverse=True):
+            if not key_data.get('is_active', True):
+                continue
+            public_jwk = jwk.construct(key_data['public_key'], algorithm="RS256").to_dict()
+            keys.append({**public_jwk, "kid": key_id, "use": "sig"})
+        
+        return {"keys": keys}
+    
     async def rotate_keys(self) -> str:
         """Rotate JWT keys - generate new key and mark old as inactive after grace period"""
         async with self._lock:
@@ -246,6 +276,9 @@ class JWTManager:
         
         # Initialize cache manager for blacklist
         self.cache_manager = get_cache_manager()
+        
+        # Per-process verified tokens and revocation filter
+        self.auth_cache = get_auth_state_cache()
     
     async def initialize(self):
         """Initialize JWT manager"""
@@ -291,7 +324,7 @@ class JWTManager:
             # Custom claims
             "type": "access",
             "creator_id": creator_id,
-            "roles": roles or ["creator"],
+            **permission_claims(roles or ["creator"]),
             "permissions": permissions or [],
             
             # Security claims
@@ -342,30 +375,11 @@ class JWTManager:
             JWTError: If token is invalid
         """
         try:
-            # Decode header to get key ID
-            unverified_header = jwt.get_unverified_header(token)
-            key_id = unverified_header.get("kid")
-            
-            if not key_id:
-                raise JWTError("Missing key ID in token header")
-            
-            # Get public key for verification
-            public_key = await self.key_manager.get_public_key(key_id)
-            if not public_key:
-                raise JWTError(f"Unknown key ID: {key_id}")
-            
-            # Verify token
-            payload = jwt.decode(
-                token,
-                public_key,
-                algorithms=["RS256"],
-                audience=self.audience,
-                issuer=self.issuer
-            )
-            
-            # Additional validation
-            if payload.get("type") != "access":
-                raise JWTError("Invalid token type")
+            # Tokens verified before skip the signature check until they expire
+            payload = self.auth_cache.tokens.get(token)
+            if payload is None:
+                payload = await self._decode_token(token)
+                self.auth_cache.tokens.put(token, payload)
             
             # Check blacklist if requested
             if check_blacklist:
@@ -383,6 +397,35 @@ class JWTManager:
             logger.error(f"Token verification error: {e}")
             raise JWTError("Token verification failed")
     
+    async def _decode_token(self, token: str) -> Dict[str, Any]:
+        """Verify signature and claims of an access token"""
+        # Decode header to get key ID
+        unverified_header = jwt.get_unverified_header(token)
+        key_id = unverified_header.get("kid")
+        
+        if not key_id:
+            raise JWTError("Missing key ID in token header")
+        
+        # Get public key for verification
+        public_key = await self.key_manager.get_public_key(key_id)
+        if not public_key:
+            raise JWTError(f"Unknown key ID: {key_id}")
+        
+        # Verify token
+        payload = jwt.decode(
+            token,
+            public_key,
+            algorithms=["RS256"],
+            audience=self.audience,
+            issuer=self.issuer
+        )
+        
+        # Additional validation
+        if payload.get("type") != "access":
+            raise JWTError("Invalid token type")
+        
+        return payload
+    
     async def blacklist_token(
         self,
         jti: str,
@@ -422,6 +465,9 @@ class JWTManager:
                     "system", cache_key, "blacklisted", ttl=ttl
                 )
             
+            # Drop the cached token and flag the JTI on every worker
+            await self.auth_cache.revoke(jti)
+            
             logger.info(f"Token blacklisted: {jti} (reason: {reason})")
             
         except Exception as e:
@@ -430,6 +476,10 @@ class JWTManager:
     
     async def _is_token_blacklisted(self, jti: str, db: AsyncSession) -> bool:
         """Check if token is blacklisted"""
+        # Never revoked: no Redis or database round trip needed
+        if not self.auth_cache.might_be_revoked(jti):
+            return False
+        
         try:
             # Check Redis cache first
             cache_key = f"blacklist:{jti}"
@@ -500,6 +550,7 @@ class JWTManager:
             # We can't blacklist all existing access tokens without knowing their JTIs
             
             await db.commit()
+            await self.auth_cache.invalidate_creator(creator_id)
             logger.warning(f"Revoked all tokens for creator {creator_id} (reason: {reason})")
             
         except Exception as e:
@@ -10,9 +10,10 @@ import logging
 from typing import Optional, List, Dict, Set
 from dataclasses import dataclass
 from enum import Enum
-import httpx
+from shared.utils.http_client import get_http_client
 from pathlib import Path
 from shared.cache import get_cache_manager
+from .breached_passwords import get_breached_password_index
 
 # Primary: Argon2id for new passwords
 from argon2 import PasswordHasher as Argon2PasswordHasher
@@ -23,6 +24,8 @@ from passlib.context import CryptContext
 
 logger = logging.getLogger(__name__)
 
+PWNED_PASSWORDS_API_URL = "https://api.pwnedpasswords.com"
+
 
 class PasswordStrength(str, Enum):
     """Password strength levels"""
@@ -408,7 +411,10 @@ class PasswordValidator:
     
     async def _check_compromised_password(self, password: str) -> bool:
         """
-        Check if password has been compromised using HaveIBeenPwned API
+        Check if password has been compromised
+        
+        Uses the offline breached-password index when one is configured
+        (no network access), otherwise the HaveIBeenPwned range API
         
         Args:
             password: Password to check
@@ -416,6 +422,13 @@ class PasswordValidator:
         Returns:
             True if password is compromised, False otherwise
         """
+        offline_index = get_breached_password_index()
+        if offline_index is not None:
+            if offline_index.contains_password(password):
+                logger.warning("Password found in offline breach index")
+                return True
+            return False
+        
         # Hash password with SHA-1
         sha1_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
         prefix = sha1_hash[:5]
@@ -438,27 +451,28 @@ class PasswordValidator:
                 return False
             
             # Query HaveIBeenPwned API with k-anonymity
-            async with httpx.AsyncClient(timeout=5.0) as client:
-                response = await client.get(
-                    f"https://api.pwnedpasswords.com/range/{prefix}",
-                    headers={"User-Agent": "MVP-Coaching-AI-Platform"}
-                )
+            client = get_http_client()
+            response = await client.get(
+                f"{PWNED_PASSWORDS_API_URL}/range/{prefix}",
+                headers={"User-Agent": "MVP-Coaching-AI-Platform"},
+                timeout=5.0
+            )
+            
+            if response.status_code == 200:
+                # Cache the response for 1 hour
+                await cache_manager.redis.set("system", cache_key, response.text, ttl=3600)
+                
+                # Check if our suffix appears in the response
+                for line in response.text.splitlines():
+                    hash_suffix, count = line.split(':')
+                    if hash_suffix == suffix:
+                        logger.warning(f"Password found in {count} breaches")
+                        return True
+                return False
+            else:
+                logger.warning(f"HaveIBeenPwned API error: {response.status_code}")
+                return False
                 
-                if response.status_code == 200:
-                    # Cache the response for 1 hour
-                    await cache_manager.redis.set("system", cache_key, response.text, ttl=3600)
-                    
-                    # Check if our suffix appears in the response
-                    for line in response.text.splitlines():
-                        hash_suffix, count = line.split(':')
-                        if hash_suffix == suffix:
-                            logger.warning(f"Password found in {count} breaches")
-                            return True
-                    return False
-                else:
-                    logger.warning(f"HaveIBeenPwned API error: {response.status_code}")
-                    return False
-                    
         except Exception as e:
             logger.warning(f"Failed to check compromised password: {e}")
             return False  # Fail open - don't block if service is unavailable
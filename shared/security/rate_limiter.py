@@ -5,12 +5,22 @@ Implements sophisticated rate limiting with Redis backend for scalability
 and multi-tenant isolation following security patterns.
 """
 
+import math
 import time
+import asyncio
 import logging
-from typing import Dict, Optional, Tuple, Any
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple, Any
 from enum import Enum
 
 from shared.cache import get_cache_manager
+from shared.config.env_constants import (
+    RATE_LIMIT_LEASE_SIZE,
+    RATE_LIMIT_LEASE_TTL_SECONDS,
+    RATE_LIMIT_EXPECTED_WORKERS,
+    get_env_value
+)
 from shared.exceptions.base import BaseServiceException
 
 logger = logging.getLogger(__name__)
@@ -34,13 +44,79 @@ class RateLimitError(BaseServiceException):
         self.retry_after = retry_after
 
 
+@dataclass
+class RateLimitCheck:
+    """One limit to enforce in a multi-limit check"""
+    identifier: str
+    endpoint_type: str
+    limit_type: RateLimitType = RateLimitType.PER_USER
+    custom_limits: Optional[Dict[str, int]] = None
+
+
+# Generic cell rate algorithm (GCRA) over any number of keys in one round-trip.
+# State per key is a single integer: the theoretical arrival time (TAT) in
+# microseconds. A request is admitted only if every key admits it; otherwise no
+# key is updated. Uses the Redis server clock so workers need no clock sync.
+#
+# KEYS: one per limit
+# ARGV: cost (negative = refund), then per key: emission interval (us), burst tolerance (us)
+# Returns: {allowed, then per key: remaining, retry_after_ms, reset_after_ms}
+GCRA_SCRIPT = """
+if redis.replicate_commands then pcall(redis.replicate_commands) end
+local time = redis.call('TIME')
+local now = tonumber(time[1]) * 1000000 + tonumber(time[2])
+local cost = tonumber(ARGV[1])
+local allowed = 1
+local tats, new_tats, retry = {}, {}, {}
+
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i])
+    local tolerance = tonumber(ARGV[2 * i + 1])
+    local tat = tonumber(redis.call('GET', key) or now)
+    if tat < now then tat = now end
+    tats[i] = tat
+    new_tats[i] = tat + interval * cost
+    retry[i] = math.max(0, new_tats[i] - tolerance - now)
+    if retry[i] > 0 then allowed = 0 end
+end
+
+local results = {allowed}
+for i, key in ipairs(KEYS) do
+    local interval = tonumber(ARGV[2 * i])
+    local tolerance = tonumber(ARGV[2 * i + 1])
+    local tat = tats[i]
+    if allowed == 1 and cost ~= 0 then
+        -- cost < 0 refunds unused leased tokens (see HybridRateLimiter)
+        tat = math.max(new_tats[i], now)
+        local ttl = math.ceil((tat - now) / 1000)
+        if ttl > 0 then
+            redis.call('SET', key, string.format('%.0f', tat), 'PX', ttl)
+        else
+            redis.call('DEL', key)
+        end
+    end
+    table.insert(results, math.max(0, math.floor((now + tolerance - tat) / interval)))
+    table.insert(results, math.ceil(retry[i] / 1000))
+    table.insert(results, math.ceil((tat - now) / 1000))
+end
+return results
+"""
+
+
 class RateLimiter:
     """
     Advanced rate limiting with Redis backend and multi-tenant support
     
-    Uses sliding window algorithm with burst protection and tenant isolation.
+    Uses GCRA (a token bucket kept as one timestamp per key) evaluated by a Lua
+    script: one round-trip per check, O(1) memory per key, and several limits
+    (e.g. per-user plus per-creator) admitted or rejected atomically together.
+    
+    A limit of ``requests`` per ``window`` seconds refills at requests/window;
+    ``burst`` (defaults to ``requests``) is the bucket capacity.
     """
     
+    KEY_PREFIX = "rate_limit:gcra"
+    
     def __init__(self, cache_manager=None):
         """
         Initialize rate limiter
@@ -49,6 +125,8 @@ class RateLimiter:
             cache_manager: Cache manager for Redis operations
         """
         self.cache_manager = cache_manager or get_cache_manager()
+        self._script = None
+        self._script_client = None
         
         # Default rate limits by endpoint type
         self.default_limits = {
@@ -60,6 +138,92 @@ class RateLimiter:
             "default": {"requests": 30, "window": 60, "burst": 45}     # 30/min, burst 45
         }
     
+    def _key(self, identifier: str, endpoint_type: str, limit_type: RateLimitType) -> str:
+        """Tenant-isolated key for one limit"""
+        return f"{self.KEY_PREFIX}:{limit_type.value}:{endpoint_type}:{identifier}"
+    
+    @staticmethod
+    def _gcra_args(limits: Dict[str, int]) -> Tuple[int, int]:
+        """Emission interval and burst tolerance in microseconds"""
+        interval = max(1, int(limits["window"] * 1_000_000 / limits["requests"]))
+        capacity = max(1, limits.get("burst") or limits["requests"])
+        return interval, interval * capacity
+    
+    async def _run_gcra(self, checks: List[RateLimitCheck], cost: int) -> Tuple[bool, List[Dict[str, Any]]]:
+        """Evaluate the GCRA script for all checks in one round-trip"""
+        redis_client = await self.cache_manager.redis.get_client()
+        if self._script is None or self._script_client is not redis_client:
+            # EVALSHA with transparent reload on NOSCRIPT
+            self._script = redis_client.register_script(GCRA_SCRIPT)
+            self._script_client = redis_client
+        
+        keys, args, resolved = [], [cost], []
+        for check in checks:
+            limits = check.custom_limits or self.default_limits.get(
+                check.endpoint_type, self.default_limits["default"]
+            )
+            interval, tolerance = self._gcra_args(limits)
+            keys.append(self._key(check.identifier, check.endpoint_type, check.limit_type))
+            args.extend([interval, tolerance])
+            resolved.append(limits)
+        
+        raw = await self._script(keys=keys, args=args)
+        allowed = int(raw[0]) == 1
+        now = time.time()
+        
+        infos = []
+        for i, (check, limits) in enumerate(zip(checks, resolved)):
+            remaining, retry_after_ms, reset_after_ms = (int(v) for v in raw[1 + 3 * i:4 + 3 * i])
+            capacity = limits.get("burst") or limits["requests"]
+            infos.append({
+                "allowed": allowed and retry_after_ms == 0,
+                "current_requests": capacity - remaining,
+                "remaining": remaining,
+                "limit": limits["requests"],
+                "window_seconds": limits["window"],
+                "reset_time": int(math.ceil(now + reset_after_ms / 1000)),
+                "retry_after": int(math.ceil(retry_after_ms / 1000)),
+                "retry_after_ms": retry_after_ms,
+                "burst_limit": limits.get("burst"),
+                "endpoint_type": check.endpoint_type,
+                "limit_type": check.limit_type.value
+            })
+        return allowed, infos
+    
+    async def check_rate_limits(
+        self,
+        checks: List[RateLimitCheck],
+        cost: int = 1
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        """
+        Atomically check and consume several limits in one Redis round-trip
+        
+        The request is admitted only if every limit admits it; a rejected request
+        consumes nothing from any limit.
+        
+        Args:
+            checks: Limits to enforce
+            cost: Units consumed from each limit
+            
+        Returns:
+            Tuple of (allowed: bool, per-check info dicts)
+        """
+        try:
+            return await self._run_gcra(checks, cost)
+        except Exception as e:
+            return self._fail_open(checks, e)
+    
+    @staticmethod
+    def _fail_open(checks: List[RateLimitCheck], error: Exception) -> Tuple[bool, List[Dict[str, Any]]]:
+        logger.exception(f"Rate limiting error for {[c.identifier for c in checks]}: {error}")
+        
+        # Fail open by default (configurable)
+        return True, [{
+            "error": "Rate limiting service unavailable",
+            "fail_mode": "open",
+            "allowed": True
+        } for _ in checks]
+    
     async def check_rate_limit(
         self,
         identifier: str,
@@ -68,7 +232,7 @@ class RateLimiter:
         custom_limits: Optional[Dict[str, int]] = None
     ) -> Tuple[bool, Dict[str, Any]]:
         """
-        Check rate limit using sliding window algorithm
+        Check rate limit using GCRA
         
         Args:
             identifier: Unique identifier (user_id, ip, creator_id, etc.)
@@ -79,85 +243,10 @@ class RateLimiter:
         Returns:
             Tuple of (allowed: bool, info: dict)
         """
-        limits = custom_limits or self.default_limits.get(endpoint_type, self.default_limits["default"])
-        
-        # Create tenant-isolated key
-        key = f"rate_limit:{limit_type.value}:{endpoint_type}:{identifier}"
-        current_time = time.time()
-        window_start = current_time - limits["window"]
-        
-        try:
-            # Get Redis client
-            redis_client = await self.cache_manager.redis.get_client()
-            
-            # Use Redis pipeline for atomic operations
-            pipe = redis_client.pipeline()
-            
-            # Remove expired entries
-            pipe.zremrangebyscore(key, 0, window_start)
-            
-            # Count current requests
-            pipe.zcard(key)
-            
-            # Add current request
-            pipe.zadd(key, {str(current_time): current_time})
-            
-            # Set expiration
-            pipe.expire(key, limits["window"])
-            
-            results = await pipe.execute()
-            current_requests = results[1]
-            
-            # Check against limits
-            allowed = current_requests < limits["requests"]
-            
-            # Check burst limit if configured
-            if allowed and limits.get("burst") and current_requests >= limits.get("burst", limits["requests"]):
-                # Implement burst protection with shorter window
-                burst_window = 10  # 10 seconds
-                burst_key = f"{key}:burst"
-                burst_start = current_time - burst_window
-                
-                burst_pipe = redis_client.pipeline()
-                burst_pipe.zremrangebyscore(burst_key, 0, burst_start)
-                burst_pipe.zcard(burst_key)
-                burst_pipe.zadd(burst_key, {str(current_time): current_time})
-                burst_pipe.expire(burst_key, burst_window)
-                
-                burst_results = await burst_pipe.execute()
-                burst_requests = burst_results[1]
-                
-                # Allow max 20% of burst limit in 10 seconds
-                burst_threshold = max(1, limits.get("burst", limits["requests"]) // 5)
-                if burst_requests > burst_threshold:
-                    allowed = False
-            
-            # Calculate reset time
-            reset_time = int(current_time + limits["window"])
-            
-            info = {
-                "allowed": allowed,
-                "current_requests": current_requests,
-                "limit": limits["requests"],
-                "window_seconds": limits["window"],
-                "reset_time": reset_time,
-                "retry_after": limits["window"] if not allowed else 0,
-                "burst_limit": limits.get("burst"),
-                "endpoint_type": endpoint_type,
-                "limit_type": limit_type.value
-            }
-            
-            return allowed, info
-            
-        except Exception as e:
-            logger.exception(f"Rate limiting error for {identifier}: {e}")
-            
-            # Fail open by default (configurable)
-            return True, {
-                "error": "Rate limiting service unavailable",
-                "fail_mode": "open",
-                "allowed": True
-            }
+        allowed, infos = await self.check_rate_limits(
+            [RateLimitCheck(identifier, endpoint_type, limit_type, custom_limits)]
+        )
+        return allowed, infos[0]
     
     async def get_rate_limit_status(
         self,
@@ -176,29 +265,16 @@ class RateLimiter:
         Returns:
             Current rate limit status
         """
-        limits = self.default_limits.get(endpoint_type, self.default_limits["default"])
-        key = f"rate_limit:{limit_type.value}:{endpoint_type}:{identifier}"
-        current_time = time.time()
-        window_start = current_time - limits["window"]
-        
         try:
-            redis_client = await self.cache_manager.redis.get_client()
-            
-            # Clean and count without incrementing
-            pipe = redis_client.pipeline()
-            pipe.zremrangebyscore(key, 0, window_start)
-            pipe.zcard(key)
-            
-            results = await pipe.execute()
-            current_requests = results[1]
-            
+            _, infos = await self._run_gcra([RateLimitCheck(identifier, endpoint_type, limit_type)], cost=0)
+            info = infos[0]
             return {
-                "current_requests": current_requests,
-                "limit": limits["requests"],
-                "window_seconds": limits["window"],
-                "remaining": max(0, limits["requests"] - current_requests),
-                "reset_time": int(current_time + limits["window"]),
-                "burst_limit": limits.get("burst")
+                "current_requests": info["current_requests"],
+                "limit": info["limit"],
+                "window_seconds": info["window_seconds"],
+                "remaining": info["remaining"],
+                "reset_time": info["reset_time"],
+                "burst_limit": info["burst_limit"]
             }
             
         except Exception as e:
@@ -222,12 +298,12 @@ class RateLimiter:
         Returns:
             True if reset successful
         """
-        key = f"rate_limit:{limit_type.value}:{endpoint_type}:{identifier}"
+        key = self._key(identifier, endpoint_type, limit_type)
+        legacy_key = f"rate_limit:{limit_type.value}:{endpoint_type}:{identifier}"
         
         try:
             redis_client = await self.cache_manager.redis.get_client()
-            await redis_client.delete(key)
-            await redis_client.delete(f"{key}:burst")
+            await redis_client.delete(key, legacy_key, f"{legacy_key}:burst")
             
             logger.info(f"Reset rate limit for {identifier} on {endpoint_type}")
             return True
@@ -274,6 +350,148 @@ class RateLimiter:
             }
 
 
+@dataclass
+class _LocalLease:
+    """Tokens this worker already consumed from the Redis limit(s), spent locally"""
+    tokens: int
+    expires_at: float
+    infos: List[Dict[str, Any]]
+    next_batch: int = 0
+    denied_until: float = 0.0
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(get_env_value(name, fallback=True) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+class HybridRateLimiter(RateLimiter):
+    """
+    Rate limiter with an in-process pre-admission tier
+    
+    Each worker leases batches of tokens from the Redis GCRA limit (the batch is
+    consumed from the global bucket in the same script call that admits the
+    request) and admits later requests from its lease without a round-trip.
+    
+    Because leased tokens are consumed up front, N workers never over-admit.
+    The error is on the conservative side: tokens sitting in other workers'
+    leases, at most ``lease_size`` per worker, until they are used or refunded
+    when the lease expires. Batches shrink to ``remaining / expected_workers``
+    so near the limit every request falls back to the authoritative Redis check.
+    A rejection is remembered locally until its retry-after passes.
+    
+    Args:
+        cache_manager: Cache manager for Redis operations
+        lease_size: Maximum tokens leased per batch (0 disables the local tier)
+        lease_ttl: Seconds before unused leased tokens are refunded
+        expected_workers: Workers sharing a limit (bounds batch size near the limit)
+        max_tracked: Identifiers kept in the local table (least recently used evicted)
+    """
+    
+    def __init__(
+        self,
+        cache_manager=None,
+        lease_size: Optional[int] = None,
+        lease_ttl: Optional[float] = None,
+        expected_workers: Optional[int] = None,
+        max_tracked: int = 10000
+    ):
+        super().__init__(cache_manager)
+        self.lease_size = lease_size if lease_size is not None else _env_int(RATE_LIMIT_LEASE_SIZE, 20)
+        self.lease_ttl = lease_ttl if lease_ttl is not None else _env_int(RATE_LIMIT_LEASE_TTL_SECONDS, 2)
+        self.expected_workers = max(1, expected_workers or _env_int(RATE_LIMIT_EXPECTED_WORKERS, 4))
+        self.max_tracked = max_tracked
+        self._leases: "OrderedDict[Tuple[str, ...], _LocalLease]" = OrderedDict()
+        self.local_admissions = 0
+        self.redis_checks = 0
+    
+    def _local_infos(self, lease: _LocalLease, allowed: bool) -> List[Dict[str, Any]]:
+        return [
+            dict(info, allowed=allowed, remaining=info["remaining"] + lease.tokens)
+            for info in lease.infos
+        ]
+    
+    def _try_local(self, lease: Optional[_LocalLease], now: float) -> Optional[Tuple[bool, List[Dict[str, Any]]]]:
+        """Decide from the local lease, or None if Redis has to be asked"""
+        if lease is None:
+            return None
+        if lease.denied_until > now:
+            return False, self._local_infos(lease, False)
+        if lease.tokens > 0 and lease.expires_at > now:
+            lease.tokens -= 1
+            self.local_admissions += 1
+            return True, self._local_infos(lease, True)
+        return None
+    
+    async def check_rate_limits(
+        self,
+        checks: List[RateLimitCheck],
+        cost: int = 1
+    ) -> Tuple[bool, List[Dict[str, Any]]]:
+        if self.lease_size <= 0 or cost != 1:
+            return await super().check_rate_limits(checks, cost)
+        
+        lease_key = tuple(self._key(c.identifier, c.endpoint_type, c.limit_type) for c in checks)
+        lease = self._leases.get(lease_key)
+        if lease is not None:
+            self._leases.move_to_end(lease_key)
+        decision = self._try_local(lease, time.monotonic())
+        if decision is not None:
+            return decision
+        
+        if lease is None:
+            lease = _LocalLease(tokens=0, expires_at=0.0, infos=[])
+            self._leases[lease_key] = lease
+            while len(self._leases) > self.max_tracked:
+                self._leases.popitem(last=False)
+        
+        async with lease.lock:
+            # Another request may have refreshed the lease while we waited
+            decision = self._try_local(lease, time.monotonic())
+            if decision is not None:
+                return decision
+            
+            try:
+                if lease.tokens > 0:
+                    # Expired lease: give unused tokens back to the other workers
+                    await self._run_gcra(checks, -lease.tokens)
+                    lease.tokens = 0
+                
+                batch = lease.next_batch
+                self.redis_checks += 1
+                allowed, infos = await self._run_gcra(checks, 1 + batch)
+                if not allowed and batch:
+                    batch = 0
+                    allowed, infos = await self._run_gcra(checks, 1)
+            except Exception as e:
+                return self._fail_open(checks, e)
+            
+            now = time.monotonic()
+            remaining = min(info["remaining"] for info in infos)
+            lease.tokens = batch if allowed else 0
+            lease.expires_at = now + self.lease_ttl
+            lease.infos = infos
+            lease.next_batch = min(self.lease_size, remaining // self.expected_workers)
+            lease.denied_until = 0.0 if allowed else now + max(
+                info.get("retry_after_ms", 0) for info in infos
+            ) / 1000
+            return allowed, self._local_infos(lease, allowed)
+    
+    async def reset_rate_limit(
+        self,
+        identifier: str,
+        endpoint_type: str,
+        limit_type: RateLimitType = RateLimitType.PER_USER
+    ) -> bool:
+        key = self._key(identifier, endpoint_type, limit_type)
+        for lease_key in [k for k in self._leases if key in k]:
+            del self._leases[lease_key]
+        return await super().reset_rate_limit(identifier, endpoint_type, limit_type)
+
+
 # Global rate limiter instance
 _rate_limiter: Optional[RateLimiter] = None
 
@@ -282,7 +500,10 @@ def get_rate_limiter() -> RateLimiter:
     """Get global rate limiter instance (lazy initialization)"""
     global _rate_limiter
     if _rate_limiter is None:
-        _rate_limiter = RateLimiter()
+        if _env_int(RATE_LIMIT_LEASE_SIZE, 0) > 0:
+            _rate_limiter = HybridRateLimiter()
+        else:
+            _rate_limiter = RateLimiter()
     return _rate_limiter
 
 
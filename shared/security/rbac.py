@@ -4,7 +4,8 @@ Implements granular roles and permissions with resource-level access control
 """
 
 import logging
-from typing import Dict, List, Set, Optional, TYPE_CHECKING
+import hashlib
+from typing import Dict, Iterable, List, Set, Optional, Tuple, Union, TYPE_CHECKING
 from enum import Enum
 from dataclasses import dataclass
 
@@ -73,12 +74,31 @@ class RoleDefinition:
     inherits_from: Optional[List[str]] = None
 
 
+def _permission_key(permission) -> str:
+    """Registry key of a permission (enum member or custom permission string)"""
+    return getattr(permission, "value", permission)
+
+
 class RBACManager:
-    """Manages roles, permissions, and access control"""
+    """
+    Manages roles, permissions, and access control
+
+    Role definitions are compiled into integer bitmasks (one bit per
+    permission, inherited permissions folded in) whenever they change, so a
+    permission check is a single AND instead of walking the role hierarchy
+    and building sets. ``version`` fingerprints the compiled definitions;
+    masks carried in token claims are only trusted while it matches.
+    """
     
     def __init__(self):
         self.roles: Dict[str, RoleDefinition] = {}
+        self._permission_bits: Dict[str, int] = {}
+        self._bit_permissions: Dict[int, Union[Permission, str]] = {}
+        self._role_masks: Dict[str, int] = {}
+        self._roles_mask_cache: Dict[Tuple[str, ...], int] = {}
+        self.version = ""
         self._initialize_default_roles()
+        self._compile()
     
     def _initialize_default_roles(self):
         """Initialize default system roles"""
@@ -149,54 +169,136 @@ class RBACManager:
             inherits_from=[Role.CREATOR_READONLY]
         )
     
+    def _compile(self):
+        """Assign permission bits and recompile every role's mask"""
+        # Built-in permissions keep their declaration order and custom ones
+        # are sorted, so every worker with the same definitions agrees on bits
+        custom = sorted({
+            _permission_key(p)
+            for role_def in self.roles.values()
+            for p in role_def.permissions
+            if not isinstance(p, Permission)
+        } - {p.value for p in Permission})
+        names: List[Union[Permission, str]] = list(Permission) + custom
+        self._permission_bits = {_permission_key(p): 1 << i for i, p in enumerate(names)}
+        self._bit_permissions = {1 << i: p for i, p in enumerate(names)}
+        
+        self._role_masks = {}
+        for role in self.roles:
+            self._role_masks[role] = self._compile_role(role, set())
+        self._roles_mask_cache = {}
+        
+        fingerprint = hashlib.blake2b(digest_size=8)
+        for name in self._permission_bits:
+            fingerprint.update(name.encode() + b"\0")
+        for role, mask in sorted(self._role_masks.items()):
+            fingerprint.update(f"{_permission_key(role)}={mask};".encode())
+        self.version = fingerprint.hexdigest()
+    
+    def _compile_role(self, role: str, visiting: Set[str]) -> int:
+        if role in self._role_masks:
+            return self._role_masks[role]
+        role_def = self.roles.get(role)
+        if role_def is None or role in visiting:
+            return 0
+        visiting.add(role)
+        
+        mask = self.permissions_mask(role_def.permissions)
+        for parent_role in role_def.inherits_from or ():
+            mask |= self._compile_role(parent_role, visiting)
+        
+        self._role_masks[role] = mask
+        return mask
+    
+    def permissions_mask(self, permissions: Iterable[Union[Permission, str]]) -> int:
+        """Bitmask of the given permissions (unknown permissions contribute no bits)"""
+        mask = 0
+        for permission in permissions:
+            mask |= self._permission_bits.get(_permission_key(permission), 0)
+        return mask
+    
+    def permissions_from_mask(self, mask: int) -> Set[Union[Permission, str]]:
+        """Decode a permission bitmask back into permissions"""
+        permissions = set()
+        while mask:
+            bit = mask & -mask
+            permission = self._bit_permissions.get(bit)
+            if permission is not None:
+                permissions.add(permission)
+            mask ^= bit
+        return permissions
+    
+    def get_roles_mask(self, user_roles: Union[str, List[str]]) -> int:
+        """
+        Combined permission bitmask of a set of roles
+        
+        Args:
+            user_roles: Role names (a single role name is accepted too)
+            
+        Returns:
+            OR of the roles' compiled masks (memoized per role combination)
+        """
+        if isinstance(user_roles, str):
+            user_roles = [user_roles]
+        key = tuple(_permission_key(role) for role in user_roles)
+        mask = self._roles_mask_cache.get(key)
+        if mask is None:
+            mask = 0
+            for role in key:
+                if role not in self._role_masks:
+                    logger.warning(f"Unknown role requested: {role}")
+                    continue
+                mask |= self._role_masks[role]
+            self._roles_mask_cache[key] = mask
+        return mask
+    
+    def mask_from_claims(self, claims: Dict) -> Optional[int]:
+        """
+        Permission mask embedded in token claims
+        
+        Returns:
+            The ``perm_mask`` claim if it was compiled from the current role
+            definitions (matching ``perm_ver``), otherwise None
+        """
+        mask = claims.get("perm_mask")
+        if isinstance(mask, int) and claims.get("perm_ver") == self.version:
+            return mask
+        return None
+    
     def get_role_permissions(self, role: str) -> Set[Permission]:
         """Get all permissions for a role, including inherited permissions"""
-        if role not in self.roles:
+        role = _permission_key(role)
+        if role not in self._role_masks:
             logger.warning(f"Unknown role requested: {role}")
             return set()
         
-        role_def = self.roles[role]
-        permissions = role_def.permissions.copy()
-        
-        # Add inherited permissions
-        if role_def.inherits_from:
-            for parent_role in role_def.inherits_from:
-                permissions.update(self.get_role_permissions(parent_role))
-        
-        return permissions
+        return self.permissions_from_mask(self._role_masks[role])
     
     def has_permission(self, user_roles: List[str], required_permission: Permission) -> bool:
         """Check if user has required permission based on their roles"""
-        for role in user_roles:
-            role_permissions = self.get_role_permissions(role)
-            if required_permission in role_permissions:
-                return True
-        return False
+        bit = self._permission_bits.get(_permission_key(required_permission), 0)
+        return bool(self.get_roles_mask(user_roles) & bit)
     
     def has_any_permission(self, user_roles: List[str], required_permissions: List[Permission]) -> bool:
         """Check if user has any of the required permissions"""
-        for permission in required_permissions:
-            if self.has_permission(user_roles, permission):
-                return True
-        return False
+        return bool(self.get_roles_mask(user_roles) & self.permissions_mask(required_permissions))
     
     def has_all_permissions(self, user_roles: List[str], required_permissions: List[Permission]) -> bool:
         """Check if user has all required permissions"""
-        for permission in required_permissions:
-            if not self.has_permission(user_roles, permission):
-                return False
-        return True
+        required = self.permissions_mask(required_permissions)
+        # A permission without a bit is one no role can hold
+        if any(_permission_key(p) not in self._permission_bits for p in required_permissions):
+            return False
+        return self.get_roles_mask(user_roles) & required == required
     
     def get_user_permissions(self, user_roles: List[str]) -> Set[Permission]:
         """Get all permissions for a user based on their roles"""
-        all_permissions = set()
-        for role in user_roles:
-            all_permissions.update(self.get_role_permissions(role))
-        return all_permissions
+        return self.permissions_from_mask(self.get_roles_mask(user_roles))
     
     def add_custom_role(self, role_def: RoleDefinition):
         """Add a custom role definition"""
         self.roles[role_def.name] = role_def
+        self._compile()
         logger.info(f"Added custom role: {role_def.name}")
     
     def create_role(self, role_name: str, permissions: List[str]) -> bool:
@@ -272,6 +374,7 @@ class RBACManager:
         """Remove a role definition"""
         if role_name in self.roles:
             del self.roles[role_name]
+            self._compile()
             logger.info(f"Removed role: {role_name}")
 
 
@@ -288,6 +391,37 @@ class AuthorizationError(HTTPException):
         )
 
 
+def resolve_permission_mask(request: Request, creator: "CreatorResponse") -> int:
+    """
+    Permission mask of the current creator, resolved once per request
+    
+    Routes guarded by several permission dependencies share the mask stored
+    on ``request.state`` instead of re-resolving roles for each check. The
+    ``perm_mask`` claim of the creator's own token (``request.state.token_claims``)
+    is used when it was compiled from the current role definitions; otherwise
+    the mask is derived from the subscription tier.
+    
+    Args:
+        request: Current request
+        creator: Authenticated creator
+        
+    Returns:
+        Compiled permission bitmask for the creator's roles
+    """
+    cached = getattr(request.state, "rbac_mask", None)
+    if cached is not None and cached[0] == creator.id and cached[1] == rbac_manager.version:
+        return cached[2]
+    
+    claims = getattr(request.state, "token_claims", None)
+    mask = None
+    if claims and claims.get("sub") == creator.id:
+        mask = rbac_manager.mask_from_claims(claims)
+    if mask is None:
+        mask = rbac_manager.get_roles_mask(get_roles_from_subscription(creator.subscription_tier))
+    request.state.rbac_mask = (creator.id, rbac_manager.version, mask)
+    return mask
+
+
 def require_permission(required_permission: Permission):
     """
     Decorator factory for permission-based access control
@@ -298,16 +432,19 @@ def require_permission(required_permission: Permission):
     Returns:
         Dependency function for FastAPI
     """
+    # Built-in permissions keep their bits across recompiles
+    required_bit = rbac_manager.permissions_mask([required_permission])
+    
     async def permission_checker(
+        request: Request,
         creator: "CreatorResponse" = Depends(get_current_creator)
     ) -> "CreatorResponse":
         """Check if creator has required permission"""
         
-        # Get user roles (for MVP, based on subscription tier)
-        user_roles = get_roles_from_subscription(creator.subscription_tier)
-        
-        # Check permission
-        if not rbac_manager.has_permission(user_roles, required_permission):
+        # Check permission against the creator's compiled mask
+        if not resolve_permission_mask(request, creator) & required_bit:
+            # Get user roles (for MVP, based on subscription tier)
+            user_roles = get_roles_from_subscription(creator.subscription_tier)
             logger.warning(
                 f"Permission denied for creator {creator.id}: "
                 f"required_permission={required_permission.value}, user_roles={user_roles}"
@@ -331,14 +468,16 @@ def require_any_permission(required_permissions: List[Permission]):
     Returns:
         Dependency function for FastAPI
     """
+    required_mask = rbac_manager.permissions_mask(required_permissions)
+    
     async def permission_checker(
+        request: Request,
         creator: "CreatorResponse" = Depends(get_current_creator)
     ) -> "CreatorResponse":
         """Check if creator has any of the required permissions"""
         
-        user_roles = get_roles_from_subscription(creator.subscription_tier)
-        
-        if not rbac_manager.has_any_permission(user_roles, required_permissions):
+        if not resolve_permission_mask(request, creator) & required_mask:
+            user_roles = get_roles_from_subscription(creator.subscription_tier)
             permission_names = [p.value for p in required_permissions]
             logger.warning(
                 f"Permission denied for creator {creator.id}: "
@@ -363,14 +502,16 @@ def require_all_permissions(required_permissions: List[Permission]):
     Returns:
         Dependency function for FastAPI
     """
+    required_mask = rbac_manager.permissions_mask(required_permissions)
+    
     async def permission_checker(
+        request: Request,
         creator: "CreatorResponse" = Depends(get_current_creator)
     ) -> "CreatorResponse":
         """Check if creator has all required permissions"""
         
-        user_roles = get_roles_from_subscription(creator.subscription_tier)
-        
-        if not rbac_manager.has_all_permissions(user_roles, required_permissions):
+        if resolve_permission_mask(request, creator) & required_mask != required_mask:
+            user_roles = get_roles_from_subscription(creator.subscription_tier)
             permission_names = [p.value for p in required_permissions]
             logger.warning(
                 f"Permission denied for creator {creator.id}: "
@@ -480,6 +621,23 @@ def get_roles_from_subscription(subscription_tier: str) -> List[str]:
     return role_mapping.get(subscription_tier, [Role.CREATOR.value])
 
 
+def permission_claims(user_roles: List[str]) -> Dict[str, object]:
+    """
+    Token claims carrying a user's roles and compiled permission mask
+    
+    Args:
+        user_roles: Roles to embed
+        
+    Returns:
+        ``roles``, ``perm_mask`` and ``perm_ver`` claims (see ``RBACManager.mask_from_claims``)
+    """
+    return {
+        "roles": list(user_roles),
+        "perm_mask": rbac_manager.get_roles_mask(user_roles),
+        "perm_ver": rbac_manager.version
+    }
+
+
 def check_permission_sync(user_roles: List[str], required_permission: Permission) -> bool:
     """Synchronous permission check for use in non-async contexts"""
     return rbac_manager.has_permission(user_roles, required_permission)
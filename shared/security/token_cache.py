@@ -0,0 +1,329 @@
+"""
+Per-process caches for request authentication
+Verified token claims, a Bloom filter of revoked JTIs and creator status,
+kept consistent across workers through Redis pub/sub invalidation events
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, Optional, Tuple
+
+from shared.utils.bloom_filter import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+# Pub/sub channel carrying revocation and creator invalidation events
+AUTH_EVENTS_CHANNEL = "auth:events"
+
+RevokedLoader = Callable[[], Awaitable[Iterable[str]]]
+
+
+class VerifiedTokenCache:
+    """
+    Bounded LRU of verified token claims keyed by the token's SHA-256 digest
+
+    Entries expire at the token's ``exp`` claim, so a cached token is never
+    accepted past its own expiry.
+
+    Args:
+        max_size: Maximum number of cached tokens
+        clock: Wall clock in epoch seconds (injectable for tests)
+    """
+
+    def __init__(self, max_size: int = 10_000, clock: Callable[[], float] = time.time):
+        self.max_size = max(1, max_size)
+        self._clock = clock
+        self._entries: "OrderedDict[bytes, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @staticmethod
+    def _key(token: str) -> bytes:
+        return hashlib.sha256(token.encode()).digest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Claims of a previously verified, unexpired token"""
+        key = self._key(token)
+        entry = self._entries.get(key)
+        if entry is None:
+            self.stats["misses"] += 1
+            return None
+        claims, expires_at = entry
+        if self._clock() >= expires_at:
+            del self._entries[key]
+            self.stats["misses"] += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats["hits"] += 1
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]) -> None:
+        """Cache verified claims until the token's ``exp``"""
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= self._clock():
+            return
+        key = self._key(token)
+        self._entries[key] = (claims, float(expires_at))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats["evictions"] += 1
+
+    def discard(self, predicate: Callable[[Dict[str, Any]], bool]) -> int:
+        """Drop every cached token whose claims match ``predicate``"""
+        keys = [key for key, (claims, _) in self._entries.items() if predicate(claims)]
+        for key in keys:
+            del self._entries[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class AuthStateCache:
+    """
+    Authentication state shared by all workers without per-request round trips
+
+    * ``tokens``: verified claims, so signatures are checked once per token
+    * a Bloom filter of revoked JTIs: a negative answer is final, only
+      positives need the authoritative blacklist lookup
+    * creator active status with a short TTL
+
+    Revocations and creator changes are applied locally and published on
+    ``AUTH_EVENTS_CHANNEL`` so every other worker applies them too. The
+    filter is rebuilt from the blacklist on start and every
+    ``rebuild_interval`` seconds, which drops expired revocations and
+    repairs events missed while a worker was disconnected.
+
+    Args:
+        redis_client: Redis client instance
+        token_cache_size: Maximum number of cached verified tokens
+        bloom_capacity: Expected number of unexpired revocations
+        bloom_error_rate: Bloom filter false-positive rate at capacity
+        creator_status_ttl: Seconds a creator's active status is trusted
+        rebuild_interval: Seconds between Bloom filter rebuilds
+        clock: Wall clock in epoch seconds (injectable for tests)
+    """
+
+    def __init__(
+        self,
+        redis_client,
+        token_cache_size: int = 10_000,
+        bloom_capacity: int = 100_000,
+        bloom_error_rate: float = 0.001,
+        creator_status_ttl: float = 60.0,
+        rebuild_interval: float = 3600.0,
+        clock: Callable[[], float] = time.time
+    ):
+        self.redis = redis_client
+        self.tokens = VerifiedTokenCache(token_cache_size, clock=clock)
+        self.bloom_capacity = bloom_capacity
+        self.bloom_error_rate = bloom_error_rate
+        self.revoked = BloomFilter(bloom_capacity, bloom_error_rate)
+        self.creator_status_ttl = creator_status_ttl
+        self.rebuild_interval = rebuild_interval
+        self._clock = clock
+        self._creators: Dict[str, Tuple[bool, float]] = {}
+        self._load_revoked: Optional[RevokedLoader] = None
+        self._revoked_during_rebuild: Optional[list] = None
+        self.loaded = False
+        self._pubsub = None
+        self._listener: Optional[asyncio.Task] = None
+        self._rebuilder: Optional[asyncio.Task] = None
+        self.stats = {"bloom_negatives": 0, "bloom_positives": 0, "events": 0}
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    async def start(self, load_revoked: Optional[RevokedLoader] = None) -> None:
+        """
+        Load the revocation filter and subscribe to invalidation events
+
+        Args:
+            load_revoked: Returns the JTIs of all unexpired revocations
+        """
+        if self._listener is not None:
+            return
+        self._load_revoked = load_revoked
+        client = await self.redis.get_client()
+        self._pubsub = client.pubsub(ignore_subscribe_messages=True)
+        await self._pubsub.subscribe(AUTH_EVENTS_CHANNEL)
+        # Subscribe first so no revocation published during the load is missed
+        await self.rebuild_revocations()
+        self._listener = asyncio.create_task(self._listen())
+        if load_revoked is not None:
+            self._rebuilder = asyncio.create_task(self._rebuild_periodically())
+        logger.info(f"Auth state cache started ({len(self.revoked)} revoked tokens loaded)")
+
+    async def stop(self) -> None:
+        for task in (self._listener, self._rebuilder):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._listener = self._rebuilder = None
+
+        if self._pubsub is not None:
+            try:
+                await self._pubsub.unsubscribe(AUTH_EVENTS_CHANNEL)
+                await self._pubsub.aclose()
+            except Exception as e:
+                logger.warning(f"Failed to close auth events subscription: {e}")
+            self._pubsub = None
+
+    async def rebuild_revocations(self) -> None:
+        """Replace the revocation filter with the current blacklist"""
+        if self._load_revoked is None:
+            return
+        # Revocations applied while loading may not be visible to the query yet
+        self._revoked_during_rebuild = []
+        try:
+            jtis = list(await self._load_revoked())
+        except Exception as e:
+            logger.error(f"Failed to load revoked tokens, keeping the current filter: {e}")
+            return
+        finally:
+            recent, self._revoked_during_rebuild = self._revoked_during_rebuild, None
+
+        revoked = BloomFilter(max(self.bloom_capacity, len(jtis) * 2), self.bloom_error_rate)
+        for jti in jtis + recent:
+            revoked.add(jti)
+        self.revoked = revoked
+        self.loaded = True
+
+    async def _rebuild_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.rebuild_interval)
+            await self.rebuild_revocations()
+
+    # ------------------------------------------------------------------
+    # Revocations
+    # ------------------------------------------------------------------
+
+    def might_be_revoked(self, jti: str) -> bool:
+        """
+        False means the token is certainly not revoked; True needs confirmation
+
+        Until the filter has been loaded from the blacklist every token is
+        reported as possibly revoked, so callers keep checking the blacklist.
+        """
+        if not self.loaded or jti in self.revoked:
+            self.stats["bloom_positives"] += 1
+            return True
+        self.stats["bloom_negatives"] += 1
+        return False
+
+    async def revoke(self, jti: str) -> None:
+        """Record a revocation here and publish it to the other workers"""
+        self._apply({"type": "revoked", "jti": jti})
+        await self._publish({"type": "revoked", "jti": jti})
+
+    # ------------------------------------------------------------------
+    # Creator status
+    # ------------------------------------------------------------------
+
+    def get_creator_active(self, creator_id: str) -> Optional[bool]:
+        """Cached active status, or None when it has to be looked up"""
+        entry = self._creators.get(creator_id)
+        if entry is None:
+            return None
+        active, cached_at = entry
+        if self._clock() - cached_at >= self.creator_status_ttl:
+            self._creators.pop(creator_id, None)
+            return None
+        return active
+
+    def set_creator_active(self, creator_id: str, active: bool) -> None:
+        self._creators[creator_id] = (active, self._clock())
+
+    async def invalidate_creator(self, creator_id: str) -> None:
+        """Forget a creator's status and cached tokens on every worker"""
+        self._apply({"type": "creator", "creator_id": creator_id})
+        await self._publish({"type": "creator", "creator_id": creator_id})
+
+    # ------------------------------------------------------------------
+    # Events
+    # ------------------------------------------------------------------
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        if event.get("type") == "revoked":
+            jti = event["jti"]
+            self.revoked.add(jti)
+            if self._revoked_during_rebuild is not None:
+                self._revoked_during_rebuild.append(jti)
+            self.tokens.discard(lambda claims: claims.get("jti") == jti)
+        elif event.get("type") == "creator":
+            creator_id = event["creator_id"]
+            self._creators.pop(creator_id, None)
+            self.tokens.discard(lambda claims: claims.get("sub") == creator_id)
+
+    async def _publish(self, event: Dict[str, Any]) -> None:
+        try:
+            client = await self.redis.get_client()
+            await client.publish(AUTH_EVENTS_CHANNEL, json.dumps(event))
+        except Exception as e:
+            # The periodic rebuild brings other workers' filters up to date
+            logger.error(f"Failed to publish auth event {event.get('type')}: {e}")
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                async for item in self._pubsub.listen():
+                    if item.get("type") != "message":
+                        continue
+                    try:
+                        self._apply(json.loads(item["data"]))
+                        self.stats["events"] += 1
+                    except (ValueError, KeyError, TypeError) as e:
+                        logger.warning(f"Ignoring malformed auth event: {e}")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Auth events listener failed, resubscribing: {e}")
+                await asyncio.sleep(1)
+                try:
+                    await self._pubsub.subscribe(AUTH_EVENTS_CHANNEL)
+                except Exception:
+                    pass
+                # Events may have been missed while disconnected
+                await self.rebuild_revocations()
+                self._creators.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "cached_tokens": len(self.tokens),
+            "cached_creators": len(self._creators),
+            "revoked_tokens": len(self.revoked),
+            **self.tokens.stats,
+            **self.stats
+        }
+
+
+# Global auth state cache instance
+_auth_state_cache: Optional[AuthStateCache] = None
+
+
+def get_auth_state_cache() -> AuthStateCache:
+    """Get global auth state cache instance"""
+    global _auth_state_cache
+    if _auth_state_cache is None:
+        from shared.cache.redis_client import get_redis_client
+        from shared.config.env_constants import (
+            AUTH_TOKEN_CACHE_SIZE, AUTH_REVOCATION_BLOOM_CAPACITY, AUTH_CREATOR_STATUS_TTL_SECONDS, get_env_value
+        )
+        _auth_state_cache = AuthStateCache(
+            get_redis_client(),
+            token_cache_size=int(get_env_value(AUTH_TOKEN_CACHE_SIZE, default="10000")),
+            bloom_capacity=int(get_env_value(AUTH_REVOCATION_BLOOM_CAPACITY, default="100000")),
+            creator_status_ttl=float(get_env_value(AUTH_CREATOR_STATUS_TTL_SECONDS, default="60"))
+        )
+    return _auth_state_cache
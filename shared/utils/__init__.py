@@ -2,8 +2,26 @@
 
 from .serializers import CustomJSONEncoder
 from .helpers import generate_correlation_id
+from .bloom_filter import BloomFilter
+from .circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState, LatencyTracker, hedged_call
+from .delivery_scheduler import DeliveryScheduler, RetryLater, TokenBucket
+from .http_client import get_http_client, init_http_client, close_http_client, create_http_client, HTTPClientConfig
 
 __all__ = [
     "CustomJSONEncoder",
     "generate_correlation_id",
+    "BloomFilter",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "CircuitState",
+    "LatencyTracker",
+    "hedged_call",
+    "DeliveryScheduler",
+    "RetryLater",
+    "TokenBucket",
+    "get_http_client",
+    "init_http_client",
+    "close_http_client",
+    "create_http_client",
+    "HTTPClientConfig",
 ]
\ No newline at end of file
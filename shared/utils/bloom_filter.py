@@ -0,0 +1,78 @@
+"""
+Bloom filter shared by the security caches
+Set membership with no false negatives in a fixed-size bit array, which can
+be a memory-mapped file so large filters are loaded without copying
+"""
+
+import hashlib
+import math
+from typing import Any, Optional
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter (no false negatives, ``error_rate`` false positives at capacity)
+
+    Args:
+        capacity: Expected number of items
+        error_rate: False-positive probability once ``capacity`` items were added
+        bits: Existing bit array (e.g. a memory-mapped file) from ``to_bytes``
+        count: Number of items already in ``bits``
+    """
+
+    def __init__(
+        self,
+        capacity: int = 100_000,
+        error_rate: float = 0.001,
+        bits: Optional[Any] = None,
+        count: int = 0
+    ):
+        capacity = max(1, capacity)
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.size = self._bit_count(capacity, error_rate)
+        self.hash_count = max(1, int(round(self.size / capacity * math.log(2))))
+        expected = (self.size + 7) // 8
+        if bits is None:
+            bits = bytearray(expected)
+        elif len(bits) != expected:
+            raise ValueError(f"Bloom filter bit array has {len(bits)} bytes, expected {expected}")
+        self._bits = bits
+        self.count = count
+
+    @staticmethod
+    def _bit_count(capacity: int, error_rate: float) -> int:
+        capacity = max(1, capacity)
+        return max(8, int(math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))))
+
+    @classmethod
+    def byte_length(cls, capacity: int, error_rate: float) -> int:
+        """
+        Size in bytes of the bit array for ``capacity`` and ``error_rate``
+
+        Raises:
+            ValueError, OverflowError: If the parameters cannot size a filter
+        """
+        return (cls._bit_count(capacity, error_rate) + 7) // 8
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "big")
+        h2 = int.from_bytes(digest[8:], "big") | 1
+        for i in range(self.hash_count):
+            yield (h1 + i * h2) % self.size
+
+    def add(self, item: str) -> None:
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
+
+    def to_bytes(self) -> bytes:
+        """Bit array for persisting; reload with ``BloomFilter(capacity, error_rate, bits=...)``"""
+        return bytes(self._bits)
@@ -0,0 +1,267 @@
+"""
+Circuit breaker and request hedging for service-to-service calls
+
+A breaker opens after consecutive failures so callers fail fast instead of
+waiting on an overloaded upstream, then lets a few probe calls through once
+the recovery timeout has passed (half-open) and closes again when they
+succeed. Hedging sends a second copy of a slow request to another replica
+after a delay derived from the recent p95 latency and takes whichever answer
+comes first.
+"""
+
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from enum import Enum
+from typing import Any, Awaitable, Callable, Deque, Optional, Sequence, Tuple
+
+from shared.exceptions.base import ExternalServiceError
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitState(str, Enum):
+    """Circuit breaker states"""
+    CLOSED = "closed"
+    HALF_OPEN = "half_open"
+    OPEN = "open"
+
+
+# Gauge values exported for each state
+CIRCUIT_STATE_VALUES = {CircuitState.CLOSED: 0, CircuitState.HALF_OPEN: 1, CircuitState.OPEN: 2}
+
+
+class CircuitOpenError(ExternalServiceError):
+    """Raised when a call is rejected because the circuit is open"""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(
+            f"Circuit '{name}' is open",
+            details={"circuit": name, "retry_after": round(retry_after, 3)}
+        )
+        self.retry_after = retry_after
+
+
+_MONITORING_UNAVAILABLE = False
+
+
+def get_optional_metrics_collector():
+    """Metrics collector if the monitoring stack is installed, else None"""
+    global _MONITORING_UNAVAILABLE
+    if _MONITORING_UNAVAILABLE:
+        return None
+    try:
+        from shared.monitoring.metrics import get_metrics_collector
+        return get_metrics_collector()
+    except ImportError:
+        _MONITORING_UNAVAILABLE = True
+        return None
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with half-open probing
+
+    Args:
+        name: Breaker name (metrics label)
+        failure_threshold: Consecutive failures that open the circuit
+        recovery_timeout: Seconds the circuit stays open before probing
+        half_open_max_calls: Concurrent probe calls allowed while half-open
+        service: Calling service name (metrics label)
+        clock: Monotonic clock (injectable for tests)
+        metrics: Metrics collector (defaults to the global one when available)
+    """
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: int = 5,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        service: str = "",
+        clock: Callable[[], float] = time.monotonic,
+        metrics: Any = None
+    ):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.recovery_timeout = recovery_timeout
+        self.half_open_max_calls = max(1, half_open_max_calls)
+        self.service = service
+        self._clock = clock
+        self._metrics = metrics
+
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._half_open_calls = 0
+        self.trip_count = 0
+        self._export_state()
+
+    @property
+    def state(self) -> CircuitState:
+        """Current state (an open circuit turns half-open once recovery is due)"""
+        if self._state == CircuitState.OPEN and self._clock() - self._opened_at >= self.recovery_timeout:
+            self._transition(CircuitState.HALF_OPEN)
+        return self._state
+
+    @property
+    def retry_after(self) -> float:
+        """Seconds until the circuit will accept a probe (0 unless open)"""
+        if self.state != CircuitState.OPEN:
+            return 0.0
+        return max(0.0, self.recovery_timeout - (self._clock() - self._opened_at))
+
+    def allow_request(self) -> bool:
+        """Whether a call may go through now (claims a probe slot when half-open)"""
+        state = self.state
+        if state == CircuitState.CLOSED:
+            return True
+        if state == CircuitState.HALF_OPEN and self._half_open_calls < self.half_open_max_calls:
+            self._half_open_calls += 1
+            return True
+        return False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        if self._state != CircuitState.CLOSED:
+            self._transition(CircuitState.CLOSED)
+
+    def record_failure(self) -> None:
+        self._failures += 1
+        if self._state == CircuitState.HALF_OPEN or self._failures >= self.failure_threshold:
+            self._trip()
+
+    def release(self) -> None:
+        """Return a probe slot for a call that ended without a verdict (e.g. cancelled)"""
+        if self._state == CircuitState.HALF_OPEN and self._half_open_calls > 0:
+            self._half_open_calls -= 1
+
+    async def call(
+        self,
+        func: Callable[..., Awaitable[Any]],
+        *args,
+        is_failure: Callable[[BaseException], bool] = lambda error: True,
+        **kwargs
+    ) -> Any:
+        """
+        Run ``func`` through the breaker
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if not self.allow_request():
+            raise CircuitOpenError(self.name, self.retry_after)
+        try:
+            result = await func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self.release()
+            raise
+        except Exception as e:
+            if is_failure(e):
+                self.record_failure()
+            else:
+                self.record_success()
+            raise
+        self.record_success()
+        return result
+
+    def _trip(self) -> None:
+        self._opened_at = self._clock()
+        self.trip_count += 1
+        logger.warning(f"Circuit '{self.name}' opened after {self._failures} consecutive failures")
+        self._transition(CircuitState.OPEN)
+        metrics = self._metrics or get_optional_metrics_collector()
+        if metrics is not None:
+            metrics.record_circuit_breaker_trip(self.name, self.service)
+
+    def _transition(self, state: CircuitState) -> None:
+        if state != self._state:
+            logger.info(f"Circuit '{self.name}': {self._state.value} -> {state.value}")
+        self._state = state
+        self._half_open_calls = 0
+        if state == CircuitState.CLOSED:
+            self._failures = 0
+        self._export_state()
+
+    def _export_state(self) -> None:
+        metrics = self._metrics or get_optional_metrics_collector()
+        if metrics is not None:
+            metrics.set_circuit_breaker_state(self.name, self.service, CIRCUIT_STATE_VALUES[self._state])
+
+    def get_status(self) -> dict:
+        return {
+            "name": self.name,
+            "state": self.state.value,
+            "consecutive_failures": self._failures,
+            "trip_count": self.trip_count,
+            "retry_after": round(self.retry_after, 3)
+        }
+
+
+class LatencyTracker:
+    """Sliding window of recent call latencies (seconds)"""
+
+    def __init__(self, window: int = 200):
+        self._samples: Deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, None without samples"""
+        if not self._samples:
+            return None
+        ordered = sorted(self._samples)
+        rank = min(len(ordered) - 1, max(0, math.ceil(pct / 100.0 * len(ordered)) - 1))
+        return ordered[rank]
+
+
+async def hedged_call(
+    attempts: Sequence[Callable[[], Awaitable[Any]]],
+    delay: float
+) -> Tuple[Any, int, int]:
+    """
+    Run ``attempts[0]`` and start each next attempt if nothing has succeeded after ``delay``
+
+    The first successful result wins and the remaining attempts are cancelled.
+    An attempt that fails early starts the next one immediately.
+
+    Returns:
+        Tuple of (result, index of the winning attempt, attempts started)
+
+    Raises:
+        The last attempt's exception if every attempt fails
+    """
+    pending = {}
+    next_index = 0
+    last_error: Optional[BaseException] = None
+
+    def launch() -> None:
+        nonlocal next_index
+        pending[asyncio.ensure_future(attempts[next_index]())] = next_index
+        next_index += 1
+
+    launch()
+    try:
+        while pending:
+            timeout = delay if next_index < len(attempts) else None
+            done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                launch()
+                continue
+            for task in done:
+                index = pending.pop(task)
+                if task.exception() is None:
+                    return task.result(), index, next_index
+                last_error = task.exception()
+            if not pending and next_index < len(attempts):
+                launch()
+        raise last_error
+    finally:
+        for task in pending:
+            task.cancel()
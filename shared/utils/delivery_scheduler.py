@@ -0,0 +1,286 @@
+"""
+Outbound delivery scheduling for provider APIs
+
+Sends to a rate-limited provider (WhatsApp, Telegram, ...) go through a
+token bucket sized to the provider quota, so bursts are spread out instead of
+being answered with 429s. Messages for the same chat are delivered in
+submission order on their own lane; different chats proceed in parallel.
+Failed attempts are retried with jittered exponential backoff, and a
+provider-supplied ``retry_after`` pauses the whole channel for that long.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+
+from .circuit_breaker import get_optional_metrics_collector
+
+logger = logging.getLogger(__name__)
+
+# Tolerance for float drift in refilled token counts
+_TOKEN_EPSILON = 1e-9
+
+# Delivery statuses reported to ``on_status`` callbacks
+STATUS_RETRYING = "retrying"
+STATUS_SENT = "sent"
+STATUS_FAILED = "failed"
+
+StatusCallback = Callable[[str, int, Optional[str]], Awaitable[None]]
+
+
+class RetryLater(Exception):
+    """
+    Raised by a send function when the attempt should be retried
+
+    Args:
+        message: Reason for the failed attempt
+        retry_after: Seconds the provider asked us to wait, if any
+        result: Value to hand back to the caller if no attempt is left
+    """
+
+    def __init__(self, message: str = "", retry_after: Optional[float] = None, result: Any = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+        self.result = result
+
+
+class TokenBucket:
+    """
+    Token bucket refilled at ``rate`` tokens per second up to ``burst``
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity (defaults to one second of tokens)
+        clock: Monotonic clock (injectable for tests)
+        sleep: Async sleep (injectable for tests)
+
+    Raises:
+        ValueError: If ``rate`` is not positive
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep
+    ):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.burst
+        self._updated = clock()
+        self._paused_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self) -> bool:
+        now = self._clock()
+        self._refill(now)
+        if now >= self._paused_until and self._tokens >= 1 - _TOKEN_EPSILON:
+            self._tokens -= 1
+            return True
+        return False
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it"""
+        while True:
+            now = self._clock()
+            self._refill(now)
+            wait = self._paused_until - now
+            if wait <= 0:
+                if self._tokens >= 1 - _TOKEN_EPSILON:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            await self._sleep(wait)
+
+    def pause(self, seconds: float) -> None:
+        """Hand out no tokens for ``seconds`` and restart from an empty bucket"""
+        now = self._clock()
+        self._paused_until = max(self._paused_until, now + seconds)
+        self._refill(now)
+        self._tokens = 0.0
+
+
+class DeliveryScheduler:
+    """
+    Paced, per-chat ordered delivery to one provider channel
+
+    Args:
+        name: Channel name (e.g. "whatsapp:<channel id>")
+        rate: Sends per second allowed for this channel
+        burst: Sends allowed back to back (defaults to ``rate``)
+        max_attempts: Attempts per message before giving up
+        base_delay: First retry backoff in seconds (doubles per attempt)
+        max_delay: Backoff cap in seconds
+        max_in_flight: Provider requests outstanding at once
+        clock: Monotonic clock (injectable for tests)
+        sleep: Async sleep (injectable for tests)
+        metrics: Metrics collector (defaults to the global one when available)
+        metrics_label: Channel label for metrics (defaults to ``name``); pass the
+            channel type so per-channel IDs do not become label values
+
+    Raises:
+        ValueError: If ``rate`` is not positive
+    """
+
+    def __init__(
+        self,
+        name: str,
+        rate: float,
+        burst: Optional[float] = None,
+        max_attempts: int = 5,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_in_flight: int = 32,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        metrics: Any = None,
+        metrics_label: Optional[str] = None
+    ):
+        self.name = name
+        self.metrics_label = metrics_label or name
+        self.rate = rate
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate, burst, clock=clock, sleep=sleep)
+        self._clock = clock
+        self._sleep = sleep
+        self._metrics = metrics
+        self._in_flight = asyncio.Semaphore(max(1, max_in_flight))
+
+        self._lanes: Dict[str, Deque[Tuple[Callable, Optional[StatusCallback], asyncio.Future]]] = {}
+        self._lane_tasks: Dict[str, asyncio.Task] = {}
+        self._sent_at: Deque[float] = deque()
+        self.rate_window = 10.0
+        self.stats = {"sent": 0, "retried": 0, "failed": 0}
+
+        metrics = self._get_metrics()
+        if metrics is not None:
+            metrics.set_outbound_delivery_quota(self.metrics_label, rate)
+
+    def _get_metrics(self):
+        return self._metrics or get_optional_metrics_collector()
+
+    def _record(self, status: str) -> None:
+        metrics = self._get_metrics()
+        if metrics is not None:
+            metrics.record_outbound_delivery(self.metrics_label, status)
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Delay before retry number ``attempt`` (full jitter, at least ``retry_after``)"""
+        if retry_after:
+            return retry_after + random.uniform(0, self.base_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** (attempt - 1))))
+
+    async def submit(
+        self,
+        key: str,
+        send: Callable[[], Awaitable[Any]],
+        on_status: Optional[StatusCallback] = None
+    ) -> Any:
+        """
+        Deliver through the scheduler and wait for the outcome
+
+        Args:
+            key: Ordering key (chat / recipient); same-key sends run in order
+            send: Performs one attempt; raise ``RetryLater`` to retry
+            on_status: Awaited with (status, attempt, error) on retries and the final outcome
+
+        Returns:
+            The result of the successful attempt
+
+        Raises:
+            RetryLater: From the last attempt when all attempts failed
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._lanes.setdefault(key, deque()).append((send, on_status, future))
+        if key not in self._lane_tasks:
+            self._lane_tasks[key] = asyncio.create_task(self._run_lane(key))
+        return await future
+
+    async def _run_lane(self, key: str) -> None:
+        lane = self._lanes[key]
+        try:
+            while lane:
+                send, on_status, future = lane.popleft()
+                try:
+                    result = await self._deliver(send, on_status)
+                except asyncio.CancelledError:
+                    future.cancel()
+                    raise
+                except Exception as e:
+                    if not future.done():
+                        future.set_exception(e)
+                else:
+                    if not future.done():
+                        future.set_result(result)
+        finally:
+            self._lane_tasks.pop(key, None)
+            if not lane:
+                self._lanes.pop(key, None)
+
+    async def _deliver(self, send: Callable[[], Awaitable[Any]], on_status: Optional[StatusCallback]) -> Any:
+        attempt = 0
+        while True:
+            attempt += 1
+            await self.bucket.acquire()
+            try:
+                async with self._in_flight:
+                    result = await send()
+            except RetryLater as e:
+                if e.retry_after:
+                    # Provider-wide throttling: slow the whole channel down
+                    self.bucket.pause(e.retry_after)
+                if attempt >= self.max_attempts:
+                    self.stats["failed"] += 1
+                    self._record(STATUS_FAILED)
+                    await self._notify(on_status, STATUS_FAILED, attempt, str(e))
+                    raise
+                self.stats["retried"] += 1
+                self._record(STATUS_RETRYING)
+                await self._notify(on_status, STATUS_RETRYING, attempt, str(e))
+                await self._sleep(self.backoff(attempt, e.retry_after))
+                continue
+
+            self.stats["sent"] += 1
+            self._sent_at.append(self._clock())
+            self.observed_rate()
+            self._record(STATUS_SENT)
+            await self._notify(on_status, STATUS_SENT, attempt, None)
+            return result
+
+    async def _notify(self, on_status: Optional[StatusCallback], status: str, attempt: int, error: Optional[str]) -> None:
+        if on_status is None:
+            return
+        try:
+            await on_status(status, attempt, error)
+        except Exception as e:
+            logger.warning(f"Delivery status callback failed for {self.name}: {e}")
+
+    def observed_rate(self) -> float:
+        """Successful sends per second over the last ``rate_window`` seconds"""
+        cutoff = self._clock() - self.rate_window
+        while self._sent_at and self._sent_at[0] < cutoff:
+            self._sent_at.popleft()
+        return len(self._sent_at) / self.rate_window
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "channel": self.name,
+            "quota_per_second": self.rate,
+            "observed_per_second": round(self.observed_rate(), 2),
+            "queued": sum(len(lane) for lane in self._lanes.values()),
+            "active_chats": len(self._lane_tasks),
+            **self.stats
+        }
@@ -0,0 +1,161 @@
+"""
+Shared pooled HTTP client for service-to-service and provider API calls
+
+One ``httpx.AsyncClient`` per process keeps connections alive between
+requests instead of paying a TCP (and TLS) handshake on every call. Hosts a
+service talks to a lot get their own bounded pool so one slow upstream cannot
+take every connection. HTTP/2 is negotiated on TLS connections when the ``h2``
+package is installed.
+"""
+
+import logging
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from shared.config.env_constants import (
+    HTTP_CLIENT_MAX_CONNECTIONS,
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+    HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS,
+    HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS,
+    HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS,
+    get_env_value,
+)
+
+# HTTP/2 needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class HTTPClientConfig:
+    """Pool sizes and timeouts for the shared HTTP client"""
+    max_connections: int = 100
+    max_keepalive_connections: int = 20
+    per_host_max_connections: int = 50
+    keepalive_expiry: float = 30.0
+    connect_timeout: float = 5.0
+    timeout: float = 30.0
+    http2: bool = True
+
+    @classmethod
+    def from_env(cls) -> "HTTPClientConfig":
+        """Build the configuration from environment variables"""
+        return cls(
+            max_connections=int(get_env_value(HTTP_CLIENT_MAX_CONNECTIONS, default="100")),
+            max_keepalive_connections=int(get_env_value(HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS, default="20")),
+            per_host_max_connections=int(get_env_value(HTTP_CLIENT_PER_HOST_MAX_CONNECTIONS, default="50")),
+            keepalive_expiry=float(get_env_value(HTTP_CLIENT_KEEPALIVE_EXPIRY_SECONDS, default="30")),
+            connect_timeout=float(get_env_value(HTTP_CLIENT_CONNECT_TIMEOUT_SECONDS, default="5"))
+        )
+
+    @property
+    def limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    @property
+    def host_limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.per_host_max_connections,
+            max_keepalive_connections=min(self.max_keepalive_connections, self.per_host_max_connections),
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    @property
+    def timeouts(self) -> httpx.Timeout:
+        return httpx.Timeout(self.timeout, connect=self.connect_timeout)
+
+
+def _host_pattern(url: str) -> Optional[str]:
+    """httpx mount pattern (scheme://host[:port]) for a base URL"""
+    if "://" not in url:
+        url = f"http://{url}"
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return None
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def create_http_client(
+    config: Optional[HTTPClientConfig] = None,
+    upstreams: Iterable[str] = (),
+    **kwargs
+) -> httpx.AsyncClient:
+    """
+    Create a pooled HTTP client
+
+    Args:
+        config: Pool and timeout configuration (environment when omitted)
+        upstreams: Base URLs that get a dedicated, per-host bounded pool
+        **kwargs: Extra ``httpx.AsyncClient`` arguments
+
+    Returns:
+        Configured ``httpx.AsyncClient``
+    """
+    config = config or HTTPClientConfig.from_env()
+    http2 = config.http2 and HTTP2_AVAILABLE
+
+    mounts: Dict[str, httpx.AsyncBaseTransport] = {}
+    for url in upstreams:
+        pattern = _host_pattern(url)
+        if pattern and pattern not in mounts:
+            mounts[pattern] = httpx.AsyncHTTPTransport(http2=http2, limits=config.host_limits)
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=config.limits,
+        timeout=config.timeouts,
+        mounts=mounts or None,
+        **kwargs
+    )
+
+
+# Global HTTP client instance
+_http_client: Optional[httpx.AsyncClient] = None
+
+
+async def init_http_client(
+    upstreams: Iterable[str] = (),
+    config: Optional[HTTPClientConfig] = None
+) -> httpx.AsyncClient:
+    """
+    Create the process-wide HTTP client (call from the service lifespan)
+
+    Args:
+        upstreams: Base URLs the service calls often (get their own pool)
+        config: Pool and timeout configuration (environment when omitted)
+    """
+    global _http_client
+    if _http_client is not None and not _http_client.is_closed:
+        await _http_client.aclose()
+    upstreams = list(upstreams)
+    _http_client = create_http_client(config, upstreams)
+    logger.info(f"Shared HTTP client ready ({len(upstreams)} dedicated upstream pools, http2={HTTP2_AVAILABLE})")
+    return _http_client
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the process-wide HTTP client, creating a default one if the lifespan did not"""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = create_http_client()
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the process-wide HTTP client and its pooled connections"""
+    global _http_client
+    if _http_client is not None:
+        await _http_client.aclose()
+        _http_client = None
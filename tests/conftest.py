@@ -4,6 +4,7 @@ Global pytest configuration and fixtures for the AI coaching platform.
 
 import os
 import sys
+import types
 import pytest
 import asyncio
 from pathlib import Path
@@ -12,6 +13,20 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
+# Services live in hyphenated directories; expose the ones the unit tests import
+# as ``services.<name>`` packages
+import services
+
+for _package_name, _service_dir in {
+    "creator_hub_service": "creator-hub-service",
+    "channel_service": "channel-service",
+}.items():
+    if f"services.{_package_name}" not in sys.modules:
+        _package = types.ModuleType(f"services.{_package_name}")
+        _package.__path__ = [str(project_root / "services" / _service_dir)]
+        sys.modules[f"services.{_package_name}"] = _package
+        setattr(services, _package_name, _package)
+
 # Configure pytest plugins to auto-load fixture modules
 pytest_plugins = [
     "tests.fixtures.common_fixtures",
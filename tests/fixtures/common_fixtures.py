@@ -2,10 +2,13 @@
 Common fixtures shared across all services.
 """
 
+import fakeredis.aioredis
 import pytest
 from unittest.mock import Mock
 from httpx import AsyncClient
 
+from shared.cache.redis_client import RedisClient
+
 
 @pytest.fixture
 def test_user_data():
@@ -105,4 +108,12 @@ def verification_test_data():
         "test_string": "verification_test",
         "test_number": 42,
         "test_list": ["item1", "item2", "item3"]
-    }
\ No newline at end of file
+    }
+
+
+@pytest.fixture
+def redis_client():
+    """RedisClient backed by an in-process fake Redis server."""
+    client = RedisClient(redis_url="redis://localhost:6379/0")
+    client._client = fakeredis.aioredis.FakeRedis(decode_responses=True)
+    return client
@@ -0,0 +1,159 @@
+"""
+Tests for the offline breached-password index.
+"""
+
+import hashlib
+import random
+from unittest.mock import patch
+
+import pytest
+
+from shared.security import breached_passwords
+from shared.security.breached_passwords import BreachedPasswordIndex, build_breached_password_index
+from shared.security.password_security import PasswordValidator
+
+BREACHED = ["password", "123456", "P@ssw0rd", "letmein", "qwerty"]
+
+
+def sha1(password):
+    return hashlib.sha1(password.encode()).hexdigest().upper()
+
+
+@pytest.fixture
+def hash_list(tmp_path):
+    rng = random.Random(7)
+    lines = [f"{sha1(p)}:{10 + i}" for i, p in enumerate(BREACHED)]
+    lines += [f"{rng.getrandbits(160):040X}:{rng.randint(1, 5)}" for _ in range(3000)]
+    lines.append(f"{sha1('password')}:99")  # duplicate
+    lines.append(f"{sha1('rare-once')}:1")
+    lines.append("not-a-hash")
+    rng.shuffle(lines)
+    path = tmp_path / "pwned.txt"
+    path.write_text("\n".join(lines))
+    return path
+
+
+class TestBreachedPasswordIndex:
+    """Test building, lookups and the Bloom sidecar."""
+
+    def test_build_and_lookup(self, hash_list, tmp_path):
+        output = tmp_path / "pwned.idx"
+        count = build_breached_password_index([str(hash_list)], str(output), chunk_size=500)
+
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert count == len(index) == 3006
+            assert all(index.contains_password(p) for p in BREACHED + ["rare-once"])
+            assert not index.contains_password("a-unique-Passphrase-91!")
+            assert index.bloom is None
+        finally:
+            index.close()
+        # Sorted runs and the temporary output are cleaned up
+        assert {p.name for p in tmp_path.iterdir()} == {"pwned.txt", "pwned.idx"}
+
+    def test_min_count_filters_rare_hashes(self, hash_list, tmp_path):
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(hash_list)], str(output), min_count=2)
+
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert index.min_count == 2
+            assert index.contains_password("password")
+            assert not index.contains_password("rare-once")
+        finally:
+            index.close()
+
+    def test_bloom_sidecar_rejects_misses_without_search(self, hash_list, tmp_path):
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(hash_list)], str(output), bloom_error_rate=0.001)
+
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert index.bloom is not None
+            assert all(index.contains_password(p) for p in BREACHED)
+            with patch.object(index, "_fanout", wraps=index._fanout) as fanout:
+                misses = sum(index.contains_password(f"unlisted-{i}") for i in range(200))
+            assert misses == 0
+            assert fanout.call_count < 10
+        finally:
+            index.close()
+
+    def test_rebuild_without_bloom_drops_the_old_sidecar(self, hash_list, tmp_path):
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(hash_list)], str(output), bloom_error_rate=0.01)
+        new_list = tmp_path / "new.txt"
+        new_list.write_text(f"{sha1('fresh-breach')}:3\n")
+
+        build_breached_password_index([str(new_list)], str(output))
+
+        assert not (tmp_path / "pwned.idx.bloom").exists()
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert index.bloom is None
+            assert index.contains_password("fresh-breach")
+        finally:
+            index.close()
+
+    def test_sidecar_of_another_index_is_ignored(self, hash_list, tmp_path):
+        build_breached_password_index([str(hash_list)], str(tmp_path / "old.idx"), bloom_error_rate=0.01)
+        new_list = tmp_path / "new.txt"
+        new_list.write_text("\n".join(f"{sha1(f'new-{i}')}:3" for i in range(3006)))
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(new_list)], str(output))
+        # Same record count, different records: only the digest tells them apart
+        (tmp_path / "pwned.idx.bloom").write_bytes((tmp_path / "old.idx.bloom").read_bytes())
+
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert len(index) == 3006
+            assert index.bloom is None
+            assert index.contains_password("new-42")
+        finally:
+            index.close()
+
+    @pytest.mark.parametrize("corrupt", [
+        lambda data: data[:-1],
+        lambda data: data + b"\0",
+        lambda data: data[:40],
+        lambda data: b"",
+    ], ids=["truncated", "extended", "header-only", "empty"])
+    def test_truncated_or_corrupt_sidecar_is_ignored(self, hash_list, tmp_path, corrupt):
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(hash_list)], str(output), bloom_error_rate=0.01)
+        sidecar = tmp_path / "pwned.idx.bloom"
+        sidecar.write_bytes(corrupt(sidecar.read_bytes()))
+
+        index = BreachedPasswordIndex(str(output))
+        try:
+            assert index.bloom is None
+            assert index.contains_password("letmein")
+            assert not index.contains_password("correct horse battery staple")
+        finally:
+            index.close()
+
+    def test_rejects_files_that_are_not_indexes(self, tmp_path):
+        bogus = tmp_path / "bogus.idx"
+        bogus.write_bytes(b"definitely not an index")
+
+        with pytest.raises(ValueError):
+            BreachedPasswordIndex(str(bogus))
+
+
+class TestOfflineBreachCheck:
+    """Test that the validator uses the offline index instead of the API."""
+
+    async def test_validator_checks_offline_index(self, hash_list, tmp_path):
+        output = tmp_path / "pwned.idx"
+        build_breached_password_index([str(hash_list)], str(output))
+        index = BreachedPasswordIndex(str(output))
+
+        validator = PasswordValidator()
+        try:
+            with patch.object(breached_passwords, "_breached_password_index", index), \
+                    patch.object(breached_passwords, "_index_loaded", True), \
+                    patch("shared.security.password_security.get_http_client",
+                          side_effect=AssertionError("network used")):
+                assert await validator._check_compromised_password("P@ssw0rd")
+                assert not await validator._check_compromised_password("a-unique-Passphrase-91!")
+        finally:
+            index.close()
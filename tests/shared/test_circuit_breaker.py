@@ -0,0 +1,188 @@
+"""
+Tests for the circuit breaker, latency tracker and hedged calls.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from shared.utils.circuit_breaker import (
+    CircuitBreaker,
+    CircuitOpenError,
+    CircuitState,
+    LatencyTracker,
+    hedged_call,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+@pytest.fixture
+def metrics():
+    return Mock()
+
+
+@pytest.fixture
+def breaker(clock, metrics):
+    return CircuitBreaker("ai_engine", failure_threshold=3, recovery_timeout=10, service="channel-service",
+                          clock=clock, metrics=metrics)
+
+
+async def failing():
+    raise ConnectionError("upstream down")
+
+
+async def succeeding():
+    return "ok"
+
+
+class TestCircuitBreaker:
+    """Test state transitions, fast failure and metrics export."""
+
+    async def test_opens_after_consecutive_failures(self, breaker, metrics):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.trip_count == 1
+        metrics.record_circuit_breaker_trip.assert_called_once_with("ai_engine", "channel-service")
+        metrics.set_circuit_breaker_state.assert_called_with("ai_engine", "channel-service", 2)
+
+    async def test_open_circuit_fails_fast(self, breaker, clock):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        clock.now = 4
+
+        func = Mock(side_effect=succeeding)
+        with pytest.raises(CircuitOpenError) as error:
+            await breaker.call(func)
+
+        func.assert_not_called()
+        assert error.value.retry_after == pytest.approx(6)
+
+    async def test_success_resets_failure_count(self, breaker):
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        await breaker.call(succeeding)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+
+        assert breaker.state == CircuitState.CLOSED
+
+    async def test_half_open_probe_closes_on_success(self, breaker, clock, metrics):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        clock.now = 10
+
+        assert breaker.state == CircuitState.HALF_OPEN
+        assert await breaker.call(succeeding) == "ok"
+        assert breaker.state == CircuitState.CLOSED
+        metrics.set_circuit_breaker_state.assert_called_with("ai_engine", "channel-service", 0)
+
+    async def test_half_open_probe_failure_reopens(self, breaker, clock):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        clock.now = 10
+
+        with pytest.raises(ConnectionError):
+            await breaker.call(failing)
+        assert breaker.state == CircuitState.OPEN
+        assert breaker.trip_count == 2
+        assert breaker.retry_after == pytest.approx(10)
+
+    async def test_half_open_limits_concurrent_probes(self, breaker, clock):
+        for _ in range(3):
+            with pytest.raises(ConnectionError):
+                await breaker.call(failing)
+        clock.now = 10
+        release = asyncio.Event()
+
+        async def slow():
+            await release.wait()
+            return "ok"
+
+        probe = asyncio.create_task(breaker.call(slow))
+        await asyncio.sleep(0)
+        with pytest.raises(CircuitOpenError):
+            await breaker.call(succeeding)
+
+        release.set()
+        assert await probe == "ok"
+        assert breaker.state == CircuitState.CLOSED
+
+    async def test_non_failures_do_not_trip(self, breaker):
+        for _ in range(5):
+            with pytest.raises(ValueError):
+                await breaker.call(Mock(side_effect=ValueError("bad request")), is_failure=lambda e: False)
+
+        assert breaker.state == CircuitState.CLOSED
+
+
+class TestHedging:
+    """Test hedged calls and the latency window."""
+
+    def test_latency_percentile(self):
+        tracker = LatencyTracker(window=100)
+        assert tracker.percentile(95) is None
+        for ms in range(1, 101):
+            tracker.record(ms / 1000)
+
+        assert tracker.percentile(95) == pytest.approx(0.095)
+        assert tracker.percentile(50) == pytest.approx(0.050)
+
+    async def test_fast_primary_never_hedges(self):
+        hedge = Mock(side_effect=succeeding)
+
+        result, winner, started = await hedged_call([succeeding, hedge], delay=0.5)
+
+        assert (result, winner, started) == ("ok", 0, 1)
+        hedge.assert_not_called()
+
+    async def test_slow_primary_is_hedged_and_cancelled(self):
+        cancelled = asyncio.Event()
+
+        async def slow_primary():
+            try:
+                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        async def hedge():
+            return "hedge"
+
+        result, winner, started = await hedged_call([slow_primary, hedge], delay=0.01)
+        await asyncio.sleep(0)
+
+        assert (result, winner, started) == ("hedge", 1, 2)
+        assert cancelled.is_set()
+
+    async def test_failed_primary_hedges_immediately(self):
+        async def hedge():
+            return "hedge"
+
+        result, winner, _ = await asyncio.wait_for(hedged_call([failing, hedge], delay=5), timeout=1)
+
+        assert (result, winner) == ("hedge", 1)
+
+    async def test_all_attempts_failing_raises(self):
+        with pytest.raises(ConnectionError):
+            await hedged_call([failing, failing], delay=0.01)
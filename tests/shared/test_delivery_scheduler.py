@@ -0,0 +1,174 @@
+"""
+Tests for the outbound delivery scheduler.
+"""
+
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+
+from shared.utils.delivery_scheduler import DeliveryScheduler, RetryLater, TokenBucket
+
+
+class VirtualTime:
+    """Clock and sleep that advance instantly, so pacing can be measured exactly"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.now += max(0.0, seconds)
+        await asyncio.sleep(0)
+
+
+@pytest.fixture
+def vt():
+    return VirtualTime()
+
+
+@pytest.fixture
+def metrics():
+    return Mock()
+
+
+def make_scheduler(vt, metrics, **kwargs):
+    return DeliveryScheduler("telegram:bot-1", clock=vt.clock, sleep=vt.sleep, metrics=metrics, **kwargs)
+
+
+class TestTokenBucket:
+    """Test pacing and pauses."""
+
+    async def test_paces_to_rate_after_burst(self, vt):
+        bucket = TokenBucket(rate=10, burst=5, clock=vt.clock, sleep=vt.sleep)
+
+        for _ in range(25):
+            await bucket.acquire()
+
+        # 5 immediately, the remaining 20 at 10/s
+        assert vt.now == pytest.approx(2.0)
+
+    async def test_pause_blocks_until_retry_after(self, vt):
+        bucket = TokenBucket(rate=10, burst=10, clock=vt.clock, sleep=vt.sleep)
+        bucket.pause(3)
+
+        assert not bucket.try_acquire()
+        await bucket.acquire()
+        assert vt.now >= 3.0
+
+    @pytest.mark.parametrize("rate", [0, -1])
+    def test_rate_must_be_positive(self, vt, rate):
+        with pytest.raises(ValueError):
+            TokenBucket(rate=rate, clock=vt.clock, sleep=vt.sleep)
+
+
+class TestDeliveryScheduler:
+    """Test quota usage, per-chat ordering, retries and status callbacks."""
+
+    async def test_throughput_matches_quota(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=30, burst=1)
+
+        async def send():
+            return "ok"
+
+        await asyncio.gather(*(scheduler.submit(f"chat-{i % 50}", send) for i in range(300)))
+
+        assert scheduler.stats["sent"] == 300
+        assert vt.now == pytest.approx(299 / 30)
+        metrics.set_outbound_delivery_quota.assert_called_once_with("telegram:bot-1", 30)
+
+    async def test_same_chat_is_delivered_in_order(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=100)
+        delivered = []
+        failures = {"chat-a:1": 2}
+
+        def sender(chat, n):
+            async def send():
+                key = f"{chat}:{n}"
+                if failures.get(key):
+                    failures[key] -= 1
+                    raise RetryLater("HTTP 500")
+                delivered.append((chat, n))
+            return send
+
+        await asyncio.gather(*(
+            scheduler.submit(chat, sender(chat, n)) for n in range(4) for chat in ("chat-a", "chat-b")
+        ))
+
+        assert [n for chat, n in delivered if chat == "chat-a"] == [0, 1, 2, 3]
+        assert [n for chat, n in delivered if chat == "chat-b"] == [0, 1, 2, 3]
+        assert scheduler.stats["retried"] == 2
+
+    async def test_retry_after_pauses_channel(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=100, base_delay=0.1)
+        attempts = []
+
+        async def send():
+            attempts.append(vt.now)
+            if len(attempts) == 1:
+                raise RetryLater("Too Many Requests", retry_after=7)
+            return "ok"
+
+        assert await scheduler.submit("chat-a", send) == "ok"
+        assert attempts[1] - attempts[0] >= 7
+        assert scheduler.bucket._paused_until >= 7
+
+    async def test_exhausted_retries_raise_and_report(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=100, max_attempts=3)
+        statuses = []
+
+        async def on_status(status, attempt, error):
+            statuses.append((status, attempt, error))
+
+        async def send():
+            raise RetryLater("HTTP 503", result="last response")
+
+        with pytest.raises(RetryLater) as error:
+            await scheduler.submit("chat-a", send, on_status=on_status)
+
+        assert error.value.result == "last response"
+        assert statuses == [("retrying", 1, "HTTP 503"), ("retrying", 2, "HTTP 503"), ("failed", 3, "HTTP 503")]
+        metrics.record_outbound_delivery.assert_called_with("telegram:bot-1", "failed")
+        assert [c.args for c in metrics.record_outbound_delivery.call_args_list] == [
+            ("telegram:bot-1", "retrying"), ("telegram:bot-1", "retrying"), ("telegram:bot-1", "failed")
+        ]
+
+    async def test_metrics_use_the_channel_label(self, vt, metrics):
+        scheduler = DeliveryScheduler(
+            "whatsapp:channel-1", rate=80, clock=vt.clock, sleep=vt.sleep, metrics=metrics,
+            metrics_label="whatsapp"
+        )
+
+        async def send():
+            return "ok"
+
+        await scheduler.submit("chat-a", send)
+
+        metrics.set_outbound_delivery_quota.assert_called_once_with("whatsapp", 80)
+        metrics.record_outbound_delivery.assert_called_once_with("whatsapp", "sent")
+        assert scheduler.get_stats()["channel"] == "whatsapp:channel-1"
+
+    async def test_non_retryable_errors_propagate(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=100)
+
+        async def send():
+            raise ValueError("bad payload")
+
+        async def succeed():
+            return "ok"
+
+        with pytest.raises(ValueError):
+            await scheduler.submit("chat-a", send)
+        assert await scheduler.submit("chat-a", succeed) == "ok"
+        assert scheduler.stats["retried"] == 0
+
+    def test_backoff_is_jittered_and_capped(self, vt, metrics):
+        scheduler = make_scheduler(vt, metrics, rate=1, base_delay=1, max_delay=8)
+
+        delays = [scheduler.backoff(10) for _ in range(200)]
+
+        assert all(0 <= d <= 8 for d in delays)
+        assert len(set(delays)) > 1
+        assert scheduler.backoff(1, retry_after=5) >= 5
@@ -0,0 +1,83 @@
+"""
+Tests for resumable execution checkpoints.
+"""
+
+import pytest
+
+from shared.cache.execution_checkpoints import (
+    COMPRESSED_PREFIX, ExecutionCheckpointStore, decode_record, encode_record
+)
+
+
+@pytest.fixture
+def store(redis_client):
+    return ExecutionCheckpointStore(redis_client, ttl=60, compress_threshold=256)
+
+
+class TestRecordEncoding:
+    """Test the compact record format."""
+
+    def test_small_records_stay_plain_json(self):
+        encoded = encode_record({"step_id": "intro", "success": True})
+
+        assert encoded == '{"step_id":"intro","success":true}'
+        assert decode_record(encoded) == {"step_id": "intro", "success": True}
+
+    def test_large_records_are_compressed(self):
+        record = {"result_data": {"message": "Keep going, you are doing great! " * 100}}
+        encoded = encode_record(record, compress_threshold=256)
+
+        assert encoded.startswith(COMPRESSED_PREFIX)
+        assert len(encoded) < len(encode_record(record, compress_threshold=0))
+        assert decode_record(encoded) == record
+
+
+class TestExecutionCheckpointStore:
+    """Test saving, loading and expiring execution checkpoints."""
+
+    async def test_round_trip(self, store):
+        await store.begin("creator-1", "exec-1", meta={"program_id": "p1"}, state={"variables": {}})
+        await store.save_step("creator-1", "exec-1", "intro", {"step_id": "intro", "success": True})
+        await store.save_step(
+            "creator-1", "exec-1", "quiz", {"step_id": "quiz", "success": True},
+            state={"variables": {"score": 80}}
+        )
+
+        checkpoint = await store.load("creator-1", "exec-1")
+
+        assert checkpoint.meta == {"program_id": "p1"}
+        assert checkpoint.state == {"variables": {"score": 80}}
+        assert set(checkpoint.steps) == {"intro", "quiz"}
+        assert checkpoint.steps["quiz"]["success"] is True
+        assert store.stats["writes"] == 3
+
+    async def test_unchanged_state_is_not_rewritten(self, store):
+        await store.begin("creator-1", "exec-1", meta={}, state={"variables": {"a": 1}})
+        written = await store.save_step("creator-1", "exec-1", "intro", {"success": True})
+
+        assert written == len("step:intro") + len('{"success":true}')
+        assert (await store.load("creator-1", "exec-1")).state == {"variables": {"a": 1}}
+
+    async def test_checkpoints_are_tenant_scoped_and_expire(self, store, redis_client):
+        await store.begin("creator-1", "exec-1", meta={}, state={})
+
+        assert await store.load("creator-2", "exec-1") is None
+        client = await redis_client.get_client()
+        assert 0 < await client.ttl(store._key("creator-1", "exec-1")) <= 60
+
+    async def test_delete(self, store):
+        await store.begin("creator-1", "exec-1", meta={}, state={})
+
+        assert await store.delete("creator-1", "exec-1")
+        assert await store.load("creator-1", "exec-1") is None
+
+    async def test_write_failures_do_not_raise(self, redis_client):
+        class BrokenRedis:
+            def pipeline(self, transaction=True):
+                raise ConnectionError("redis is down")
+
+        redis_client._client = BrokenRedis()
+        store = ExecutionCheckpointStore(redis_client)
+
+        assert await store.save_step("creator-1", "exec-1", "intro", {"success": True}) == 0
+        assert store.stats["failed_writes"] == 1
@@ -0,0 +1,132 @@
+"""
+Tests for the bounded off-loop password hashing pool.
+"""
+
+import asyncio
+import threading
+import time
+from unittest.mock import Mock
+
+import pytest
+
+from shared.security.hashing_pool import HashingPoolBusy, PasswordHashingPool
+from shared.security.password_security import PasswordHasher
+
+
+class BlockingHasher(PasswordHasher):
+    """Hasher whose jobs hold a worker until released"""
+
+    def __init__(self):
+        super().__init__()
+        self.release = threading.Event()
+        self.threads = []
+
+    def hash_password(self, password, use_argon2=True):
+        self.threads.append(threading.current_thread().name)
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify_password(self, password, hashed_password):
+        time.sleep(0.2)
+        return hashed_password == f"hashed:{password}"
+
+
+@pytest.fixture
+def metrics():
+    return Mock()
+
+
+class TestPasswordHashingPool:
+    """Test off-loop execution, load shedding and the process executor."""
+
+    async def test_real_hash_round_trip(self, metrics):
+        pool = PasswordHashingPool(max_workers=2, metrics=metrics)
+        try:
+            hashed = await pool.hash_password("S3cure-Passw0rd!")
+
+            assert await pool.verify_password("S3cure-Passw0rd!", hashed)
+            assert not await pool.verify_password("wrong", hashed)
+            assert not pool.needs_rehash(hashed)
+        finally:
+            pool.shutdown()
+        metrics.record_password_hash.assert_called_with("verify", "completed", 0)
+
+    async def test_hashing_does_not_block_event_loop(self, metrics):
+        hasher = BlockingHasher()
+        pool = PasswordHashingPool(hasher, max_workers=2, metrics=metrics)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            results = await asyncio.gather(*(pool.verify_password("pw", "hashed:pw") for _ in range(2)))
+        finally:
+            task.cancel()
+            pool.shutdown()
+
+        assert results == [True, True]
+        assert ticks >= 10
+
+    async def test_saturated_pool_sheds_load(self, metrics):
+        hasher = BlockingHasher()
+        pool = PasswordHashingPool(hasher, max_workers=1, max_queue=1, retry_after=2, metrics=metrics)
+        try:
+            running = [asyncio.create_task(pool.hash_password(f"pw{i}")) for i in range(2)]
+            await asyncio.sleep(0.05)
+
+            with pytest.raises(HashingPoolBusy) as error:
+                await pool.hash_password("pw3")
+            assert error.value.retry_after == 2
+            metrics.record_password_hash.assert_called_with("hash", "rejected", 2)
+
+            hasher.release.set()
+            assert await asyncio.gather(*running) == ["hashed:pw0", "hashed:pw1"]
+            await asyncio.sleep(0)
+        finally:
+            hasher.release.set()
+            pool.shutdown()
+
+        assert pool.pending == 0
+        assert pool.stats["rejected"] == 1
+        assert hasher.threads and all(name.startswith("password-hash") for name in hasher.threads)
+
+    async def test_abandoned_jobs_still_count_until_finished(self, metrics):
+        hasher = BlockingHasher()
+        pool = PasswordHashingPool(hasher, max_workers=1, max_queue=0, metrics=metrics)
+        try:
+            waiter = asyncio.create_task(pool.hash_password("pw"))
+            await asyncio.sleep(0.05)
+            waiter.cancel()
+            await asyncio.sleep(0)
+
+            with pytest.raises(HashingPoolBusy):
+                await pool.hash_password("other")
+
+            hasher.release.set()
+            for _ in range(100):
+                if pool.pending == 0:
+                    break
+                await asyncio.sleep(0.01)
+            assert pool.pending == 0
+        finally:
+            hasher.release.set()
+            pool.shutdown()
+
+    async def test_process_executor(self, metrics):
+        pool = PasswordHashingPool(max_workers=1, executor="process", metrics=metrics)
+        try:
+            hashed = await pool.hash_password("S3cure-Passw0rd!")
+
+            assert hashed.startswith("$argon2id$")
+            assert await pool.verify_password("S3cure-Passw0rd!", hashed)
+        finally:
+            pool.shutdown()
+
+    def test_rejects_unknown_executor(self):
+        with pytest.raises(ValueError):
+            PasswordHashingPool(executor="fibers")
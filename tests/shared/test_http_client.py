@@ -0,0 +1,66 @@
+"""
+Tests for the shared pooled HTTP client.
+"""
+
+import httpx
+import pytest
+
+from shared.utils import http_client
+from shared.utils.http_client import (
+    HTTPClientConfig,
+    close_http_client,
+    create_http_client,
+    get_http_client,
+    init_http_client,
+)
+
+
+@pytest.fixture(autouse=True)
+async def reset_client():
+    yield
+    await close_http_client()
+
+
+class TestSharedHTTPClient:
+    """Test client reuse, per-host pools and lifecycle."""
+
+    async def test_process_wide_client_is_reused(self):
+        first = get_http_client()
+        assert get_http_client() is first
+
+        await first.aclose()
+        assert get_http_client() is not first
+
+    async def test_upstreams_get_dedicated_pools(self):
+        config = HTTPClientConfig(per_host_max_connections=7)
+        client = await init_http_client(
+            upstreams=["http://ai-engine-service:8003", "ai-engine-service:8003/api", "https://api.telegram.org/bot123"],
+            config=config
+        )
+
+        patterns = sorted(pattern.pattern for pattern in client._mounts)
+        assert patterns == ["http://ai-engine-service:8003", "https://api.telegram.org"]
+        assert get_http_client() is client
+
+    async def test_config_applies_limits_and_timeouts(self):
+        config = HTTPClientConfig(max_connections=10, max_keepalive_connections=4, connect_timeout=1.5, timeout=12)
+        client = create_http_client(config)
+
+        assert client.timeout == httpx.Timeout(12, connect=1.5)
+        assert config.limits.max_connections == 10
+        assert config.host_limits.max_keepalive_connections == 4
+        await client.aclose()
+
+    async def test_calls_go_through_the_shared_client(self):
+        seen = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.append(request.url.host)
+            return httpx.Response(200, json={"ok": True})
+
+        http_client._http_client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        for _ in range(3):
+            response = await get_http_client().get("http://ai-engine-service:8003/health")
+            assert response.json() == {"ok": True}
+
+        assert seen == ["ai-engine-service"] * 3
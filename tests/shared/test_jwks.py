@@ -0,0 +1,174 @@
+"""
+Tests for the JWKS publisher and the local token verifier.
+"""
+
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from jose import JWTError, jwt
+from jose.exceptions import ExpiredSignatureError, JWTClaimsError
+
+from shared.security.jwks import JWKSVerifier
+from shared.security.jwt_manager import JWTKeyManager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+async def key_manager(tmp_path, monkeypatch):
+    monkeypatch.setenv("JWT_KEYS_DIR", str(tmp_path))
+    manager = JWTKeyManager()
+    await manager.initialize()
+    return manager
+
+
+def counting_loader(key_manager):
+    async def load():
+        load.calls += 1
+        return await key_manager.get_jwks()
+    load.calls = 0
+    return load
+
+
+async def issue(key_manager, key_id=None, **claims):
+    if key_id is None:
+        key_id, private_key = await key_manager.get_current_key()
+    else:
+        private_key = key_manager.keys[key_id]["private_key"]
+    payload = {
+        "sub": str(uuid.uuid4()),
+        "jti": str(uuid.uuid4()),
+        "type": "access",
+        "iss": "mvp-coaching-ai-platform",
+        "aud": "api",
+        "exp": datetime.utcnow() + timedelta(minutes=5),
+        **claims
+    }
+    return jwt.encode(payload, private_key, algorithm="RS256", headers={"kid": key_id})
+
+
+class TestJWKSPublishing:
+    """Test the published key set."""
+
+    async def test_publishes_active_public_keys_only(self, key_manager):
+        old_key = key_manager.current_key_id
+        await key_manager._generate_key_pair("next-key")
+        key_manager.keys[old_key]["is_active"] = False
+
+        document = await key_manager.get_jwks()
+
+        assert [key["kid"] for key in document["keys"]] == ["next-key"]
+        assert document["keys"][0]["kty"] == "RSA"
+        assert "d" not in document["keys"][0]
+
+
+class TestJWKSVerifier:
+    """Test local verification, rotation and refresh behaviour."""
+
+    async def test_verifies_without_fetching_per_request(self, key_manager):
+        load = counting_loader(key_manager)
+        verifier = JWKSVerifier(load)
+        await verifier.refresh()
+        token = await issue(key_manager)
+
+        for _ in range(10):
+            claims = await verifier.verify(token)
+
+        assert claims["type"] == "access"
+        assert load.calls == 1
+
+    async def test_rotated_key_is_picked_up_on_demand(self, key_manager):
+        clock = Clock()
+        load = counting_loader(key_manager)
+        verifier = JWKSVerifier(load, min_refresh_interval=30, clock=clock)
+        await verifier.refresh()
+        old_token = await issue(key_manager)
+
+        await key_manager._generate_key_pair("rotated-key")
+        clock.now += 30
+        new_token = await issue(key_manager, key_id="rotated-key")
+
+        assert (await verifier.verify(new_token))["aud"] == "api"
+        assert (await verifier.verify(old_token))["aud"] == "api"
+        assert load.calls == 2
+
+    async def test_unknown_kid_refreshes_at_most_once_per_interval(self, key_manager):
+        clock = Clock()
+        load = counting_loader(key_manager)
+        verifier = JWKSVerifier(load, min_refresh_interval=30, clock=clock)
+        await verifier.refresh()
+        await key_manager._generate_key_pair("forged")
+        forged = await issue(key_manager, key_id="forged")
+        del key_manager.keys["forged"]
+
+        for _ in range(5):
+            with pytest.raises(JWTError):
+                await verifier.verify(forged)
+
+        assert load.calls == 1
+
+    async def test_failed_refresh_keeps_cached_keys(self, key_manager):
+        load = counting_loader(key_manager)
+        verifier = JWKSVerifier(load)
+        await verifier.refresh()
+        token = await issue(key_manager)
+
+        async def unavailable():
+            raise ConnectionError("auth service down")
+        verifier._load_jwks = unavailable
+
+        assert not await verifier.refresh()
+        assert await verifier.verify(token)
+        assert verifier.stats["refresh_failures"] == 1
+
+    async def test_rejects_expired_and_foreign_audience(self, key_manager):
+        verifier = JWKSVerifier(counting_loader(key_manager))
+        await verifier.refresh()
+
+        with pytest.raises(ExpiredSignatureError):
+            await verifier.verify(await issue(key_manager, exp=datetime.utcnow() - timedelta(seconds=1)))
+        with pytest.raises(JWTClaimsError):
+            await verifier.verify(await issue(key_manager, aud="other-api"))
+
+    async def test_legacy_shared_secret_tokens(self, key_manager):
+        payload = {"sub": "creator-1", "iss": "mvp-coaching-ai-platform", "aud": "api",
+                   "exp": datetime.utcnow() + timedelta(minutes=5)}
+        legacy = jwt.encode(payload, "legacy-secret", algorithm="HS256")
+
+        strict = JWKSVerifier(counting_loader(key_manager))
+        with pytest.raises(JWTError):
+            await strict.verify(legacy)
+
+        lenient = JWKSVerifier(counting_loader(key_manager), legacy_secret="legacy-secret")
+        assert (await lenient.verify(legacy))["sub"] == "creator-1"
+
+    @pytest.mark.parametrize("algorithm", ["RS256", "ES256", "none"])
+    def test_legacy_secret_requires_hmac_algorithm(self, algorithm):
+        async def load():
+            return {"keys": []}
+
+        with pytest.raises(ValueError):
+            JWKSVerifier(load, legacy_secret="legacy-secret", legacy_algorithm=algorithm)
+        assert JWKSVerifier(load, legacy_algorithm=algorithm).legacy_secret is None
+
+    def test_global_verifier_drops_fallback_for_asymmetric_algorithm(self, monkeypatch):
+        from shared.security import jwks
+
+        async def load():
+            return {"keys": []}
+
+        monkeypatch.setattr(jwks, "_jwks_verifier", None)
+        monkeypatch.setenv("JWT_SECRET_KEY", "legacy-secret")
+        monkeypatch.setenv("JWT_ALGORITHM", "RS256")
+
+        verifier = jwks.get_jwks_verifier(load_jwks=load)
+
+        assert verifier.legacy_secret is None
+        assert (verifier.audience, verifier.issuer) == ("api", "mvp-coaching-ai-platform")
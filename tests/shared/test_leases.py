@@ -0,0 +1,43 @@
+"""
+Tests for Redis leases.
+"""
+
+import pytest
+
+from shared.cache.leases import LeaseUnavailableError, RedisLease
+
+
+class TestRedisLease:
+    """Test exclusive, expiring ownership."""
+
+    async def test_only_one_holder(self, redis_client):
+        first = RedisLease(redis_client, "system", "job")
+        second = RedisLease(redis_client, "system", "job")
+
+        assert await first.acquire()
+        assert not await second.acquire()
+
+        await first.release()
+        assert await second.acquire()
+
+    async def test_lost_lease_cannot_be_renewed_or_released(self, redis_client):
+        first = RedisLease(redis_client, "system", "job", ttl_ms=60000)
+        second = RedisLease(redis_client, "system", "job")
+        await first.acquire()
+        client = await redis_client.get_client()
+        await client.delete(first.key)  # expired
+        await second.acquire()
+
+        assert not await first.renew()
+        await first.release()
+        assert await second.holder() == second.token
+        assert await second.renew()
+
+    async def test_context_manager(self, redis_client):
+        async with RedisLease(redis_client, "creator-1", "job") as lease:
+            with pytest.raises(LeaseUnavailableError):
+                async with RedisLease(redis_client, "creator-1", "job"):
+                    pass
+            assert await lease.holder() == lease.token
+
+        assert await RedisLease(redis_client, "creator-1", "job").holder() is None
@@ -0,0 +1,387 @@
+"""
+Tests for MessageQueue consumers and message deduplication.
+"""
+
+import asyncio
+import time
+from unittest.mock import Mock, patch
+
+import fakeredis.aioredis
+import pytest
+
+from shared.cache.deduplication import MessageDeduplicator
+from shared.cache.message_queue import MessageQueue, _LaneSchedule
+from shared.cache.redis_client import RedisClient
+
+
+class BlockingFakeRedis(fakeredis.aioredis.FakeRedis):
+    """fakeredis returns empty blocking reads at once; wait like a real server would"""
+
+    async def xreadgroup(self, *args, block=None, **kwargs):
+        result = await super().xreadgroup(*args, **kwargs)
+        if not result and block:
+            await asyncio.sleep(block / 1000)
+        return result
+
+
+@pytest.fixture
+def redis_client():
+    client = RedisClient(redis_url="redis://localhost:6379/0")
+    client._client = BlockingFakeRedis(decode_responses=True)
+    return client
+
+
+@pytest.fixture
+def queue(redis_client):
+    return MessageQueue(redis_client)
+
+
+async def consume_until(queue, handler, expected, handler_wrapper=None, **kwargs):
+    """Run consume_ordered until ``expected`` messages were handled"""
+    task = asyncio.create_task(queue.consume_ordered(
+        "system", "webhooks", handler_wrapper or handler, key_func=lambda m: m["data"]["user"],
+        block_time=10, **kwargs
+    ))
+    deadline = asyncio.get_running_loop().time() + 2
+    while len(handler.seen) < expected:
+        assert asyncio.get_running_loop().time() < deadline, "messages not consumed in time"
+        await asyncio.sleep(0.01)
+    await queue.stop_all_consumers()
+    await asyncio.wait_for(task, timeout=2)
+
+
+class RecordingHandler:
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.seen = []
+        self.active = {}
+        self.max_active = 0
+        self.overlapped_keys = False
+
+    async def __call__(self, message):
+        user = message["data"]["user"]
+        if self.active.get(user):
+            self.overlapped_keys = True
+        self.active[user] = True
+        self.max_active = max(self.max_active, sum(self.active.values()))
+        await asyncio.sleep(self.delay)
+        self.active[user] = False
+        self.seen.append((user, message["data"]["n"]))
+        return True
+
+
+class TestOrderedConsumer:
+    """Test per-key ordering with concurrency across keys."""
+
+    async def test_keys_run_concurrently_in_order(self, queue):
+        await queue.create_stream("system", "webhooks")
+        for n in range(4):
+            for user in ("alice", "bob", "carol"):
+                await queue.send_message("system", "webhooks", "whatsapp_webhook", {"user": user, "n": n})
+        handler = RecordingHandler()
+
+        await consume_until(queue, handler, expected=12, concurrency=3)
+
+        for user in ("alice", "bob", "carol"):
+            assert [n for u, n in handler.seen if u == user] == [0, 1, 2, 3]
+        assert handler.max_active == 3
+        assert not handler.overlapped_keys
+
+    async def test_concurrency_limit(self, queue):
+        await queue.create_stream("system", "webhooks")
+        for user in range(6):
+            await queue.send_message("system", "webhooks", "telegram_webhook", {"user": str(user), "n": 0})
+        handler = RecordingHandler()
+
+        await consume_until(queue, handler, expected=6, concurrency=2)
+
+        assert handler.max_active == 2
+
+    async def test_messages_are_acknowledged(self, queue, redis_client):
+        await queue.create_stream("system", "webhooks")
+        await queue.send_message("system", "webhooks", "whatsapp_webhook", {"user": "alice", "n": 0})
+        handler = RecordingHandler(delay=0)
+
+        await consume_until(queue, handler, expected=1)
+
+        client = await redis_client.get_client()
+        pending = await client.xpending("tenant:system:queue:webhooks", "webhooks_consumers")
+        assert pending["pending"] == 0
+
+    async def test_failed_message_is_not_overtaken_by_its_key(self, queue):
+        queue.retry_base_delay = 0.05
+        await queue.create_stream("system", "webhooks")
+        for n in range(3):
+            for user in ("alice", "bob"):
+                await queue.send_message("system", "webhooks", "whatsapp_webhook", {"user": user, "n": n})
+        handler = RecordingHandler(delay=0)
+        failed = []
+
+        async def flaky(message):
+            if message["data"] == {"user": "alice", "n": 0} and not failed:
+                failed.append(message["retry_count"])
+                return False
+            return await handler(message)
+
+        await consume_until(queue, handler, expected=6, handler_wrapper=flaky)
+
+        assert [n for u, n in handler.seen if u == "alice"] == [0, 1, 2]
+        assert [n for u, n in handler.seen if u == "bob"] == [0, 1, 2]
+        assert failed == [0]
+        assert (await queue.get_queue_info("system", "webhooks"))["delayed"] == 0
+
+
+async def run_consumer(queue, handler, until, **kwargs):
+    """Run consume_messages until ``until()`` holds, then stop it gracefully"""
+    task = asyncio.create_task(queue.consume_messages("creator-1", "jobs", handler, block_time=10, **kwargs))
+    deadline = asyncio.get_running_loop().time() + 3
+    while not until():
+        assert asyncio.get_running_loop().time() < deadline, "messages not consumed in time"
+        await asyncio.sleep(0.005)
+    await queue.stop_all_consumers()
+    await asyncio.wait_for(task, timeout=3)
+
+
+async def pending_count(redis_client, queue_name="jobs"):
+    client = await redis_client.get_client()
+    pending = await client.xpending(f"tenant:creator-1:queue:{queue_name}", f"{queue_name}_consumers")
+    return pending["pending"]
+
+
+class TestConcurrentConsumer:
+    """Test concurrent handlers, batched acks, reclaiming and draining."""
+
+    async def fill(self, queue, count):
+        await queue.create_stream("creator-1", "jobs")
+        for n in range(count):
+            await queue.send_message("creator-1", "jobs", "job", {"n": n})
+
+    async def test_throughput_scales_with_concurrency(self, queue, redis_client):
+        await self.fill(queue, 40)
+        done = []
+
+        async def handler(message):
+            await asyncio.sleep(0.05)
+            done.append(message["data"]["n"])
+            return True
+
+        started = time.monotonic()
+        await run_consumer(queue, handler, lambda: len(done) == 40, batch_size=20, concurrency=20)
+
+        # 40 x 50ms sequentially would take 2s
+        assert time.monotonic() - started < 0.6
+        assert sorted(done) == list(range(40))
+        assert await pending_count(redis_client) == 0
+
+    async def test_acks_are_batched(self, queue, redis_client):
+        await self.fill(queue, 10)
+        done = []
+
+        async def handler(message):
+            done.append(message["id"])
+            return True
+
+        client = await redis_client.get_client()
+        with patch.object(client, "xack", wraps=client.xack) as xack:
+            await run_consumer(queue, handler, lambda: len(done) == 10, batch_size=10, concurrency=10)
+
+        assert sum(len(call.args) - 2 for call in xack.call_args_list) == 10
+        assert xack.call_count < 10
+        assert await pending_count(redis_client) == 0
+
+    async def test_failed_message_is_retried_with_its_data(self, queue, redis_client):
+        queue.retry_base_delay = 0.01
+        await self.fill(queue, 1)
+        attempts = []
+
+        async def handler(message):
+            attempts.append((message["data"], message["retry_count"]))
+            return len(attempts) > 1
+
+        await run_consumer(queue, handler, lambda: len(attempts) == 2)
+
+        assert attempts == [({"n": 0}, 0), ({"n": 0}, 1)]
+        assert await pending_count(redis_client) == 0
+
+    async def test_stale_pending_messages_are_reclaimed(self, queue, redis_client):
+        await self.fill(queue, 3)
+        client = await redis_client.get_client()
+        # A consumer that read the messages and died before acknowledging them
+        await client.xreadgroup("jobs_consumers", "dead-consumer", {"tenant:creator-1:queue:jobs": ">"}, count=10)
+        await asyncio.sleep(0.05)
+        done = []
+
+        async def handler(message):
+            done.append(message["data"]["n"])
+            return True
+
+        await run_consumer(queue, handler, lambda: len(done) == 3, claim_idle_ms=20, claim_interval=0.01)
+
+        assert sorted(done) == [0, 1, 2]
+        assert await pending_count(redis_client) == 0
+
+    async def test_stop_drains_in_flight_handlers(self, queue, redis_client):
+        await self.fill(queue, 5)
+        started, finished = [], []
+
+        async def handler(message):
+            started.append(message["id"])
+            await asyncio.sleep(0.1)
+            finished.append(message["id"])
+            return True
+
+        await run_consumer(queue, handler, lambda: len(started) == 5, concurrency=5)
+
+        assert len(finished) == 5
+        assert await pending_count(redis_client) == 0
+
+    async def test_lag_is_reported(self, queue):
+        await self.fill(queue, 4)
+        metrics = Mock()
+
+        assert await queue.get_consumer_lag("creator-1", "jobs") == {"pending": 0, "lag": 4, "consumers": 0}
+        with patch("shared.cache.message_queue.get_optional_metrics_collector", return_value=metrics):
+            await queue._report_lag("creator-1", "jobs")
+        metrics.set_message_queue_lag.assert_called_once_with("jobs", 4, 0)
+
+
+class TestPriorityLanes:
+    """Test per-priority streams and weighted reads."""
+
+    async def test_messages_go_to_their_lane(self, queue):
+        for priority in ("high", "normal", "low", "bogus"):
+            await queue.send_message("creator-1", "jobs", "job", {"p": priority}, priority=priority)
+
+        info = await queue.get_queue_info("creator-1", "jobs")
+
+        assert info["lanes"] == {"high": 1, "normal": 2, "low": 1}
+        assert info["length"] == 4
+
+    async def test_reads_are_weighted_across_busy_lanes(self, queue, redis_client):
+        await queue.create_stream("creator-1", "jobs")
+        for n in range(20):
+            await queue.send_message("creator-1", "jobs", "bulk", {"n": n}, priority="low")
+            await queue.send_message("creator-1", "jobs", "chat", {"n": n}, priority="high")
+        client = await redis_client.get_client()
+        lanes = queue._get_lane_streams("creator-1", "jobs")
+
+        entries = await queue._read_lanes(
+            client, lanes, "jobs_consumers", "c1", _LaneSchedule(queue.priority_weights), 10, 0
+        )
+
+        # The empty normal lane's share goes to high; low still gets its share
+        assert [stream for stream, _, _ in entries] == [lanes["high"]] * 9 + [lanes["low"]]
+
+    async def test_live_work_overtakes_bulk_backlog(self, queue):
+        await queue.create_stream("creator-1", "jobs")
+        for n in range(30):
+            await queue.send_message("creator-1", "jobs", "bulk", {"n": n}, priority="low")
+        for n in range(5):
+            await queue.send_message("creator-1", "jobs", "chat", {"n": n}, priority="high")
+        seen = []
+
+        async def handler(message):
+            seen.append(message["priority"])
+            return True
+
+        await run_consumer(queue, handler, lambda: len(seen) == 35, concurrency=2)
+
+        assert seen[:5] == ["high"] * 5
+
+
+class TestDelayedRetries:
+    """Test backoff scheduling, dead-lettering and replay."""
+
+    def test_retry_delay_backs_off_exponentially(self, queue):
+        queue.retry_base_delay = 1
+        queue.retry_max_delay = 10
+
+        for retry_count, upper in ((1, 1), (2, 2), (3, 4), (6, 10)):
+            delay = queue.retry_delay(retry_count)
+            assert upper / 2 <= delay <= upper
+
+    async def test_failed_message_waits_for_backoff(self, queue):
+        queue.retry_base_delay = 0.2
+        await queue.send_message("creator-1", "jobs", "job", {"n": 1}, priority="high")
+        attempts = []
+
+        async def handler(message):
+            attempts.append((time.monotonic(), message["priority"]))
+            return len(attempts) > 1
+
+        await run_consumer(queue, handler, lambda: len(attempts) == 2)
+
+        assert attempts[1][0] - attempts[0][0] >= 0.1
+        assert attempts[1][1] == "high"
+        assert (await queue.get_queue_info("creator-1", "jobs"))["delayed"] == 0
+
+    async def test_promote_moves_only_due_messages(self, queue, redis_client):
+        await queue.create_stream("creator-1", "jobs")
+        client = await redis_client.get_client()
+        queue.retry_base_delay = 100
+        await queue._handle_message_retry(client, "creator-1", "jobs", "1-0", {"id": "a", "priority": "low", "data": {}})
+        queue.retry_base_delay = 0
+        await queue._handle_message_retry(client, "creator-1", "jobs", "2-0", {"id": "b", "priority": "low", "data": {}})
+
+        assert await queue._promote_due(client, "creator-1", "jobs") == 1
+
+        info = await queue.get_queue_info("creator-1", "jobs")
+        assert info["lanes"]["low"] == 1
+        assert info["delayed"] == 1
+
+    async def test_exhausted_message_is_dead_lettered_and_replayed(self, queue):
+        queue.max_retries = 1
+        queue.retry_base_delay = 0.01
+        await queue.send_message("creator-1", "jobs", "job", {"n": 7})
+        attempts = []
+
+        async def failing(message):
+            attempts.append(message["retry_count"])
+            return False
+
+        await run_consumer(queue, failing, lambda: len(attempts) == 2)
+        await asyncio.sleep(0.05)
+
+        dead = await queue.get_dead_letters("creator-1", "jobs")
+        assert [(m["type"], m["data"], m["retry_count"]) for m in dead] == [("job", {"n": 7}, 1)]
+        assert dead[0]["failed_at"]
+
+        assert await queue.replay_dead_letters("creator-1", "jobs", priority="high") == 1
+        assert await queue.get_dead_letters("creator-1", "jobs") == []
+
+        replayed = []
+
+        async def handler(message):
+            replayed.append((message["data"], message["retry_count"], message["priority"]))
+            return True
+
+        await run_consumer(queue, handler, lambda: len(replayed) == 1)
+        assert replayed == [({"n": 7}, 0, "high")]
+
+
+class TestMessageDeduplicator:
+    """Test claim / complete / release semantics."""
+
+    async def test_second_claim_is_rejected(self, redis_client):
+        dedup = MessageDeduplicator(redis_client, "webhook")
+
+        assert await dedup.claim("creator-1", "whatsapp:ch:wamid.1")
+        assert not await dedup.claim("creator-1", "whatsapp:ch:wamid.1")
+        assert await dedup.claim("creator-2", "whatsapp:ch:wamid.1")
+
+    async def test_completed_message_stays_deduplicated(self, redis_client):
+        dedup = MessageDeduplicator(redis_client, "webhook", done_ttl=3600)
+        await dedup.claim("creator-1", "m1")
+        await dedup.complete("creator-1", "m1")
+
+        assert not await dedup.claim("creator-1", "m1")
+        assert await dedup.get_status("creator-1", "m1") == "done"
+        client = await redis_client.get_client()
+        assert 0 < await client.ttl("tenant:creator-1:dedup:webhook:m1") <= 3600
+
+    async def test_released_message_can_be_retried(self, redis_client):
+        dedup = MessageDeduplicator(redis_client, "webhook")
+        await dedup.claim("creator-1", "m1")
+        await dedup.release("creator-1", "m1")
+
+        assert await dedup.claim("creator-1", "m1")
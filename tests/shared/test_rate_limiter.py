@@ -0,0 +1,142 @@
+"""
+Tests for the Lua GCRA rate limiter.
+Runs the real script against fakeredis (needs the Lua runtime from fakeredis[lua]).
+"""
+
+import pytest
+from unittest.mock import AsyncMock, Mock
+
+pytest.importorskip("lupa")
+import fakeredis.aioredis
+
+from shared.security.rate_limiter import HybridRateLimiter, RateLimiter, RateLimitCheck, RateLimitType
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def limiter(redis):
+    cache_manager = Mock()
+    cache_manager.redis.get_client = AsyncMock(return_value=redis)
+    return RateLimiter(cache_manager=cache_manager)
+
+
+class TestGCRARateLimiter:
+    """Test GCRA admission, metadata and multi-limit atomicity."""
+
+    async def test_burst_then_reject(self, limiter):
+        limits = {"requests": 5, "window": 60, "burst": 3}
+        results = [await limiter.check_rate_limit("user_1", "chat", custom_limits=limits) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert [info["remaining"] for _, info in results] == [2, 1, 0, 0]
+        assert results[-1][1]["retry_after"] == 12  # one emission interval (60s / 5)
+
+    async def test_single_key_with_constant_memory(self, limiter, redis):
+        for _ in range(10):
+            await limiter.check_rate_limit("user_1", "chat")
+
+        keys = await redis.keys("*")
+        assert keys == ["rate_limit:gcra:user:chat:user_1"]
+        assert await redis.type(keys[0]) == "string"
+        assert await redis.pttl(keys[0]) > 0
+
+    async def test_status_does_not_consume(self, limiter):
+        await limiter.check_rate_limit("user_1", "search")
+        first = await limiter.get_rate_limit_status("user_1", "search")
+        second = await limiter.get_rate_limit_status("user_1", "search")
+
+        assert first["remaining"] == second["remaining"] == 74
+
+    async def test_multi_limit_is_all_or_nothing(self, limiter):
+        creator_limit = {"requests": 2, "window": 60}
+        checks = [
+            RateLimitCheck("user_1", "chat"),
+            RateLimitCheck("creator_1", "chat", RateLimitType.PER_CREATOR, creator_limit),
+        ]
+
+        outcomes = [(await limiter.check_rate_limits(checks))[0] for _ in range(3)]
+        _, user_info = await limiter.check_rate_limit("user_1", "chat")
+
+        assert outcomes == [True, True, False]
+        # The rejected request consumed nothing from the user's own limit
+        assert user_info["remaining"] == 150 - 3
+
+    async def test_reset(self, limiter):
+        limits = {"requests": 1, "window": 60}
+        await limiter.check_rate_limit("user_1", "upload", custom_limits=limits)
+        assert await limiter.reset_rate_limit("user_1", "upload")
+
+        allowed, _ = await limiter.check_rate_limit("user_1", "upload", custom_limits=limits)
+        assert allowed
+
+    async def test_fails_open_without_redis(self):
+        cache_manager = Mock()
+        cache_manager.redis.get_client = AsyncMock(side_effect=ConnectionError("down"))
+
+        allowed, info = await RateLimiter(cache_manager=cache_manager).check_rate_limit("user_1", "chat")
+
+        assert allowed
+        assert info["fail_mode"] == "open"
+
+
+class TestHybridRateLimiter:
+    """Test the local pre-admission tier."""
+
+    def _hybrid(self, redis, **kwargs):
+        cache_manager = Mock()
+        cache_manager.redis.get_client = AsyncMock(return_value=redis)
+        return HybridRateLimiter(cache_manager=cache_manager, **kwargs)
+
+    async def test_most_requests_admitted_locally(self, redis):
+        limiter = self._hybrid(redis, lease_size=10, lease_ttl=60, expected_workers=1)
+
+        for _ in range(50):
+            allowed, info = await limiter.check_rate_limit("user_1", "chat")
+            assert allowed
+
+        assert limiter.redis_checks <= 6
+        assert limiter.local_admissions >= 44
+        assert info["remaining"] == 150 - 50
+
+    async def test_workers_never_over_admit(self, redis):
+        limits = {"requests": 30, "window": 3600}
+        workers = [self._hybrid(redis, lease_size=8, lease_ttl=60, expected_workers=3) for _ in range(3)]
+
+        admitted = 0
+        for _ in range(40):
+            for worker in workers:
+                allowed, _ = await worker.check_rate_limit("user_1", "search", custom_limits=limits)
+                admitted += allowed
+
+        # Leased tokens are consumed up front: exact on the over-admit side,
+        # at most one lease per worker stranded on the conservative side
+        assert 30 - 3 * 8 <= admitted <= 30
+
+    async def test_rejection_cached_until_retry_after(self, redis):
+        limiter = self._hybrid(redis, lease_size=5, lease_ttl=60, expected_workers=1)
+        limits = {"requests": 1, "window": 60}
+
+        assert (await limiter.check_rate_limit("user_1", "upload", custom_limits=limits))[0]
+        checks_before = limiter.redis_checks
+        results = [await limiter.check_rate_limit("user_1", "upload", custom_limits=limits) for _ in range(5)]
+
+        assert not any(allowed for allowed, _ in results)
+        assert limiter.redis_checks == checks_before + 1
+
+    async def test_expired_lease_is_refunded(self, redis):
+        limiter = self._hybrid(redis, lease_size=10, lease_ttl=0, expected_workers=1)
+        for _ in range(3):
+            await limiter.check_rate_limit("user_1", "chat")
+        leased = await limiter.get_rate_limit_status("user_1", "chat")
+
+        # Lease expired: the next Redis call first returns the unused tokens
+        await limiter.check_rate_limit("user_1", "chat")
+        status = await limiter.get_rate_limit_status("user_1", "chat")
+
+        assert leased["remaining"] < 150 - 3
+        assert status["remaining"] >= 150 - 4 - 10
+        assert status["remaining"] > leased["remaining"] - 11
@@ -0,0 +1,147 @@
+"""
+Tests for compiled RBAC permission bitmasks, token claims and per-request resolution.
+"""
+
+from types import SimpleNamespace
+
+import pytest
+
+from shared.security import rbac
+from shared.security.rbac import (
+    Permission, RBACManager, Role, RoleDefinition, permission_claims,
+    require_all_permissions, require_permission, resolve_permission_mask
+)
+
+
+def make_request():
+    return SimpleNamespace(state=SimpleNamespace())
+
+
+def make_creator(tier="free", creator_id="creator-1"):
+    return SimpleNamespace(id=creator_id, subscription_tier=tier)
+
+
+class TestCompiledMasks:
+    """Test that masks agree with the role definitions they were compiled from."""
+
+    def test_masks_match_role_hierarchy(self):
+        manager = RBACManager()
+
+        for role in manager.roles:
+            role_def = manager.roles[role]
+            expected = set(role_def.permissions)
+            for parent in role_def.inherits_from or ():
+                expected |= manager.get_role_permissions(parent)
+            assert manager.get_role_permissions(role) == expected
+
+        assert manager.has_permission([Role.ADMIN], Permission.DELETE_WIDGET)
+        assert not manager.has_permission([Role.CREATOR_READONLY], Permission.UPDATE_WIDGET)
+        assert manager.has_permission(Role.SUPPORT, Permission.READ_WIDGET)
+
+    def test_any_and_all_checks(self):
+        manager = RBACManager()
+        roles = [Role.CREATOR_READONLY.value]
+
+        assert manager.has_any_permission(roles, [Permission.MANAGE_SYSTEM, Permission.READ_WIDGET])
+        assert not manager.has_all_permissions(roles, [Permission.MANAGE_SYSTEM, Permission.READ_WIDGET])
+        assert manager.has_all_permissions(roles, [])
+        assert not manager.has_any_permission(roles, [])
+
+    def test_unknown_roles_and_permissions_grant_nothing(self):
+        manager = RBACManager()
+
+        assert manager.get_roles_mask(["no-such-role"]) == 0
+        assert not manager.has_permission([Role.ADMIN], "launch:rockets")
+        assert not manager.has_all_permissions([Role.ADMIN], [Permission.MANAGE_USERS, "launch:rockets"])
+
+    def test_custom_roles_recompile_and_change_version(self):
+        manager = RBACManager()
+        version = manager.version
+        admin_mask = manager.get_roles_mask([Role.ADMIN])
+
+        assert manager.create_role("exporter", ["export:reports", "read:analytics"])
+
+        assert manager.version != version
+        assert manager.has_permission(["exporter"], "export:reports")
+        assert manager.has_permission(["exporter"], Permission.READ_ANALYTICS)
+        assert not manager.has_permission(["exporter"], Permission.READ_WIDGET)
+        # Built-in permission bits are stable across recompiles
+        assert manager.get_roles_mask([Role.ADMIN]) == admin_mask
+
+        manager.remove_role("exporter")
+        assert manager.version == version
+        assert manager.get_roles_mask(["exporter"]) == 0
+
+    def test_inheritance_cycles_terminate(self):
+        manager = RBACManager()
+        manager.add_custom_role(RoleDefinition("a", "", {Permission.READ_WIDGET}, inherits_from=["b"]))
+        manager.add_custom_role(RoleDefinition("b", "", {Permission.READ_DOCUMENT}, inherits_from=["a"]))
+
+        assert manager.has_all_permissions(["a"], [Permission.READ_WIDGET, Permission.READ_DOCUMENT])
+
+    def test_identical_definitions_share_version(self):
+        assert RBACManager().version == RBACManager().version
+
+
+class TestTokenClaims:
+    """Test that embedded masks are only trusted for the current definitions."""
+
+    def test_claims_round_trip(self):
+        claims = permission_claims([Role.CREATOR.value])
+
+        assert claims["roles"] == ["creator"]
+        assert rbac.rbac_manager.mask_from_claims(claims) == rbac.rbac_manager.get_roles_mask(["creator"])
+
+    def test_stale_or_missing_claims_are_ignored(self):
+        claims = permission_claims([Role.CREATOR.value])
+
+        assert rbac.rbac_manager.mask_from_claims({**claims, "perm_ver": "old"}) is None
+        assert rbac.rbac_manager.mask_from_claims({"roles": ["creator"]}) is None
+
+
+class TestPermissionDependencies:
+    """Test the require_* dependencies against the per-request mask."""
+
+    async def test_mask_is_resolved_once_per_request(self, monkeypatch):
+        calls = []
+        original = rbac.get_roles_from_subscription
+        monkeypatch.setattr(
+            rbac, "get_roles_from_subscription", lambda tier: calls.append(tier) or original(tier)
+        )
+        request, creator = make_request(), make_creator("free")
+
+        await require_permission(Permission.READ_WIDGET)(request, creator)
+        await require_all_permissions([Permission.READ_DOCUMENT, Permission.UPDATE_WIDGET])(request, creator)
+        assert resolve_permission_mask(request, creator) & rbac.rbac_manager.permissions_mask(
+            [Permission.READ_ANALYTICS]
+        )
+
+        assert calls == ["free"]
+
+    async def test_missing_permission_is_forbidden(self):
+        request, creator = make_request(), make_creator("support")
+
+        with pytest.raises(rbac.AuthorizationError):
+            await require_permission(Permission.UPDATE_WIDGET)(request, creator)
+        await require_permission(Permission.READ_SUPPORT_DATA)(request, creator)
+
+    async def test_current_token_mask_is_used(self, monkeypatch):
+        monkeypatch.setattr(rbac, "get_roles_from_subscription", lambda tier: pytest.fail("roles resolved"))
+        request, creator = make_request(), make_creator("free")
+        request.state.token_claims = {"sub": creator.id, **permission_claims([Role.SUPPORT.value])}
+
+        await require_permission(Permission.READ_SUPPORT_DATA)(request, creator)
+
+        assert resolve_permission_mask(request, creator) == rbac.rbac_manager.get_roles_mask(["support"])
+
+    async def test_stale_or_foreign_token_mask_falls_back_to_tier(self):
+        creator = make_creator("free")
+        claims = permission_claims([Role.ADMIN.value])
+        tier_mask = rbac.rbac_manager.get_roles_mask(["creator"])
+
+        for token_claims in ({"sub": creator.id, **claims, "perm_ver": "old"}, {"sub": "creator-2", **claims}):
+            request = make_request()
+            request.state.token_claims = token_claims
+            assert resolve_permission_mask(request, creator) == tier_mask
+            with pytest.raises(rbac.AuthorizationError):
+                await require_permission(Permission.MANAGE_SYSTEM)(request, creator)
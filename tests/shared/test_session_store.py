@@ -0,0 +1,206 @@
+"""
+Tests for session activity buffering and the user-session index.
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from shared.cache.session_store import SessionStore
+
+
+@pytest.fixture
+def store(redis_client):
+    return SessionStore(redis_client, activity_flush_interval=60)
+
+
+class TestSessionActivity:
+    """Test that reads do not rewrite sessions and activity is flushed in batches."""
+
+    async def test_reads_do_not_rewrite_session(self, store, redis_client):
+        session_id = await store.create_session("creator-1", user_id="u1")
+        client = await redis_client.get_client()
+
+        with patch.object(client, "eval", wraps=client.eval) as script, \
+                patch.object(client, "zadd", wraps=client.zadd) as zadd:
+            for _ in range(20):
+                assert await store.get_session("creator-1", session_id)
+
+        script.assert_not_called()
+        zadd.assert_not_called()
+        assert await store.get_last_activity("creator-1", session_id) is not None
+
+    async def test_activity_is_flushed_after_interval(self, store, redis_client):
+        first = await store.create_session("creator-1")
+        second = await store.create_session("creator-2")
+        await store.get_session("creator-1", first)
+
+        client = await redis_client.get_client()
+        created_at = await client.zscore("tenant:creator-1:session_activity", first)
+
+        store._last_activity_flush -= 61
+        await store.get_session("creator-2", second)
+
+        assert store._pending_activity == {}
+        assert await client.zscore("tenant:creator-1:session_activity", first) > created_at
+        assert await client.zscore("tenant:creator-2:session_activity", second) is not None
+
+    async def test_background_flush_writes_idle_buffer(self, redis_client):
+        store = SessionStore(redis_client, activity_flush_interval=0.01)
+        session_id = await store.create_session("creator-1")
+        await store.start()
+        try:
+            await store.get_session("creator-1", session_id)
+            await asyncio.sleep(0.05)
+            assert store._pending_activity == {}
+        finally:
+            await store.stop()
+
+    async def test_stop_flushes_buffered_activity(self, store, redis_client):
+        session_id = await store.create_session("creator-1")
+        await store.start()
+        await store.get_session("creator-1", session_id)
+
+        await store.stop()
+
+        assert store._pending_activity == {}
+        assert store._flusher is None
+
+    async def test_update_session_applies_updates(self, store):
+        session_id = await store.create_session("creator-1", user_id="u1")
+
+        assert await store.update_session("creator-1", session_id, {"step": 2})
+        session = await store.get_session("creator-1", session_id, update_activity=False)
+        assert session["step"] == 2
+        assert session["user_id"] == "u1"
+
+        assert await store.end_session("creator-1", session_id)
+        assert await store.get_session("creator-1", session_id) is None
+
+
+class TestUserSessionIndex:
+    """Test user → sessions lookup through the index set."""
+
+    async def test_lookup_returns_active_sessions(self, store, redis_client):
+        first = await store.create_session("creator-1", user_id="u1", channel="web_widget")
+        second = await store.create_session("creator-1", user_id="u1", channel="whatsapp")
+        ended = await store.create_session("creator-1", user_id="u1")
+        await store.create_session("creator-1", user_id="u2")
+        await store.end_session("creator-1", ended)
+        client = await redis_client.get_client()
+
+        with patch.object(client, "scan_iter") as scan:
+            sessions = await store.get_user_sessions("creator-1", "u1")
+
+        scan.assert_not_called()
+        assert {s["session_id"] for s in sessions} == {first, second}
+
+    async def test_expired_and_deleted_sessions_leave_the_index(self, store, redis_client):
+        kept = await store.create_session("creator-1", user_id="u1")
+        expired = await store.create_session("creator-1", user_id="u1")
+        deleted = await store.create_session("creator-1", user_id="u1")
+        client = await redis_client.get_client()
+        await client.delete(f"tenant:creator-1:session:{expired}")
+
+        await store.delete_session("creator-1", deleted)
+        sessions = await store.get_user_sessions("creator-1", "u1")
+
+        assert [s["session_id"] for s in sessions] == [kept]
+        assert await client.smembers("tenant:creator-1:user_sessions:u1") == {kept}
+        assert await client.zscore("tenant:creator-1:session_activity", deleted) is None
+
+
+class TestSessionStats:
+    """Test counter-based statistics and activity-ordered expiry sweeps."""
+
+    async def test_stats_follow_create_end_and_delete(self, store, redis_client):
+        widget = [await store.create_session("creator-1", channel="web_widget") for _ in range(3)]
+        whatsapp = await store.create_session("creator-1", channel="whatsapp")
+        await store.create_session("creator-2", channel="telegram")
+
+        await store.end_session("creator-1", widget[0])
+        await store.end_session("creator-1", widget[0])
+        await store.delete_session("creator-1", widget[1])
+        client = await redis_client.get_client()
+
+        with patch.object(client, "scan_iter") as scan:
+            stats = await store.get_session_stats("creator-1")
+
+        scan.assert_not_called()
+        assert stats == {
+            "total_sessions": 3,
+            "active_sessions": 2,
+            "inactive_sessions": 1,
+            "channels": {"web_widget": 1, "whatsapp": 1}
+        }
+        await store.delete_session("creator-1", whatsapp)
+        assert (await store.get_session_stats("creator-1"))["channels"] == {"web_widget": 1}
+
+    async def test_cleanup_removes_only_idle_sessions(self, store, redis_client):
+        idle = [await store.create_session("creator-1", channel="whatsapp") for _ in range(3)]
+        recent = await store.create_session("creator-1", channel="whatsapp")
+        client = await redis_client.get_client()
+        stale = 1_000_000
+        await client.zadd("tenant:creator-1:session_activity", {session_id: stale for session_id in idle})
+        # One idle session already expired through its TTL
+        await client.delete(f"tenant:creator-1:session:{idle[0]}")
+
+        assert await store.cleanup_expired_sessions("creator-1", batch_size=2) == 3
+
+        for session_id in idle:
+            assert not await client.exists(f"tenant:creator-1:session:{session_id}")
+        assert await store.get_session("creator-1", recent)
+        assert await store.get_session_stats("creator-1") == {
+            "total_sessions": 1,
+            "active_sessions": 1,
+            "inactive_sessions": 0,
+            "channels": {"whatsapp": 1}
+        }
+
+    async def expire(self, redis_client, session_id):
+        """Expire a session's key the way its TTL would"""
+        client = await redis_client.get_client()
+        await client.delete(f"tenant:creator-1:session:{session_id}")
+        await client.zadd("tenant:creator-1:session_expiry", {session_id: time.time() - 1})
+
+    async def test_sessions_expired_by_ttl_leave_the_counters(self, store, redis_client):
+        short = await store.create_session("creator-1", channel="whatsapp", ttl=60)
+        await store.create_session("creator-1", channel="whatsapp")
+        await self.expire(redis_client, short)
+
+        assert await store.get_session_stats("creator-1") == {
+            "total_sessions": 1,
+            "active_sessions": 1,
+            "inactive_sessions": 0,
+            "channels": {"whatsapp": 1}
+        }
+        client = await redis_client.get_client()
+        assert await client.zscore("tenant:creator-1:session_expiry", short) is None
+
+    async def test_ended_session_expiring_is_uncounted_once(self, store, redis_client):
+        ended = await store.create_session("creator-1", channel="whatsapp", ttl=60)
+        await store.create_session("creator-1", channel="whatsapp")
+        await store.end_session("creator-1", ended)
+        await self.expire(redis_client, ended)
+
+        stats = await store.get_session_stats("creator-1")
+
+        assert stats["total_sessions"] == 1
+        assert stats["channels"] == {"whatsapp": 1}
+
+    async def test_live_session_past_its_expiry_score_stays_counted(self, store, redis_client):
+        session_id = await store.create_session("creator-1", channel="whatsapp", ttl=60)
+        client = await redis_client.get_client()
+        await client.zadd("tenant:creator-1:session_expiry", {session_id: time.time() - 1})
+
+        assert (await store.get_session_stats("creator-1"))["active_sessions"] == 1
+        assert await client.zscore("tenant:creator-1:session_expiry", session_id) > time.time()
+
+    async def test_cleanup_counts_sessions_expired_by_ttl(self, store, redis_client):
+        short = await store.create_session("creator-1", channel="whatsapp", ttl=60)
+        await self.expire(redis_client, short)
+
+        assert await store.cleanup_expired_sessions("creator-1") == 1
+        assert (await store.get_session_stats("creator-1"))["total_sessions"] == 0
@@ -0,0 +1,173 @@
+"""
+Tests for the verified-token cache, revocation Bloom filter and cross-worker invalidation.
+"""
+
+import asyncio
+import uuid
+
+import fakeredis
+import fakeredis.aioredis
+import pytest
+
+from shared.cache.redis_client import RedisClient
+from shared.security.token_cache import AuthStateCache, BloomFilter, VerifiedTokenCache
+
+
+class Clock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+def make_cache(server, revoked=(), clock=None, **kwargs):
+    client = RedisClient(redis_url="redis://localhost:6379/0")
+    client._client = fakeredis.aioredis.FakeRedis(server=server, decode_responses=True)
+    cache = AuthStateCache(client, token_cache_size=100, bloom_capacity=1000, clock=clock or Clock(), **kwargs)
+
+    async def load_revoked():
+        return list(revoked)
+
+    return cache, load_revoked
+
+
+async def wait_for(condition, timeout=2.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not condition():
+        assert asyncio.get_running_loop().time() < deadline, "condition not met in time"
+        await asyncio.sleep(0.01)
+
+
+class TestBloomFilter:
+    """Test that the filter never forgets and stays near its error rate."""
+
+    def test_no_false_negatives_and_bounded_false_positives(self):
+        bloom = BloomFilter(capacity=5000, error_rate=0.01)
+        added = [str(uuid.uuid4()) for _ in range(5000)]
+        for jti in added:
+            bloom.add(jti)
+
+        assert all(jti in bloom for jti in added)
+        false_positives = sum(str(uuid.uuid4()) in bloom for _ in range(5000))
+        assert false_positives < 5000 * 0.03
+
+
+class TestVerifiedTokenCache:
+    """Test expiry at the token's exp claim and the LRU bound."""
+
+    def test_entries_expire_with_token(self):
+        clock = Clock()
+        cache = VerifiedTokenCache(max_size=10, clock=clock)
+        cache.put("token", {"sub": "c1", "jti": "j1", "exp": clock.now + 30})
+
+        assert cache.get("token")["sub"] == "c1"
+        clock.now += 30
+        assert cache.get("token") is None
+        assert len(cache) == 0
+
+    def test_expired_tokens_are_not_cached(self):
+        clock = Clock()
+        cache = VerifiedTokenCache(max_size=10, clock=clock)
+        cache.put("token", {"sub": "c1", "exp": clock.now - 1})
+        cache.put("no-exp", {"sub": "c1"})
+
+        assert len(cache) == 0
+
+    def test_least_recently_used_is_evicted(self):
+        clock = Clock()
+        cache = VerifiedTokenCache(max_size=2, clock=clock)
+        claims = {"exp": clock.now + 60}
+        cache.put("a", claims)
+        cache.put("b", claims)
+        cache.get("a")
+        cache.put("c", claims)
+
+        assert cache.get("a") is not None
+        assert cache.get("b") is None
+        assert cache.stats["evictions"] == 1
+
+
+class TestAuthStateCache:
+    """Test revocation filtering and pub/sub invalidation between workers."""
+
+    async def test_unloaded_filter_reports_possible_revocation(self, server):
+        cache, _ = make_cache(server)
+
+        assert cache.might_be_revoked("any-jti")
+
+    async def test_loaded_revocations_are_flagged(self, server):
+        cache, load = make_cache(server, revoked=["revoked-jti"])
+        await cache.start(load_revoked=load)
+        try:
+            assert cache.might_be_revoked("revoked-jti")
+            assert not cache.might_be_revoked("other-jti")
+        finally:
+            await cache.stop()
+
+    async def test_revocation_propagates_to_other_workers(self, server):
+        first, load = make_cache(server)
+        second, _ = make_cache(server)
+        await first.start(load_revoked=load)
+        await second.start(load_revoked=load)
+        try:
+            claims = {"sub": "creator-1", "jti": "jti-1", "exp": second._clock() + 60}
+            second.tokens.put("token", claims)
+            assert not second.might_be_revoked("jti-1")
+
+            await first.revoke("jti-1")
+
+            await wait_for(lambda: second.stats["events"] >= 1)
+            assert second.might_be_revoked("jti-1")
+            assert second.tokens.get("token") is None
+        finally:
+            await first.stop()
+            await second.stop()
+
+    async def test_creator_invalidation_drops_status_and_tokens(self, server):
+        first, load = make_cache(server)
+        second, _ = make_cache(server)
+        await first.start(load_revoked=load)
+        await second.start(load_revoked=load)
+        try:
+            second.set_creator_active("creator-1", True)
+            second.tokens.put("token", {"sub": "creator-1", "jti": "j", "exp": second._clock() + 60})
+            second.tokens.put("other", {"sub": "creator-2", "jti": "k", "exp": second._clock() + 60})
+
+            await first.invalidate_creator("creator-1")
+
+            await wait_for(lambda: second.stats["events"] >= 1)
+            assert second.get_creator_active("creator-1") is None
+            assert second.tokens.get("token") is None
+            assert second.tokens.get("other") is not None
+        finally:
+            await first.stop()
+            await second.stop()
+
+    async def test_creator_status_expires(self, server):
+        clock = Clock()
+        cache, _ = make_cache(server, clock=clock, creator_status_ttl=60)
+        cache.set_creator_active("creator-1", False)
+
+        assert cache.get_creator_active("creator-1") is False
+        clock.now += 60
+        assert cache.get_creator_active("creator-1") is None
+
+    async def test_rebuild_drops_expired_revocations(self, server):
+        revoked = ["old-jti"]
+        cache, load = make_cache(server, revoked=revoked)
+        await cache.start(load_revoked=load)
+        try:
+            assert cache.might_be_revoked("old-jti")
+
+            revoked.clear()
+            await cache.rebuild_revocations()
+
+            assert not cache.might_be_revoked("old-jti")
+        finally:
+            await cache.stop()
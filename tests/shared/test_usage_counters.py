@@ -0,0 +1,104 @@
+"""
+Tests for the day/month-bucketed usage counters.
+Runs the real Lua scripts against fakeredis (needs the Lua runtime from fakeredis[lua]).
+"""
+
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+
+pytest.importorskip("lupa")
+import fakeredis.aioredis
+
+from shared.cache.redis_client import RedisClient
+from shared.cache.usage_counters import UsageCounters
+
+
+@pytest.fixture
+def redis():
+    return fakeredis.aioredis.FakeRedis(decode_responses=True)
+
+
+@pytest.fixture
+def counters(redis):
+    client = RedisClient(redis_url="redis://unused")
+    client._client = redis
+    return UsageCounters(client, name="channel_messages")
+
+
+class TestUsageCounters:
+    """Test atomic reservations, bucket expiry and write-behind draining."""
+
+    async def test_reserve_counts_until_limit(self, counters):
+        results = [await counters.reserve("creator_1", "chan_1", daily_limit=3, monthly_limit=10) for _ in range(4)]
+
+        assert [allowed for allowed, _ in results] == [True, True, True, False]
+        assert results[-1][1] == {"daily": 3, "monthly": 3}
+        assert await counters.get_counts("creator_1", "chan_1") == {"daily": 3, "monthly": 3}
+
+    async def test_monthly_limit_blocks_without_counting(self, counters):
+        await counters.reserve("creator_1", "chan_1", daily_limit=10, monthly_limit=2, amount=2)
+        allowed, counts = await counters.reserve("creator_1", "chan_1", daily_limit=10, monthly_limit=2)
+
+        assert not allowed
+        assert counts == {"daily": 2, "monthly": 2}
+
+    async def test_concurrent_reservations_never_overshoot(self, counters):
+        results = await asyncio.gather(*(
+            counters.reserve("creator_1", "chan_1", daily_limit=5, monthly_limit=100) for _ in range(20)
+        ))
+
+        assert sum(allowed for allowed, _ in results) == 5
+        assert (await counters.get_counts("creator_1", "chan_1"))["daily"] == 5
+
+    async def test_release_gives_back_and_clamps_at_zero(self, counters):
+        await counters.reserve("creator_1", "chan_1", daily_limit=1)
+        assert not (await counters.reserve("creator_1", "chan_1", daily_limit=1))[0]
+
+        assert await counters.release("creator_1", "chan_1") == {"daily": 0, "monthly": 0}
+        assert await counters.release("creator_1", "chan_1") == {"daily": 0, "monthly": 0}
+        assert (await counters.reserve("creator_1", "chan_1", daily_limit=1))[0]
+
+    async def test_buckets_are_tenant_scoped_and_expire(self, counters, redis):
+        await counters.increment("creator_1", "chan_1")
+
+        now = datetime.now(timezone.utc)
+        day_key = f"tenant:creator_1:usage:channel_messages:chan_1:d:{now:%Y%m%d}"
+        month_key = f"tenant:creator_1:usage:channel_messages:chan_1:m:{now:%Y%m}"
+        assert await redis.get(day_key) == "1"
+        assert await redis.get(month_key) == "1"
+
+        # Expiry (end of period + retention) is what resets the counts
+        day_ttl = await redis.ttl(day_key)
+        month_ttl = await redis.ttl(month_key)
+        assert 2 * 86400 <= day_ttl <= 3 * 86400
+        assert day_ttl <= month_ttl <= 33 * 86400
+
+    async def test_bucket_rollover(self, counters):
+        day_key, month_key, day_expire, month_expire = counters._bucket_keys(
+            "c", "e", now=datetime(2024, 12, 31, 23, 59, tzinfo=timezone.utc)
+        )
+
+        assert day_key.endswith(":d:20241231") and month_key.endswith(":m:202412")
+        assert day_expire == int(datetime(2025, 1, 3, tzinfo=timezone.utc).timestamp())
+        assert month_expire == day_expire
+
+    async def test_drain_returns_current_counts_once(self, counters):
+        for _ in range(3):
+            await counters.increment("creator_1", "chan_1")
+        await counters.increment("creator_2", "chan_2")
+
+        entries = sorted(await counters.drain_dirty(), key=lambda e: e["entity_id"])
+        assert entries == [
+            {"creator_id": "creator_1", "entity_id": "chan_1", "daily": 3, "monthly": 3},
+            {"creator_id": "creator_2", "entity_id": "chan_2", "daily": 1, "monthly": 1},
+        ]
+        assert await counters.drain_dirty() == []
+
+    async def test_mark_dirty_requeues_failed_flush(self, counters):
+        await counters.increment("creator_1", "chan_1")
+        entries = await counters.drain_dirty(batch_size=10)
+
+        await counters.mark_dirty(entries)
+        assert await counters.drain_dirty() == entries
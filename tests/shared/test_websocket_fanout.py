@@ -0,0 +1,136 @@
+"""
+Tests for cross-worker WebSocket fan-out.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.cache.websocket_fanout import SLOW_CONSUMER_CLOSE_CODE, WebSocketFanout
+
+
+class FakeWebSocket:
+    def __init__(self, delay: float = 0):
+        self.delay = delay
+        self.sent = []
+        self.close_code = None
+
+    async def send_json(self, message):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append(message)
+
+    async def close(self, code=1000):
+        self.close_code = code
+
+
+@pytest.fixture
+async def nodes(redis_client):
+    created = [WebSocketFanout(redis_client, node_id=f"node-{i}", queue_size=3, send_timeout=0.05) for i in range(2)]
+    for node in created:
+        await node.start()
+    yield created
+    for node in created:
+        await node.stop()
+
+
+async def wait_for(predicate, timeout=1.0):
+    deadline = asyncio.get_running_loop().time() + timeout
+    while not predicate():
+        if asyncio.get_running_loop().time() > deadline:
+            raise AssertionError("condition not met in time")
+        await asyncio.sleep(0.01)
+
+
+class TestWebSocketFanout:
+    """Test routing, cross-node delivery and slow-consumer eviction."""
+
+    async def test_local_delivery(self, nodes):
+        node, _ = nodes
+        websocket = FakeWebSocket()
+        await node.connect("s1", websocket)
+
+        assert await node.send("s1", {"type": "message", "content": "hi"})
+        await wait_for(lambda: websocket.sent)
+
+        assert websocket.sent == [{"type": "message", "content": "hi"}]
+        assert await node.get_route("s1") == "node-0"
+
+    async def test_message_reaches_session_on_other_node(self, nodes):
+        node_a, node_b = nodes
+        websocket = FakeWebSocket()
+        await node_b.connect("s1", websocket)
+
+        assert await node_a.send("s1", {"content": "from a"})
+        await wait_for(lambda: websocket.sent)
+
+        assert websocket.sent == [{"content": "from a"}]
+        assert node_a.stats["remote_publishes"] == 1
+
+    async def test_unknown_session_is_undeliverable(self, nodes):
+        node, _ = nodes
+
+        assert not await node.send("missing", {"content": "x"})
+        assert node.stats["undeliverable"] == 1
+
+    async def test_disconnect_keeps_route_taken_over_by_other_node(self, nodes):
+        node_a, node_b = nodes
+        await node_a.connect("s1", FakeWebSocket())
+        await node_b.connect("s1", FakeWebSocket())
+
+        await node_a.disconnect("s1")
+
+        assert await node_a.get_route("s1") == "node-1"
+        await node_b.disconnect("s1")
+        assert await node_a.get_route("s1") is None
+
+    async def test_stale_cleanup_after_reconnect_keeps_new_connection(self, nodes):
+        node, _ = nodes
+        old_socket, new_socket = FakeWebSocket(), FakeWebSocket()
+        old_connection = await node.connect("s1", old_socket)
+        await node.connect("s1", new_socket)
+
+        # The replaced handler's ``finally`` runs after the reconnect
+        await node.disconnect("s1", connection=old_connection)
+
+        assert node.is_local("s1")
+        assert await node.get_route("s1") == "node-0"
+        assert await node.send("s1", {"content": "still here"})
+        await wait_for(lambda: new_socket.sent)
+        assert old_socket.close_code == 1000
+
+    async def test_eviction_of_replaced_connection_keeps_new_connection(self, nodes):
+        node, _ = nodes
+        old_connection = await node.connect("s1", FakeWebSocket())
+        await node.connect("s1", FakeWebSocket())
+
+        old_connection.closed = False
+        node._evict(old_connection)
+        await asyncio.sleep(0.01)
+
+        assert node.is_local("s1")
+        assert await node.get_route("s1") == "node-0"
+
+    async def test_full_queue_evicts_slow_consumer(self, nodes):
+        node, _ = nodes
+        websocket = FakeWebSocket(delay=10)
+        await node.connect("slow", websocket)
+
+        results = [await node.send("slow", {"n": n}) for n in range(5)]
+        await wait_for(lambda: websocket.close_code is not None)
+
+        assert False in results
+        assert websocket.close_code == SLOW_CONSUMER_CLOSE_CODE
+        assert not node.is_local("slow")
+        assert node.stats["evictions"] == 1
+
+    async def test_send_timeout_evicts_stalled_consumer(self, nodes):
+        node, _ = nodes
+        websocket = FakeWebSocket(delay=1)
+        await node.connect("stalled", websocket)
+
+        await node.send("stalled", {"n": 1})
+        await wait_for(lambda: not node.is_local("stalled"))
+
+        assert websocket.close_code == SLOW_CONSUMER_CLOSE_CODE
+        assert await node.get_route("stalled") is None
@@ -0,0 +1,116 @@
+"""
+Tests for per-creator embedding compression settings in the Embedding Manager.
+Covers the memoized compression type, its invalidation and shard-level quantization.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from shared.ai.chromadb_manager import ChromaDBManager
+
+# The service directory is hyphenated; load the module on its own so the rest of
+# the (not importable) ai-engine package stays out of sys.modules
+_spec = importlib.util.spec_from_file_location(
+    "ai_engine_embedding_manager",
+    Path(__file__).resolve().parents[3] / "services" / "ai-engine-service" / "app" / "embedding_manager.py",
+)
+embedding_manager_module = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(embedding_manager_module)
+EmbeddingManager = embedding_manager_module.EmbeddingManager
+
+
+@pytest.fixture
+def chromadb_manager():
+    return ChromaDBManager(backend="local", vector_store_path="", shard_count=5)
+
+
+@pytest.fixture
+def embedding_manager(redis_client, chromadb_manager):
+    manager = EmbeddingManager()
+    manager.cache_manager.redis = redis_client
+    manager.chromadb_manager = chromadb_manager
+    return manager
+
+
+async def _add_vectors(chromadb_manager, creator_id, count=20, dim=8):
+    vectors = np.random.default_rng(0).standard_normal((count, dim)).astype(np.float32)
+    await chromadb_manager.add_embeddings(
+        creator_id=creator_id,
+        document_id="doc_1",
+        embeddings=vectors.tolist(),
+        documents=[f"doc {i}" for i in range(count)],
+        metadatas=[{}] * count
+    )
+
+
+class TestCompressionType:
+    """Test the memoized per-creator compression type."""
+
+    async def test_compression_type_is_reloaded_after_ttl(self, embedding_manager, redis_client):
+        """Test that a compression change made elsewhere is picked up."""
+        await redis_client.set("creator_123", "embedding_compression", {"enabled": True, "type": "int8"})
+
+        assert await embedding_manager._get_compression_type("creator_123") == "int8"
+        await redis_client.delete("creator_123", "embedding_compression")
+        assert await embedding_manager._get_compression_type("creator_123") == "int8"
+
+        embedding_manager.compression_type_ttl = 0
+        assert await embedding_manager._get_compression_type("creator_123") is None
+
+    async def test_invalidate_compression_type(self, embedding_manager, redis_client):
+        """Test dropping the memoized compression type."""
+        await redis_client.set("creator_123", "embedding_compression", {"enabled": True, "type": "float16"})
+        await embedding_manager._get_compression_type("creator_123")
+
+        await redis_client.set("creator_123", "embedding_compression", {"enabled": False, "type": "float16"})
+        embedding_manager.invalidate_compression_type("creator_123")
+
+        assert await embedding_manager._get_compression_type("creator_123") is None
+
+    async def test_enabling_compression_replaces_the_memoized_type(self, embedding_manager, chromadb_manager):
+        """Test that a settings change is seen immediately, not after the TTL."""
+        await _add_vectors(chromadb_manager, "creator_123")
+        assert await embedding_manager._get_compression_type("creator_123") is None
+
+        assert await embedding_manager.enable_embedding_compression("creator_123", "int8")
+
+        assert await embedding_manager._get_compression_type("creator_123") == "int8"
+
+
+class TestShardCompression:
+    """Test that vector store quantization is only applied to shards the creator owns."""
+
+    async def test_own_shard_is_quantized(self, embedding_manager, chromadb_manager):
+        await _add_vectors(chromadb_manager, "creator_a")
+
+        assert await embedding_manager.enable_embedding_compression("creator_a", "int8")
+
+        config = await embedding_manager.get_compression_config("creator_a")
+        assert config["vector_store"]["applied"] is True
+        assert config["vector_store"]["compression_type"] == "int8"
+
+    async def test_shared_shard_is_left_alone(self, embedding_manager, chromadb_manager):
+        # creator_b and creator_c hash to the same shard
+        await _add_vectors(chromadb_manager, "creator_b")
+        await _add_vectors(chromadb_manager, "creator_c")
+
+        assert await embedding_manager.enable_embedding_compression("creator_b", "int8")
+
+        config = await embedding_manager.get_compression_config("creator_b")
+        collection = await chromadb_manager.get_or_create_collection("creator_c")
+        assert config["cache_codec"] == "int8"
+        assert config["vector_store"]["applied"] is False
+        assert "shard_wide" in config["vector_store"]["reason"]
+        assert collection.compression_type is None
+
+    async def test_shared_shard_is_quantized_with_shard_wide(self, embedding_manager, chromadb_manager):
+        await _add_vectors(chromadb_manager, "creator_b")
+        await _add_vectors(chromadb_manager, "creator_c")
+
+        assert await embedding_manager.enable_embedding_compression("creator_b", "int8", shard_wide=True)
+
+        collection = await chromadb_manager.get_or_create_collection("creator_c")
+        assert collection.compression_type == "int8"
@@ -0,0 +1,242 @@
+"""
+Tests for embedding quantization codecs and quantized vector store search.
+Covers float16/int8/PQ round trips, cache payloads, re-ranked recall and persistence.
+"""
+
+import numpy as np
+import pytest
+
+from shared.ai.quantization import (
+    Float16Codec,
+    Int8Codec,
+    ProductQuantizer,
+    benchmark_compression,
+    create_codec,
+    pack_embedding,
+    unpack_embedding,
+)
+from shared.ai.vector_store import LocalVectorStoreClient
+from shared.ai.chromadb_manager import ChromaDBCollectionError, ChromaDBManager
+
+
+def _clustered_vectors(count, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((8, dim)).astype(np.float32)
+    labels = rng.integers(0, 8, count)
+    return centers[labels] + 0.3 * rng.standard_normal((count, dim)).astype(np.float32)
+
+
+def _fill(collection, vectors, creator_id="creator_a"):
+    collection.add(
+        embeddings=vectors.tolist(),
+        documents=[f"doc {i}" for i in range(len(vectors))],
+        metadatas=[{"creator_id": creator_id} for _ in range(len(vectors))],
+        ids=[f"id_{i}" for i in range(len(vectors))]
+    )
+
+
+class TestCodecs:
+    """Test codec round trips and asymmetric distances."""
+
+    def test_float16_round_trip(self):
+        vectors = _clustered_vectors(50)
+        codec = Float16Codec()
+        decoded = codec.decode(codec.encode(vectors))
+        assert np.allclose(decoded, vectors, atol=1e-2)
+
+    def test_int8_dots_match_decoded(self):
+        vectors = _clustered_vectors(50)
+        queries = _clustered_vectors(3, seed=1)
+        codec = Int8Codec()
+        codes = codec.encode(vectors)
+
+        assert codes[0].dtype == np.int8
+        assert np.allclose(codec.dots(queries, codes), queries @ codec.decode(codes).T, atol=1e-3)
+
+    def test_pq_requires_training_and_restores_state(self):
+        vectors = _clustered_vectors(400)
+        codec = ProductQuantizer(subspaces=4, centroids=16, iterations=5)
+        with pytest.raises(ValueError):
+            codec.encode(vectors)
+
+        codec.train(vectors)
+        restored = ProductQuantizer(centroids=16)
+        restored.load_state(codec.state())
+
+        assert codec.encode(vectors)[0].shape == (400, 4)
+        assert np.array_equal(codec.encode(vectors)[0], restored.encode(vectors)[0])
+
+    def test_unknown_codec_rejected(self):
+        with pytest.raises(ValueError):
+            create_codec("bfloat8")
+
+
+class TestCachePayloads:
+    """Test Redis cache embedding payloads."""
+
+    @pytest.mark.parametrize("compression_type", ["float16", "int8", "pq"])
+    def test_pack_unpack(self, compression_type):
+        embedding = _clustered_vectors(1)[0].tolist()
+        payload = pack_embedding(embedding, compression_type)
+
+        assert isinstance(payload, dict)
+        assert np.allclose(unpack_embedding(payload), embedding, atol=0.05)
+
+    def test_uncompressed_and_legacy_payloads_pass_through(self):
+        embedding = [0.1, 0.2, 0.3]
+        assert pack_embedding(embedding, None) == embedding
+        assert unpack_embedding(embedding) == embedding
+        assert unpack_embedding(None) is None
+
+
+class TestQuantizedCollection:
+    """Test quantized search on the local vector store."""
+
+    @pytest.mark.parametrize("compression_type", ["float16", "int8", "pq"])
+    def test_reranked_results_match_exact(self, compression_type):
+        vectors = _clustered_vectors(600)
+        collection = LocalVectorStoreClient().create_collection("knowledge_shard_0")
+        _fill(collection, vectors)
+        queries = vectors[[3, 150, 420]]
+        exact = collection.query(query_embeddings=queries.tolist(), n_results=5)
+
+        options = {"subspaces": 8, "centroids": 32} if compression_type == "pq" else {}
+        stats = collection.enable_quantization(compression_type, rerank_factor=8, **options)
+        approx = collection.query(query_embeddings=queries.tolist(), n_results=5)
+
+        assert stats["compression_type"] == compression_type
+        assert stats["index_bytes"] < stats["full_precision_bytes"]
+        assert [ids[0] for ids in approx["ids"]] == ["id_3", "id_150", "id_420"]
+        hits = sum(len(set(a) & set(e)) for a, e in zip(approx["ids"], exact["ids"]))
+        assert hits / 15 >= 0.8
+
+    def test_appends_after_enable_are_quantized(self):
+        collection = LocalVectorStoreClient().create_collection("knowledge_shard_0")
+        _fill(collection, _clustered_vectors(100))
+        collection.enable_quantization("int8")
+
+        extra = _clustered_vectors(10, seed=7)
+        collection.add(
+            embeddings=extra.tolist(),
+            documents=["extra"] * 10,
+            metadatas=[{"creator_id": "creator_b"}] * 10,
+            ids=[f"extra_{i}" for i in range(10)]
+        )
+
+        assert collection.memory_stats()["vectors"] == 110
+        results = collection.query(query_embeddings=[extra[4].tolist()], n_results=1, where={"creator_id": "creator_b"})
+        assert results["ids"][0] == ["extra_4"]
+
+    def test_pq_codebook_persists(self, tmp_path):
+        vectors = _clustered_vectors(300)
+        client = LocalVectorStoreClient(path=str(tmp_path))
+        collection = client.create_collection("knowledge_shard_1")
+        _fill(collection, vectors)
+        collection.enable_quantization("pq", subspaces=4, centroids=16)
+        client.close()
+
+        reopened = LocalVectorStoreClient(path=str(tmp_path)).get_collection("knowledge_shard_1")
+
+        assert reopened.compression_type == "pq"
+        assert reopened.memory_stats()["index_bytes"] == 300 * 4 + 300 * 4
+        results = reopened.query(query_embeddings=[vectors[77].tolist()], n_results=1)
+        assert results["ids"][0] == ["id_77"]
+
+    def test_disable_restores_exact_search(self):
+        collection = LocalVectorStoreClient().create_collection("knowledge_shard_0")
+        _fill(collection, _clustered_vectors(50))
+        collection.enable_quantization("float16")
+        collection.disable_quantization()
+
+        assert collection.compression_type is None
+        assert collection.memory_stats()["index_reduction"] == 0.0
+
+    def test_resident_bytes_include_float32_copy(self):
+        collection = LocalVectorStoreClient().create_collection("knowledge_shard_0")
+        _fill(collection, _clustered_vectors(100))
+        plain = collection.memory_stats()
+
+        stats = collection.enable_quantization("pq", subspaces=4, centroids=16)
+
+        assert plain["resident_bytes"] == plain["float32_bytes"] >= 100 * 32 * 4
+        assert stats["float32_bytes"] == plain["float32_bytes"]
+        codebook_bytes = 4 * 16 * 8 * 4
+        assert stats["resident_bytes"] == stats["float32_bytes"] + stats["index_bytes"] + codebook_bytes
+        assert stats["resident_bytes"] > plain["resident_bytes"]
+        assert stats["index_reduction"] > 0.5
+        assert stats["mapped_bytes"] == 0
+
+    def test_memory_mapped_vectors_are_not_resident(self, tmp_path):
+        collection = LocalVectorStoreClient(path=str(tmp_path)).create_collection("knowledge_shard_0")
+        _fill(collection, _clustered_vectors(100))
+
+        stats = collection.enable_quantization("int8")
+
+        assert stats["mapped_bytes"] >= 100 * 32 * 4
+        assert stats["resident_bytes"] == stats["float32_bytes"] + stats["index_bytes"]
+        assert stats["float32_bytes"] < stats["mapped_bytes"]
+
+
+class TestCompressionBenchmark:
+    """Test the recall vs. memory benchmark."""
+
+    def test_reports_reduction_and_recall(self):
+        vectors = _clustered_vectors(500)
+        queries = _clustered_vectors(10, seed=3)
+
+        reports = benchmark_compression(
+            vectors, queries, k=5, pq_options={"subspaces": 8, "centroids": 32}
+        )
+
+        by_type = {report["compression_type"]: report for report in reports}
+        assert set(by_type) == {"float16", "int8", "pq"}
+        assert by_type["float16"]["recall_at_k_reranked"] >= 0.99
+        assert by_type["pq"]["reduction"] > by_type["int8"]["reduction"] > by_type["float16"]["reduction"]
+        assert by_type["pq"]["recall_at_k_reranked"] >= by_type["pq"]["recall_at_k"]
+
+
+class TestManagerCompression:
+    """Test compression through ChromaDBManager."""
+
+    async def test_enable_compression_on_local_backend(self):
+        manager = ChromaDBManager(backend="local", vector_store_path="", shard_count=2)
+        vectors = _clustered_vectors(20, dim=8)
+        await manager.add_embeddings(
+            creator_id="creator_a",
+            document_id="doc_1",
+            embeddings=vectors.tolist(),
+            documents=[f"doc {i}" for i in range(20)],
+            metadatas=[{}] * 20
+        )
+
+        stats = await manager.enable_compression("creator_a", "int8")
+        results = await manager.query_embeddings(
+            creator_id="creator_a", query_embeddings=[vectors[5].tolist()], n_results=1
+        )
+
+        assert stats["compression_type"] == "int8"
+        assert stats["vectors"] == 20
+        assert results["documents"][0] == ["doc 5"]
+
+    async def test_shared_shard_requires_shard_wide(self):
+        manager = ChromaDBManager(backend="local", vector_store_path="", shard_count=5)
+        vectors = _clustered_vectors(20, dim=8)
+        # creator_b and creator_c hash to the same shard
+        for creator_id in ("creator_b", "creator_c"):
+            await manager.add_embeddings(
+                creator_id=creator_id,
+                document_id="doc_1",
+                embeddings=vectors.tolist(),
+                documents=[f"doc {i}" for i in range(20)],
+                metadatas=[{}] * 20
+            )
+
+        with pytest.raises(ChromaDBCollectionError, match="shard_wide"):
+            await manager.enable_compression("creator_b", "int8")
+        collection = await manager.get_or_create_collection("creator_b")
+        assert collection.compression_type is None
+
+        stats = await manager.enable_compression("creator_b", "int8", shard_wide=True)
+
+        assert stats["compression_type"] == "int8"
+        assert stats["vectors"] == 40
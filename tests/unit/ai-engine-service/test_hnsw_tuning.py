@@ -0,0 +1,275 @@
+"""
+Tests for HNSW tier selection, tuned shard metadata and shadow rebuild/swap.
+"""
+
+from datetime import timedelta
+from unittest.mock import Mock
+
+import numpy as np
+import pytest
+
+from shared.ai.hnsw_tuning import (
+    HNSWLIB_AVAILABLE,
+    HNSWParams,
+    TIER_METADATA_KEY,
+    candidate_grid,
+    pick_params,
+    select_hnsw_tier,
+    tune_for_sample,
+    benchmark_hnsw_params,
+)
+from shared.ai.chromadb_manager import (
+    ACTIVE_COLLECTION_KEY,
+    SHADOW_COLLECTION_KEY,
+    ChromaDBCollectionError,
+    ChromaDBManager,
+)
+from shared.ai.vector_store import HNSW_METADATA_KEYS, LocalVectorStoreClient
+
+
+async def _zero():
+    return 0
+
+
+def _vectors(count, dim=8, seed=0):
+    return np.random.default_rng(seed).standard_normal((count, dim)).astype(np.float32)
+
+
+async def _add(manager, creator_id, document_id, vectors):
+    await manager.add_embeddings(
+        creator_id=creator_id,
+        document_id=document_id,
+        embeddings=vectors.tolist(),
+        documents=[f"{document_id} {i}" for i in range(len(vectors))],
+        metadatas=[{}] * len(vectors)
+    )
+
+
+class TestTierSelection:
+    """Test size tiers and parameter picking."""
+
+    @pytest.mark.parametrize("size,tier", [(0, "small"), (999, "small"), (1000, "medium"), (50_000, "large"), (10**7, "xlarge")])
+    def test_select_tier(self, size, tier):
+        assert select_hnsw_tier(size).name == tier
+
+    def test_params_metadata_round_trip(self):
+        params = HNSWParams(M=24, construction_ef=300, search_ef=256)
+        assert HNSWParams.from_metadata(params.to_metadata()) == params
+        assert HNSWParams.from_metadata({"hnsw:space": "l2"}) is None
+
+    def test_pick_cheapest_meeting_target(self):
+        reports = [
+            {"M": 32, "construction_ef": 200, "search_ef": 256, "recall_at_k": 0.99, "latency_ms_p95": 0.9},
+            {"M": 16, "construction_ef": 200, "search_ef": 64, "recall_at_k": 0.96, "latency_ms_p95": 0.3},
+            {"M": 8, "construction_ef": 200, "search_ef": 32, "recall_at_k": 0.80, "latency_ms_p95": 0.1},
+        ]
+        assert pick_params(reports, target_recall=0.95).M == 16
+        assert pick_params(reports, target_recall=0.999).M == 32
+
+    def test_small_sample_falls_back_to_tier_defaults(self):
+        tier = select_hnsw_tier(10)
+        params, reports = tune_for_sample(_vectors(10), tier)
+        assert params == tier.params
+        assert reports == []
+
+    @pytest.mark.skipif(not HNSWLIB_AVAILABLE, reason="hnswlib not installed")
+    def test_benchmark_reports_recall_and_latency(self):
+        vectors = _vectors(500, dim=16)
+        reports = benchmark_hnsw_params(vectors[50:], vectors[:50], candidate_grid(select_hnsw_tier(500)), k=5)
+
+        assert len(reports) == len(candidate_grid(select_hnsw_tier(500)))
+        assert max(report["recall_at_k"] for report in reports) >= 0.9
+        assert all(report["latency_ms_p95"] >= report["latency_ms_p50"] for report in reports)
+
+
+class TestShardRebuild:
+    """Test tuned shard creation and shadow rebuilds on the local backend."""
+
+    @pytest.fixture
+    def manager(self, redis_client):
+        return ChromaDBManager(backend="local", vector_store_path="", shard_count=5, redis_client=redis_client)
+
+    @pytest.fixture
+    def other_worker(self, manager, redis_client):
+        """A second worker sharing the vector store and Redis"""
+        worker = ChromaDBManager(backend="local", vector_store_path="", shard_count=5, redis_client=redis_client)
+        worker._client = manager._get_client()
+        return worker
+
+    async def test_new_shard_gets_tier_metadata(self, manager):
+        collection = await manager.get_or_create_collection("creator_a")
+
+        assert collection.metadata[TIER_METADATA_KEY] == "small"
+        assert HNSWParams.from_metadata(collection.metadata) == select_hnsw_tier(0).params
+
+    def test_shard_metadata_uses_only_chroma_hnsw_keys(self, manager):
+        metadata = manager._shard_metadata("knowledge_shard_1", "small", select_hnsw_tier(0).params)
+
+        assert all(key in HNSW_METADATA_KEYS for key in metadata if key.startswith("hnsw:"))
+        with pytest.raises(ValueError, match="hnsw:tier"):
+            LocalVectorStoreClient().create_collection("shard", metadata={"hnsw:tier": "small"})
+
+    def test_alias_update_keeps_the_distance_metric(self):
+        base = Mock(metadata={
+            "hnsw:space": "cosine",
+            **HNSWParams(M=16, construction_ef=200, search_ef=100).to_metadata(),
+            TIER_METADATA_KEY: "small",
+            ACTIVE_COLLECTION_KEY: "shard__g1_abc",
+        })
+
+        ChromaDBManager._update_alias(base, **{SHADOW_COLLECTION_KEY: "shard__g2_def"})
+
+        base.modify.assert_called_once_with(metadata={
+            "hnsw:space": "cosine",
+            TIER_METADATA_KEY: "small",
+            ACTIVE_COLLECTION_KEY: "shard__g1_abc",
+            SHADOW_COLLECTION_KEY: "shard__g2_def",
+        })
+
+    async def test_rebuild_swaps_in_shadow(self, manager):
+        vectors = _vectors(30)
+        await _add(manager, "creator_a", "doc_1", vectors)
+        shard = manager._get_shard_name("creator_a")
+        params = HNSWParams(M=24, construction_ef=300, search_ef=256)
+
+        report = await manager.rebuild_shard(shard, tier="large", params=params)
+        collection = await manager.get_or_create_collection("creator_a")
+        results = await manager.query_embeddings("creator_a", [vectors[7].tolist()], n_results=1)
+
+        assert report["collection"].startswith(f"{shard}__g1_")
+        assert collection.name == report["collection"]
+        assert collection.metadata[TIER_METADATA_KEY] == "large"
+        assert HNSWParams.from_metadata(collection.metadata) == params
+        assert collection.count() == 30
+        assert results["documents"][0] == ["doc_1 7"]
+
+    async def test_previous_generation_retired_on_next_rebuild(self, manager):
+        await _add(manager, "creator_a", "doc_1", _vectors(10))
+        shard = manager._get_shard_name("creator_a")
+        client = manager._get_client()
+
+        first = await manager.rebuild_shard(shard, tier="medium", tune=False)
+        assert client.get_collection(shard).count() == 10  # kept for stale caches
+        manager._cache_ttl = timedelta(0)
+        second = await manager.rebuild_shard(shard, tier="large", tune=False)
+
+        names = {info.name for info in client.list_collections()}
+        assert names == {shard, first["collection"], second["collection"]}  # g1 waits for the next run
+        assert second["collection"].startswith(f"{shard}__g2_")
+        assert client.get_collection(shard).count() == 0
+        assert client.get_collection(shard).metadata[ACTIVE_COLLECTION_KEY] == second["collection"]
+
+    async def test_no_rebuild_while_previous_generation_may_be_cached(self, manager):
+        await _add(manager, "creator_a", "doc_1", _vectors(10))
+        shard = manager._get_shard_name("creator_a")
+        await manager.rebuild_shard(shard, tier="medium", tune=False)
+
+        with pytest.raises(ChromaDBCollectionError, match="still in use"):
+            await manager.rebuild_shard(shard, tier="large", tune=False)
+        assert manager._get_client().get_collection(shard).count() == 10
+
+    async def test_rebuild_needs_the_shard_lease(self, manager, other_worker):
+        await _add(manager, "creator_a", "doc_1", _vectors(5))
+        shard = manager._get_shard_name("creator_a")
+        lease = other_worker._rebuild_lease(shard)
+        assert await lease.acquire()
+
+        with pytest.raises(ChromaDBCollectionError, match="already in progress"):
+            await manager.rebuild_shard(shard, tier="medium", tune=False)
+        results = await manager.maintain_hnsw_tiers()
+        assert results == [{"shard": shard, "skipped": "rebuild in progress elsewhere"}]
+
+        await lease.release()
+        assert (await manager.rebuild_shard(shard, tier="medium", tune=False))["vectors"] == 5
+
+    async def test_abandoned_shadow_is_cleaned_up(self, manager):
+        await _add(manager, "creator_a", "doc_1", _vectors(5))
+        shard = manager._get_shard_name("creator_a")
+        client = manager._get_client()
+        failed_copy = manager._copy_collection
+
+        async def crash(source, target, lease=None):
+            await failed_copy(source, target, lease)
+            raise RuntimeError("worker died")
+
+        manager._copy_collection = crash
+        with pytest.raises(ChromaDBCollectionError):
+            await manager.rebuild_shard(shard, tier="medium", tune=False)
+        manager._copy_collection = failed_copy
+
+        # Simulate a worker that died before it could clean up after itself
+        leftover = client.create_collection(f"{shard}__g1_deadbeef")
+        manager._update_alias(client.get_collection(shard), **{SHADOW_COLLECTION_KEY: leftover.name})
+
+        report = await manager.rebuild_shard(shard, tier="medium", tune=False)
+
+        names = {info.name for info in client.list_collections()}
+        assert names == {shard, report["collection"]}
+        assert SHADOW_COLLECTION_KEY not in client.get_collection(shard).metadata
+
+    async def test_other_workers_writes_reach_the_shadow(self, manager, other_worker):
+        await _add(manager, "creator_a", "doc_1", _vectors(5))
+        await other_worker.get_or_create_collection("creator_a")  # caches the pre-rebuild collection
+        shard = manager._get_shard_name("creator_a")
+        original_copy = manager._copy_collection
+
+        async def copy_then_write_elsewhere(source, target, lease=None):
+            copied = await original_copy(source, target, lease)
+            await _add(other_worker, "creator_a", "doc_2", _vectors(3, seed=1))
+            await other_worker.delete_document_embeddings("creator_a", "doc_1")
+            return copied
+
+        manager._copy_collection = copy_then_write_elsewhere
+        # Without reconciliation only the alias-routed writes can keep the shadow in sync
+        manager._reconcile_collections = lambda source, target: _zero()
+        await manager.rebuild_shard(shard, tier="medium", tune=False)
+
+        collection = await manager.get_or_create_collection("creator_a")
+        documents = collection.get(include=["documents"])["documents"]
+        assert sorted(documents) == ["doc_2 0", "doc_2 1", "doc_2 2"]
+
+    async def test_stale_alias_cache_writes_to_the_new_generation(self, manager, other_worker):
+        await _add(manager, "creator_a", "doc_1", _vectors(5))
+        stale = await other_worker.get_or_create_collection("creator_a")
+        shard = manager._get_shard_name("creator_a")
+
+        report = await manager.rebuild_shard(shard, tier="medium", tune=False)
+        await _add(other_worker, "creator_a", "doc_2", _vectors(3, seed=1))
+
+        client = manager._get_client()
+        assert stale.name == shard
+        assert client.get_collection(report["collection"]).count() == 8
+        assert (await other_worker.get_or_create_collection("creator_a")).name == report["collection"]
+
+    async def test_writes_during_rebuild_are_mirrored(self, manager):
+        await _add(manager, "creator_a", "doc_1", _vectors(5))
+        shard = manager._get_shard_name("creator_a")
+        original_copy = manager._copy_collection
+
+        async def copy_then_write(source, target, lease=None):
+            copied = await original_copy(source, target, lease)
+            await _add(manager, "creator_a", "doc_2", _vectors(3, seed=1))
+            await manager.delete_document_embeddings("creator_a", "doc_1")
+            return copied
+
+        manager._copy_collection = copy_then_write
+        await manager.rebuild_shard(shard, tier="medium", tune=False)
+
+        collection = await manager.get_or_create_collection("creator_a")
+        documents = collection.get(include=["documents"])["documents"]
+        assert sorted(documents) == ["doc_2 0", "doc_2 1", "doc_2 2"]
+
+    async def test_maintenance_rebuilds_only_shards_that_changed_tier(self, manager):
+        await _add(manager, "creator_a", "doc_1", _vectors(1200))
+        await _add(manager, "creator_b", "doc_1", _vectors(5))
+
+        results = await manager.maintain_hnsw_tiers()
+
+        by_shard = {entry["shard"]: entry for entry in results}
+        big = by_shard[manager._get_shard_name("creator_a")]
+        assert big["target_tier"] == "medium"
+        assert big["rebuild"]["vectors"] == 1200
+        if manager._get_shard_name("creator_b") != manager._get_shard_name("creator_a"):
+            assert "rebuild" not in by_shard[manager._get_shard_name("creator_b")]
+        second = await manager.maintain_hnsw_tiers()
+        assert not any("rebuild" in entry for entry in second)
@@ -0,0 +1,195 @@
+"""
+Tests for the embedded NumPy vector store backend.
+Covers exact top-k search, metadata filtering, persistence and manager integration.
+"""
+
+import numpy as np
+import pytest
+
+from shared.ai.vector_store import LocalVectorStoreClient, VectorStoreClient
+from shared.ai.chromadb_manager import ChromaDBManager
+
+
+def _random_vectors(count, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    return rng.standard_normal((count, dim)).astype(np.float32)
+
+
+class TestLocalVectorCollection:
+    """Test local collection search and filtering."""
+
+    @pytest.fixture
+    def collection(self):
+        client = LocalVectorStoreClient()
+        return client.create_collection("knowledge_shard_0")
+
+    def test_client_implements_contract(self):
+        assert isinstance(LocalVectorStoreClient(), VectorStoreClient)
+
+    def test_exact_top_k_matches_brute_force(self, collection):
+        vectors = _random_vectors(500)
+        collection.add(
+            embeddings=vectors.tolist(),
+            documents=[f"doc {i}" for i in range(500)],
+            metadatas=[{"creator_id": "creator_a"} for _ in range(500)],
+            ids=[f"id_{i}" for i in range(500)]
+        )
+        query = _random_vectors(1, seed=42)
+
+        results = collection.query(
+            query_embeddings=query.tolist(),
+            n_results=5,
+            where={"creator_id": {"$eq": "creator_a"}},
+            include=["documents", "distances"]
+        )
+
+        expected = np.argsort(((vectors - query) ** 2).sum(axis=1))[:5]
+        assert results["ids"][0] == [f"id_{i}" for i in expected]
+        assert results["documents"][0] == [f"doc {i}" for i in expected]
+        assert results["distances"][0] == sorted(results["distances"][0])
+
+    def test_creator_partition_isolation(self, collection):
+        vectors = _random_vectors(20)
+        collection.add(
+            embeddings=vectors.tolist(),
+            documents=[f"doc {i}" for i in range(20)],
+            metadatas=[{"creator_id": "creator_a" if i < 10 else "creator_b"} for i in range(20)],
+            ids=[f"id_{i}" for i in range(20)]
+        )
+
+        results = collection.query(
+            query_embeddings=[vectors[15].tolist()],
+            n_results=20,
+            where={"$and": [{"creator_id": {"$eq": "creator_a"}}]}
+        )
+
+        assert len(results["ids"][0]) == 10
+        assert all(int(i.split("_")[1]) < 10 for i in results["ids"][0])
+
+    def test_metadata_filters(self, collection):
+        vectors = _random_vectors(30)
+        collection.add(
+            embeddings=vectors.tolist(),
+            documents=[f"doc {i}" for i in range(30)],
+            metadatas=[
+                {"creator_id": "creator_a", "document_id": f"d{i % 3}", "page": i}
+                for i in range(30)
+            ],
+            ids=[f"id_{i}" for i in range(30)]
+        )
+
+        results = collection.get(
+            where={"$and": [
+                {"creator_id": {"$eq": "creator_a"}},
+                {"document_id": {"$in": ["d0", "d1"]}},
+                {"page": {"$gte": 20}}
+            ]},
+            include=["metadatas"]
+        )
+
+        assert results["ids"]
+        assert all(m["document_id"] in ("d0", "d1") and m["page"] >= 20 for m in results["metadatas"])
+
+    def test_append_extends_cached_masks(self, collection):
+        collection.add(
+            embeddings=_random_vectors(5).tolist(),
+            documents=["a"] * 5,
+            metadatas=[{"creator_id": "c", "document_id": "d1"}] * 5,
+            ids=[f"first_{i}" for i in range(5)]
+        )
+        assert len(collection.get(where={"document_id": "d1"})["ids"]) == 5
+
+        collection.add(
+            embeddings=_random_vectors(5, seed=1).tolist(),
+            documents=["b"] * 5,
+            metadatas=[{"creator_id": "c", "document_id": "d1"}] * 5,
+            ids=[f"second_{i}" for i in range(5)]
+        )
+
+        assert len(collection.get(where={"document_id": "d1"})["ids"]) == 10
+
+    def test_delete_compacts_segment(self, collection):
+        vectors = _random_vectors(10)
+        collection.add(
+            embeddings=vectors.tolist(),
+            documents=[f"doc {i}" for i in range(10)],
+            metadatas=[{"creator_id": "c", "document_id": f"d{i % 2}"} for i in range(10)],
+            ids=[f"id_{i}" for i in range(10)]
+        )
+
+        collection.delete(where={"$and": [{"creator_id": {"$eq": "c"}}, {"document_id": {"$eq": "d0"}}]})
+
+        assert collection.count() == 5
+        results = collection.query(query_embeddings=[vectors[1].tolist()], n_results=1)
+        assert results["ids"][0] == ["id_1"]
+
+    def test_dimension_mismatch_rejected(self, collection):
+        collection.add(
+            embeddings=_random_vectors(2, dim=8).tolist(),
+            documents=["a", "b"],
+            metadatas=[{"creator_id": "c"}] * 2,
+            ids=["a", "b"]
+        )
+        with pytest.raises(ValueError):
+            collection.add(
+                embeddings=_random_vectors(1, dim=4).tolist(),
+                documents=["c"],
+                metadatas=[{"creator_id": "c"}],
+                ids=["c"]
+            )
+
+
+class TestLocalVectorPersistence:
+    """Test memory-mapped persistence."""
+
+    def test_reopen_after_growth(self, tmp_path):
+        vectors = _random_vectors(600)
+        client = LocalVectorStoreClient(path=str(tmp_path))
+        collection = client.create_collection("knowledge_shard_1", metadata={"hnsw:space": "cosine"})
+        for start in range(0, 600, 200):
+            collection.add(
+                embeddings=vectors[start:start + 200].tolist(),
+                documents=[f"doc {i}" for i in range(start, start + 200)],
+                metadatas=[{"creator_id": "creator_a"} for _ in range(200)],
+                ids=[f"id_{i}" for i in range(start, start + 200)]
+            )
+        client.close()
+
+        reopened = LocalVectorStoreClient(path=str(tmp_path)).get_collection("knowledge_shard_1")
+
+        assert reopened.count() == 600
+        assert reopened.space == "cosine"
+        results = reopened.query(query_embeddings=[vectors[321].tolist()], n_results=1)
+        assert results["ids"][0] == ["id_321"]
+        assert results["distances"][0][0] == pytest.approx(0.0, abs=1e-5)
+
+
+class TestChromaDBManagerLocalBackend:
+    """Test ChromaDBManager running on the local backend."""
+
+    async def test_add_and_query_embeddings(self):
+        manager = ChromaDBManager(backend="local", vector_store_path="", shard_count=5)
+        vectors = _random_vectors(3, dim=8)
+
+        await manager.add_embeddings(
+            creator_id="creator_a",
+            document_id="doc_1",
+            embeddings=vectors.tolist(),
+            documents=["one", "two", "three"],
+            metadatas=[{"source": "test"}] * 3
+        )
+        results = await manager.query_embeddings(
+            creator_id="creator_a",
+            query_embeddings=[vectors[2].tolist()],
+            n_results=1
+        )
+        deleted = await manager.delete_document_embeddings("creator_a", "doc_1")
+        health = await manager.health_check()
+
+        assert results["documents"][0] == ["three"]
+        assert deleted == 3
+        assert health["backend"] == "local"
+
+    def test_invalid_backend_rejected(self):
+        with pytest.raises(ValueError):
+            ChromaDBManager(backend="faiss")
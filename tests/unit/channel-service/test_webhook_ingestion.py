@@ -0,0 +1,241 @@
+"""
+Tests for webhook ingestion: verification, ack-then-queue endpoints and
+deduplicated background processing.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from httpx import ASGITransport, AsyncClient
+
+from shared.cache.deduplication import MessageDeduplicator
+from shared.cache.message_queue import MessageQueue
+from services.channel_service.app import webhook_processor
+from services.channel_service.app.channels.telegram import TelegramService
+from services.channel_service.app.channels.whatsapp import WhatsAppService
+
+
+WHATSAPP_MESSAGE = {
+    "entry": [{"changes": [{"value": {
+        "messages": [{"id": "wamid.1", "from": "15550001", "type": "text", "text": {"body": "hi"}}]
+    }}]}]
+}
+WHATSAPP_STATUS = {
+    "entry": [{"changes": [{"value": {
+        "statuses": [{"id": "wamid.1", "status": "delivered", "recipient_id": "15550001"}]
+    }}]}]
+}
+TELEGRAM_UPDATE = {
+    "update_id": 42,
+    "message": {"message_id": 7, "from": {"id": 1001}, "chat": {"id": 2002}, "text": "hi"}
+}
+
+
+@pytest.fixture
+def queue(redis_client):
+    queue = MessageQueue(redis_client)
+    with patch.object(webhook_processor, "get_message_queue", return_value=queue):
+        yield queue
+
+
+@pytest.fixture
+def deduplicator(redis_client):
+    deduplicator = MessageDeduplicator(redis_client, namespace="webhook")
+    with patch.object(webhook_processor, "get_webhook_deduplicator", return_value=deduplicator):
+        yield deduplicator
+
+
+def telegram_service(webhook_secret=None, secret_token=None):
+    configuration = {"bot_username": "coach_bot"}
+    if secret_token:
+        configuration["webhook_secret_token"] = secret_token
+    channel_config = SimpleNamespace(
+        id="channel-1",
+        creator_id="creator-1",
+        api_token="123:abc",
+        webhook_secret=webhook_secret,
+        configuration=configuration
+    )
+    return TelegramService(channel_config, db_session=None)
+
+
+class TestWebhookEventKeys:
+    """Test how raw provider events are identified before processing."""
+
+    def test_whatsapp_message(self):
+        assert WhatsAppService.webhook_event_keys(WHATSAPP_MESSAGE) == ("wamid.1", "15550001")
+
+    def test_whatsapp_status_transitions_are_distinct(self):
+        assert WhatsAppService.webhook_event_keys(WHATSAPP_STATUS) == ("wamid.1:delivered", "15550001")
+
+    def test_whatsapp_unknown_payload(self):
+        assert WhatsAppService.webhook_event_keys({"object": "whatsapp_business_account"}) == (None, None)
+
+    def test_telegram_update(self):
+        assert TelegramService.webhook_event_keys(TELEGRAM_UPDATE) == ("42", "1001")
+
+    def test_telegram_falls_back_to_chat(self):
+        update = {"update_id": 43, "edited_message": {"chat": {"id": 2002}}}
+        assert TelegramService.webhook_event_keys(update) == ("43", "2002")
+
+
+class TestTelegramSecretToken:
+    """Telegram echoes the setWebhook secret_token instead of signing the body."""
+
+    def test_matching_header_is_accepted(self):
+        service = telegram_service(webhook_secret="s3cret")
+        assert service.validate_webhook_signature("{}", "s3cret", "s3cret")
+
+    def test_wrong_or_missing_header_is_rejected(self):
+        service = telegram_service(webhook_secret="s3cret")
+        assert not service.validate_webhook_signature("{}", "guess", "s3cret")
+        assert not service.validate_webhook_signature("{}", None, "s3cret")
+
+    def test_configured_secret_token_takes_precedence(self):
+        service = telegram_service(webhook_secret="s3cret", secret_token="bot-token")
+        assert service.webhook_secret_token == "bot-token"
+        assert service.validate_webhook_signature("{}", "bot-token", "s3cret")
+        assert not service.validate_webhook_signature("{}", "s3cret", "s3cret")
+
+
+class TestEnqueueWebhook:
+    """Test queueing verified webhook events."""
+
+    async def test_event_is_queued_with_its_keys(self, queue):
+        entry_id = await webhook_processor.enqueue_webhook(
+            "whatsapp", WhatsAppService, "channel-1", "creator-1", WHATSAPP_MESSAGE
+        )
+
+        client = await queue.redis.get_client()
+        [(stream_id, fields)] = await client.xrange(queue._get_lane_streams("system", "webhooks")["high"])
+        assert stream_id == entry_id
+        message = queue._parse_message(stream_id, fields)
+        assert message["type"] == "whatsapp_webhook"
+        assert message["data"]["external_message_id"] == "wamid.1"
+        assert message["data"]["user_identifier"] == "15550001"
+        assert message["data"]["payload"] == WHATSAPP_MESSAGE
+        assert webhook_processor.webhook_ordering_key(message) == "channel-1:15550001"
+
+    def test_events_without_user_share_the_channel_lane(self):
+        message = {"data": {"channel_id": "channel-1", "user_identifier": None}}
+        assert webhook_processor.webhook_ordering_key(message) == "channel-1:"
+
+
+class TestProcessWebhookEvent:
+    """Test deduplicated processing of queued events."""
+
+    @pytest.fixture
+    def channel_manager(self):
+        manager = AsyncMock()
+        manager.process_webhook.return_value = {"requires_ai_processing": False}
+        session = AsyncMock()
+        session.__aenter__.return_value = session
+        with patch.object(webhook_processor, "async_session", return_value=session), \
+                patch.object(webhook_processor, "set_tenant_context", AsyncMock()), \
+                patch.object(webhook_processor, "ChannelManager", return_value=manager):
+            yield manager
+
+    @staticmethod
+    def message(external_message_id="42"):
+        return {"data": {
+            "channel_type": "telegram",
+            "channel_id": "channel-1",
+            "creator_id": "creator-1",
+            "external_message_id": external_message_id,
+            "user_identifier": "1001",
+            "payload": TELEGRAM_UPDATE
+        }}
+
+    async def test_redelivered_event_is_processed_once(self, deduplicator, channel_manager):
+        assert await webhook_processor.process_webhook_event(self.message())
+        assert await webhook_processor.process_webhook_event(self.message())
+
+        channel_manager.process_webhook.assert_awaited_once_with("channel-1", "creator-1", TELEGRAM_UPDATE)
+
+    async def test_failed_event_releases_its_claim(self, deduplicator, channel_manager):
+        channel_manager.process_webhook.side_effect = [RuntimeError("database down"), {}]
+
+        with pytest.raises(RuntimeError):
+            await webhook_processor.process_webhook_event(self.message())
+        assert await webhook_processor.process_webhook_event(self.message())
+
+        assert channel_manager.process_webhook.await_count == 2
+
+    async def test_events_without_id_are_not_deduplicated(self, deduplicator, channel_manager):
+        await webhook_processor.process_webhook_event(self.message(external_message_id=None))
+        await webhook_processor.process_webhook_event(self.message(external_message_id=None))
+
+        assert channel_manager.process_webhook.await_count == 2
+
+
+class TestWebhookEndpoints:
+    """Test that webhook endpoints acknowledge once the event is queued."""
+
+    @pytest.fixture
+    def app(self):
+        from services.channel_service.app import main
+
+        manager = AsyncMock()
+        manager.verify_webhook.return_value = True
+        main.app.dependency_overrides[main.get_channel_manager] = lambda: manager
+        with patch.object(main, "enqueue_webhook", AsyncMock(return_value="1-0")) as enqueue:
+            yield SimpleNamespace(app=main.app, manager=manager, enqueue=enqueue)
+        main.app.dependency_overrides.clear()
+
+    @pytest.fixture
+    async def client(self, app):
+        async with AsyncClient(transport=ASGITransport(app=app.app), base_url="http://test") as client:
+            yield client
+
+    async def test_telegram_update_is_queued(self, app, client):
+        response = await client.post(
+            "/api/v1/webhooks/telegram/channel-1?creator_id=creator-1",
+            json=TELEGRAM_UPDATE,
+            headers={"X-Telegram-Bot-Api-Secret-Token": "s3cret"}
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert app.manager.verify_webhook.await_args.args[3] == "s3cret"
+        app.enqueue.assert_awaited_once_with(
+            "telegram", TelegramService, "channel-1", "creator-1", TELEGRAM_UPDATE
+        )
+
+    async def test_whatsapp_event_is_queued(self, app, client):
+        response = await client.post(
+            "/api/v1/webhooks/whatsapp/channel-1?creator_id=creator-1",
+            json=WHATSAPP_MESSAGE,
+            headers={"X-Hub-Signature-256": "sha256=abc"}
+        )
+
+        assert response.status_code == 200
+        assert app.manager.verify_webhook.await_args.args[3] == "sha256=abc"
+        app.enqueue.assert_awaited_once()
+
+    async def test_rejected_webhook_is_not_queued(self, app, client):
+        app.manager.verify_webhook.return_value = False
+
+        response = await client.post(
+            "/api/v1/webhooks/telegram/channel-1?creator_id=creator-1", json=TELEGRAM_UPDATE
+        )
+
+        assert response.status_code == 401
+        app.enqueue.assert_not_awaited()
+
+    async def test_invalid_payload_is_rejected(self, app, client):
+        response = await client.post(
+            "/api/v1/webhooks/telegram/channel-1?creator_id=creator-1", content=b"not json"
+        )
+
+        assert response.status_code == 400
+        app.enqueue.assert_not_awaited()
+
+    async def test_unqueued_event_is_not_acknowledged(self, app, client):
+        app.enqueue.return_value = None
+
+        response = await client.post(
+            "/api/v1/webhooks/whatsapp/channel-1?creator_id=creator-1", json=WHATSAPP_MESSAGE
+        )
+
+        assert response.status_code == 503
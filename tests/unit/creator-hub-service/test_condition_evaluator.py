@@ -0,0 +1,386 @@
+"""
+Tests for condition evaluation: compiled conditions against the parse-tree
+interpreter they replaced, result caching, and batch (columnar) evaluation
+against the per-user path.
+"""
+
+import pytest
+
+from services.creator_hub_service.app.condition_evaluator import (
+    BuiltinFunction,
+    ConditionContext,
+    ConditionEvaluationResult,
+    ConditionEvaluator,
+    ConditionResultCache,
+)
+from services.creator_hub_service.app.program_engine import ExecutionContext
+from services.creator_hub_service.app.step_models import ConditionalConfig
+
+
+def make_context(user_variables=None, variables=None, step_results=None):
+    return ConditionContext(
+        execution_context=ExecutionContext(
+            program_id="program-1",
+            user_id="user-1",
+            creator_id="creator-1",
+            execution_id="execution-1",
+            variables=dict(variables or {})
+        ),
+        program=None,
+        step_results=step_results or {},
+        user_variables=dict(user_variables or {}),
+        system_variables={},
+        time_context={}
+    )
+
+
+@pytest.fixture
+def evaluator():
+    return ConditionEvaluator()
+
+
+async def interpret(evaluator, parsed, context):
+    """Reference results: walk the parse tree, as conditions were evaluated before compilation"""
+    expr_type = parsed.get("type")
+    if expr_type == "literal":
+        return parsed["value"]
+    if expr_type == "variable":
+        return context.get_variable(parsed["name"])
+    if expr_type == "function":
+        func_impl = (
+            evaluator.parser.functions.get(parsed["function"])
+            or evaluator.custom_functions.get(parsed["function"])
+        )
+        if not func_impl:
+            raise ValueError(f"Unknown function: {parsed['function']}")
+        args = [await interpret(evaluator, arg, context) for arg in parsed["args"]]
+        return await func_impl.execute(args, context)
+    if expr_type == "comparison":
+        operator = evaluator.parser.operators.get(parsed["operator"])
+        if not operator:
+            raise ValueError(f"Unknown operator: {parsed['operator']}")
+        left = await interpret(evaluator, parsed["left"], context)
+        right = await interpret(evaluator, parsed["right"], context)
+        return operator.evaluate(left, right, context)
+    if expr_type == "logical":
+        left = await interpret(evaluator, parsed["left"], context)
+        if parsed["operator"] == "AND":
+            if not left:
+                return False
+            return bool(left) and bool(await interpret(evaluator, parsed["right"], context))
+        if parsed["operator"] == "OR":
+            if left:
+                return True
+            return bool(left) or bool(await interpret(evaluator, parsed["right"], context))
+        raise ValueError(f"Unknown logical operator: {parsed['operator']}")
+    raise ValueError(f"Unknown expression type: {expr_type}")
+
+
+async def outcome(evaluate):
+    """Value of an evaluation, or the type of the error it raised"""
+    try:
+        return await evaluate
+    except Exception as e:
+        return type(e)
+
+
+class StreakFunction(BuiltinFunction):
+    """Async custom function standing in for a lookup in another service"""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def execute(self, args, context):
+        self.calls += 1
+        return context.get_variable("streak") or 0
+
+    def get_function_name(self):
+        return "STREAK"
+
+    def get_arg_count(self):
+        return 0
+
+
+async def per_row(evaluator, expression, table, base_context):
+    """Reference results: the compiled condition evaluated one user at a time"""
+    compiled = evaluator.compile(expression)
+    size = len(next(iter(table.values())))
+    results = []
+    for row in range(size):
+        context = make_context(
+            {**base_context.user_variables, **{name: column[row] for name, column in table.items()}},
+            base_context.execution_context.variables
+        )
+        try:
+            results.append(bool(await compiled.evaluate(context)))
+        except Exception:
+            results.append(False)
+    return results
+
+
+TABLE = {
+    "score": [0.2, 0.9, 0.5, 0.7],
+    "days": [3, 10, 30, 8],
+    "plan": ["free", "pro", "enterprise", None],
+    "tags": [[1, 2], [3], [], [1, 2]],
+    "traits": ["visual", "auditory", "visual kinesthetic", "reading"],
+    "label": ["10", "abc", None, "7.5"],
+}
+
+
+USER_VARIABLES = {
+    "score": 0.7,
+    "days": 10,
+    "plan": "pro",
+    "tags": ["a", "b", "c"],
+    "lessons": [1, 2, 3],
+    "traits": "visual kinesthetic",
+    "label": "abc",
+    "streak": 4,
+}
+STEP_RESULTS = {"intro": {"success": True, "engagement_score": 0.9}}
+
+
+class TestCompiledCondition:
+    """Compiled conditions must evaluate exactly like the parse-tree interpreter."""
+
+    @pytest.fixture
+    def evaluator(self):
+        evaluator = ConditionEvaluator()
+        evaluator.register_custom_function(StreakFunction())
+        return evaluator
+
+    @pytest.mark.parametrize("expression", [
+        # Function calls mixed with groups
+        "COUNT(tags) >= 2",
+        "(COUNT(tags) >= 2) AND score > 0.5",
+        "score > 0.9 OR (COUNT(lessons) == 3 AND days > 7)",
+        "(SUM(lessons) > 5 OR days < 3) AND (AVG(lessons) == 2)",
+        "COUNT(tags) > 5 OR (plan == 'pro' AND COUNT(lessons) > 1)",
+        "GET_STEP_RESULT('intro', 'engagement_score') > 0.5",
+        "STREAK() >= 3 AND (COUNT(tags) == 3)",
+        "(STREAK() > 10) OR score >= 0.7",
+        # IN lists
+        "plan IN ['pro', 'enterprise']",
+        "days IN [1, 2, 3]",
+        "(plan IN ['free']) OR days IN [10, 30]",
+        # CONTAINS
+        "tags CONTAINS 'b'",
+        "traits CONTAINS 'visual' AND score >= 0.5",
+        "label CONTAINS 'z' OR (COUNT(tags) < 1)",
+        # Plain comparisons and chains
+        "score < 0.5 AND days > 7",
+        "plan != 'free' AND days >= 10 AND score <= 0.7",
+        "missing == 1 OR days < 5",
+        "true",
+        # Errors
+        "UNKNOWN_FN(tags) > 1",
+        "COUNT(tags, lessons) > 1",
+        "label > 5",
+        "(label > 5) AND score > 0.5",
+        "score > 0.9 AND label > 5",
+        "score > 0.5 OR label > 5",
+    ])
+    async def test_matches_interpreter(self, evaluator, expression):
+        context = make_context(USER_VARIABLES, step_results=STEP_RESULTS)
+        parsed = evaluator.parser.parse_expression(expression)
+
+        expected = await outcome(interpret(evaluator, parsed, context))
+        actual = await outcome(evaluator.compile(expression).evaluate(context))
+
+        assert actual == expected
+
+    @pytest.mark.parametrize("expression, calls", [
+        ("score > 0.9 AND STREAK() > 1", 0),
+        ("score > 0.5 OR STREAK() > 1", 0),
+        ("score > 0.5 AND STREAK() > 1", 1),
+        ("(STREAK() > 1) OR (STREAK() > 2)", 1),
+    ])
+    async def test_short_circuits_like_interpreter(self, evaluator, expression, calls):
+        context = make_context(USER_VARIABLES)
+        streak = evaluator.custom_functions["STREAK"]
+
+        await evaluator.compile(expression).evaluate(context)
+        assert streak.calls == calls
+
+        await interpret(evaluator, evaluator.parser.parse_expression(expression), context)
+        assert streak.calls == 2 * calls
+
+    async def test_function_calls_are_not_groups(self, evaluator):
+        parsed = evaluator.compile("(COUNT(tags) >= 2) AND score > 0.5").parsed
+
+        assert parsed["type"] == "logical"
+        assert parsed["left"]["left"] == {
+            "type": "function", "function": "COUNT", "args": [{"type": "variable", "name": "tags"}]
+        }
+
+    async def test_only_async_functions_make_the_condition_async(self, evaluator):
+        assert not evaluator.compile("COUNT(tags) >= 2 AND plan IN ['pro']").is_async
+        assert evaluator.compile("COUNT(tags) >= 2 AND STREAK() > 1").is_async
+
+    async def test_unknown_operator_fails_to_compile(self, evaluator):
+        with pytest.raises(ValueError):
+            evaluator.compiler._compile_node(
+                {"type": "comparison", "operator": "~", "left": {}, "right": {}}, set(), set()
+            )
+
+    async def test_evaluation_errors_evaluate_to_false(self, evaluator):
+        result = await evaluator.evaluate_condition(
+            ConditionalConfig(condition_expression="UNKNOWN_FN(tags) > 1"),
+            make_context(USER_VARIABLES)
+        )
+
+        assert result.result is False
+        assert result.confidence == 0.0
+        assert "Unknown function" in result.explanation
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestConditionResultCache:
+    """Test expiry, eviction and keys of cached condition results."""
+
+    def test_entries_expire_after_their_ttl(self):
+        clock = FakeClock()
+        cache = ConditionResultCache(clock=clock)
+        result = ConditionEvaluationResult(result=True)
+        cache.put("short", result, ttl_seconds=10)
+        cache.put("long", result, ttl_seconds=60)
+
+        clock.now += 9.9
+        assert cache.get("short") is result
+
+        clock.now += 0.1
+        assert cache.get("short") is None
+        assert cache.get("long") is result
+        assert len(cache) == 1
+        assert cache.stats["expired"] == 1
+
+    def test_zero_ttl_is_not_cached(self):
+        cache = ConditionResultCache()
+        cache.put("key", ConditionEvaluationResult(result=True), ttl_seconds=0)
+
+        assert len(cache) == 0
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ConditionResultCache(max_size=3)
+        results = {key: ConditionEvaluationResult(result=True) for key in "abcd"}
+        for key in "abc":
+            cache.put(key, results[key], ttl_seconds=60)
+
+        cache.get("a")
+        cache.put("d", results["d"], ttl_seconds=60)
+
+        assert cache.get("b") is None
+        assert [cache.get(key) for key in "acd"] == [results[key] for key in "acd"]
+        assert cache.stats["evictions"] == 1
+
+    def test_rewriting_an_entry_refreshes_it(self):
+        cache = ConditionResultCache(max_size=2)
+        cache.put("a", ConditionEvaluationResult(result=True), ttl_seconds=60)
+        cache.put("b", ConditionEvaluationResult(result=True), ttl_seconds=60)
+
+        cache.put("a", ConditionEvaluationResult(result=False), ttl_seconds=60)
+        cache.put("c", ConditionEvaluationResult(result=True), ttl_seconds=60)
+
+        assert cache.get("b") is None
+        assert cache.get("a").result is False
+
+    def test_key_depends_only_on_variables_read(self, evaluator):
+        compiled = evaluator.compile("score > 0.5 AND plan == 'pro'")
+        key = evaluator._get_cache_key(compiled, make_context({"score": 0.7, "plan": "pro", "days": 1}))
+
+        assert key == evaluator._get_cache_key(
+            compiled, make_context({"days": 99, "plan": "pro", "score": 0.7})
+        )
+        assert key != evaluator._get_cache_key(
+            compiled, make_context({"score": 0.8, "plan": "pro", "days": 1})
+        )
+
+    def test_key_is_stable_across_evaluators(self, evaluator):
+        context = make_context({"score": 0.7, "tags": ["a"]})
+        other = ConditionEvaluator()
+
+        assert evaluator._get_cache_key(evaluator.compile("score > 0.5"), context) == \
+            other._get_cache_key(other.compile("score > 0.5"), context)
+        assert evaluator._get_cache_key(evaluator.compile("score > 0.5"), context) != \
+            evaluator._get_cache_key(evaluator.compile("score > 0.6"), context)
+
+    def test_key_covers_step_results_only_when_read(self, evaluator):
+        compiled = evaluator.compile("GET_STEP_RESULT('intro', 'success') == true")
+        plain = evaluator.compile("score > 0.5")
+        before = make_context({"score": 0.7}, step_results={"intro": {"success": True}})
+        after = make_context({"score": 0.7}, step_results={"intro": {"success": False}})
+
+        assert evaluator._get_cache_key(compiled, before) != evaluator._get_cache_key(compiled, after)
+        assert evaluator._get_cache_key(plain, before) == evaluator._get_cache_key(plain, after)
+
+    async def test_cache_hit_returns_a_copy(self, evaluator):
+        config = ConditionalConfig(condition_expression="score > 0.5")
+        context = make_context({"score": 0.7})
+
+        first = await evaluator.evaluate_condition(config, context)
+        second = await evaluator.evaluate_condition(config, context)
+        third = await evaluator.evaluate_condition(config, context)
+
+        assert not first.cached
+        assert second.cached and third.cached
+        assert second is not first and third is not second
+        assert second.result is True
+        assert evaluator.cache.get(evaluator._get_cache_key(evaluator.compile("score > 0.5"), context)) is first
+        assert not first.cached
+
+
+class TestBatchCondition:
+    """Batch evaluation must match evaluating each row on its own."""
+
+    @pytest.mark.parametrize("expression", [
+        "score < 0.5 AND days > 7",
+        "(plan == 'pro' OR plan == 'enterprise') AND days IN [10, 30]",
+        "plan != 'free'",
+        "tags == other",
+        "tags != other",
+        "other == tags",
+        "tags == pair",
+        "label > 5",
+        "COUNT(tags) >= 2 OR score > 0.8",
+        "traits CONTAINS 'visual' AND score >= 0.5",
+        "plan IN ['pro', 'enterprise']",
+        "missing == 1 OR days < 5",
+    ])
+    async def test_matches_per_row_evaluation(self, evaluator, expression):
+        base_context = make_context({"other": [1, 2]}, {"pair": (1, 2)})
+
+        batch = await evaluator.evaluate_batch(expression, TABLE, base_context)
+
+        assert batch.tolist() == await per_row(evaluator, expression, TABLE, base_context)
+
+    async def test_list_operands_are_compared_whole(self, evaluator):
+        base_context = make_context({"other": [1, 2]})
+        table = {"tags": [[1, 2], [3]]}
+
+        assert (await evaluator.evaluate_batch("tags == other", table, base_context)).tolist() == [True, False]
+        assert (await evaluator.evaluate_batch("tags != other", table, base_context)).tolist() == [False, True]
+
+    async def test_list_operand_against_numeric_column(self, evaluator):
+        base_context = make_context({"other": [1, 2]})
+        table = {"days": [1, 2]}
+
+        assert (await evaluator.evaluate_batch("days == other", table, base_context)).tolist() == [False, False]
+
+    async def test_failing_rows_are_false(self, evaluator):
+        table = {"lessons": [[1, 2, 3], None, 5]}
+
+        batch = await evaluator.evaluate_batch("COUNT(lessons) >= 1", table, make_context())
+
+        assert batch.tolist() == await per_row(evaluator, "COUNT(lessons) >= 1", table, make_context())
+
+    async def test_columns_must_have_the_same_length(self, evaluator):
+        with pytest.raises(ValueError):
+            await evaluator.evaluate_batch("a == b", {"a": [1, 2], "b": [1]}, make_context())
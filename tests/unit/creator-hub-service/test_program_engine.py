@@ -0,0 +1,452 @@
+"""
+Tests for the program engine: step graph loading, the parallel scheduler and
+resuming interrupted executions from checkpoints.
+"""
+
+import asyncio
+
+import pytest
+
+from shared.cache.execution_checkpoints import ExecutionCheckpointStore
+from shared.cache.leases import LeaseUnavailableError, RedisLease
+from services.creator_hub_service.app.program_engine import (
+    ExecutionContext,
+    ProgramEngine,
+    StepExecutionResult,
+    StepHandler,
+)
+from services.creator_hub_service.app.program_models import (
+    ExecutionConfig,
+    ExecutionStrategy,
+    ProgramDefinition,
+    StepType,
+)
+from services.creator_hub_service.app.step_models import (
+    ActionConfig,
+    ActionType,
+    ProgramStep,
+    TriggerConfig,
+    TriggerType,
+)
+
+
+class RecordingStepHandler(StepHandler):
+    """Records when steps run and how many overlap; fails the steps it is told to"""
+
+    def __init__(self, failing=(), step_seconds=0.01, block_on=None):
+        self.failing = set(failing)
+        self.step_seconds = step_seconds
+        self.block_on = block_on
+        self.reached = asyncio.Event()
+        self.seen_variables = {}
+        self.seen_metrics = {}
+        self.started = []
+        self.finished = []
+        self.running = 0
+        self.peak = 0
+
+    async def can_handle(self, step):
+        return True
+
+    async def validate(self, step):
+        return []
+
+    async def execute(self, step, context, step_debug):
+        self.started.append(step.step_id)
+        self.seen_variables[step.step_id] = dict(context.variables)
+        self.seen_metrics[step.step_id] = dict(context.metrics)
+        if step.step_id == self.block_on:
+            self.reached.set()
+            await asyncio.Event().wait()
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(self.step_seconds)
+        finally:
+            self.running -= 1
+        self.finished.append(step.step_id)
+        context.variables[f"{step.step_id}_done"] = True
+        context.metrics[f"{step.step_id}_score"] = 0.5
+        success = step.step_id not in self.failing
+        return StepExecutionResult(
+            step_id=step.step_id,
+            execution_id=context.execution_id,
+            status="completed" if success else "failed",
+            started_at=context.started_at,
+            success=success,
+            next_step_recommendations=step.next_steps
+        )
+
+
+def make_program(strategy=ExecutionStrategy.PARALLEL_LIMITED, limit=3, entry_step_ids=("a",)):
+    return ProgramDefinition(
+        title="Scheduler test",
+        description="Step graph",
+        creator_id="creator-1",
+        entry_step_ids=list(entry_step_ids),
+        execution_config=ExecutionConfig(execution_strategy=strategy, parallel_execution_limit=limit)
+    )
+
+
+def make_step(program, step_id, order, next_steps=(), prerequisites=()):
+    return ProgramStep(
+        step_id=step_id,
+        program_id=program.id,
+        creator_id="creator-1",
+        step_type=StepType.CUSTOM,
+        title=f"Step {step_id}",
+        step_order=order,
+        trigger_config=TriggerConfig(trigger_type=TriggerType.IMMEDIATE),
+        action_config=ActionConfig(action_type=ActionType.SEND_MESSAGE),
+        next_steps=list(next_steps),
+        prerequisites=list(prerequisites)
+    )
+
+
+def make_context(program, execution_id="execution-1"):
+    return ExecutionContext(
+        program_id=program.id, user_id="user-1", creator_id="creator-1", execution_id=execution_id
+    )
+
+
+def make_engine(handler, program=None, steps=None, checkpoint_store=None):
+    engine = ProgramEngine(checkpoint_store=checkpoint_store)
+    engine.register_step_handler(StepType.CUSTOM, handler)
+    if program is not None:
+        engine.register_program_steps(program, steps)
+    return engine
+
+
+def diamond(program):
+    """a -> (b, c) -> d, where d needs both b and c"""
+    return [
+        make_step(program, "a", 0, next_steps=["b", "c"]),
+        make_step(program, "b", 1, next_steps=["d"], prerequisites=["a"]),
+        make_step(program, "c", 2, next_steps=["d"], prerequisites=["a"]),
+        make_step(program, "d", 3, prerequisites=["b", "c"]),
+    ]
+
+
+class TestProgramGraphLoading:
+    """Test how the engine finds a program's steps."""
+
+    async def test_steps_are_loaded_from_storage(self, monkeypatch):
+        program = make_program(ExecutionStrategy.SEQUENTIAL)
+        steps = [make_step(program, "a", 0)]
+        handler = RecordingStepHandler()
+        engine = make_engine(handler)
+        loads = []
+
+        async def get_program_steps(creator_id, program_id, session=None):
+            loads.append(program_id)
+            return steps
+
+        monkeypatch.setattr(engine, "get_program_steps", get_program_steps)
+
+        await engine.run_program(program, make_context(program, "first"))
+        await engine.run_program(program, make_context(program, "second"))
+
+        assert handler.started == ["a", "a"]
+        assert loads == [program.id]
+
+    async def test_program_without_steps_is_not_cached(self, monkeypatch):
+        program = make_program()
+        stored = []
+        engine = make_engine(RecordingStepHandler())
+
+        async def get_program_steps(creator_id, program_id, session=None):
+            return list(stored)
+
+        monkeypatch.setattr(engine, "get_program_steps", get_program_steps)
+
+        assert (await engine._get_program_graph(program)).steps == {}
+        stored.append(make_step(program, "a", 0))
+
+        assert list((await engine._get_program_graph(program)).steps) == ["a"]
+
+    async def test_saving_a_step_drops_the_cached_graph(self, monkeypatch):
+        program = make_program()
+        stored = [make_step(program, "a", 0)]
+        engine = make_engine(RecordingStepHandler())
+
+        async def get_program_steps(creator_id, program_id, session=None):
+            return list(stored)
+
+        monkeypatch.setattr(engine, "get_program_steps", get_program_steps)
+        await engine._get_program_graph(program)
+
+        step = make_step(program, "b", 1)
+        stored.append(step)
+        await engine.add_step("creator-1", program.id, step)
+
+        assert list((await engine._get_program_graph(program)).steps) == ["a", "b"]
+
+    async def test_cached_graph_expires(self, monkeypatch):
+        program = make_program()
+        stored = [make_step(program, "a", 0)]
+        engine = make_engine(RecordingStepHandler())
+
+        async def get_program_steps(creator_id, program_id, session=None):
+            return list(stored)
+
+        monkeypatch.setattr(engine, "get_program_steps", get_program_steps)
+        await engine._get_program_graph(program)
+
+        # Edited by another worker, which cannot drop this engine's cache
+        stored.append(make_step(program, "b", 1))
+        engine.program_graph_ttl = 0
+
+        assert list((await engine._get_program_graph(program)).steps) == ["a", "b"]
+
+
+class TestSequentialSteps:
+    """Test the SEQUENTIAL batch loop."""
+
+    async def test_failed_step_is_not_run_again(self):
+        program = make_program(ExecutionStrategy.SEQUENTIAL)
+        steps = [
+            make_step(program, "a", 0, next_steps=["b", "c"]),
+            make_step(program, "b", 1, next_steps=["b"]),
+            make_step(program, "c", 2, next_steps=["b"]),
+        ]
+        handler = RecordingStepHandler(failing={"b"})
+        engine = make_engine(handler, program, steps)
+        context = make_context(program)
+
+        result = await engine.run_program(program, context)
+
+        assert handler.started.count("b") == 1
+        assert result.failed_steps == 1
+        assert context.failed_steps == ["b"]
+
+
+class TestParallelScheduler:
+    """Test the PARALLEL_LIMITED step scheduler."""
+
+    async def test_steps_run_in_dependency_order(self):
+        program = make_program()
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, diamond(program))
+
+        result = await engine.run_program(program, make_context(program))
+
+        assert result.successful_steps == 4
+        assert handler.started[0] == "a"
+        assert set(handler.started[1:3]) == {"b", "c"}
+        assert handler.started[3] == "d"
+        assert handler.finished.index("d") > max(handler.finished.index("b"), handler.finished.index("c"))
+
+    async def test_step_waits_for_all_prerequisites(self):
+        program = make_program()
+        handler = RecordingStepHandler()
+        steps = diamond(program)
+        engine = make_engine(handler, program, steps)
+        slow_c = handler.execute
+
+        async def execute(step, context, step_debug):
+            if step.step_id == "c":
+                await asyncio.sleep(0.05)
+            return await slow_c(step, context, step_debug)
+
+        handler.execute = execute
+
+        await engine.run_program(program, make_context(program))
+
+        assert handler.started.index("d") > handler.finished.index("c")
+
+    @pytest.mark.parametrize("limit", [1, 2, 3])
+    async def test_concurrency_is_limited(self, limit):
+        program = make_program(limit=limit, entry_step_ids=[f"s{i}" for i in range(6)])
+        steps = [make_step(program, f"s{i}", i) for i in range(6)]
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps)
+
+        result = await engine.run_program(program, make_context(program))
+
+        assert result.successful_steps == 6
+        assert handler.peak == limit
+
+    async def test_failure_skips_dependents(self):
+        program = make_program()
+        handler = RecordingStepHandler(failing={"b"})
+        engine = make_engine(handler, program, diamond(program))
+        context = make_context(program)
+
+        result = await engine.run_program(program, context)
+
+        assert "d" not in handler.started
+        assert sorted(handler.started) == ["a", "b", "c"]
+        assert result.failed_steps == 1
+        assert context.failed_steps == ["b"]
+        assert sorted(context.completed_steps) == ["a", "c"]
+
+    async def test_failure_does_not_stop_independent_branches(self):
+        program = make_program(entry_step_ids=["a", "x"])
+        steps = [
+            make_step(program, "a", 0, next_steps=["b"]),
+            make_step(program, "b", 1, prerequisites=["a"]),
+            make_step(program, "x", 2, next_steps=["y"]),
+            make_step(program, "y", 3, prerequisites=["x"]),
+        ]
+        handler = RecordingStepHandler(failing={"a"})
+        engine = make_engine(handler, program, steps)
+
+        await engine.run_program(program, make_context(program))
+
+        assert sorted(handler.started) == ["a", "x", "y"]
+
+
+@pytest.fixture
+def checkpoint_store(redis_client):
+    return ExecutionCheckpointStore(redis_client)
+
+
+def linear(program, count=4):
+    return [
+        make_step(program, f"s{i}", i, next_steps=[f"s{i + 1}"] if i + 1 < count else [])
+        for i in range(count)
+    ]
+
+
+async def interrupt(program, steps, checkpoint_store, at_step):
+    """Run a program until it reaches ``at_step``, then kill it like a crashed worker"""
+    handler = RecordingStepHandler(block_on=at_step)
+    engine = make_engine(handler, program, steps, checkpoint_store)
+    run = asyncio.create_task(engine.run_program(program, make_context(program, "interrupted")))
+    await handler.reached.wait()
+    # Let steps running alongside it finish and checkpoint first
+    while handler.running:
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.01)
+    run.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await run
+    return handler
+
+
+class TestResumeProgram:
+    """Test run -> interrupt -> resume."""
+
+    async def test_checkpointed_steps_are_replayed_not_rerun(self, checkpoint_store):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        first = await interrupt(program, steps, checkpoint_store, at_step="s2")
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps, checkpoint_store)
+
+        result = await engine.resume_program(program, "creator-1", "interrupted")
+
+        assert first.finished == ["s0", "s1"]
+        assert handler.started == ["s2", "s3"]
+        assert result.status == "completed"
+        assert [r.step_id for r in result.step_results] == ["s0", "s1", "s2", "s3"]
+        assert result.successful_steps == 4
+        assert await checkpoint_store.load("creator-1", "interrupted") is None
+
+    async def test_parallel_run_resumes_unfinished_steps(self, checkpoint_store):
+        program = make_program()
+        steps = diamond(program)
+        first = await interrupt(program, steps, checkpoint_store, at_step="c")
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps, checkpoint_store)
+
+        result = await engine.resume_program(program, "creator-1", "interrupted")
+
+        assert first.finished == ["a", "b"]
+        assert sorted(handler.started) == ["c", "d"]
+        assert result.successful_steps == 4
+
+    async def test_restored_variables_and_metrics_are_used(self, checkpoint_store):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        await interrupt(program, steps, checkpoint_store, at_step="s2")
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps, checkpoint_store)
+
+        await engine.resume_program(program, "creator-1", "interrupted")
+
+        assert handler.seen_variables["s2"] == {"s0_done": True, "s1_done": True}
+        assert handler.seen_metrics["s2"] == {"s0_score": 0.5, "s1_score": 0.5}
+
+    async def test_other_program_version_is_rejected(self, checkpoint_store):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        await interrupt(program, steps, checkpoint_store, at_step="s2")
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps, checkpoint_store)
+
+        # The resume endpoint answers 409 Conflict for this ValueError
+        with pytest.raises(ValueError):
+            await engine.resume_program(
+                program.model_copy(update={"version": "2.0"}), "creator-1", "interrupted"
+            )
+        other = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        with pytest.raises(ValueError):
+            await engine.resume_program(other, "creator-1", "interrupted")
+
+        assert handler.started == []
+        assert await checkpoint_store.load("creator-1", "interrupted") is not None
+
+    async def test_executed_program_can_be_resumed(self, checkpoint_store, monkeypatch):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        engine = make_engine(RecordingStepHandler(failing={"s2"}), program, steps, checkpoint_store)
+
+        async def get_program(creator_id, program_id, session=None):
+            return program
+
+        monkeypatch.setattr(engine, "get_program", get_program)
+
+        result = await engine.execute_program("creator-1", program.id, "user-1")
+        handler = RecordingStepHandler()
+        resumed = await make_engine(handler, program, steps, checkpoint_store).resume_program(
+            program, "creator-1", result.execution_id
+        )
+
+        assert result.failed_steps == 1
+        assert handler.started == ["s2", "s3"]
+        assert resumed.successful_steps == 4
+
+    async def test_executing_a_missing_program_fails(self):
+        engine = make_engine(RecordingStepHandler())
+
+        with pytest.raises(ValueError):
+            await engine.execute_program("creator-1", "missing", "user-1")
+
+    async def test_missing_checkpoint(self, checkpoint_store):
+        program = make_program()
+        engine = make_engine(RecordingStepHandler(), program, diamond(program), checkpoint_store)
+
+        assert await engine.resume_program(program, "creator-1", "never-started") is None
+
+    async def test_concurrent_resumes_run_once(self, checkpoint_store):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        await interrupt(program, steps, checkpoint_store, at_step="s2")
+        handlers = [RecordingStepHandler(), RecordingStepHandler()]
+        engines = [make_engine(handler, program, steps, checkpoint_store) for handler in handlers]
+
+        outcomes = await asyncio.gather(
+            *(engine.resume_program(program, "creator-1", "interrupted") for engine in engines),
+            return_exceptions=True
+        )
+
+        assert sum(isinstance(outcome, LeaseUnavailableError) for outcome in outcomes) == 1
+        assert sorted(handlers[0].started + handlers[1].started) == ["s2", "s3"]
+
+    async def test_resume_waits_for_the_lease(self, checkpoint_store):
+        program = make_program(ExecutionStrategy.SEQUENTIAL, entry_step_ids=["s0"])
+        steps = linear(program)
+        await interrupt(program, steps, checkpoint_store, at_step="s2")
+        handler = RecordingStepHandler()
+        engine = make_engine(handler, program, steps, checkpoint_store)
+        other_worker = RedisLease(checkpoint_store.redis, "creator-1", "execution:resume:interrupted")
+        await other_worker.acquire()
+
+        with pytest.raises(LeaseUnavailableError):
+            await engine.resume_program(program, "creator-1", "interrupted")
+        assert handler.started == []
+
+        await other_worker.release()
+        assert (await engine.resume_program(program, "creator-1", "interrupted")).successful_steps == 4
+        assert await other_worker.holder() is None